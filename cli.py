@@ -5,6 +5,8 @@ cli.py — Unified CLI for the hgraph_platform_tools project.
 Provides a single entry point with subcommands for every module:
 
     python cli.py book    --input_file trade.json --output_dir output/
+    python cli.py requeue --output_dir output/ --concurrency 16
+    python cli.py requeue --output_dir output/ --validate-fpml --delta-amends --skip-duplicates
     python cli.py entitlements update trader1 Trader
     python cli.py entitlements query trader1
     python cli.py static-admin --init-db --db-path static_data.db
@@ -12,10 +14,18 @@ Provides a single entry point with subcommands for every module:
     python cli.py parse-xsd --xsd path/to/file.xsd
     python cli.py party-subscribe --db-path party_data.db
     python cli.py party-subscribe --init-db --db-path party_data.db
+    python cli.py party-subscribe --db-path party_data.db --snapshot-dir snapshots/
     python cli.py portfolio-subscribe --db-path portfolio_data.db
     python cli.py portfolio-subscribe --init-db --db-path portfolio_data.db
     python cli.py credit-subscribe --db-path credit_data.db
     python cli.py credit-subscribe --init-db --db-path credit_data.db
+    python cli.py credit-subscribe --db-path credit_data.db --dead-letter --retry-delays 30,300
+    python cli.py dead-letter-replay --subscriber credit
+    python cli.py daemon
+
+While ``daemon`` is running, book, requeue, entitlements, notify, parse-xsd and
+static-admin are forwarded to it (see hgraph_trade/daemon.py); pass
+``--no-daemon`` or set ``HGRAPH_DAEMON=0`` to run in-process.
 
 Can also be installed as a console script via pyproject.toml.
 """
@@ -23,6 +33,7 @@ Can also be installed as a console script via pyproject.toml.
 import argparse
 import logging
 import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from hgraph_trade.logging_config import setup_logging
 
@@ -30,6 +41,118 @@ __all__ = ("main",)
 
 logger = logging.getLogger(__name__)
 
+# Objects reused across commands inside ``hgraph-tools daemon`` (see _warm); a
+# one-shot CLI process builds them per run
+_WARM_CACHE: Dict[Any, Any] = {}
+_DAEMON_MODE = False
+
+# How stale the daemon's static-data snapshot may get before a book reloads it
+_DAEMON_STATIC_MAX_AGE = 60.0
+
+
+def _warm(key: Any, factory: Callable[[], Any]) -> Any:
+    """Return ``factory()``, cached under ``key`` while running inside the daemon."""
+    if not _DAEMON_MODE:
+        return factory()
+    value = _WARM_CACHE.get(key)
+    if value is None:
+        value = _WARM_CACHE[key] = factory()
+    return value
+
+
+def _add_booking_check_arguments(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--validate-fpml",
+        action="store_true",
+        help="Quarantine messages that do not conform to the FpML schema (requires parse-xsd output)",
+    )
+    p.add_argument(
+        "--delta-amends",
+        action="store_true",
+        help="Book amendTrade/cancelTrade as deltas against the previously booked version",
+    )
+    p.add_argument(
+        "--skip-duplicates",
+        action="store_true",
+        help="Skip messages identical to the booked version of their trade (Bloom-filter backed)",
+    )
+    p.add_argument(
+        "--enrich-static",
+        action="store_true",
+        help="Add LEIs and legal names to trade headers and reject trades whose parties, portfolio or trading "
+        "relationship are not in the static data stores (loaded once per run)",
+    )
+    p.add_argument(
+        "--party-db", type=str, default=None, help="Party store for --enrich-static (default: PARTY_DB_PATH)"
+    )
+    p.add_argument(
+        "--portfolio-db",
+        type=str,
+        default=None,
+        help="Portfolio store for --enrich-static (default: PORTFOLIO_DB_PATH)",
+    )
+    p.add_argument(
+        "--credit-db",
+        type=str,
+        default=None,
+        help="Credit store for --enrich-static; counterparties must then have an active credit limit",
+    )
+
+
+def _booking_checks(args: argparse.Namespace) -> Optional[Tuple[Any, Any, Any, Any]]:
+    """Validator, enricher, version store and duplicate filter selected by the booking check flags."""
+    import os
+
+    validator = None
+    if args.validate_fpml:
+        from hgraph_trade.hgraph_trade_booker.fpml_validator import FpmlValidator
+
+        try:
+            validator = _warm(("validator",), FpmlValidator.from_reference_files)
+        except FileNotFoundError as exc:
+            logger.error("%s", exc)
+            return None
+
+    enricher = None
+    if args.enrich_static:
+        import sqlite3
+
+        from secure_config import config
+        from hgraph_trade.hgraph_trade_booker.static_enrichment import StaticDataEnricher
+
+        # Absolute paths: the daemon serves clients from different working directories
+        stores = (
+            os.path.abspath(args.party_db or config["PARTY_DB_PATH"]),
+            os.path.abspath(args.portfolio_db or config["PORTFOLIO_DB_PATH"]),
+            os.path.abspath(args.credit_db) if args.credit_db else None,
+        )
+        try:
+            enricher = _warm(
+                ("enricher", stores),
+                lambda: StaticDataEnricher.from_stores(
+                    *stores,
+                    require_credit_limit=args.credit_db is not None,
+                    max_age=_DAEMON_STATIC_MAX_AGE if _DAEMON_MODE else None,
+                ),
+            )
+        except sqlite3.Error as exc:
+            logger.error("Cannot load static data: %s", exc)
+            return None
+
+    version_store = None
+    if args.delta_amends:
+        from hgraph_trade.hgraph_trade_booker.trade_delta import DEFAULT_VERSIONS_DIR, TradeVersionStore
+
+        version_store = TradeVersionStore(os.path.join(args.output_dir, DEFAULT_VERSIONS_DIR))
+
+    duplicate_filter = None
+    if args.skip_duplicates:
+        from hgraph_trade.hgraph_trade_booker.duplicate_filter import BookedTradeFilter
+
+        duplicate_filter = BookedTradeFilter.open_or_rebuild(args.output_dir)
+
+    return validator, enricher, version_store, duplicate_filter
+
 
 # ---------------------------------------------------------------------------
 # Subcommand: book
@@ -38,41 +161,176 @@ def _add_book_parser(subparsers: argparse._SubParsersAction) -> None:
     p = subparsers.add_parser("book", help="Process and book trades")
     p.add_argument("--input_file", type=str, help="Path to a single trade file")
     p.add_argument("--input_dir", type=str, help="Directory of trade files (*.json, *.txt)")
+    p.add_argument(
+        "--input_archive",
+        type=str,
+        help="Tar (optionally compressed) or zip archive of trade files, streamed without extraction ('-' reads a tar "
+        "from stdin)",
+    )
+    p.add_argument("--fetch_ids", type=str, help="File of trade IDs (one per line, '-' for stdin) to fetch and book")
+    p.add_argument(
+        "--fetch_window",
+        nargs=2,
+        metavar=("START", "END"),
+        help="Fetch and book every trade in [START, END) (ISO timestamps)",
+    )
+    p.add_argument("--source_url", type=str, default=None, help="Trade service URL (default: TRADE_SOURCE_API_URL)")
     p.add_argument("--output_dir", type=str, required=True, help="Output directory for booked trades")
     p.add_argument("--fail-fast", action="store_true", help="Stop on first error")
+    _add_booking_check_arguments(p)
+    p.add_argument(
+        "--async-pipeline",
+        action="store_true",
+        help="Load, map and book concurrently through bounded queues (prints queue depths)",
+    )
+    p.add_argument("--queue-size", type=int, default=None, help="Async pipeline queue capacity (default: 64)")
+    p.add_argument("--map-workers", type=int, default=None, help="Async pipeline mapping processes (default: CPUs)")
+    p.add_argument("--sink-concurrency", type=int, default=None, help="Async pipeline booking threads (default: 8)")
+    p.add_argument(
+        "--profile",
+        metavar="OUT",
+        default=None,
+        help="Profile each stage and write a hotspot report, collapsed stacks and .pstats files to directory OUT",
+    )
     p.add_argument("--verbose", action="store_true", help="Enable debug logging")
     p.set_defaults(func=_run_book)
 
 
 def _run_book(args: argparse.Namespace) -> int:
     import glob as globmod
+    import os
+    from typing import Any, Iterable, Tuple
+
     from hgraph_trade.hgraph_trade_booker.pipeline_result import PipelineResult, TradeResult, TradeStatus
-    from hgraph_trade.hgraph_trade_booker.trade_loader import load_trade_from_file
+    from hgraph_trade.hgraph_trade_booker.trade_loader import (
+        load_trade_from_dict,
+        load_trade_from_file,
+        load_trade_from_string,
+    )
     from hgraph_trade.hgraph_trade_booker.trade_mapper import map_trade_to_model
     from hgraph_trade.hgraph_trade_booker.trade_booker import book_trades_batch
 
-    files: list[str] = []
-    if args.input_file:
-        files = [args.input_file]
-    elif args.input_dir:
-        files = sorted(globmod.glob(f"{args.input_dir}/*.json") + globmod.glob(f"{args.input_dir}/*.txt"))
+    # (source, content) pairs: content is None for files on disk, the member text
+    # for archive members, the trade dict for fetched trades, or the exception
+    # raised reading it
+    sources: Iterable[Tuple[str, Any]]
+    if args.fetch_ids or args.fetch_window:
+        import datetime
+
+        from hgraph_trade.hgraph_trade_booker.trade_source import TradeSourceClient, TradeSourceError
+
+        client = TradeSourceClient(args.source_url) if args.source_url else TradeSourceClient.from_config()
+        try:
+            if args.fetch_ids:
+                with sys.stdin if args.fetch_ids == "-" else open(args.fetch_ids, "r", encoding="utf-8") as fh:
+                    trade_ids = [line.strip() for line in fh if line.strip()]
+                trades = client.iter_trades(trade_ids)
+            else:
+                start, end = (datetime.datetime.fromisoformat(ts) for ts in args.fetch_window)
+                trades = client.iter_trades_in_window(start, end)
+        except (OSError, ValueError) as exc:
+            logger.error("%s", exc)
+            return 2
+
+        def _fetched() -> Iterable[Tuple[str, Any]]:
+            try:
+                for trade in trades:
+                    yield str(trade.get("trade_id", client.base_url)), trade
+            except TradeSourceError as exc:
+                logger.error("Trade service fetch aborted: %s", exc)
+                yield client.base_url, exc
+
+        sources = _fetched()
+    elif args.input_archive:
+        from hgraph_trade.hgraph_trade_booker.trade_archive import iter_archive_members
+
+        try:
+            sources = iter_archive_members(sys.stdin.buffer if args.input_archive == "-" else args.input_archive)
+        except (OSError, ValueError) as exc:
+            logger.error("Cannot read archive %s: %s", args.input_archive, exc)
+            return 2
     else:
-        logger.error("Provide --input_file or --input_dir")
+        files: list[str] = []
+        if args.input_file:
+            files = [args.input_file]
+        elif args.input_dir:
+            files = sorted(globmod.glob(f"{args.input_dir}/*.json") + globmod.glob(f"{args.input_dir}/*.txt"))
+        else:
+            logger.error("Provide --input_file, --input_dir, --input_archive, --fetch_ids or --fetch_window")
+            return 2
+
+        if not files:
+            logger.error("No trade files found")
+            return 2
+        sources = ((fp, None) for fp in files)
+
+    if args.async_pipeline and (args.delta_amends or args.skip_duplicates or args.profile):
+        logger.error("--async-pipeline cannot be combined with --delta-amends, --skip-duplicates or --profile")
         return 2
 
-    if not files:
-        logger.error("No trade files found")
+    checks = _booking_checks(args)
+    if checks is None:
         return 2
+    validator, enricher, version_store, duplicate_filter = checks
+
+    if args.async_pipeline:
+        from hgraph_trade.hgraph_trade_booker.async_pipeline import (
+            DEFAULT_QUEUE_SIZE,
+            DEFAULT_SINK_CONCURRENCY,
+            book_files_async,
+        )
+
+        try:
+            pipeline, stats = book_files_async(
+                (fp if content is None else (fp, content) for fp, content in sources),
+                args.output_dir,
+                queue_size=args.queue_size or DEFAULT_QUEUE_SIZE,
+                map_workers=args.map_workers,
+                sink_concurrency=args.sink_concurrency or DEFAULT_SINK_CONCURRENCY,
+                validator=validator,
+                fail_fast=args.fail_fast,
+                enricher=enricher,
+            )
+        except ValueError as exc:
+            logger.error("%s", exc)
+            return 2
+        if pipeline.total == 0:
+            logger.error("No trades found")
+            return 2
+        print("\n" + pipeline.summary())
+        print(stats.summary())
+        return 0 if pipeline.failure_count == 0 else 1
+
+    from hgraph_trade.hgraph_trade_booker.pipeline_profiler import NULL_PROFILER
+
+    profiler = NULL_PROFILER
+    if args.profile:
+        from hgraph_trade.hgraph_trade_booker.pipeline_profiler import PipelineProfiler
+        from hgraph_trade.hgraph_trade_mapping.instrument_mappings import map_pricing_instrument
+
+        profiler = PipelineProfiler().start()
 
     pipeline = PipelineResult()
     all_messages = []
 
-    for fp in files:
+    for fp, content in sources:
         trade_id = fp
         try:
-            trade_data = load_trade_from_file(fp)
+            if isinstance(content, Exception):
+                raise content
+            with profiler.stage("load"):
+                if content is None:
+                    trade_data = load_trade_from_file(fp)
+                elif isinstance(content, dict):
+                    trade_data = load_trade_from_dict(content, fp)
+                else:
+                    trade_data = load_trade_from_string(content, fp)
             trade_id = trade_data.get("trade_id", fp)
-            messages = map_trade_to_model(trade_data, fail_fast=args.fail_fast)
+            instrument_type = None
+            if profiler.enabled:
+                instrument_type = map_pricing_instrument(str(trade_data.get("instrument", "")))[0] or "unknown"
+            with profiler.stage("map", instrument_type):
+                messages = map_trade_to_model(trade_data, fail_fast=args.fail_fast, enricher=enricher)
             if not messages:
                 raise ValueError("Mapping produced zero trade messages")
             all_messages.extend(messages)
@@ -98,20 +356,87 @@ def _run_book(args: argparse.Namespace) -> int:
             if args.fail_fast:
                 break
 
+    if pipeline.total == 0:
+        profiler.stop()
+        logger.error("No trades found")
+        return 2
+
     if all_messages:
-        result = book_trades_batch(all_messages, args.output_dir)
+        with profiler.stage("book"):
+            result = book_trades_batch(
+                all_messages,
+                args.output_dir,
+                validator=validator,
+                version_store=version_store,
+                duplicate_filter=duplicate_filter,
+            )
+        if result["duplicates"]:
+            print(f"Skipped {len(result['duplicates'])} duplicate trade message(s)")
         if result["quarantined"]:
+            invalid = set(result["invalid"])
             for qp in result["quarantined"]:
                 pipeline.add(
                     TradeResult(
                         trade_id=qp,
-                        status=TradeStatus.BOOKING_FAILED,
+                        status=TradeStatus.VALIDATION_FAILED if qp in invalid else TradeStatus.BOOKING_FAILED,
                         message=f"Quarantined to {qp}",
-                        stage="booking",
+                        stage="validation" if qp in invalid else "booking",
                     )
                 )
 
     pipeline.finalise()
+    print("\n" + pipeline.summary())
+    profiler.stop()
+    if profiler.enabled:
+        print(f"Profile written to {profiler.write(args.profile)}")
+    return 0 if pipeline.failure_count == 0 else 1
+
+
+# ---------------------------------------------------------------------------
+# Subcommand: requeue
+# ---------------------------------------------------------------------------
+def _add_requeue_parser(subparsers: argparse._SubParsersAction) -> None:
+    p = subparsers.add_parser("requeue", help="Re-book trades from the quarantine directory")
+    p.add_argument("--output_dir", type=str, required=True, help="Output directory for booked trades")
+    p.add_argument(
+        "--quarantine_dir", type=str, default=None, help="Quarantine directory (default: <output_dir>/quarantine)"
+    )
+    p.add_argument("--archive_dir", type=str, default=None, help="Move replayed files here instead of deleting them")
+    p.add_argument("--concurrency", type=int, default=None, help="Number of parallel booking workers (default: 8)")
+    p.add_argument("--fail-fast", action="store_true", help="Stop on first error")
+    _add_booking_check_arguments(p)
+    p.set_defaults(func=_run_requeue)
+
+
+def _run_requeue(args: argparse.Namespace) -> int:
+    import os
+
+    from hgraph_trade.hgraph_trade_booker.quarantine_replay import DEFAULT_REQUEUE_CONCURRENCY, requeue_quarantined
+    from hgraph_trade.hgraph_trade_booker.trade_booker import DEFAULT_QUARANTINE_DIR
+
+    quarantine_dir = args.quarantine_dir or os.path.join(args.output_dir, DEFAULT_QUARANTINE_DIR)
+    concurrency = args.concurrency or DEFAULT_REQUEUE_CONCURRENCY
+    checks = _booking_checks(args)
+    if checks is None:
+        return 2
+    validator, enricher, version_store, duplicate_filter = checks
+
+    try:
+        pipeline = requeue_quarantined(
+            quarantine_dir,
+            args.output_dir,
+            concurrency=concurrency,
+            archive_dir=args.archive_dir,
+            fail_fast=args.fail_fast,
+            validator=validator,
+            enricher=enricher,
+            version_store=version_store,
+            duplicate_filter=duplicate_filter,
+        )
+    except (FileNotFoundError, ValueError) as exc:
+        logger.error("%s", exc)
+        return 2
+
     print("\n" + pipeline.summary())
     return 0 if pipeline.failure_count == 0 else 1
 
@@ -187,12 +512,16 @@ def _add_static_admin_parser(subparsers: argparse._SubParsersAction) -> None:
     p.add_argument("--fetch", action="store_true", help="Fetch and store static data from API")
     p.add_argument("--db-path", type=str, default=None, help="Path to SQLite database")
     p.add_argument("--api-url", type=str, default=None, help="API URL for static data")
+    p.add_argument("--force", action="store_true", help="Fetch and store even if the API reports the data unchanged")
+    p.add_argument("--page-size", type=int, default=None, help="Records requested per page (default: 500)")
+    p.add_argument("--concurrency", type=int, default=None, help="Concurrent page requests (default: 4)")
     p.set_defaults(func=_run_static_admin)
 
 
 def _run_static_admin(args: argparse.Namespace) -> int:
     from secure_config import config
     from hgraph_static_admin.example_code import init_db, run_pipeline
+    from hgraph_static_admin.static_data_source import DEFAULT_CONCURRENCY, DEFAULT_PAGE_SIZE, StaticDataSourceError
 
     db_path = args.db_path or config["STATIC_DATA_DB_PATH"]
     api_url = args.api_url or config["STATIC_DATA_API_URL"]
@@ -201,7 +530,17 @@ def _run_static_admin(args: argparse.Namespace) -> int:
         init_db(db_path)
         logger.info("Database initialised at %s", db_path)
     if args.fetch:
-        run_pipeline(api_url, db_path)
+        try:
+            run_pipeline(
+                api_url,
+                db_path,
+                force=args.force,
+                page_size=args.page_size or DEFAULT_PAGE_SIZE,
+                concurrency=args.concurrency or DEFAULT_CONCURRENCY,
+            )
+        except (StaticDataSourceError, ValueError) as exc:
+            logger.error("%s", exc)
+            return 2
     return 0
 
 
@@ -232,25 +571,105 @@ def _add_parse_xsd_parser(subparsers: argparse._SubParsersAction) -> None:
     p = subparsers.add_parser("parse-xsd", help="Parse FpML XSD and generate JSON tag dictionary")
     p.add_argument("--xsd", type=str, default=None, help="Path to XSD file")
     p.add_argument("--output", type=str, default=None, help="Output JSON file path")
+    p.add_argument("--index", type=str, default=None, help="Output memory-mapped tag index path")
+    p.add_argument("--workers", type=int, default=1, help="Worker processes for parsing (default: 1)")
+    p.add_argument("--force", action="store_true", help="Regenerate even if the XSD files are unchanged")
     p.set_defaults(func=_run_parse_xsd)
 
 
 def _run_parse_xsd(args: argparse.Namespace) -> int:
     from hgraph_trade.fpml_xsd_reference_files.fpml_XSD_parser import (
-        parse_xsd_schema,
-        save_fpml_tags,
+        generate_fpml_tags,
         DEFAULT_XSD,
         DEFAULT_OUTPUT,
     )
+    from hgraph_trade.fpml_xsd_reference_files.fpml_tag_index import DEFAULT_INDEX
 
     xsd = args.xsd or DEFAULT_XSD
     output = args.output or DEFAULT_OUTPUT
-    fpml_tags = parse_xsd_schema(xsd)
-    save_fpml_tags(fpml_tags, output)
-    print(f"Done. {len(fpml_tags)} elements written to {output}")
+    index = args.index or DEFAULT_INDEX
+    try:
+        regenerated = generate_fpml_tags(xsd, output, index, workers=args.workers, force=args.force)
+    except ValueError as exc:
+        logger.error("%s", exc)
+        return 2
+    if regenerated:
+        print(f"Done. FpML tags written to {output} and {index}")
+    else:
+        print(f"Up to date. {output} matches {xsd}")
     return 0
 
 
+# ---------------------------------------------------------------------------
+# Subscribers: shared metrics exporter, snapshot, worker and dead-letter options
+# ---------------------------------------------------------------------------
+def _start_metrics_exporter(port: int | None):
+    """Start the Prometheus exporter if a port was given; return it, or None."""
+    if port is None:
+        return None
+    from hgraph_trade.metrics.exporter import MetricsExporter
+
+    return MetricsExporter(port).start()
+
+
+def _add_snapshot_arguments(p: argparse.ArgumentParser) -> None:
+    """Add the database snapshot options shared by the subscribe commands."""
+    p.add_argument(
+        "--snapshot-dir",
+        type=str,
+        default=None,
+        help="Restore the latest database snapshot from here on a cold start and write new ones periodically",
+    )
+    p.add_argument(
+        "--snapshot-interval",
+        type=float,
+        default=300.0,
+        help="Seconds between database snapshots; 0 only restores (default: 300)",
+    )
+
+
+def _add_worker_arguments(p: argparse.ArgumentParser) -> None:
+    """Add the worker pool options shared by the subscribe commands."""
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker threads processing poll batches; 1 processes on the polling thread (default: 1)",
+    )
+    p.add_argument(
+        "--dispatch",
+        choices=("partition", "key"),
+        default="partition",
+        help="Route records to workers by partition, or by message key to spread hot partitions (default: partition)",
+    )
+
+
+def _retry_delays(value: str) -> tuple:
+    """Parse ``--retry-delays``: comma-separated seconds, or empty for none."""
+    try:
+        delays = tuple(float(delay) for delay in value.split(",") if delay.strip())
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated seconds, got {value!r}")
+    if any(delay < 0 for delay in delays):
+        raise argparse.ArgumentTypeError(f"retry delays must not be negative, got {value!r}")
+    return delays
+
+
+def _add_dead_letter_arguments(p: argparse.ArgumentParser) -> None:
+    """Add the retry and dead-letter options shared by the subscribe commands."""
+    p.add_argument(
+        "--dead-letter",
+        action="store_true",
+        help="Publish records that fail to retry topics, then to <subscriber>.dead_letter, instead of skipping them",
+    )
+    p.add_argument(
+        "--retry-delays",
+        type=_retry_delays,
+        default=(30.0, 300.0),
+        help="Seconds a failed record waits in each retry tier; empty dead-letters at once (default: 30,300)",
+    )
+
+
 # ---------------------------------------------------------------------------
 # Subcommand: party-subscribe
 # ---------------------------------------------------------------------------
@@ -262,6 +681,16 @@ def _add_party_subscribe_parser(subparsers: argparse._SubParsersAction) -> None:
     p.add_argument("--group-id", type=str, default=None, help="Kafka consumer group")
     p.add_argument("--entity-topic", type=str, default=None, help="Topic for legal entity messages")
     p.add_argument("--relationship-topic", type=str, default=None, help="Topic for trading relationship messages")
+    p.add_argument(
+        "--entity-cache-size",
+        type=int,
+        default=10_000,
+        help="Legal entities kept in the lookup cache for relationship messages (default: 10000)",
+    )
+    p.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port")
+    _add_snapshot_arguments(p)
+    _add_worker_arguments(p)
+    _add_dead_letter_arguments(p)
     p.set_defaults(func=_run_party_subscribe)
 
 
@@ -279,12 +708,25 @@ def _run_party_subscribe(args: argparse.Namespace) -> int:
 
     from hgraph_static_admin.party_kafka_subscriber import PartyKafkaSubscriber
 
+    try:
+        exporter = _start_metrics_exporter(args.metrics_port)
+    except OSError as exc:
+        logger.error("Cannot serve metrics on port %s: %s", args.metrics_port, exc)
+        return 2
+
     subscriber = PartyKafkaSubscriber(
         db_path,
         bootstrap_servers=args.bootstrap_servers,
         group_id=args.group_id,
         entity_topic=args.entity_topic,
         relationship_topic=args.relationship_topic,
+        entity_cache_size=args.entity_cache_size,
+        snapshot_dir=args.snapshot_dir,
+        snapshot_interval_s=args.snapshot_interval,
+        workers=args.workers,
+        dispatch=args.dispatch,
+        dead_letter=args.dead_letter,
+        retry_delays=args.retry_delays,
     )
     try:
         logger.info("Starting party Kafka subscriber...")
@@ -293,6 +735,8 @@ def _run_party_subscribe(args: argparse.Namespace) -> int:
         logger.info("Interrupted by user")
     finally:
         subscriber.close()
+        if exporter is not None:
+            exporter.stop()
     return 0
 
 
@@ -307,6 +751,10 @@ def _add_portfolio_subscribe_parser(subparsers: argparse._SubParsersAction) -> N
     p.add_argument("--group-id", type=str, default=None, help="Kafka consumer group")
     p.add_argument("--portfolio-topic", type=str, default=None, help="Topic for portfolio messages")
     p.add_argument("--book-topic", type=str, default=None, help="Topic for book messages")
+    p.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port")
+    _add_snapshot_arguments(p)
+    _add_worker_arguments(p)
+    _add_dead_letter_arguments(p)
     p.set_defaults(func=_run_portfolio_subscribe)
 
 
@@ -324,12 +772,24 @@ def _run_portfolio_subscribe(args: argparse.Namespace) -> int:
 
     from hgraph_static_admin.portfolio_kafka_subscriber import PortfolioKafkaSubscriber
 
+    try:
+        exporter = _start_metrics_exporter(args.metrics_port)
+    except OSError as exc:
+        logger.error("Cannot serve metrics on port %s: %s", args.metrics_port, exc)
+        return 2
+
     subscriber = PortfolioKafkaSubscriber(
         db_path,
         bootstrap_servers=args.bootstrap_servers,
         group_id=args.group_id,
         portfolio_topic=args.portfolio_topic,
         book_topic=args.book_topic,
+        snapshot_dir=args.snapshot_dir,
+        snapshot_interval_s=args.snapshot_interval,
+        workers=args.workers,
+        dispatch=args.dispatch,
+        dead_letter=args.dead_letter,
+        retry_delays=args.retry_delays,
     )
     try:
         logger.info("Starting portfolio Kafka subscriber...")
@@ -338,6 +798,8 @@ def _run_portfolio_subscribe(args: argparse.Namespace) -> int:
         logger.info("Interrupted by user")
     finally:
         subscriber.close()
+        if exporter is not None:
+            exporter.stop()
     return 0
 
 
@@ -352,6 +814,10 @@ def _add_credit_subscribe_parser(subparsers: argparse._SubParsersAction) -> None
     p.add_argument("--group-id", type=str, default=None, help="Kafka consumer group")
     p.add_argument("--limit-topic", type=str, default=None, help="Topic for credit limit messages")
     p.add_argument("--utilization-topic", type=str, default=None, help="Topic for credit utilization messages")
+    p.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this port")
+    _add_snapshot_arguments(p)
+    _add_worker_arguments(p)
+    _add_dead_letter_arguments(p)
     p.set_defaults(func=_run_credit_subscribe)
 
 
@@ -369,12 +835,24 @@ def _run_credit_subscribe(args: argparse.Namespace) -> int:
 
     from hgraph_static_admin.credit_kafka_subscriber import CreditKafkaSubscriber
 
+    try:
+        exporter = _start_metrics_exporter(args.metrics_port)
+    except OSError as exc:
+        logger.error("Cannot serve metrics on port %s: %s", args.metrics_port, exc)
+        return 2
+
     subscriber = CreditKafkaSubscriber(
         db_path,
         bootstrap_servers=args.bootstrap_servers,
         group_id=args.group_id,
         limit_topic=args.limit_topic,
         utilization_topic=args.utilization_topic,
+        snapshot_dir=args.snapshot_dir,
+        snapshot_interval_s=args.snapshot_interval,
+        workers=args.workers,
+        dispatch=args.dispatch,
+        dead_letter=args.dead_letter,
+        retry_delays=args.retry_delays,
     )
     try:
         logger.info("Starting credit Kafka subscriber...")
@@ -383,6 +861,52 @@ def _run_credit_subscribe(args: argparse.Namespace) -> int:
         logger.info("Interrupted by user")
     finally:
         subscriber.close()
+        if exporter is not None:
+            exporter.stop()
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Subcommand: dead-letter-replay
+# ---------------------------------------------------------------------------
+def _add_dead_letter_replay_parser(subparsers: argparse._SubParsersAction) -> None:
+    p = subparsers.add_parser(
+        "dead-letter-replay", help="Publish a subscriber's dead-lettered messages back to their original topics"
+    )
+    p.add_argument("--subscriber", choices=("party", "portfolio", "credit"), required=True, help="Subscriber to replay")
+    p.add_argument("--bootstrap-servers", type=str, default=None, help="Kafka bootstrap servers")
+    p.add_argument(
+        "--group-id",
+        type=str,
+        default=None,
+        help="The subscriber's consumer group; replay progress is kept under <group>.dead_letter_replay",
+    )
+    p.add_argument("--limit", type=int, default=None, help="Replay at most this many messages")
+    p.set_defaults(func=_run_dead_letter_replay)
+
+
+def _run_dead_letter_replay(args: argparse.Namespace) -> int:
+    from secure_config import config
+    from hgraph_static_admin.subscriber_dead_letter import dead_letter_topic, replay_dead_letters
+    from hgraph_trade.hgraph_trade_booker.kafka_consumer import KafkaReceiver
+    from hgraph_trade.hgraph_trade_booker.kafka_sender import KafkaSender
+
+    group_id = args.group_id or config.get("KAFKA_CONSUMER_GROUP", "hgraph_platform")
+    receiver = KafkaReceiver(
+        [dead_letter_topic(args.subscriber)],
+        bootstrap_servers=args.bootstrap_servers,
+        group_id=f"{group_id}.dead_letter_replay",
+    )
+    sender = KafkaSender(args.bootstrap_servers)
+    try:
+        result = replay_dead_letters(receiver, sender, limit=args.limit)
+    finally:
+        receiver.close()
+        sender.close()
+
+    print(f"Replayed {result.replayed} {args.subscriber} dead letters")
+    for topic, count in sorted(result.by_topic.items()):
+        print(f"  {topic}: {count}")
     return 0
 
 
@@ -422,10 +946,95 @@ def _run_serve(args: argparse.Namespace) -> int:
     return 0
 
 
+# ---------------------------------------------------------------------------
+# Subcommand: daemon
+# ---------------------------------------------------------------------------
+def _add_daemon_parser(subparsers: argparse._SubParsersAction) -> None:
+    p = subparsers.add_parser(
+        "daemon", help="Keep mapper, config and stores warm and serve other subcommands on a local socket"
+    )
+    p.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Unix socket path (default: HGRAPH_DAEMON_SOCKET, else a per-user path in XDG_RUNTIME_DIR or /tmp)",
+    )
+    group = p.add_mutually_exclusive_group()
+    group.add_argument("--status", action="store_true", help="Report whether a daemon is running and exit")
+    group.add_argument("--stop", action="store_true", help="Stop the running daemon and exit")
+    p.set_defaults(func=_run_daemon)
+
+
+def _preload() -> None:
+    """Import and build everything a forwarded book needs, so the first request is as fast as the rest."""
+    from secure_config import config  # noqa: F401
+    from hgraph_trade.calendars import default_registry
+    from hgraph_trade.hgraph_trade_booker import trade_booker, trade_loader  # noqa: F401
+    from hgraph_trade.hgraph_trade_booker.trade_mapper import preload_instrument_creators
+
+    preload_instrument_creators()
+    default_registry()
+
+
+def _run_daemon(args: argparse.Namespace) -> int:
+    import os
+    import signal
+    import threading
+
+    from hgraph_trade.daemon import DaemonServer, default_socket_path, send_control
+
+    global _DAEMON_MODE
+
+    path = args.socket or default_socket_path()
+    if args.status or args.stop:
+        reply = send_control("stop" if args.stop else "ping", path)
+        if reply is None:
+            print(f"No daemon running on {path}")
+            return 1
+        action = "Stopped" if args.stop else "Running:"
+        print(
+            f"{action} daemon pid {reply['pid']} on {path} "
+            f"(up {reply['uptime_seconds']:.0f}s, {reply['commands_served']} command(s) served)"
+        )
+        return 0
+
+    # Before secure_config loads .env into os.environ, so clients are compared with the shell environment
+    startup_env = dict(os.environ)
+    from secure_config import config
+
+    server = DaemonServer(
+        run,
+        path,
+        after_command=lambda: setup_logging(
+            level="DEBUG" if args.verbose else "INFO", fmt=args.log_format, use_queue=args.log_queue
+        ),
+        config_env={name: startup_env.get(name) for name in config},
+    )
+    try:
+        server.bind()
+    except (OSError, RuntimeError) as exc:
+        logger.error("Cannot start daemon: %s", exc)
+        return 2
+
+    _DAEMON_MODE = True
+    _preload()
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: server.stop())
+    logger.info("hgraph-tools daemon listening on %s (pid %d)", path, os.getpid())
+    try:
+        server.serve_forever()
+    finally:
+        _DAEMON_MODE = False
+        _WARM_CACHE.clear()
+    logger.info("hgraph-tools daemon stopped after %d command(s)", server.commands_served)
+    return 0
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
-def main() -> None:
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="hgraph",
         description="hgraph_platform_tools — unified command-line interface",
@@ -436,9 +1045,31 @@ def main() -> None:
         action="store_true",
         help="Enable debug logging (applies to all subcommands)",
     )
+    parser.add_argument(
+        "--log-format", choices=("text", "json"), default=None, help="Log line format (default: LOG_FORMAT or text)"
+    )
+    parser.add_argument(
+        "--log-queue",
+        action="store_true",
+        default=None,
+        help="Write logs from a background thread via a queue (default: LOG_QUEUE)",
+    )
+    parser.add_argument(
+        "--log-rate-limit",
+        type=float,
+        default=None,
+        metavar="N",
+        help="Cap per-trade/per-message INFO logs at N records/sec per logger (default: LOG_RATE_LIMIT)",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Run in this process even if an hgraph-tools daemon is running (default: HGRAPH_DAEMON)",
+    )
 
     subparsers = parser.add_subparsers(dest="command")
     _add_book_parser(subparsers)
+    _add_requeue_parser(subparsers)
     _add_entitlements_parser(subparsers)
     _add_static_admin_parser(subparsers)
     _add_notify_parser(subparsers)
@@ -446,19 +1077,53 @@ def main() -> None:
     _add_party_subscribe_parser(subparsers)
     _add_portfolio_subscribe_parser(subparsers)
     _add_credit_subscribe_parser(subparsers)
+    _add_dead_letter_replay_parser(subparsers)
     _add_serve_parser(subparsers)
+    _add_daemon_parser(subparsers)
+    return parser
 
-    args = parser.parse_args()
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Parse ``argv`` and run the subcommand in this process.
+
+    :param argv: CLI arguments without the program name; defaults to ``sys.argv[1:]``.
+    :return: The subcommand's exit code.
+    """
+    parser = _build_parser()
+    args = parser.parse_args(argv)
 
     # Global verbose flag (subcommand-level --verbose also works for book)
     verbose = args.verbose or getattr(args, "verbose", False)
-    setup_logging(level="DEBUG" if verbose else "INFO")
+    rate_limits = None
+    if args.log_rate_limit is not None:
+        from hgraph_trade.logging_config import DEFAULT_RATE_LIMITED_LOGGERS
+
+        rate_limits = {name: args.log_rate_limit for name in DEFAULT_RATE_LIMITED_LOGGERS}
+    try:
+        setup_logging(
+            level="DEBUG" if verbose else "INFO",
+            fmt=args.log_format,
+            use_queue=args.log_queue,
+            rate_limits=rate_limits,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
 
     if args.command is None:
         parser.print_help()
-        sys.exit(0)
+        return 0
+
+    return args.func(args)
+
+
+def main() -> None:
+    from hgraph_trade.daemon import forward_if_running
 
-    exit_code = args.func(args)
+    argv = sys.argv[1:]
+    exit_code = forward_if_running(argv)
+    if exit_code is None:
+        exit_code = run(argv)
     sys.exit(exit_code)
 
 
@@ -9,8 +9,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from hgraph_api.config import api_config
-from hgraph_api.routers import credit, orders, parties, portfolios, entitlements, health
+from hgraph_api.routers import credit, orders, parties, portfolios, entitlements, health, metrics
 from hgraph_api.middleware.auth import AuthMiddleware
+from hgraph_api.middleware.metrics import MetricsMiddleware
 from hgraph_api.websockets import credit_ws, orders_ws
 
 __all__ = ("create_app",)
@@ -39,6 +40,7 @@ def create_app() -> FastAPI:
 
     # Register routers
     app.include_router(health.router)
+    app.include_router(metrics.router)
     app.include_router(credit.router)
     app.include_router(parties.router)
     app.include_router(portfolios.router)
@@ -50,4 +52,7 @@ def create_app() -> FastAPI:
     # Auth middleware — checks X-User-Id header and entitlements on write endpoints
     app.add_middleware(AuthMiddleware)
 
+    # Request metrics — added last so it is outermost and also times rejected requests
+    app.add_middleware(MetricsMiddleware)
+
     return app
@@ -20,6 +20,7 @@ logger = logging.getLogger(__name__)
 # Paths that do not require authentication
 _PUBLIC_PREFIXES = (
     "/api/v1/health",
+    "/metrics",
     "/docs",
     "/openapi.json",
     "/redoc",
@@ -0,0 +1,70 @@
+"""
+Request metrics middleware.
+
+Records, for every HTTP request:
+
+- ``hgraph_api_requests_total{method,route,status}``
+- ``hgraph_api_request_seconds{method,route}`` (latency histogram)
+- ``hgraph_api_requests_in_progress`` (gauge)
+
+``route`` is the matched route template (``/api/v1/orders/{order_id}``), not
+the raw path, so the number of series stays bounded. Unmatched paths are
+recorded as ``<unmatched>``.
+
+Written as plain ASGI middleware rather than ``BaseHTTPMiddleware`` so it adds
+no extra task or body buffering per request. WebSocket connections are passed
+through untouched.
+"""
+
+import time
+
+from hgraph_trade.metrics import counter, gauge, histogram
+
+__all__ = ("MetricsMiddleware",)
+
+_REQUESTS = counter(
+    "hgraph_api_requests_total",
+    "HTTP requests served by the API, by route and status code.",
+    ("method", "route", "status"),
+)
+_LATENCY = histogram(
+    "hgraph_api_request_seconds",
+    "HTTP request latency, from receipt to the end of the response.",
+    ("method", "route"),
+)
+_IN_PROGRESS = gauge("hgraph_api_requests_in_progress", "HTTP requests currently being served.")
+
+_UNMATCHED = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts, latency and concurrency."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def _send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        _IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _IN_PROGRESS.dec()
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or _UNMATCHED
+            method = scope["method"]
+            _LATENCY.labels(method, template).observe(time.perf_counter() - started)
+            _REQUESTS.labels(method, template, status).inc()
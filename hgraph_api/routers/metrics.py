@@ -0,0 +1,16 @@
+"""Prometheus metrics endpoint."""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from hgraph_trade.metrics import CONTENT_TYPE, REGISTRY
+
+__all__ = ("router",)
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Return every registered metric in the Prometheus text format."""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
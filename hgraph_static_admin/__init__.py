@@ -8,15 +8,23 @@ static reference information through a fetch-process-store pipeline.
 Modules:
 - example_code.py: Core static data management including database operations,
   API fetching, data processing, and CLI interface.
+
+Public names are resolved lazily on first attribute access, so importing one of
+the store or subscriber modules does not import ``requests`` via example_code.
 """
 
-from .example_code import (
-    init_db,
-    fetch_static_data,
-    process_counterparty_data,
-    store_counterparty_data,
-    run_pipeline,
-)
+from typing import TYPE_CHECKING, Dict
+
+from hgraph_trade.lazy_exports import lazy_exports
+
+if TYPE_CHECKING:
+    from .example_code import (
+        init_db,
+        fetch_static_data,
+        process_counterparty_data,
+        store_counterparty_data,
+        run_pipeline,
+    )
 
 __all__ = (
     "init_db",
@@ -25,3 +33,8 @@ __all__ = (
     "store_counterparty_data",
     "run_pipeline",
 )
+
+# Public name -> module that defines it
+_LAZY_ATTRS: Dict[str, str] = {name: f"{__name__}.example_code" for name in __all__}
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_ATTRS)
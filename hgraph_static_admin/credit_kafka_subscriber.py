@@ -43,7 +43,7 @@ Message formats
 
 import logging
 from datetime import date
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Tuple
 
 from hg_oap.credit.credit_limit import (
     CreditLimit,
@@ -53,11 +53,11 @@ from hg_oap.credit.credit_limit import (
 )
 
 from hgraph_static_admin.credit_store import (
+    CreditStore,
     delete_credit_limit,
     delete_credit_utilization,
-    upsert_credit_limit,
-    upsert_credit_utilization,
 )
+from hgraph_static_admin.subscriber_runtime import StoreSubscriber
 
 __all__ = (
     "CreditKafkaSubscriber",
@@ -67,10 +67,6 @@ __all__ = (
 
 logger = logging.getLogger(__name__)
 
-# Stop the subscriber after this many consecutive processing failures
-# to avoid infinite error loops on persistently bad data.
-_MAX_CONSECUTIVE_ERRORS = 50
-
 # Reverse lookup: limit type string value → enum member
 _LIMIT_TYPE_MAP: Dict[str, CreditLimitType] = {t.value: t for t in CreditLimitType}
 
@@ -213,105 +209,40 @@ def parse_credit_utilization_message(msg: Dict[str, Any]) -> Tuple[str, CreditUt
 # ---------------------------------------------------------------------------
 
 
-class CreditKafkaSubscriber:
+class CreditKafkaSubscriber(StoreSubscriber):
     """Subscribes to credit Kafka topics and persists updates to the credit store.
 
     :param db_path: Path to the credit SQLite database.
-    :param bootstrap_servers: Kafka bootstrap servers.  Falls back to config.
-    :param group_id: Kafka consumer group.  Falls back to config.
     :param limit_topic: Topic for credit limit messages.
     :param utilization_topic: Topic for credit utilization messages.
+    :param options: Connection, snapshot, worker and dead-letter options (see ``StoreSubscriber``).
     """
 
+    name = "credit"
+    store_class = CreditStore
+    error_field = "counterparty_symbol"
+    error_label = "counterparty"
+
     def __init__(
         self,
         db_path: str,
         *,
-        bootstrap_servers: str | None = None,
-        group_id: str | None = None,
         limit_topic: str | None = None,
         utilization_topic: str | None = None,
+        **options: Any,
     ):
         from secure_config import config
 
-        self.db_path = db_path
-        self.bootstrap_servers = bootstrap_servers or config["KAFKA_BOOTSTRAP_SERVERS"]
-        self.group_id = group_id or config.get("KAFKA_CONSUMER_GROUP", "hgraph_platform")
+        super().__init__(db_path, **options)
         self.limit_topic = limit_topic or config.get(
             "CREDIT_KAFKA_LIMIT_TOPIC", "credit.limit"
         )
         self.utilization_topic = utilization_topic or config.get(
             "CREDIT_KAFKA_UTILIZATION_TOPIC", "credit.utilization"
         )
-        self._running = False
-        self._receiver = None
-        self._processed_count = 0
-
-    def start(self, *, poll_interval_ms: int = 1000, max_messages: int | None = None) -> None:
-        """Start the subscriber loop.
 
-        Blocks until :meth:`stop` is called or *max_messages* have been
-        processed (useful for testing / batch mode).
-
-        :param poll_interval_ms: Kafka poll timeout in milliseconds.
-        :param max_messages: Stop after processing this many messages
-            (``None`` = run indefinitely).
-        """
-        from hgraph_trade.hgraph_trade_booker.kafka_consumer import KafkaReceiver
-
-        topics = [self.limit_topic, self.utilization_topic]
-        self._receiver = KafkaReceiver(
-            topics,
-            bootstrap_servers=self.bootstrap_servers,
-            group_id=self.group_id,
-        )
-
-        self._running = True
-        self._processed_count = 0
-        logger.info(
-            "Credit subscriber started: topics=%s, group=%s",
-            topics,
-            self.group_id,
-        )
-
-        consecutive_errors = 0
-        try:
-            while self._running:
-                records = self._receiver.poll(timeout_ms=poll_interval_ms)
-                for record in records:
-                    topic = record["topic"]
-                    value = record["value"]
-                    try:
-                        self.process_message(topic, value)
-                        self._processed_count += 1
-                        consecutive_errors = 0
-                    except Exception as exc:
-                        consecutive_errors += 1
-                        logger.error(
-                            "Error processing message on topic %s: %s — counterparty: %s",
-                            topic,
-                            exc,
-                            value.get("counterparty_symbol", "unknown") if isinstance(value, dict) else "unknown",
-                        )
-                        if consecutive_errors >= _MAX_CONSECUTIVE_ERRORS:
-                            logger.critical(
-                                "Too many consecutive errors (%d), stopping credit subscriber",
-                                consecutive_errors,
-                            )
-                            self._running = False
-                            break
-
-                if records:
-                    self._receiver.commit()
-
-                if max_messages is not None and self._processed_count >= max_messages:
-                    logger.info(
-                        "Reached max_messages=%d, stopping subscriber",
-                        max_messages,
-                    )
-                    break
-        finally:
-            self._running = False
+    def _topics(self) -> List[str]:
+        return [self.limit_topic, self.utilization_topic]
 
     def process_message(self, topic: str, message: Dict[str, Any]) -> None:
         """Process a single Kafka message.
@@ -336,8 +267,9 @@ class CreditKafkaSubscriber:
         cpty = message["counterparty_symbol"]
 
         if action == "UPSERT":
-            upsert_credit_limit(self.db_path, credit_limit)
-            logger.info("Upserted credit limit: %s / %s", cpty, credit_limit.limit_type.value)
+            store = CreditStore.shared(self.db_path)
+            store.upsert_credit_limit(credit_limit)
+            store.after_commit(logger.info, "Upserted credit limit: %s / %s", cpty, credit_limit.limit_type.value)
         elif action == "DELETE":
             limit_type = message.get("limit_type", "")
             deleted = delete_credit_limit(self.db_path, cpty, limit_type)
@@ -352,28 +284,12 @@ class CreditKafkaSubscriber:
         cpty = message["counterparty_symbol"]
 
         if action == "UPSERT":
-            upsert_credit_utilization(self.db_path, utilization)
-            logger.info("Upserted credit utilization: %s", cpty)
+            store = CreditStore.shared(self.db_path)
+            store.upsert_credit_utilization(utilization)
+            store.after_commit(logger.info, "Upserted credit utilization: %s", cpty)
         elif action == "DELETE":
             deleted = delete_credit_utilization(self.db_path, cpty)
             if deleted:
                 logger.info("Deleted credit utilization: %s", cpty)
             else:
                 logger.warning("Credit utilization not found for deletion: %s", cpty)
-
-    def stop(self) -> None:
-        """Signal the subscriber to stop after the current poll cycle."""
-        self._running = False
-        logger.info("Credit subscriber stop requested")
-
-    def close(self) -> None:
-        """Close the Kafka consumer and release resources."""
-        self.stop()
-        if self._receiver is not None:
-            self._receiver.close()
-            self._receiver = None
-
-    @property
-    def processed_count(self) -> int:
-        """Number of messages successfully processed."""
-        return self._processed_count
@@ -11,12 +11,18 @@ Provides CRUD operations for two tables:
 
 This module is the persistence layer for the credit Kafka subscriber and
 can also be used standalone for local credit data management.
+``get_credit_limits_for_counterparties`` / ``get_credit_utilizations``
+look up many counterparties in one query.
+
+:class:`CreditStore` keeps a persistent connection per thread (see
+``sqlite_store``); the module-level functions are thin wrappers around the
+shared store for each database path.
 """
 
 import logging
 import sqlite3
 from datetime import date, datetime, timezone
-from typing import List
+from typing import Any, Dict, Iterable, List, Tuple
 
 from hg_oap.credit.credit_limit import (
     CreditLimit,
@@ -25,15 +31,20 @@ from hg_oap.credit.credit_limit import (
     CreditUtilization,
 )
 
+from hgraph_static_admin.sqlite_store import SqliteStore, json_keys
+
 __all__ = (
+    "CreditStore",
     "init_credit_db",
     "upsert_credit_limit",
     "get_credit_limit",
     "get_credit_limits_for_counterparty",
+    "get_credit_limits_for_counterparties",
     "get_all_credit_limits",
     "delete_credit_limit",
     "upsert_credit_utilization",
     "get_credit_utilization",
+    "get_credit_utilizations",
     "get_all_credit_utilizations",
     "delete_credit_utilization",
 )
@@ -75,6 +86,68 @@ CREATE TABLE IF NOT EXISTS credit_utilizations (
 """
 
 
+# ---------------------------------------------------------------------------
+# Statements (constant text, so each connection prepares them once)
+# ---------------------------------------------------------------------------
+
+_UPSERT_CREDIT_LIMIT_SQL = """
+INSERT INTO credit_limits (counterparty_symbol, limit_type, limit_amount,
+                           limit_currency, effective_date, expiry_date,
+                           status, approved_by, last_review_date, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(counterparty_symbol, limit_type) DO UPDATE SET
+    limit_amount = excluded.limit_amount,
+    limit_currency = excluded.limit_currency,
+    effective_date = excluded.effective_date,
+    expiry_date = excluded.expiry_date,
+    status = excluded.status,
+    approved_by = excluded.approved_by,
+    last_review_date = excluded.last_review_date,
+    updated_at = excluded.updated_at
+"""
+
+_SELECT_CREDIT_LIMIT_SQL = "SELECT * FROM credit_limits WHERE counterparty_symbol = ? AND limit_type = ?"
+
+_SELECT_CREDIT_LIMITS_FOR_COUNTERPARTY_SQL = (
+    "SELECT * FROM credit_limits WHERE counterparty_symbol = ? ORDER BY limit_type"
+)
+
+_SELECT_CREDIT_LIMITS_FOR_COUNTERPARTIES_SQL = """
+SELECT * FROM credit_limits WHERE counterparty_symbol IN (SELECT value FROM json_each(?))
+ORDER BY counterparty_symbol, limit_type
+"""
+
+_SELECT_ALL_CREDIT_LIMITS_SQL = "SELECT * FROM credit_limits ORDER BY counterparty_symbol, limit_type"
+
+_DELETE_CREDIT_LIMIT_SQL = "DELETE FROM credit_limits WHERE counterparty_symbol = ? AND limit_type = ?"
+
+_UPSERT_CREDIT_UTILIZATION_SQL = """
+INSERT INTO credit_utilizations (counterparty_symbol, utilized_amount,
+                                 utilization_currency, limit_amount,
+                                 available_amount, utilization_percentage,
+                                 as_of_timestamp, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(counterparty_symbol) DO UPDATE SET
+    utilized_amount = excluded.utilized_amount,
+    utilization_currency = excluded.utilization_currency,
+    limit_amount = excluded.limit_amount,
+    available_amount = excluded.available_amount,
+    utilization_percentage = excluded.utilization_percentage,
+    as_of_timestamp = excluded.as_of_timestamp,
+    updated_at = excluded.updated_at
+"""
+
+_SELECT_CREDIT_UTILIZATION_SQL = "SELECT * FROM credit_utilizations WHERE counterparty_symbol = ?"
+
+_SELECT_CREDIT_UTILIZATIONS_SQL = (
+    "SELECT * FROM credit_utilizations WHERE counterparty_symbol IN (SELECT value FROM json_each(?))"
+)
+
+_SELECT_ALL_CREDIT_UTILIZATIONS_SQL = "SELECT * FROM credit_utilizations ORDER BY counterparty_symbol"
+
+_DELETE_CREDIT_UTILIZATION_SQL = "DELETE FROM credit_utilizations WHERE counterparty_symbol = ?"
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -92,73 +165,205 @@ def _parse_date(value: str | None) -> date | None:
     return date.fromisoformat(value)
 
 
+def _credit_limit_params(limit: CreditLimit) -> Tuple[Any, ...]:
+    """Parameters for ``_UPSERT_CREDIT_LIMIT_SQL``."""
+    return (
+        limit.counterparty_symbol,
+        limit.limit_type.value,
+        limit.limit_amount,
+        limit.limit_currency,
+        limit.effective_date.isoformat() if limit.effective_date else None,
+        limit.expiry_date.isoformat() if limit.expiry_date else None,
+        limit.status.value,
+        limit.approved_by,
+        limit.last_review_date.isoformat() if limit.last_review_date else None,
+        _now_iso(),
+    )
+
+
+def _row_to_credit_limit(row: sqlite3.Row) -> CreditLimit:
+    """Build a CreditLimit from a ``credit_limits`` row."""
+    return CreditLimit(
+        counterparty_symbol=row["counterparty_symbol"],
+        limit_type=CreditLimitType(row["limit_type"]),
+        limit_amount=row["limit_amount"],
+        limit_currency=row["limit_currency"],
+        effective_date=_parse_date(row["effective_date"]),
+        expiry_date=_parse_date(row["expiry_date"]),
+        status=CreditStatus(row["status"]),
+        approved_by=row["approved_by"],
+        last_review_date=_parse_date(row["last_review_date"]),
+    )
+
+
+def _credit_utilization_params(utilization: CreditUtilization) -> Tuple[Any, ...]:
+    """Parameters for ``_UPSERT_CREDIT_UTILIZATION_SQL``."""
+    return (
+        utilization.counterparty_symbol,
+        utilization.utilized_amount,
+        utilization.utilization_currency,
+        utilization.limit_amount,
+        utilization.available_amount,
+        utilization.utilization_percentage,
+        utilization.as_of_timestamp,
+        _now_iso(),
+    )
+
+
+def _row_to_credit_utilization(row: sqlite3.Row) -> CreditUtilization:
+    """Build a CreditUtilization from a ``credit_utilizations`` row."""
+    return CreditUtilization(
+        counterparty_symbol=row["counterparty_symbol"],
+        utilized_amount=row["utilized_amount"],
+        utilization_currency=row["utilization_currency"],
+        limit_amount=row["limit_amount"],
+        available_amount=row["available_amount"],
+        utilization_percentage=row["utilization_percentage"],
+        as_of_timestamp=row["as_of_timestamp"],
+    )
+
+
 # ---------------------------------------------------------------------------
-# Database initialisation
+# Store
 # ---------------------------------------------------------------------------
 
 
-def init_credit_db(db_path: str) -> None:
-    """Create the ``credit_limits`` and ``credit_utilizations`` tables.
+class CreditStore(SqliteStore):
+    """Credit limits and utilization snapshots in one SQLite database.
 
     :param db_path: Path to the SQLite database file.
+    :param pragmas: Overrides for ``sqlite_store.DEFAULT_PRAGMAS``.
     """
-    conn = sqlite3.connect(db_path)
-    try:
-        conn.execute("PRAGMA journal_mode = WAL")
-        conn.execute("PRAGMA foreign_keys = ON")
-        conn.execute(_CREATE_CREDIT_LIMITS_SQL)
-        conn.execute(_CREATE_CREDIT_UTILIZATIONS_SQL)
-        conn.commit()
-    finally:
-        conn.close()
-    logger.info("Credit database initialised at %s", db_path)
+
+    kind = "Credit"
+
+    def init_db(self) -> None:
+        """Create the ``credit_limits`` and ``credit_utilizations`` tables."""
+        with self.transaction() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(_CREATE_CREDIT_LIMITS_SQL)
+            conn.execute(_CREATE_CREDIT_UTILIZATIONS_SQL)
+        logger.info("Credit database initialised at %s", self.db_path)
+
+    # -- Credit limits ------------------------------------------------------
+
+    def upsert_credit_limit(self, limit: CreditLimit) -> None:
+        """Insert or update a credit limit record.
+
+        :param limit: The credit limit to store.
+        """
+        self._write("credit_limits", _UPSERT_CREDIT_LIMIT_SQL, _credit_limit_params(limit))
+
+    def get_credit_limit(self, counterparty_symbol: str, limit_type: str) -> CreditLimit | None:
+        """Retrieve a credit limit by counterparty and type.
+
+        :param counterparty_symbol: The counterparty's short identifier.
+        :param limit_type: The limit type value (e.g. ``"Bilateral"``).
+        :returns: The :class:`CreditLimit`, or ``None`` if not found.
+        """
+        row = self._reader().execute(_SELECT_CREDIT_LIMIT_SQL, (counterparty_symbol, limit_type)).fetchone()
+        return None if row is None else _row_to_credit_limit(row)
+
+    def get_credit_limits_for_counterparty(self, counterparty_symbol: str) -> List[CreditLimit]:
+        """Return all credit limits for a single counterparty.
+
+        :param counterparty_symbol: The counterparty's short identifier.
+        :returns: List of :class:`CreditLimit` instances.
+        """
+        rows = self._reader().execute(_SELECT_CREDIT_LIMITS_FOR_COUNTERPARTY_SQL, (counterparty_symbol,))
+        return [_row_to_credit_limit(r) for r in rows]
+
+    def get_credit_limits_for_counterparties(self, counterparty_symbols: Iterable[str]) -> Dict[str, List[CreditLimit]]:
+        """Return the credit limits of many counterparties in one query.
+
+        :param counterparty_symbols: The counterparties' short identifiers.
+        :returns: Limits by counterparty symbol (an empty list for a counterparty with none).
+        """
+        symbols = list(counterparty_symbols)
+        results: Dict[str, List[CreditLimit]] = {symbol: [] for symbol in symbols}
+        for row in self._reader().execute(_SELECT_CREDIT_LIMITS_FOR_COUNTERPARTIES_SQL, (json_keys(symbols),)):
+            results[row["counterparty_symbol"]].append(_row_to_credit_limit(row))
+        return results
+
+    def get_all_credit_limits(self) -> List[CreditLimit]:
+        """Return all credit limits.
+
+        :returns: List of :class:`CreditLimit` instances.
+        """
+        return [_row_to_credit_limit(r) for r in self._reader().execute(_SELECT_ALL_CREDIT_LIMITS_SQL)]
+
+    def delete_credit_limit(self, counterparty_symbol: str, limit_type: str) -> bool:
+        """Delete a credit limit by counterparty and type.
+
+        :param counterparty_symbol: The counterparty's short identifier.
+        :param limit_type: The limit type value (e.g. ``"Bilateral"``).
+        :returns: ``True`` if a row was deleted, ``False`` if not found.
+        """
+        return self._execute("credit_limits", _DELETE_CREDIT_LIMIT_SQL, (counterparty_symbol, limit_type)) > 0
+
+    # -- Credit utilizations ------------------------------------------------
+
+    def upsert_credit_utilization(self, utilization: CreditUtilization) -> None:
+        """Insert or update a credit utilization snapshot (only the latest per counterparty is kept).
+
+        :param utilization: The utilization snapshot to store.
+        """
+        self._write("credit_utilizations", _UPSERT_CREDIT_UTILIZATION_SQL, _credit_utilization_params(utilization))
+
+    def get_credit_utilization(self, counterparty_symbol: str) -> CreditUtilization | None:
+        """Retrieve the latest utilization snapshot for a counterparty.
+
+        :param counterparty_symbol: The counterparty's short identifier.
+        :returns: The :class:`CreditUtilization`, or ``None`` if not found.
+        """
+        row = self._reader().execute(_SELECT_CREDIT_UTILIZATION_SQL, (counterparty_symbol,)).fetchone()
+        return None if row is None else _row_to_credit_utilization(row)
+
+    def get_credit_utilizations(self, counterparty_symbols: Iterable[str]) -> Dict[str, CreditUtilization]:
+        """Retrieve the latest utilization snapshots of many counterparties in one query.
+
+        :param counterparty_symbols: The counterparties' short identifiers.
+        :returns: Snapshots by counterparty symbol; counterparties not in the store are absent.
+        """
+        rows = self._reader().execute(_SELECT_CREDIT_UTILIZATIONS_SQL, (json_keys(counterparty_symbols),))
+        return {r["counterparty_symbol"]: _row_to_credit_utilization(r) for r in rows}
+
+    def get_all_credit_utilizations(self) -> List[CreditUtilization]:
+        """Return all credit utilization snapshots.
+
+        :returns: List of :class:`CreditUtilization` instances.
+        """
+        return [_row_to_credit_utilization(r) for r in self._reader().execute(_SELECT_ALL_CREDIT_UTILIZATIONS_SQL)]
+
+    def delete_credit_utilization(self, counterparty_symbol: str) -> bool:
+        """Delete a credit utilization snapshot.
+
+        :param counterparty_symbol: The counterparty's short identifier.
+        :returns: ``True`` if a row was deleted, ``False`` if not found.
+        """
+        return self._execute("credit_utilizations", _DELETE_CREDIT_UTILIZATION_SQL, (counterparty_symbol,)) > 0
 
 
 # ---------------------------------------------------------------------------
-# Credit Limit CRUD
+# Module-level API (one shared CreditStore per database file)
 # ---------------------------------------------------------------------------
 
 
+def init_credit_db(db_path: str) -> None:
+    """Create the ``credit_limits`` and ``credit_utilizations`` tables.
+
+    :param db_path: Path to the SQLite database file.
+    """
+    CreditStore.shared(db_path).init_db()
+
+
 def upsert_credit_limit(db_path: str, limit: CreditLimit) -> None:
     """Insert or update a credit limit record.
 
     :param db_path: Path to the SQLite database file.
     :param limit: The credit limit to store.
     """
-    conn = sqlite3.connect(db_path)
-    try:
-        conn.execute(
-            """
-            INSERT INTO credit_limits (counterparty_symbol, limit_type, limit_amount,
-                                       limit_currency, effective_date, expiry_date,
-                                       status, approved_by, last_review_date, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(counterparty_symbol, limit_type) DO UPDATE SET
-                limit_amount = excluded.limit_amount,
-                limit_currency = excluded.limit_currency,
-                effective_date = excluded.effective_date,
-                expiry_date = excluded.expiry_date,
-                status = excluded.status,
-                approved_by = excluded.approved_by,
-                last_review_date = excluded.last_review_date,
-                updated_at = excluded.updated_at
-            """,
-            (
-                limit.counterparty_symbol,
-                limit.limit_type.value,
-                limit.limit_amount,
-                limit.limit_currency,
-                limit.effective_date.isoformat() if limit.effective_date else None,
-                limit.expiry_date.isoformat() if limit.expiry_date else None,
-                limit.status.value,
-                limit.approved_by,
-                limit.last_review_date.isoformat() if limit.last_review_date else None,
-                _now_iso(),
-            ),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    CreditStore.shared(db_path).upsert_credit_limit(limit)
 
 
 def get_credit_limit(db_path: str, counterparty_symbol: str, limit_type: str) -> CreditLimit | None:
@@ -169,30 +374,7 @@ def get_credit_limit(db_path: str, counterparty_symbol: str, limit_type: str) ->
     :param limit_type: The limit type value (e.g. ``"Bilateral"``).
     :returns: The :class:`CreditLimit`, or ``None`` if not found.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        row = conn.execute(
-            "SELECT * FROM credit_limits WHERE counterparty_symbol = ? AND limit_type = ?",
-            (counterparty_symbol, limit_type),
-        ).fetchone()
-    finally:
-        conn.close()
-
-    if row is None:
-        return None
-
-    return CreditLimit(
-        counterparty_symbol=row["counterparty_symbol"],
-        limit_type=CreditLimitType(row["limit_type"]),
-        limit_amount=row["limit_amount"],
-        limit_currency=row["limit_currency"],
-        effective_date=_parse_date(row["effective_date"]),
-        expiry_date=_parse_date(row["expiry_date"]),
-        status=CreditStatus(row["status"]),
-        approved_by=row["approved_by"],
-        last_review_date=_parse_date(row["last_review_date"]),
-    )
+    return CreditStore.shared(db_path).get_credit_limit(counterparty_symbol, limit_type)
 
 
 def get_credit_limits_for_counterparty(db_path: str, counterparty_symbol: str) -> List[CreditLimit]:
@@ -206,30 +388,20 @@ def get_credit_limits_for_counterparty(db_path: str, counterparty_symbol: str) -
     :param counterparty_symbol: The counterparty's short identifier.
     :returns: List of :class:`CreditLimit` instances.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        rows = conn.execute(
-            "SELECT * FROM credit_limits WHERE counterparty_symbol = ? ORDER BY limit_type",
-            (counterparty_symbol,),
-        ).fetchall()
-    finally:
-        conn.close()
-
-    return [
-        CreditLimit(
-            counterparty_symbol=r["counterparty_symbol"],
-            limit_type=CreditLimitType(r["limit_type"]),
-            limit_amount=r["limit_amount"],
-            limit_currency=r["limit_currency"],
-            effective_date=_parse_date(r["effective_date"]),
-            expiry_date=_parse_date(r["expiry_date"]),
-            status=CreditStatus(r["status"]),
-            approved_by=r["approved_by"],
-            last_review_date=_parse_date(r["last_review_date"]),
-        )
-        for r in rows
-    ]
+    return CreditStore.shared(db_path).get_credit_limits_for_counterparty(counterparty_symbol)
+
+
+def get_credit_limits_for_counterparties(
+    db_path: str,
+    counterparty_symbols: Iterable[str],
+) -> Dict[str, List[CreditLimit]]:
+    """Return the credit limits of many counterparties in one query.
+
+    :param db_path: Path to the SQLite database file.
+    :param counterparty_symbols: The counterparties' short identifiers.
+    :returns: Limits by counterparty symbol (an empty list for a counterparty with none).
+    """
+    return CreditStore.shared(db_path).get_credit_limits_for_counterparties(counterparty_symbols)
 
 
 def get_all_credit_limits(db_path: str) -> List[CreditLimit]:
@@ -238,29 +410,7 @@ def get_all_credit_limits(db_path: str) -> List[CreditLimit]:
     :param db_path: Path to the SQLite database file.
     :returns: List of :class:`CreditLimit` instances.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        rows = conn.execute(
-            "SELECT * FROM credit_limits ORDER BY counterparty_symbol, limit_type"
-        ).fetchall()
-    finally:
-        conn.close()
-
-    return [
-        CreditLimit(
-            counterparty_symbol=r["counterparty_symbol"],
-            limit_type=CreditLimitType(r["limit_type"]),
-            limit_amount=r["limit_amount"],
-            limit_currency=r["limit_currency"],
-            effective_date=_parse_date(r["effective_date"]),
-            expiry_date=_parse_date(r["expiry_date"]),
-            status=CreditStatus(r["status"]),
-            approved_by=r["approved_by"],
-            last_review_date=_parse_date(r["last_review_date"]),
-        )
-        for r in rows
-    ]
+    return CreditStore.shared(db_path).get_all_credit_limits()
 
 
 def delete_credit_limit(db_path: str, counterparty_symbol: str, limit_type: str) -> bool:
@@ -271,21 +421,7 @@ def delete_credit_limit(db_path: str, counterparty_symbol: str, limit_type: str)
     :param limit_type: The limit type value (e.g. ``"Bilateral"``).
     :returns: ``True`` if a row was deleted, ``False`` if not found.
     """
-    conn = sqlite3.connect(db_path)
-    try:
-        cursor = conn.execute(
-            "DELETE FROM credit_limits WHERE counterparty_symbol = ? AND limit_type = ?",
-            (counterparty_symbol, limit_type),
-        )
-        conn.commit()
-        return cursor.rowcount > 0
-    finally:
-        conn.close()
-
-
-# ---------------------------------------------------------------------------
-# Credit Utilization CRUD
-# ---------------------------------------------------------------------------
+    return CreditStore.shared(db_path).delete_credit_limit(counterparty_symbol, limit_type)
 
 
 def upsert_credit_utilization(db_path: str, utilization: CreditUtilization) -> None:
@@ -296,38 +432,7 @@ def upsert_credit_utilization(db_path: str, utilization: CreditUtilization) -> N
     :param db_path: Path to the SQLite database file.
     :param utilization: The utilization snapshot to store.
     """
-    conn = sqlite3.connect(db_path)
-    try:
-        conn.execute(
-            """
-            INSERT INTO credit_utilizations (counterparty_symbol, utilized_amount,
-                                             utilization_currency, limit_amount,
-                                             available_amount, utilization_percentage,
-                                             as_of_timestamp, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(counterparty_symbol) DO UPDATE SET
-                utilized_amount = excluded.utilized_amount,
-                utilization_currency = excluded.utilization_currency,
-                limit_amount = excluded.limit_amount,
-                available_amount = excluded.available_amount,
-                utilization_percentage = excluded.utilization_percentage,
-                as_of_timestamp = excluded.as_of_timestamp,
-                updated_at = excluded.updated_at
-            """,
-            (
-                utilization.counterparty_symbol,
-                utilization.utilized_amount,
-                utilization.utilization_currency,
-                utilization.limit_amount,
-                utilization.available_amount,
-                utilization.utilization_percentage,
-                utilization.as_of_timestamp,
-                _now_iso(),
-            ),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    CreditStore.shared(db_path).upsert_credit_utilization(utilization)
 
 
 def get_credit_utilization(db_path: str, counterparty_symbol: str) -> CreditUtilization | None:
@@ -337,28 +442,17 @@ def get_credit_utilization(db_path: str, counterparty_symbol: str) -> CreditUtil
     :param counterparty_symbol: The counterparty's short identifier.
     :returns: The :class:`CreditUtilization`, or ``None`` if not found.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        row = conn.execute(
-            "SELECT * FROM credit_utilizations WHERE counterparty_symbol = ?",
-            (counterparty_symbol,),
-        ).fetchone()
-    finally:
-        conn.close()
-
-    if row is None:
-        return None
+    return CreditStore.shared(db_path).get_credit_utilization(counterparty_symbol)
 
-    return CreditUtilization(
-        counterparty_symbol=row["counterparty_symbol"],
-        utilized_amount=row["utilized_amount"],
-        utilization_currency=row["utilization_currency"],
-        limit_amount=row["limit_amount"],
-        available_amount=row["available_amount"],
-        utilization_percentage=row["utilization_percentage"],
-        as_of_timestamp=row["as_of_timestamp"],
-    )
+
+def get_credit_utilizations(db_path: str, counterparty_symbols: Iterable[str]) -> Dict[str, CreditUtilization]:
+    """Retrieve the latest utilization snapshots of many counterparties in one query.
+
+    :param db_path: Path to the SQLite database file.
+    :param counterparty_symbols: The counterparties' short identifiers.
+    :returns: Snapshots by counterparty symbol; counterparties not in the store are absent.
+    """
+    return CreditStore.shared(db_path).get_credit_utilizations(counterparty_symbols)
 
 
 def get_all_credit_utilizations(db_path: str) -> List[CreditUtilization]:
@@ -367,27 +461,7 @@ def get_all_credit_utilizations(db_path: str) -> List[CreditUtilization]:
     :param db_path: Path to the SQLite database file.
     :returns: List of :class:`CreditUtilization` instances.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        rows = conn.execute(
-            "SELECT * FROM credit_utilizations ORDER BY counterparty_symbol"
-        ).fetchall()
-    finally:
-        conn.close()
-
-    return [
-        CreditUtilization(
-            counterparty_symbol=r["counterparty_symbol"],
-            utilized_amount=r["utilized_amount"],
-            utilization_currency=r["utilization_currency"],
-            limit_amount=r["limit_amount"],
-            available_amount=r["available_amount"],
-            utilization_percentage=r["utilization_percentage"],
-            as_of_timestamp=r["as_of_timestamp"],
-        )
-        for r in rows
-    ]
+    return CreditStore.shared(db_path).get_all_credit_utilizations()
 
 
 def delete_credit_utilization(db_path: str, counterparty_symbol: str) -> bool:
@@ -397,13 +471,4 @@ def delete_credit_utilization(db_path: str, counterparty_symbol: str) -> bool:
     :param counterparty_symbol: The counterparty's short identifier.
     :returns: ``True`` if a row was deleted, ``False`` if not found.
     """
-    conn = sqlite3.connect(db_path)
-    try:
-        cursor = conn.execute(
-            "DELETE FROM credit_utilizations WHERE counterparty_symbol = ?",
-            (counterparty_symbol,),
-        )
-        conn.commit()
-        return cursor.rowcount > 0
-    finally:
-        conn.close()
+    return CreditStore.shared(db_path).delete_credit_utilization(counterparty_symbol)
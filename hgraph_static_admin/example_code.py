@@ -6,16 +6,25 @@ This module manages static data required for processing trades.
 It fetches data from an external API, processes the data, and stores it
 in a local SQLite database. The data flow follows a forward propagation graph
 (FPG) style.
+
+Fetches go through ``StaticDataClient`` (paged, concurrent, decoded as they
+download). ``run_pipeline`` records the ETag and Last-Modified of each sync
+in the ``static_data_sync`` table and sends them with the next request, so
+an unchanged data set is neither downloaded nor reprocessed.
 """
 
 import argparse
 import logging
 import re
 import sqlite3
-from typing import List, Dict, Any
-
-import requests
+from typing import Any, Dict, Iterable, List, Optional
 
+from hgraph_static_admin.static_data_source import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_PAGE_SIZE,
+    StaticDataClient,
+    Validators,
+)
 from secure_config import config
 
 __all__ = (
@@ -30,6 +39,44 @@ __all__ = (
 
 logger = logging.getLogger(__name__)
 
+# Version of the data set each API URL was last synced at
+_CREATE_SYNC_SQL = """
+CREATE TABLE IF NOT EXISTS static_data_sync (
+    api_url       TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    records       INTEGER NOT NULL,
+    synced_at     TEXT NOT NULL DEFAULT (datetime('now'))
+)
+"""
+
+_SAVE_SYNC_SQL = """
+INSERT OR REPLACE INTO static_data_sync (api_url, etag, last_modified, records) VALUES (?, ?, ?, ?)
+"""
+
+_SELECT_SYNC_SQL = "SELECT etag, last_modified FROM static_data_sync WHERE api_url = ?"
+
+_INSERT_COUNTERPARTY_SQL = """
+INSERT INTO counterparties (
+    legal_name, short_name, identifier1, identifier2,
+    identifier3, identifier4, cleared_otc, dropcopy_enabled,
+    notification_preferences, notification_contacts
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_COUNTERPARTY_COLUMNS = (
+    "legal_name",
+    "short_name",
+    "identifier1",
+    "identifier2",
+    "identifier3",
+    "identifier4",
+    "cleared_otc",
+    "dropcopy_enabled",
+    "notification_preferences",
+    "notification_contacts",
+)
+
 
 def init_db(db_path: str) -> None:
     """Initialise the SQLite database with the required static tables.
@@ -53,22 +100,33 @@ def init_db(db_path: str) -> None:
             notification_contacts TEXT
         )
         """)
+    cursor.execute(_CREATE_SYNC_SQL)
     conn.commit()
     conn.close()
 
 
-def fetch_static_data(api_url: str) -> List[Dict[str, Any]]:
+def fetch_static_data(
+    api_url: str,
+    *,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> List[Dict[str, Any]]:
     """Fetch static data from an external API.
 
+    Follows the API's pagination, fetching up to *concurrency* pages at once
+    (see ``static_data_source``).
+
     :param api_url: The URL of the API endpoint.
+    :param page_size: Records requested per page.
+    :param concurrency: Maximum concurrent page requests.
     :returns: List of raw static data dictionaries.
+    :raises StaticDataSourceError: If a request fails after all retries.
     """
-    response = requests.get(api_url)
-    response.raise_for_status()
-    return response.json()
+    with StaticDataClient(api_url, page_size=page_size, concurrency=concurrency) as client:
+        return list(client.fetch())
 
 
-def process_counterparty_data(raw_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def process_counterparty_data(raw_data: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Process and validate counterparty static data.
 
     Cleans the data, applying regex where needed (e.g. to remove invalid
@@ -107,53 +165,91 @@ def process_counterparty_data(raw_data: List[Dict[str, Any]]) -> List[Dict[str,
     return processed
 
 
-def store_counterparty_data(db_path: str, data: List[Dict[str, Any]]) -> None:
+def store_counterparty_data(
+    db_path: str,
+    data: List[Dict[str, Any]],
+    *,
+    replace: bool = False,
+    api_url: Optional[str] = None,
+    validators: Optional[Validators] = None,
+) -> None:
     """Store processed counterparty data into the SQLite database.
 
+    Everything is written in one transaction.
+
     :param db_path: Path to the SQLite database file.
     :param data: Processed counterparty data.
+    :param replace: Delete the stored counterparties first (*data* is the whole universe).
+    :param api_url: With *validators*: the API URL the data was fetched from.
+    :param validators: Version of the fetched data set, recorded for the next sync of *api_url*.
     """
     conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    for entry in data:
-        cursor.execute(
-            """
-            INSERT INTO counterparties (
-                legal_name, short_name, identifier1, identifier2,
-                identifier3, identifier4, cleared_otc, dropcopy_enabled,
-                notification_preferences, notification_contacts
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                entry["legal_name"],
-                entry["short_name"],
-                entry["identifier1"],
-                entry["identifier2"],
-                entry["identifier3"],
-                entry["identifier4"],
-                entry["cleared_otc"],
-                entry["dropcopy_enabled"],
-                entry["notification_preferences"],
-                entry["notification_contacts"],
-            ),
-        )
-    conn.commit()
-    conn.close()
+    try:
+        with conn:
+            if replace:
+                conn.execute("DELETE FROM counterparties")
+            conn.executemany(
+                _INSERT_COUNTERPARTY_SQL, [tuple(entry[column] for column in _COUNTERPARTY_COLUMNS) for entry in data]
+            )
+            if api_url is not None and validators is not None:
+                conn.execute(_CREATE_SYNC_SQL)
+                conn.execute(_SAVE_SYNC_SQL, (api_url, validators.etag, validators.last_modified, len(data)))
+    finally:
+        conn.close()
+
 
+def _load_validators(db_path: str, api_url: str) -> Optional[Validators]:
+    """Version of the data set last synced from *api_url*, or None if it has never been synced."""
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute(_SELECT_SYNC_SQL, (api_url,)).fetchone()
+    except sqlite3.OperationalError:  # no sync table yet
+        return None
+    finally:
+        conn.close()
+    return Validators(*row) if row is not None else None
 
-def run_pipeline(api_url: str, db_path: str) -> None:
+
+def run_pipeline(
+    api_url: str,
+    db_path: str,
+    *,
+    force: bool = False,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    version_header: Optional[str] = None,
+) -> bool:
     """Run the FPG pipeline to fetch, process, and store static data.
 
+    The stored counterparties are replaced by the fetched ones. If the API
+    reports the data set unchanged since the last run, nothing is fetched,
+    processed or stored.
+
     :param api_url: API URL to fetch static data.
     :param db_path: Path to the SQLite database.
+    :param force: Fetch and store even if the data set is unchanged.
+    :param page_size: Records requested per page.
+    :param concurrency: Maximum concurrent page requests.
+    :param version_header: Data-set version header the API sends on every page; if given, the
+        sync fails when the data changes between pages (see ``static_data_source``).
+    :returns: True if the data was stored, False if it was unchanged.
+    :raises StaticDataSourceError: If a request fails after all retries.
     """
-    # Stage 1: Fetch
-    raw_data = fetch_static_data(api_url)
-    # Stage 2: Process/Transform
-    processed_data = process_counterparty_data(raw_data)
+    validators = None if force else _load_validators(db_path, api_url)
+    with StaticDataClient(
+        api_url, page_size=page_size, concurrency=concurrency, version_header=version_header
+    ) as client:
+        # Stage 1: Fetch
+        fetch = client.fetch(validators)
+        if not fetch.modified:
+            logger.info("Static data unchanged since the last sync; nothing to do.")
+            return False
+        # Stage 2: Process/Transform (as the pages arrive)
+        processed_data = process_counterparty_data(fetch)
     # Stage 3: Store
-    store_counterparty_data(db_path, processed_data)
-    logger.info("Static data pipeline completed successfully.")
+    store_counterparty_data(db_path, processed_data, replace=True, api_url=api_url, validators=fetch.validators)
+    logger.info("Static data pipeline completed successfully: %d counterparties.", len(processed_data))
+    return True
 
 
 def parse_cli_args() -> argparse.Namespace:
@@ -176,6 +272,7 @@ def parse_cli_args() -> argparse.Namespace:
         default=config["STATIC_DATA_API_URL"],
         help="API URL for fetching static data",
     )
+    parser.add_argument("--force", action="store_true", help="Fetch and store even if the data is unchanged")
     return parser.parse_args()
 
 
@@ -188,7 +285,7 @@ def main() -> None:
         init_db(args.db_path)
         logger.info("Database initialized at %s", args.db_path)
     if args.fetch:
-        run_pipeline(args.api_url, args.db_path)
+        run_pipeline(args.api_url, args.db_path, force=args.force)
 
 
 if __name__ == "__main__":
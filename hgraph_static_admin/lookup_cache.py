@@ -0,0 +1,167 @@
+"""
+lookup_cache.py
+
+Bounded LRU read-through cache for the static data lookups the Kafka
+subscribers make while parsing messages (e.g. resolving the two parties of
+a trading relationship).
+
+During a topic replay the same few hundred keys are resolved millions of
+times. ``LookupCache`` answers repeats from memory and loads the misses of
+one call with a single bulk store read (``get_legal_entities`` and the
+like). Only found values are cached, so a key that appears later is picked
+up on its next lookup.
+
+The cache sees only what its owner tells it about: the subscriber that owns
+it invalidates a key whenever it upserts or deletes that record itself.
+It is meant for a subscriber that is the only writer of its database, not
+for readers of a store another process keeps changing.
+
+Lookups are counted in ``hgraph_static_cache_lookups_total{cache,result}``
+(``hit`` / ``miss``); the hit rate is ``hit / (hit + miss)``. Evictions and
+the current size are exported alongside.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Iterable, List, Optional, TypeVar
+
+from hgraph_trade.metrics import counter, gauge
+
+__all__ = ("DEFAULT_CACHE_SIZE", "LookupCache")
+
+# Entries per cache; static data sets on the subscribed topics are far smaller
+DEFAULT_CACHE_SIZE = 10_000
+
+_LOOKUPS = counter(
+    "hgraph_static_cache_lookups_total",
+    "Static data cache lookups by the subscribers, by result (hit or miss).",
+    ("cache", "result"),
+)
+_EVICTIONS = counter(
+    "hgraph_static_cache_evictions_total",
+    "Least recently used entries dropped to keep a static data cache within its size.",
+    ("cache",),
+)
+_ENTRIES = gauge(
+    "hgraph_static_cache_entries",
+    "Entries held by a static data cache.",
+    ("cache",),
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LookupCache(Generic[K, V]):
+    """
+    LRU read-through cache in front of a bulk store lookup.
+
+    :param name: Cache name, used as the ``cache`` metric label (e.g. ``"party.legal_entity"``).
+    :param load_many: Loads the given keys from the store; keys not found are left out of the result.
+    :param maxsize: Most entries kept before the least recently used is evicted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load_many: Callable[[List[K]], Dict[K, V]],
+        maxsize: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_many = load_many
+        self._entries: "OrderedDict[K, V]" = OrderedDict()
+        # Bumped by every invalidation, so a load racing one is not cached
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._hit_counter = _LOOKUPS.labels(name, "hit")
+        self._miss_counter = _LOOKUPS.labels(name, "miss")
+        self._eviction_counter = _EVICTIONS.labels(name)
+        self._size_gauge = _ENTRIES.labels(name)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered from the cache (0.0 before the first lookup)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key: K) -> Optional[V]:
+        """
+        Look up one key.
+
+        :param key: The key.
+        :return: The cached or loaded value, or ``None`` if the store has no such record.
+        """
+        return self.get_many((key,)).get(key)
+
+    def get_many(self, keys: Iterable[K]) -> Dict[K, V]:
+        """
+        Look up several keys, loading all the misses with one store read.
+
+        :param keys: The keys.
+        :return: Values by key; keys the store does not have are absent.
+        """
+        found: Dict[K, V] = {}
+        missing: Dict[K, None] = {}  # ordered set
+        with self._lock:
+            for key in keys:
+                if key in found or key in missing:
+                    continue
+                value = self._entries.get(key)
+                if value is None:
+                    missing[key] = None
+                else:
+                    self._entries.move_to_end(key)
+                    found[key] = value
+            self.hits += len(found)
+            self.misses += len(missing)
+            generation = self._generation
+        self._hit_counter.inc(len(found))
+        if not missing:
+            return found
+
+        self._miss_counter.inc(len(missing))
+        loaded = self._load_many(list(missing))
+        evicted = 0
+        with self._lock:
+            # An invalidation during the load may have made what was read stale
+            if generation == self._generation:
+                for key, value in loaded.items():
+                    self._entries[key] = value
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    evicted += 1
+                self.evictions += evicted
+            size = len(self._entries)
+        if evicted:
+            self._eviction_counter.inc(evicted)
+        self._size_gauge.set(size)
+        found.update(loaded)
+        return found
+
+    def invalidate(self, key: K) -> None:
+        """Forget ``key``, e.g. after the owner upserted or deleted that record."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generation += 1
+            size = len(self._entries)
+        self._size_gauge.set(size)
+
+    def clear(self) -> None:
+        """Forget every entry (the hit and miss counts are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+        self._size_gauge.set(0)
@@ -5,6 +5,10 @@ Subscribes to two Kafka topics — one for legal entity updates and
 one for trading relationship updates — deserialises incoming JSON
 messages, and persists the data into the local SQLite party store.
 
+Parties referenced by relationship messages are resolved through a
+bounded LRU cache (see ``lookup_cache``) that the subscriber invalidates
+whenever it upserts or deletes a legal entity itself.
+
 The subscriber runs a blocking poll loop via :meth:`PartyKafkaSubscriber.start`
 and can be stopped gracefully with :meth:`PartyKafkaSubscriber.stop`.
 
@@ -47,19 +51,20 @@ Message formats
 
 import logging
 from datetime import date
-from typing import Any, Dict, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Tuple
 
 from hg_oap.parties.agreement import MasterAgreement, MasterAgreementType
 from hg_oap.parties.party import LegalEntity, PartyClassification
 from hg_oap.parties.relationship import ClearingStatus, TradingRelationship
 
+from hgraph_static_admin.lookup_cache import DEFAULT_CACHE_SIZE, LookupCache
 from hgraph_static_admin.party_store import (
+    PartyStore,
     delete_legal_entity,
     delete_trading_relationship,
-    get_legal_entity,
-    upsert_legal_entity,
-    upsert_trading_relationship,
+    get_legal_entities,
 )
+from hgraph_static_admin.subscriber_runtime import StoreSubscriber
 
 __all__ = (
     "PartyKafkaSubscriber",
@@ -69,10 +74,6 @@ __all__ = (
 
 logger = logging.getLogger(__name__)
 
-# Stop the subscriber after this many consecutive processing failures
-# to avoid infinite error loops on persistently bad data.
-_MAX_CONSECUTIVE_ERRORS = 50
-
 # Reverse lookup: classification string value → enum member
 _CLASSIFICATION_MAP: Dict[str, PartyClassification] = {c.value: c for c in PartyClassification}
 
@@ -156,6 +157,8 @@ def _parse_agreement(data: Dict[str, Any] | None, agreement_type: MasterAgreemen
 def parse_relationship_message(
     msg: Dict[str, Any],
     db_path: str,
+    *,
+    lookup: Callable[[Iterable[str]], Dict[str, LegalEntity]] | None = None,
 ) -> Tuple[str, TradingRelationship | None]:
     """Parse a trading relationship Kafka message.
 
@@ -164,6 +167,8 @@ def parse_relationship_message(
 
     :param msg: Deserialised JSON message dict.
     :param db_path: Path to the party SQLite database (for entity lookup).
+    :param lookup: Resolves party symbols to entities instead of reading
+        the store directly (e.g. :meth:`LookupCache.get_many`).
     :returns: A tuple of ``(action, relationship)``.  For ``DELETE``
         actions the relationship is ``None``.
     :raises ValueError: If required fields are missing, parties not found,
@@ -181,12 +186,13 @@ def parse_relationship_message(
     if action == "DELETE":
         return action, None
 
-    # Look up parties from the store
-    internal = get_legal_entity(db_path, int_sym)
+    # Look up both parties from the store in one query
+    parties = lookup((int_sym, ext_sym)) if lookup is not None else get_legal_entities(db_path, (int_sym, ext_sym))
+    internal = parties.get(int_sym)
     if internal is None:
         raise ValueError(f"Internal party not found in store: {int_sym!r}")
 
-    external = get_legal_entity(db_path, ext_sym)
+    external = parties.get(ext_sym)
     if external is None:
         raise ValueError(f"External party not found in store: {ext_sym!r}")
 
@@ -220,104 +226,62 @@ def parse_relationship_message(
 # ---------------------------------------------------------------------------
 
 
-class PartyKafkaSubscriber:
+class PartyKafkaSubscriber(StoreSubscriber):
     """Subscribes to party Kafka topics and persists updates to the party store.
 
+    Parties referenced by relationship messages are resolved through
+    :attr:`entity_cache`, which is cleared on start and whenever a batch
+    is rolled back.
+
     :param db_path: Path to the party SQLite database.
-    :param bootstrap_servers: Kafka bootstrap servers.  Falls back to config.
-    :param group_id: Kafka consumer group.  Falls back to config.
     :param entity_topic: Topic for legal entity messages.
     :param relationship_topic: Topic for trading relationship messages.
+    :param entity_cache_size: Legal entities kept in the party lookup cache.
+    :param options: Connection, snapshot, worker and dead-letter options (see ``StoreSubscriber``).
     """
 
+    name = "party"
+    store_class = PartyStore
+
     def __init__(
         self,
         db_path: str,
         *,
-        bootstrap_servers: str | None = None,
-        group_id: str | None = None,
         entity_topic: str | None = None,
         relationship_topic: str | None = None,
+        entity_cache_size: int = DEFAULT_CACHE_SIZE,
+        **options: Any,
     ):
         from secure_config import config
 
-        self.db_path = db_path
-        self.bootstrap_servers = bootstrap_servers or config["KAFKA_BOOTSTRAP_SERVERS"]
-        self.group_id = group_id or config.get("KAFKA_CONSUMER_GROUP", "hgraph_platform")
+        super().__init__(db_path, **options)
         self.entity_topic = entity_topic or config.get("PARTY_KAFKA_ENTITY_TOPIC", "party.legal_entity")
         self.relationship_topic = relationship_topic or config.get(
             "PARTY_KAFKA_RELATIONSHIP_TOPIC", "party.trading_relationship"
         )
-        self._running = False
-        self._receiver = None
-        self._processed_count = 0
+        self.entity_cache: LookupCache[str, LegalEntity] = LookupCache(
+            "party.legal_entity",
+            lambda symbols: get_legal_entities(self.db_path, symbols),
+            maxsize=entity_cache_size,
+        )
 
-    def start(self, *, poll_interval_ms: int = 1000, max_messages: int | None = None) -> None:
-        """Start the subscriber loop.
+    def _topics(self) -> List[str]:
+        return [self.entity_topic, self.relationship_topic]
 
-        Blocks until :meth:`stop` is called or *max_messages* have been
-        processed (useful for testing / batch mode).
+    def _on_start(self) -> None:
+        self.entity_cache.clear()  # the database may have changed while stopped
 
-        :param poll_interval_ms: Kafka poll timeout in milliseconds.
-        :param max_messages: Stop after processing this many messages
-            (``None`` = run indefinitely).
-        """
-        from hgraph_trade.hgraph_trade_booker.kafka_consumer import KafkaReceiver
+    def _on_rollback(self) -> None:
+        # Entities cached during the batch may never have been committed
+        self.entity_cache.clear()
 
-        topics = [self.entity_topic, self.relationship_topic]
-        self._receiver = KafkaReceiver(
-            topics,
-            bootstrap_servers=self.bootstrap_servers,
-            group_id=self.group_id,
-        )
-
-        self._running = True
-        self._processed_count = 0
+    def _on_stop(self) -> None:
         logger.info(
-            "Party subscriber started: topics=%s, group=%s",
-            topics,
-            self.group_id,
+            "Party subscriber stopped: processed=%d, entity cache hit rate=%.1f%%",
+            self._processed_count,
+            self.entity_cache.hit_rate * 100,
         )
 
-        consecutive_errors = 0
-        try:
-            while self._running:
-                records = self._receiver.poll(timeout_ms=poll_interval_ms)
-                for record in records:
-                    topic = record["topic"]
-                    value = record["value"]
-                    try:
-                        self.process_message(topic, value)
-                        self._processed_count += 1
-                        consecutive_errors = 0
-                    except Exception as exc:
-                        consecutive_errors += 1
-                        logger.error(
-                            "Error processing message on topic %s: %s — symbol: %s",
-                            topic,
-                            exc,
-                            value.get("symbol", "unknown") if isinstance(value, dict) else "unknown",
-                        )
-                        if consecutive_errors >= _MAX_CONSECUTIVE_ERRORS:
-                            logger.critical(
-                                "Too many consecutive errors (%d), stopping party subscriber",
-                                consecutive_errors,
-                            )
-                            self._running = False
-                            break
-
-                if records:
-                    self._receiver.commit()
-
-                if max_messages is not None and self._processed_count >= max_messages:
-                    logger.info(
-                        "Reached max_messages=%d, stopping subscriber",
-                        max_messages,
-                    )
-                    break
-        finally:
-            self._running = False
-
     def process_message(self, topic: str, message: Dict[str, Any]) -> None:
         """Process a single Kafka message.
 
@@ -341,10 +305,16 @@ class PartyKafkaSubscriber:
         symbol = message["symbol"]
 
         if action == "UPSERT":
-            upsert_legal_entity(self.db_path, entity)
-            logger.info("Upserted legal entity: %s", symbol)
+            store = PartyStore.shared(self.db_path)
+            store.upsert_legal_entity(entity)
+            self.entity_cache.invalidate(symbol)
+            # Again once committed: another worker may have cached the old entity meanwhile
+            store.after_commit(self.entity_cache.invalidate, symbol)
+            store.after_commit(logger.info, "Upserted legal entity: %s", symbol)
         elif action == "DELETE":
             deleted = delete_legal_entity(self.db_path, symbol)
+            self.entity_cache.invalidate(symbol)
+            PartyStore.shared(self.db_path).after_commit(self.entity_cache.invalidate, symbol)
             if deleted:
                 logger.info("Deleted legal entity: %s", symbol)
             else:
@@ -352,13 +322,14 @@ class PartyKafkaSubscriber:
 
     def _handle_relationship_message(self, message: Dict[str, Any]) -> None:
         """Handle a trading relationship message."""
-        action, relationship = parse_relationship_message(message, self.db_path)
+        action, relationship = parse_relationship_message(message, self.db_path, lookup=self.entity_cache.get_many)
         int_sym = message["internal_party_symbol"]
         ext_sym = message["external_party_symbol"]
 
         if action == "UPSERT":
-            upsert_trading_relationship(self.db_path, relationship)
-            logger.info("Upserted trading relationship: %s ↔ %s", int_sym, ext_sym)
+            store = PartyStore.shared(self.db_path)
+            store.upsert_trading_relationship(relationship)
+            store.after_commit(logger.info, "Upserted trading relationship: %s ↔ %s", int_sym, ext_sym)
         elif action == "DELETE":
             deleted = delete_trading_relationship(self.db_path, int_sym, ext_sym)
             if deleted:
@@ -369,20 +340,3 @@ class PartyKafkaSubscriber:
                     int_sym,
                     ext_sym,
                 )
-
-    def stop(self) -> None:
-        """Signal the subscriber to stop after the current poll cycle."""
-        self._running = False
-        logger.info("Party subscriber stop requested")
-
-    def close(self) -> None:
-        """Close the Kafka consumer and release resources."""
-        self.stop()
-        if self._receiver is not None:
-            self._receiver.close()
-            self._receiver = None
-
-    @property
-    def processed_count(self) -> int:
-        """Number of messages successfully processed."""
-        return self._processed_count
@@ -9,27 +9,40 @@ Provides CRUD operations for two tables:
   :class:`~hg_oap.parties.relationship.TradingRelationship` records
   keyed by ``(internal_party_symbol, external_party_symbol)``.
 
+Relationship reads join both parties in the same query, and the
+``get_legal_entities`` / ``get_trading_relationships`` variants look up
+many keys in one statement.
+
 This module is the persistence layer for the party Kafka subscriber and
 can also be used standalone for local party data management.
+
+:class:`PartyStore` keeps a persistent connection per thread (see
+``sqlite_store``); the module-level functions are thin wrappers around the
+shared store for each database path.
 """
 
 import logging
 import sqlite3
 from datetime import date, datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Tuple
 
 from hg_oap.parties.agreement import MasterAgreement, MasterAgreementType
 from hg_oap.parties.party import LegalEntity, PartyClassification
 from hg_oap.parties.relationship import ClearingStatus, TradingRelationship
 
+from hgraph_static_admin.sqlite_store import SqliteStore, json_keys
+
 __all__ = (
+    "PartyStore",
     "init_party_db",
     "upsert_legal_entity",
     "get_legal_entity",
+    "get_legal_entities",
     "get_all_legal_entities",
     "delete_legal_entity",
     "upsert_trading_relationship",
     "get_trading_relationship",
+    "get_trading_relationships",
     "get_all_trading_relationships",
     "delete_trading_relationship",
 )
@@ -83,6 +96,95 @@ CREATE TABLE IF NOT EXISTS trading_relationships (
 """
 
 
+# ---------------------------------------------------------------------------
+# Statements (constant text, so each connection prepares them once)
+# ---------------------------------------------------------------------------
+
+_UPSERT_LEGAL_ENTITY_SQL = """
+INSERT INTO legal_entities (symbol, name, classification, lei,
+                            jurisdiction, registration_id, tax_id,
+                            address, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(symbol) DO UPDATE SET
+    name = excluded.name,
+    classification = excluded.classification,
+    lei = excluded.lei,
+    jurisdiction = excluded.jurisdiction,
+    registration_id = excluded.registration_id,
+    tax_id = excluded.tax_id,
+    address = excluded.address,
+    updated_at = excluded.updated_at
+"""
+
+_SELECT_LEGAL_ENTITY_SQL = "SELECT * FROM legal_entities WHERE symbol = ?"
+
+_SELECT_LEGAL_ENTITIES_SQL = "SELECT * FROM legal_entities WHERE symbol IN (SELECT value FROM json_each(?))"
+
+_SELECT_ALL_LEGAL_ENTITIES_SQL = "SELECT * FROM legal_entities ORDER BY symbol"
+
+_DELETE_LEGAL_ENTITY_SQL = "DELETE FROM legal_entities WHERE symbol = ?"
+
+_UPSERT_TRADING_RELATIONSHIP_SQL = """
+INSERT INTO trading_relationships (
+    internal_party_symbol, external_party_symbol, clearing_status,
+    isda_type, isda_version, isda_date, isda_csa, isda_threshold, isda_governing_law,
+    naesb_type, naesb_version, naesb_date,
+    eei_type, eei_version, eei_date,
+    dropcopy_enabled, internal_portfolio, external_portfolio, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(internal_party_symbol, external_party_symbol) DO UPDATE SET
+    clearing_status = excluded.clearing_status,
+    isda_type = excluded.isda_type,
+    isda_version = excluded.isda_version,
+    isda_date = excluded.isda_date,
+    isda_csa = excluded.isda_csa,
+    isda_threshold = excluded.isda_threshold,
+    isda_governing_law = excluded.isda_governing_law,
+    naesb_type = excluded.naesb_type,
+    naesb_version = excluded.naesb_version,
+    naesb_date = excluded.naesb_date,
+    eei_type = excluded.eei_type,
+    eei_version = excluded.eei_version,
+    eei_date = excluded.eei_date,
+    dropcopy_enabled = excluded.dropcopy_enabled,
+    internal_portfolio = excluded.internal_portfolio,
+    external_portfolio = excluded.external_portfolio,
+    updated_at = excluded.updated_at
+"""
+
+_ENTITY_COLUMNS = ("symbol", "name", "classification", "lei", "jurisdiction", "registration_id", "tax_id", "address")
+
+# Each relationship with both parties' columns, prefixed "internal_" / "external_".
+# LEFT JOINs so a relationship whose party is missing is still seen (and reported).
+_SELECT_RELATIONSHIPS_WITH_PARTIES_SQL = f"""
+SELECT r.*,
+    {", ".join(f"i.{c} AS internal_{c}" for c in _ENTITY_COLUMNS)},
+    {", ".join(f"e.{c} AS external_{c}" for c in _ENTITY_COLUMNS)}
+FROM trading_relationships AS r
+LEFT JOIN legal_entities AS i ON i.symbol = r.internal_party_symbol
+LEFT JOIN legal_entities AS e ON e.symbol = r.external_party_symbol
+"""
+
+_SELECT_TRADING_RELATIONSHIP_SQL = (
+    _SELECT_RELATIONSHIPS_WITH_PARTIES_SQL + "WHERE r.internal_party_symbol = ? AND r.external_party_symbol = ?"
+)
+
+_SELECT_TRADING_RELATIONSHIPS_SQL = _SELECT_RELATIONSHIPS_WITH_PARTIES_SQL + """
+WHERE (r.internal_party_symbol, r.external_party_symbol) IN (
+    SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]') FROM json_each(?)
+)
+"""
+
+_SELECT_ALL_TRADING_RELATIONSHIPS_SQL = (
+    _SELECT_RELATIONSHIPS_WITH_PARTIES_SQL + "ORDER BY r.internal_party_symbol, r.external_party_symbol"
+)
+
+_DELETE_TRADING_RELATIONSHIP_SQL = """
+DELETE FROM trading_relationships
+WHERE internal_party_symbol = ? AND external_party_symbol = ?
+"""
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -132,72 +234,227 @@ def _row_to_agreement(row: Dict[str, Any], prefix: str) -> MasterAgreement | Non
     return MasterAgreement(**kwargs)
 
 
+def _legal_entity_params(entity: LegalEntity) -> Tuple[Any, ...]:
+    """Parameters for ``_UPSERT_LEGAL_ENTITY_SQL``."""
+    return (
+        entity.symbol,
+        entity.name,
+        entity.classification.value,
+        entity.lei,
+        entity.jurisdiction,
+        entity.registration_id,
+        entity.tax_id,
+        entity.address,
+        _now_iso(),
+    )
+
+
+def _row_to_legal_entity(row: sqlite3.Row, prefix: str = "") -> LegalEntity:
+    """Build a LegalEntity from a ``legal_entities`` row (or its ``prefix``-ed columns in a joined row)."""
+    return LegalEntity(
+        symbol=row[f"{prefix}symbol"],
+        name=row[f"{prefix}name"],
+        classification=PartyClassification(row[f"{prefix}classification"]),
+        lei=row[f"{prefix}lei"],
+        jurisdiction=row[f"{prefix}jurisdiction"],
+        registration_id=row[f"{prefix}registration_id"],
+        tax_id=row[f"{prefix}tax_id"],
+        address=row[f"{prefix}address"],
+    )
+
+
+def _relationship_params(relationship: TradingRelationship) -> Tuple[Any, ...]:
+    """Parameters for ``_UPSERT_TRADING_RELATIONSHIP_SQL``."""
+    isda_cols = _agreement_to_row(relationship.isda, "isda")
+    naesb_cols = _agreement_to_row(relationship.naesb, "naesb")
+    eei_cols = _agreement_to_row(relationship.eei, "eei")
+    return (
+        relationship.internal_party.symbol,
+        relationship.external_party.symbol,
+        relationship.clearing_status.value,
+        isda_cols.get("isda_type"),
+        isda_cols.get("isda_version"),
+        isda_cols.get("isda_date"),
+        isda_cols.get("isda_csa", 0),
+        isda_cols.get("isda_threshold"),
+        isda_cols.get("isda_governing_law"),
+        naesb_cols.get("naesb_type"),
+        naesb_cols.get("naesb_version"),
+        naesb_cols.get("naesb_date"),
+        eei_cols.get("eei_type"),
+        eei_cols.get("eei_version"),
+        eei_cols.get("eei_date"),
+        1 if relationship.dropcopy_enabled else 0,
+        relationship.internal_portfolio,
+        relationship.external_portfolio,
+        _now_iso(),
+    )
+
+
+def _row_to_relationship(row: sqlite3.Row) -> TradingRelationship | None:
+    """Build a TradingRelationship from a row of ``_SELECT_RELATIONSHIPS_WITH_PARTIES_SQL``.
+
+    :returns: ``None`` (with a warning) if either party is missing from ``legal_entities``.
+    """
+    row_dict = dict(row)
+    if row_dict["internal_symbol"] is None or row_dict["external_symbol"] is None:
+        logger.warning(
+            "Relationship found but party missing: internal=%s external=%s",
+            row_dict["internal_party_symbol"],
+            row_dict["external_party_symbol"],
+        )
+        return None
+    return TradingRelationship(
+        internal_party=_row_to_legal_entity(row, "internal_"),
+        external_party=_row_to_legal_entity(row, "external_"),
+        clearing_status=ClearingStatus(row_dict["clearing_status"]),
+        isda=_row_to_agreement(row_dict, "isda"),
+        naesb=_row_to_agreement(row_dict, "naesb"),
+        eei=_row_to_agreement(row_dict, "eei"),
+        dropcopy_enabled=bool(row_dict.get("dropcopy_enabled", 0)),
+        internal_portfolio=row_dict.get("internal_portfolio"),
+        external_portfolio=row_dict.get("external_portfolio"),
+    )
+
+
 # ---------------------------------------------------------------------------
-# Database initialisation
+# Store
 # ---------------------------------------------------------------------------
 
 
-def init_party_db(db_path: str) -> None:
-    """Create the ``legal_entities`` and ``trading_relationships`` tables.
+class PartyStore(SqliteStore):
+    """Legal entities and trading relationships in one SQLite database.
 
     :param db_path: Path to the SQLite database file.
+    :param pragmas: Overrides for ``sqlite_store.DEFAULT_PRAGMAS``.
     """
-    conn = sqlite3.connect(db_path)
-    try:
-        conn.execute("PRAGMA journal_mode = WAL")
-        conn.execute("PRAGMA foreign_keys = ON")
-        conn.execute(_CREATE_LEGAL_ENTITIES_SQL)
-        conn.execute(_CREATE_TRADING_RELATIONSHIPS_SQL)
-        conn.commit()
-    finally:
-        conn.close()
-    logger.info("Party database initialised at %s", db_path)
+
+    kind = "Party"
+
+    def init_db(self) -> None:
+        """Create the ``legal_entities`` and ``trading_relationships`` tables."""
+        with self.transaction() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(_CREATE_LEGAL_ENTITIES_SQL)
+            conn.execute(_CREATE_TRADING_RELATIONSHIPS_SQL)
+        logger.info("Party database initialised at %s", self.db_path)
+
+    # -- Legal entities -----------------------------------------------------
+
+    def upsert_legal_entity(self, entity: LegalEntity) -> None:
+        """Insert or update a legal entity record.
+
+        :param entity: The legal entity to store.
+        """
+        self._write("legal_entities", _UPSERT_LEGAL_ENTITY_SQL, _legal_entity_params(entity))
+
+    def get_legal_entity(self, symbol: str) -> LegalEntity | None:
+        """Retrieve a legal entity by symbol.
+
+        :param symbol: The entity's short identifier.
+        :returns: The :class:`LegalEntity`, or ``None`` if not found.
+        """
+        row = self._reader().execute(_SELECT_LEGAL_ENTITY_SQL, (symbol,)).fetchone()
+        return None if row is None else _row_to_legal_entity(row)
+
+    def get_legal_entities(self, symbols: Iterable[str]) -> Dict[str, LegalEntity]:
+        """Retrieve many legal entities in one query.
+
+        :param symbols: The entities' short identifiers.
+        :returns: Entities by symbol; symbols not in the store are absent.
+        """
+        rows = self._reader().execute(_SELECT_LEGAL_ENTITIES_SQL, (json_keys(symbols),))
+        return {r["symbol"]: _row_to_legal_entity(r) for r in rows}
+
+    def get_all_legal_entities(self) -> List[LegalEntity]:
+        """Return all legal entities.
+
+        :returns: List of :class:`LegalEntity` instances.
+        """
+        return [_row_to_legal_entity(r) for r in self._reader().execute(_SELECT_ALL_LEGAL_ENTITIES_SQL)]
+
+    def delete_legal_entity(self, symbol: str) -> bool:
+        """Delete a legal entity by symbol.
+
+        :param symbol: The entity's short identifier.
+        :returns: ``True`` if a row was deleted, ``False`` if not found.
+        """
+        return self._execute("legal_entities", _DELETE_LEGAL_ENTITY_SQL, (symbol,)) > 0
+
+    # -- Trading relationships ----------------------------------------------
+
+    def upsert_trading_relationship(self, relationship: TradingRelationship) -> None:
+        """Insert or update a trading relationship record.
+
+        :param relationship: The trading relationship to store.
+        """
+        self._write("trading_relationships", _UPSERT_TRADING_RELATIONSHIP_SQL, _relationship_params(relationship))
+
+    def get_trading_relationship(self, internal_symbol: str, external_symbol: str) -> TradingRelationship | None:
+        """Retrieve a trading relationship by party symbols.
+
+        Both the internal and external party must exist in ``legal_entities``.
+
+        :param internal_symbol: Internal party symbol.
+        :param external_symbol: External party symbol.
+        :returns: The :class:`TradingRelationship`, or ``None`` if not found.
+        """
+        row = self._reader().execute(_SELECT_TRADING_RELATIONSHIP_SQL, (internal_symbol, external_symbol)).fetchone()
+        return None if row is None else _row_to_relationship(row)
+
+    def get_trading_relationships(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], TradingRelationship]:
+        """Retrieve many trading relationships, with their parties, in one query.
+
+        :param keys: ``(internal_symbol, external_symbol)`` pairs.
+        :returns: Relationships by key; keys not found (or missing a party) are absent.
+        """
+        rows = self._reader().execute(_SELECT_TRADING_RELATIONSHIPS_SQL, (json_keys(keys),))
+        results: Dict[Tuple[str, str], TradingRelationship] = {}
+        for row in rows:
+            rel = _row_to_relationship(row)
+            if rel is not None:
+                results[(row["internal_party_symbol"], row["external_party_symbol"])] = rel
+        return results
+
+    def get_all_trading_relationships(self) -> List[TradingRelationship]:
+        """Return all trading relationships, with their parties, in one query.
+
+        :returns: List of :class:`TradingRelationship` instances.
+        """
+        rows = self._reader().execute(_SELECT_ALL_TRADING_RELATIONSHIPS_SQL)
+        return [rel for rel in map(_row_to_relationship, rows) if rel is not None]
+
+    def delete_trading_relationship(self, internal_symbol: str, external_symbol: str) -> bool:
+        """Delete a trading relationship by party symbols.
+
+        :param internal_symbol: Internal party symbol.
+        :param external_symbol: External party symbol.
+        :returns: ``True`` if a row was deleted, ``False`` if not found.
+        """
+        params = (internal_symbol, external_symbol)
+        return self._execute("trading_relationships", _DELETE_TRADING_RELATIONSHIP_SQL, params) > 0
 
 
 # ---------------------------------------------------------------------------
-# Legal Entity CRUD
+# Module-level API (one shared PartyStore per database file)
 # ---------------------------------------------------------------------------
 
 
+def init_party_db(db_path: str) -> None:
+    """Create the ``legal_entities`` and ``trading_relationships`` tables.
+
+    :param db_path: Path to the SQLite database file.
+    """
+    PartyStore.shared(db_path).init_db()
+
+
 def upsert_legal_entity(db_path: str, entity: LegalEntity) -> None:
     """Insert or update a legal entity record.
 
     :param db_path: Path to the SQLite database file.
     :param entity: The legal entity to store.
     """
-    conn = sqlite3.connect(db_path)
-    try:
-        conn.execute(
-            """
-            INSERT INTO legal_entities (symbol, name, classification, lei,
-                                        jurisdiction, registration_id, tax_id,
-                                        address, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(symbol) DO UPDATE SET
-                name = excluded.name,
-                classification = excluded.classification,
-                lei = excluded.lei,
-                jurisdiction = excluded.jurisdiction,
-                registration_id = excluded.registration_id,
-                tax_id = excluded.tax_id,
-                address = excluded.address,
-                updated_at = excluded.updated_at
-            """,
-            (
-                entity.symbol,
-                entity.name,
-                entity.classification.value,
-                entity.lei,
-                entity.jurisdiction,
-                entity.registration_id,
-                entity.tax_id,
-                entity.address,
-                _now_iso(),
-            ),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    PartyStore.shared(db_path).upsert_legal_entity(entity)
 
 
 def get_legal_entity(db_path: str, symbol: str) -> LegalEntity | None:
@@ -207,28 +464,17 @@ def get_legal_entity(db_path: str, symbol: str) -> LegalEntity | None:
     :param symbol: The entity's short identifier.
     :returns: The :class:`LegalEntity`, or ``None`` if not found.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        row = conn.execute(
-            "SELECT * FROM legal_entities WHERE symbol = ?", (symbol,)
-        ).fetchone()
-    finally:
-        conn.close()
-
-    if row is None:
-        return None
+    return PartyStore.shared(db_path).get_legal_entity(symbol)
 
-    return LegalEntity(
-        symbol=row["symbol"],
-        name=row["name"],
-        classification=PartyClassification(row["classification"]),
-        lei=row["lei"],
-        jurisdiction=row["jurisdiction"],
-        registration_id=row["registration_id"],
-        tax_id=row["tax_id"],
-        address=row["address"],
-    )
+
+def get_legal_entities(db_path: str, symbols: Iterable[str]) -> Dict[str, LegalEntity]:
+    """Retrieve many legal entities in one query.
+
+    :param db_path: Path to the SQLite database file.
+    :param symbols: The entities' short identifiers.
+    :returns: Entities by symbol; symbols not in the store are absent.
+    """
+    return PartyStore.shared(db_path).get_legal_entities(symbols)
 
 
 def get_all_legal_entities(db_path: str) -> List[LegalEntity]:
@@ -237,28 +483,7 @@ def get_all_legal_entities(db_path: str) -> List[LegalEntity]:
     :param db_path: Path to the SQLite database file.
     :returns: List of :class:`LegalEntity` instances.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        rows = conn.execute(
-            "SELECT * FROM legal_entities ORDER BY symbol"
-        ).fetchall()
-    finally:
-        conn.close()
-
-    return [
-        LegalEntity(
-            symbol=r["symbol"],
-            name=r["name"],
-            classification=PartyClassification(r["classification"]),
-            lei=r["lei"],
-            jurisdiction=r["jurisdiction"],
-            registration_id=r["registration_id"],
-            tax_id=r["tax_id"],
-            address=r["address"],
-        )
-        for r in rows
-    ]
+    return PartyStore.shared(db_path).get_all_legal_entities()
 
 
 def delete_legal_entity(db_path: str, symbol: str) -> bool:
@@ -268,20 +493,7 @@ def delete_legal_entity(db_path: str, symbol: str) -> bool:
     :param symbol: The entity's short identifier.
     :returns: ``True`` if a row was deleted, ``False`` if not found.
     """
-    conn = sqlite3.connect(db_path)
-    try:
-        cursor = conn.execute(
-            "DELETE FROM legal_entities WHERE symbol = ?", (symbol,)
-        )
-        conn.commit()
-        return cursor.rowcount > 0
-    finally:
-        conn.close()
-
-
-# ---------------------------------------------------------------------------
-# Trading Relationship CRUD
-# ---------------------------------------------------------------------------
+    return PartyStore.shared(db_path).delete_legal_entity(symbol)
 
 
 def upsert_trading_relationship(db_path: str, relationship: TradingRelationship) -> None:
@@ -290,65 +502,7 @@ def upsert_trading_relationship(db_path: str, relationship: TradingRelationship)
     :param db_path: Path to the SQLite database file.
     :param relationship: The trading relationship to store.
     """
-    isda_cols = _agreement_to_row(relationship.isda, "isda")
-    naesb_cols = _agreement_to_row(relationship.naesb, "naesb")
-    eei_cols = _agreement_to_row(relationship.eei, "eei")
-
-    conn = sqlite3.connect(db_path)
-    try:
-        conn.execute(
-            """
-            INSERT INTO trading_relationships (
-                internal_party_symbol, external_party_symbol, clearing_status,
-                isda_type, isda_version, isda_date, isda_csa, isda_threshold, isda_governing_law,
-                naesb_type, naesb_version, naesb_date,
-                eei_type, eei_version, eei_date,
-                dropcopy_enabled, internal_portfolio, external_portfolio, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(internal_party_symbol, external_party_symbol) DO UPDATE SET
-                clearing_status = excluded.clearing_status,
-                isda_type = excluded.isda_type,
-                isda_version = excluded.isda_version,
-                isda_date = excluded.isda_date,
-                isda_csa = excluded.isda_csa,
-                isda_threshold = excluded.isda_threshold,
-                isda_governing_law = excluded.isda_governing_law,
-                naesb_type = excluded.naesb_type,
-                naesb_version = excluded.naesb_version,
-                naesb_date = excluded.naesb_date,
-                eei_type = excluded.eei_type,
-                eei_version = excluded.eei_version,
-                eei_date = excluded.eei_date,
-                dropcopy_enabled = excluded.dropcopy_enabled,
-                internal_portfolio = excluded.internal_portfolio,
-                external_portfolio = excluded.external_portfolio,
-                updated_at = excluded.updated_at
-            """,
-            (
-                relationship.internal_party.symbol,
-                relationship.external_party.symbol,
-                relationship.clearing_status.value,
-                isda_cols.get("isda_type"),
-                isda_cols.get("isda_version"),
-                isda_cols.get("isda_date"),
-                isda_cols.get("isda_csa", 0),
-                isda_cols.get("isda_threshold"),
-                isda_cols.get("isda_governing_law"),
-                naesb_cols.get("naesb_type"),
-                naesb_cols.get("naesb_version"),
-                naesb_cols.get("naesb_date"),
-                eei_cols.get("eei_type"),
-                eei_cols.get("eei_version"),
-                eei_cols.get("eei_date"),
-                1 if relationship.dropcopy_enabled else 0,
-                relationship.internal_portfolio,
-                relationship.external_portfolio,
-                _now_iso(),
-            ),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    PartyStore.shared(db_path).upsert_trading_relationship(relationship)
 
 
 def get_trading_relationship(
@@ -365,43 +519,20 @@ def get_trading_relationship(
     :param external_symbol: External party symbol.
     :returns: The :class:`TradingRelationship`, or ``None`` if not found.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        row = conn.execute(
-            """SELECT * FROM trading_relationships
-               WHERE internal_party_symbol = ? AND external_party_symbol = ?""",
-            (internal_symbol, external_symbol),
-        ).fetchone()
-    finally:
-        conn.close()
-
-    if row is None:
-        return None
+    return PartyStore.shared(db_path).get_trading_relationship(internal_symbol, external_symbol)
 
-    # Look up the party objects
-    internal = get_legal_entity(db_path, internal_symbol)
-    external = get_legal_entity(db_path, external_symbol)
-    if internal is None or external is None:
-        logger.warning(
-            "Relationship found but party missing: internal=%s external=%s",
-            internal_symbol,
-            external_symbol,
-        )
-        return None
 
-    row_dict = dict(row)
-    return TradingRelationship(
-        internal_party=internal,
-        external_party=external,
-        clearing_status=ClearingStatus(row_dict["clearing_status"]),
-        isda=_row_to_agreement(row_dict, "isda"),
-        naesb=_row_to_agreement(row_dict, "naesb"),
-        eei=_row_to_agreement(row_dict, "eei"),
-        dropcopy_enabled=bool(row_dict.get("dropcopy_enabled", 0)),
-        internal_portfolio=row_dict.get("internal_portfolio"),
-        external_portfolio=row_dict.get("external_portfolio"),
-    )
+def get_trading_relationships(
+    db_path: str,
+    keys: Iterable[Tuple[str, str]],
+) -> Dict[Tuple[str, str], TradingRelationship]:
+    """Retrieve many trading relationships, with their parties, in one query.
+
+    :param db_path: Path to the SQLite database file.
+    :param keys: ``(internal_symbol, external_symbol)`` pairs.
+    :returns: Relationships by key; keys not found (or missing a party) are absent.
+    """
+    return PartyStore.shared(db_path).get_trading_relationships(keys)
 
 
 def get_all_trading_relationships(db_path: str) -> List[TradingRelationship]:
@@ -410,21 +541,7 @@ def get_all_trading_relationships(db_path: str) -> List[TradingRelationship]:
     :param db_path: Path to the SQLite database file.
     :returns: List of :class:`TradingRelationship` instances.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        rows = conn.execute(
-            "SELECT * FROM trading_relationships ORDER BY internal_party_symbol, external_party_symbol"
-        ).fetchall()
-    finally:
-        conn.close()
-
-    results: List[TradingRelationship] = []
-    for row in rows:
-        rel = get_trading_relationship(db_path, row["internal_party_symbol"], row["external_party_symbol"])
-        if rel is not None:
-            results.append(rel)
-    return results
+    return PartyStore.shared(db_path).get_all_trading_relationships()
 
 
 def delete_trading_relationship(
@@ -439,14 +556,4 @@ def delete_trading_relationship(
     :param external_symbol: External party symbol.
     :returns: ``True`` if a row was deleted, ``False`` if not found.
     """
-    conn = sqlite3.connect(db_path)
-    try:
-        cursor = conn.execute(
-            """DELETE FROM trading_relationships
-               WHERE internal_party_symbol = ? AND external_party_symbol = ?""",
-            (internal_symbol, external_symbol),
-        )
-        conn.commit()
-        return cursor.rowcount > 0
-    finally:
-        conn.close()
+    return PartyStore.shared(db_path).delete_trading_relationship(internal_symbol, external_symbol)
@@ -42,7 +42,7 @@ Message formats
 """
 
 import logging
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Tuple
 
 from hg_oap.portfolio.portfolio_info import (
     BookInfo,
@@ -53,11 +53,11 @@ from hg_oap.portfolio.portfolio_info import (
 )
 
 from hgraph_static_admin.portfolio_store import (
+    PortfolioStore,
     delete_book,
     delete_portfolio,
-    upsert_book,
-    upsert_portfolio,
 )
+from hgraph_static_admin.subscriber_runtime import StoreSubscriber
 
 __all__ = (
     "PortfolioKafkaSubscriber",
@@ -67,10 +67,6 @@ __all__ = (
 
 logger = logging.getLogger(__name__)
 
-# Stop the subscriber after this many consecutive processing failures
-# to avoid infinite error loops on persistently bad data.
-_MAX_CONSECUTIVE_ERRORS = 50
-
 # Reverse lookup: portfolio type string value → enum member
 _PORTFOLIO_TYPE_MAP: Dict[str, PortfolioType] = {t.value: t for t in PortfolioType}
 
@@ -195,105 +191,38 @@ def parse_book_message(msg: Dict[str, Any]) -> Tuple[str, BookInfo | None]:
 # ---------------------------------------------------------------------------
 
 
-class PortfolioKafkaSubscriber:
+class PortfolioKafkaSubscriber(StoreSubscriber):
     """Subscribes to portfolio Kafka topics and persists updates to the portfolio store.
 
     :param db_path: Path to the portfolio SQLite database.
-    :param bootstrap_servers: Kafka bootstrap servers.  Falls back to config.
-    :param group_id: Kafka consumer group.  Falls back to config.
     :param portfolio_topic: Topic for portfolio messages.
     :param book_topic: Topic for book messages.
+    :param options: Connection, snapshot, worker and dead-letter options (see ``StoreSubscriber``).
     """
 
+    name = "portfolio"
+    store_class = PortfolioStore
+
     def __init__(
         self,
         db_path: str,
         *,
-        bootstrap_servers: str | None = None,
-        group_id: str | None = None,
         portfolio_topic: str | None = None,
         book_topic: str | None = None,
+        **options: Any,
     ):
         from secure_config import config
 
-        self.db_path = db_path
-        self.bootstrap_servers = bootstrap_servers or config["KAFKA_BOOTSTRAP_SERVERS"]
-        self.group_id = group_id or config.get("KAFKA_CONSUMER_GROUP", "hgraph_platform")
+        super().__init__(db_path, **options)
         self.portfolio_topic = portfolio_topic or config.get(
             "PORTFOLIO_KAFKA_PORTFOLIO_TOPIC", "portfolio.portfolio"
         )
         self.book_topic = book_topic or config.get(
             "PORTFOLIO_KAFKA_BOOK_TOPIC", "portfolio.book"
         )
-        self._running = False
-        self._receiver = None
-        self._processed_count = 0
-
-    def start(self, *, poll_interval_ms: int = 1000, max_messages: int | None = None) -> None:
-        """Start the subscriber loop.
 
-        Blocks until :meth:`stop` is called or *max_messages* have been
-        processed (useful for testing / batch mode).
-
-        :param poll_interval_ms: Kafka poll timeout in milliseconds.
-        :param max_messages: Stop after processing this many messages
-            (``None`` = run indefinitely).
-        """
-        from hgraph_trade.hgraph_trade_booker.kafka_consumer import KafkaReceiver
-
-        topics = [self.portfolio_topic, self.book_topic]
-        self._receiver = KafkaReceiver(
-            topics,
-            bootstrap_servers=self.bootstrap_servers,
-            group_id=self.group_id,
-        )
-
-        self._running = True
-        self._processed_count = 0
-        logger.info(
-            "Portfolio subscriber started: topics=%s, group=%s",
-            topics,
-            self.group_id,
-        )
-
-        consecutive_errors = 0
-        try:
-            while self._running:
-                records = self._receiver.poll(timeout_ms=poll_interval_ms)
-                for record in records:
-                    topic = record["topic"]
-                    value = record["value"]
-                    try:
-                        self.process_message(topic, value)
-                        self._processed_count += 1
-                        consecutive_errors = 0
-                    except Exception as exc:
-                        consecutive_errors += 1
-                        logger.error(
-                            "Error processing message on topic %s: %s — symbol: %s",
-                            topic,
-                            exc,
-                            value.get("symbol", "unknown") if isinstance(value, dict) else "unknown",
-                        )
-                        if consecutive_errors >= _MAX_CONSECUTIVE_ERRORS:
-                            logger.critical(
-                                "Too many consecutive errors (%d), stopping portfolio subscriber",
-                                consecutive_errors,
-                            )
-                            self._running = False
-                            break
-
-                if records:
-                    self._receiver.commit()
-
-                if max_messages is not None and self._processed_count >= max_messages:
-                    logger.info(
-                        "Reached max_messages=%d, stopping subscriber",
-                        max_messages,
-                    )
-                    break
-        finally:
-            self._running = False
+    def _topics(self) -> List[str]:
+        return [self.portfolio_topic, self.book_topic]
 
     def process_message(self, topic: str, message: Dict[str, Any]) -> None:
         """Process a single Kafka message.
@@ -318,8 +247,9 @@ class PortfolioKafkaSubscriber:
         symbol = message["symbol"]
 
         if action == "UPSERT":
-            upsert_portfolio(self.db_path, portfolio)
-            logger.info("Upserted portfolio: %s", symbol)
+            store = PortfolioStore.shared(self.db_path)
+            store.upsert_portfolio(portfolio)
+            store.after_commit(logger.info, "Upserted portfolio: %s", symbol)
         elif action == "DELETE":
             deleted = delete_portfolio(self.db_path, symbol)
             if deleted:
@@ -333,28 +263,12 @@ class PortfolioKafkaSubscriber:
         symbol = message["symbol"]
 
         if action == "UPSERT":
-            upsert_book(self.db_path, book)
-            logger.info("Upserted book: %s", symbol)
+            store = PortfolioStore.shared(self.db_path)
+            store.upsert_book(book)
+            store.after_commit(logger.info, "Upserted book: %s", symbol)
         elif action == "DELETE":
             deleted = delete_book(self.db_path, symbol)
             if deleted:
                 logger.info("Deleted book: %s", symbol)
             else:
                 logger.warning("Book not found for deletion: %s", symbol)
-
-    def stop(self) -> None:
-        """Signal the subscriber to stop after the current poll cycle."""
-        self._running = False
-        logger.info("Portfolio subscriber stop requested")
-
-    def close(self) -> None:
-        """Close the Kafka consumer and release resources."""
-        self.stop()
-        if self._receiver is not None:
-            self._receiver.close()
-            self._receiver = None
-
-    @property
-    def processed_count(self) -> int:
-        """Number of messages successfully processed."""
-        return self._processed_count
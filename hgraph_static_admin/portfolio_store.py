@@ -10,12 +10,17 @@ Provides CRUD operations for two tables:
 
 This module is the persistence layer for the portfolio Kafka subscriber and
 can also be used standalone for local portfolio data management.
+``get_portfolios`` / ``get_books`` look up many symbols in one query.
+
+:class:`PortfolioStore` keeps a persistent connection per thread (see
+``sqlite_store``); the module-level functions are thin wrappers around the
+shared store for each database path.
 """
 
 import logging
 import sqlite3
 from datetime import datetime, timezone
-from typing import List
+from typing import Any, Dict, Iterable, List, Tuple
 
 from hg_oap.portfolio.portfolio_info import (
     BookInfo,
@@ -25,14 +30,19 @@ from hg_oap.portfolio.portfolio_info import (
     PortfolioType,
 )
 
+from hgraph_static_admin.sqlite_store import SqliteStore, json_keys
+
 __all__ = (
+    "PortfolioStore",
     "init_portfolio_db",
     "upsert_portfolio",
     "get_portfolio",
+    "get_portfolios",
     "get_all_portfolios",
     "delete_portfolio",
     "upsert_book",
     "get_book",
+    "get_books",
     "get_all_books",
     "delete_book",
 )
@@ -75,6 +85,59 @@ CREATE TABLE IF NOT EXISTS books (
 """
 
 
+# ---------------------------------------------------------------------------
+# Statements (constant text, so each connection prepares them once)
+# ---------------------------------------------------------------------------
+
+_UPSERT_PORTFOLIO_SQL = """
+INSERT INTO portfolios (symbol, name, portfolio_type, owner,
+                        base_currency, legal_entity_symbol,
+                        status, parent_portfolio_symbol, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(symbol) DO UPDATE SET
+    name = excluded.name,
+    portfolio_type = excluded.portfolio_type,
+    owner = excluded.owner,
+    base_currency = excluded.base_currency,
+    legal_entity_symbol = excluded.legal_entity_symbol,
+    status = excluded.status,
+    parent_portfolio_symbol = excluded.parent_portfolio_symbol,
+    updated_at = excluded.updated_at
+"""
+
+_SELECT_PORTFOLIO_SQL = "SELECT * FROM portfolios WHERE symbol = ?"
+
+_SELECT_PORTFOLIOS_SQL = "SELECT * FROM portfolios WHERE symbol IN (SELECT value FROM json_each(?))"
+
+_SELECT_ALL_PORTFOLIOS_SQL = "SELECT * FROM portfolios ORDER BY symbol"
+
+_DELETE_PORTFOLIO_SQL = "DELETE FROM portfolios WHERE symbol = ?"
+
+_UPSERT_BOOK_SQL = """
+INSERT INTO books (symbol, name, book_type, owner,
+                   base_currency, legal_entity_symbol,
+                   portfolio_symbol, status, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(symbol) DO UPDATE SET
+    name = excluded.name,
+    book_type = excluded.book_type,
+    owner = excluded.owner,
+    base_currency = excluded.base_currency,
+    legal_entity_symbol = excluded.legal_entity_symbol,
+    portfolio_symbol = excluded.portfolio_symbol,
+    status = excluded.status,
+    updated_at = excluded.updated_at
+"""
+
+_SELECT_BOOK_SQL = "SELECT * FROM books WHERE symbol = ?"
+
+_SELECT_BOOKS_SQL = "SELECT * FROM books WHERE symbol IN (SELECT value FROM json_each(?))"
+
+_SELECT_ALL_BOOKS_SQL = "SELECT * FROM books ORDER BY symbol"
+
+_DELETE_BOOK_SQL = "DELETE FROM books WHERE symbol = ?"
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -85,72 +148,191 @@ def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _portfolio_params(portfolio: PortfolioInfo) -> Tuple[Any, ...]:
+    """Parameters for ``_UPSERT_PORTFOLIO_SQL``."""
+    return (
+        portfolio.symbol,
+        portfolio.name,
+        portfolio.portfolio_type.value,
+        portfolio.owner,
+        portfolio.base_currency,
+        portfolio.legal_entity_symbol,
+        portfolio.status.value,
+        portfolio.parent_portfolio_symbol,
+        _now_iso(),
+    )
+
+
+def _row_to_portfolio(row: sqlite3.Row) -> PortfolioInfo:
+    """Build a PortfolioInfo from a ``portfolios`` row."""
+    return PortfolioInfo(
+        symbol=row["symbol"],
+        name=row["name"],
+        portfolio_type=PortfolioType(row["portfolio_type"]),
+        owner=row["owner"],
+        base_currency=row["base_currency"],
+        legal_entity_symbol=row["legal_entity_symbol"],
+        status=PortfolioStatus(row["status"]),
+        parent_portfolio_symbol=row["parent_portfolio_symbol"],
+    )
+
+
+def _book_params(book: BookInfo) -> Tuple[Any, ...]:
+    """Parameters for ``_UPSERT_BOOK_SQL``."""
+    return (
+        book.symbol,
+        book.name,
+        book.book_type.value,
+        book.owner,
+        book.base_currency,
+        book.legal_entity_symbol,
+        book.portfolio_symbol,
+        book.status.value,
+        _now_iso(),
+    )
+
+
+def _row_to_book(row: sqlite3.Row) -> BookInfo:
+    """Build a BookInfo from a ``books`` row."""
+    return BookInfo(
+        symbol=row["symbol"],
+        name=row["name"],
+        book_type=BookType(row["book_type"]),
+        owner=row["owner"],
+        base_currency=row["base_currency"],
+        legal_entity_symbol=row["legal_entity_symbol"],
+        portfolio_symbol=row["portfolio_symbol"],
+        status=PortfolioStatus(row["status"]),
+    )
+
+
 # ---------------------------------------------------------------------------
-# Database initialisation
+# Store
 # ---------------------------------------------------------------------------
 
 
-def init_portfolio_db(db_path: str) -> None:
-    """Create the ``portfolios`` and ``books`` tables.
+class PortfolioStore(SqliteStore):
+    """Portfolios and books in one SQLite database.
 
     :param db_path: Path to the SQLite database file.
+    :param pragmas: Overrides for ``sqlite_store.DEFAULT_PRAGMAS``.
     """
-    conn = sqlite3.connect(db_path)
-    try:
-        conn.execute("PRAGMA journal_mode = WAL")
-        conn.execute("PRAGMA foreign_keys = ON")
-        conn.execute(_CREATE_PORTFOLIOS_SQL)
-        conn.execute(_CREATE_BOOKS_SQL)
-        conn.commit()
-    finally:
-        conn.close()
-    logger.info("Portfolio database initialised at %s", db_path)
+
+    kind = "Portfolio"
+
+    def init_db(self) -> None:
+        """Create the ``portfolios`` and ``books`` tables."""
+        with self.transaction() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(_CREATE_PORTFOLIOS_SQL)
+            conn.execute(_CREATE_BOOKS_SQL)
+        logger.info("Portfolio database initialised at %s", self.db_path)
+
+    # -- Portfolios ---------------------------------------------------------
+
+    def upsert_portfolio(self, portfolio: PortfolioInfo) -> None:
+        """Insert or update a portfolio record.
+
+        :param portfolio: The portfolio info to store.
+        """
+        self._write("portfolios", _UPSERT_PORTFOLIO_SQL, _portfolio_params(portfolio))
+
+    def get_portfolio(self, symbol: str) -> PortfolioInfo | None:
+        """Retrieve a portfolio by symbol.
+
+        :param symbol: The portfolio's short identifier.
+        :returns: The :class:`PortfolioInfo`, or ``None`` if not found.
+        """
+        row = self._reader().execute(_SELECT_PORTFOLIO_SQL, (symbol,)).fetchone()
+        return None if row is None else _row_to_portfolio(row)
+
+    def get_portfolios(self, symbols: Iterable[str]) -> Dict[str, PortfolioInfo]:
+        """Retrieve many portfolios in one query.
+
+        :param symbols: The portfolios' short identifiers.
+        :returns: :class:`PortfolioInfo` records by symbol; symbols not in the store are absent.
+        """
+        rows = self._reader().execute(_SELECT_PORTFOLIOS_SQL, (json_keys(symbols),))
+        return {r["symbol"]: _row_to_portfolio(r) for r in rows}
+
+    def get_all_portfolios(self) -> List[PortfolioInfo]:
+        """Return all portfolios.
+
+        :returns: List of :class:`PortfolioInfo` instances.
+        """
+        return [_row_to_portfolio(r) for r in self._reader().execute(_SELECT_ALL_PORTFOLIOS_SQL)]
+
+    def delete_portfolio(self, symbol: str) -> bool:
+        """Delete a portfolio by symbol.
+
+        :param symbol: The portfolio's short identifier.
+        :returns: ``True`` if a row was deleted, ``False`` if not found.
+        """
+        return self._execute("portfolios", _DELETE_PORTFOLIO_SQL, (symbol,)) > 0
+
+    # -- Books --------------------------------------------------------------
+
+    def upsert_book(self, book: BookInfo) -> None:
+        """Insert or update a book record.
+
+        :param book: The book info to store.
+        """
+        self._write("books", _UPSERT_BOOK_SQL, _book_params(book))
+
+    def get_book(self, symbol: str) -> BookInfo | None:
+        """Retrieve a book by symbol.
+
+        :param symbol: The book's short identifier.
+        :returns: The :class:`BookInfo`, or ``None`` if not found.
+        """
+        row = self._reader().execute(_SELECT_BOOK_SQL, (symbol,)).fetchone()
+        return None if row is None else _row_to_book(row)
+
+    def get_books(self, symbols: Iterable[str]) -> Dict[str, BookInfo]:
+        """Retrieve many books in one query.
+
+        :param symbols: The books' short identifiers.
+        :returns: :class:`BookInfo` records by symbol; symbols not in the store are absent.
+        """
+        rows = self._reader().execute(_SELECT_BOOKS_SQL, (json_keys(symbols),))
+        return {r["symbol"]: _row_to_book(r) for r in rows}
+
+    def get_all_books(self) -> List[BookInfo]:
+        """Return all books.
+
+        :returns: List of :class:`BookInfo` instances.
+        """
+        return [_row_to_book(r) for r in self._reader().execute(_SELECT_ALL_BOOKS_SQL)]
+
+    def delete_book(self, symbol: str) -> bool:
+        """Delete a book by symbol.
+
+        :param symbol: The book's short identifier.
+        :returns: ``True`` if a row was deleted, ``False`` if not found.
+        """
+        return self._execute("books", _DELETE_BOOK_SQL, (symbol,)) > 0
 
 
 # ---------------------------------------------------------------------------
-# Portfolio CRUD
+# Module-level API (one shared PortfolioStore per database file)
 # ---------------------------------------------------------------------------
 
 
+def init_portfolio_db(db_path: str) -> None:
+    """Create the ``portfolios`` and ``books`` tables.
+
+    :param db_path: Path to the SQLite database file.
+    """
+    PortfolioStore.shared(db_path).init_db()
+
+
 def upsert_portfolio(db_path: str, portfolio: PortfolioInfo) -> None:
     """Insert or update a portfolio record.
 
     :param db_path: Path to the SQLite database file.
     :param portfolio: The portfolio info to store.
     """
-    conn = sqlite3.connect(db_path)
-    try:
-        conn.execute(
-            """
-            INSERT INTO portfolios (symbol, name, portfolio_type, owner,
-                                    base_currency, legal_entity_symbol,
-                                    status, parent_portfolio_symbol, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(symbol) DO UPDATE SET
-                name = excluded.name,
-                portfolio_type = excluded.portfolio_type,
-                owner = excluded.owner,
-                base_currency = excluded.base_currency,
-                legal_entity_symbol = excluded.legal_entity_symbol,
-                status = excluded.status,
-                parent_portfolio_symbol = excluded.parent_portfolio_symbol,
-                updated_at = excluded.updated_at
-            """,
-            (
-                portfolio.symbol,
-                portfolio.name,
-                portfolio.portfolio_type.value,
-                portfolio.owner,
-                portfolio.base_currency,
-                portfolio.legal_entity_symbol,
-                portfolio.status.value,
-                portfolio.parent_portfolio_symbol,
-                _now_iso(),
-            ),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    PortfolioStore.shared(db_path).upsert_portfolio(portfolio)
 
 
 def get_portfolio(db_path: str, symbol: str) -> PortfolioInfo | None:
@@ -160,28 +342,17 @@ def get_portfolio(db_path: str, symbol: str) -> PortfolioInfo | None:
     :param symbol: The portfolio's short identifier.
     :returns: The :class:`PortfolioInfo`, or ``None`` if not found.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        row = conn.execute(
-            "SELECT * FROM portfolios WHERE symbol = ?", (symbol,)
-        ).fetchone()
-    finally:
-        conn.close()
-
-    if row is None:
-        return None
+    return PortfolioStore.shared(db_path).get_portfolio(symbol)
 
-    return PortfolioInfo(
-        symbol=row["symbol"],
-        name=row["name"],
-        portfolio_type=PortfolioType(row["portfolio_type"]),
-        owner=row["owner"],
-        base_currency=row["base_currency"],
-        legal_entity_symbol=row["legal_entity_symbol"],
-        status=PortfolioStatus(row["status"]),
-        parent_portfolio_symbol=row["parent_portfolio_symbol"],
-    )
+
+def get_portfolios(db_path: str, symbols: Iterable[str]) -> Dict[str, PortfolioInfo]:
+    """Retrieve many portfolios in one query.
+
+    :param db_path: Path to the SQLite database file.
+    :param symbols: The portfolios' short identifiers.
+    :returns: :class:`PortfolioInfo` records by symbol; symbols not in the store are absent.
+    """
+    return PortfolioStore.shared(db_path).get_portfolios(symbols)
 
 
 def get_all_portfolios(db_path: str) -> List[PortfolioInfo]:
@@ -190,28 +361,7 @@ def get_all_portfolios(db_path: str) -> List[PortfolioInfo]:
     :param db_path: Path to the SQLite database file.
     :returns: List of :class:`PortfolioInfo` instances.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        rows = conn.execute(
-            "SELECT * FROM portfolios ORDER BY symbol"
-        ).fetchall()
-    finally:
-        conn.close()
-
-    return [
-        PortfolioInfo(
-            symbol=r["symbol"],
-            name=r["name"],
-            portfolio_type=PortfolioType(r["portfolio_type"]),
-            owner=r["owner"],
-            base_currency=r["base_currency"],
-            legal_entity_symbol=r["legal_entity_symbol"],
-            status=PortfolioStatus(r["status"]),
-            parent_portfolio_symbol=r["parent_portfolio_symbol"],
-        )
-        for r in rows
-    ]
+    return PortfolioStore.shared(db_path).get_all_portfolios()
 
 
 def delete_portfolio(db_path: str, symbol: str) -> bool:
@@ -221,20 +371,7 @@ def delete_portfolio(db_path: str, symbol: str) -> bool:
     :param symbol: The portfolio's short identifier.
     :returns: ``True`` if a row was deleted, ``False`` if not found.
     """
-    conn = sqlite3.connect(db_path)
-    try:
-        cursor = conn.execute(
-            "DELETE FROM portfolios WHERE symbol = ?", (symbol,)
-        )
-        conn.commit()
-        return cursor.rowcount > 0
-    finally:
-        conn.close()
-
-
-# ---------------------------------------------------------------------------
-# Book CRUD
-# ---------------------------------------------------------------------------
+    return PortfolioStore.shared(db_path).delete_portfolio(symbol)
 
 
 def upsert_book(db_path: str, book: BookInfo) -> None:
@@ -243,39 +380,7 @@ def upsert_book(db_path: str, book: BookInfo) -> None:
     :param db_path: Path to the SQLite database file.
     :param book: The book info to store.
     """
-    conn = sqlite3.connect(db_path)
-    try:
-        conn.execute(
-            """
-            INSERT INTO books (symbol, name, book_type, owner,
-                               base_currency, legal_entity_symbol,
-                               portfolio_symbol, status, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(symbol) DO UPDATE SET
-                name = excluded.name,
-                book_type = excluded.book_type,
-                owner = excluded.owner,
-                base_currency = excluded.base_currency,
-                legal_entity_symbol = excluded.legal_entity_symbol,
-                portfolio_symbol = excluded.portfolio_symbol,
-                status = excluded.status,
-                updated_at = excluded.updated_at
-            """,
-            (
-                book.symbol,
-                book.name,
-                book.book_type.value,
-                book.owner,
-                book.base_currency,
-                book.legal_entity_symbol,
-                book.portfolio_symbol,
-                book.status.value,
-                _now_iso(),
-            ),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    PortfolioStore.shared(db_path).upsert_book(book)
 
 
 def get_book(db_path: str, symbol: str) -> BookInfo | None:
@@ -285,28 +390,17 @@ def get_book(db_path: str, symbol: str) -> BookInfo | None:
     :param symbol: The book's short identifier.
     :returns: The :class:`BookInfo`, or ``None`` if not found.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        row = conn.execute(
-            "SELECT * FROM books WHERE symbol = ?", (symbol,)
-        ).fetchone()
-    finally:
-        conn.close()
-
-    if row is None:
-        return None
+    return PortfolioStore.shared(db_path).get_book(symbol)
 
-    return BookInfo(
-        symbol=row["symbol"],
-        name=row["name"],
-        book_type=BookType(row["book_type"]),
-        owner=row["owner"],
-        base_currency=row["base_currency"],
-        legal_entity_symbol=row["legal_entity_symbol"],
-        portfolio_symbol=row["portfolio_symbol"],
-        status=PortfolioStatus(row["status"]),
-    )
+
+def get_books(db_path: str, symbols: Iterable[str]) -> Dict[str, BookInfo]:
+    """Retrieve many books in one query.
+
+    :param db_path: Path to the SQLite database file.
+    :param symbols: The books' short identifiers.
+    :returns: :class:`BookInfo` records by symbol; symbols not in the store are absent.
+    """
+    return PortfolioStore.shared(db_path).get_books(symbols)
 
 
 def get_all_books(db_path: str) -> List[BookInfo]:
@@ -315,28 +409,7 @@ def get_all_books(db_path: str) -> List[BookInfo]:
     :param db_path: Path to the SQLite database file.
     :returns: List of :class:`BookInfo` instances.
     """
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        rows = conn.execute(
-            "SELECT * FROM books ORDER BY symbol"
-        ).fetchall()
-    finally:
-        conn.close()
-
-    return [
-        BookInfo(
-            symbol=r["symbol"],
-            name=r["name"],
-            book_type=BookType(r["book_type"]),
-            owner=r["owner"],
-            base_currency=r["base_currency"],
-            legal_entity_symbol=r["legal_entity_symbol"],
-            portfolio_symbol=r["portfolio_symbol"],
-            status=PortfolioStatus(r["status"]),
-        )
-        for r in rows
-    ]
+    return PortfolioStore.shared(db_path).get_all_books()
 
 
 def delete_book(db_path: str, symbol: str) -> bool:
@@ -346,12 +419,4 @@ def delete_book(db_path: str, symbol: str) -> bool:
     :param symbol: The book's short identifier.
     :returns: ``True`` if a row was deleted, ``False`` if not found.
     """
-    conn = sqlite3.connect(db_path)
-    try:
-        cursor = conn.execute(
-            "DELETE FROM books WHERE symbol = ?", (symbol,)
-        )
-        conn.commit()
-        return cursor.rowcount > 0
-    finally:
-        conn.close()
+    return PortfolioStore.shared(db_path).delete_book(symbol)
@@ -0,0 +1,386 @@
+"""
+sqlite_store.py
+
+Long-lived SQLite connections for the static data stores.
+
+Opening a connection costs far more than the single-row statement a store
+call runs (file open, WAL shared-memory mapping, schema parse). A
+``SqliteStore`` therefore keeps one connection per thread for its database,
+opened on first use with tuned pragmas and a per-connection cache of
+prepared statements (keyed by SQL text, so the stores keep their SQL in
+module constants).
+
+Write methods run inside ``transaction()``, which commits once when the
+outermost block exits and rolls back if it raises. Reads run outside any
+transaction, so every statement sees the latest committed data, including
+writes made through other connections or processes.
+
+Inside ``batch()`` the same write methods queue their rows on a
+``WriteBatch`` instead: upserts go to the database as ``executemany`` runs
+under a savepoint, deletes and reads first flush what the batch has queued,
+and the whole batch commits once. A row that fails is rolled back to its
+savepoint and reported against the record that queued it, without losing
+the rest of the batch.
+
+Bulk reads pass their keys as one JSON array bound to
+``IN (SELECT value FROM json_each(?))`` (see ``json_keys``): the statement
+text stays constant whatever the number of keys, so it is prepared once,
+and no lookup runs into SQLite's bound-parameter limit.
+
+``SqliteStore.shared(db_path)`` returns one process-wide store per class and
+database file; the module-level store functions use it. If the file is
+deleted or replaced, the next ``shared()`` call opens a fresh store instead
+of reading the old file through a stale connection.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, ClassVar, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Type, TypeVar
+
+__all__ = (
+    "DEFAULT_PRAGMAS",
+    "SqliteStore",
+    "WriteBatch",
+    "close_shared_stores",
+    "json_keys",
+)
+
+logger = logging.getLogger(__name__)
+
+# Applied to every connection a store opens. WAL is set once by the init_*_db
+# functions (it is stored in the database file); synchronous=NORMAL is safe
+# with WAL and only risks the last transactions on power loss, which a
+# subscriber re-applies from Kafka. foreign_keys stays off, as it always was
+# for store operations.
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    "synchronous": "NORMAL",
+    "cache_size": -16_384,  # KiB, i.e. 16 MiB of page cache per connection
+    "mmap_size": 256 * 1024 * 1024,
+    "busy_timeout": 5_000,  # ms to wait for another writer instead of failing
+    "temp_store": "MEMORY",
+}
+
+# Prepared statements kept per connection (sqlite3's default is 128)
+DEFAULT_STATEMENT_CACHE_SIZE = 256
+
+_StoreT = TypeVar("_StoreT", bound="SqliteStore")
+
+_shared: Dict[Tuple[type, str], "SqliteStore"] = {}
+_shared_lock = threading.Lock()
+
+
+# Savepoints are never nested within a batch, so one name keeps the
+# SAVEPOINT / RELEASE / ROLLBACK TO statements in the statement cache
+_SAVEPOINT = "write_batch"
+
+
+def json_keys(keys: Iterable[Any]) -> str:
+    """
+    Bind value for an ``IN (SELECT value FROM json_each(?))`` lookup.
+
+    :param keys: Key values; composite keys as tuples, read back with ``json_extract(value, '$[0]')`` etc.
+    :return: The keys as a JSON array.
+    """
+    return json.dumps(list(keys))
+
+
+def _file_identity(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+class WriteBatch:
+    """
+    Writes queued for one transaction on one connection (see ``SqliteStore.batch``).
+
+    Rows queue per table in arrival order. A flush sends each run of rows
+    with the same statement as one ``executemany`` under a savepoint; if the
+    run fails it is rolled back and replayed a row at a time, each under its
+    own savepoint, so only the failing rows are lost. Failures are kept in
+    ``failures`` against ``record``, the key of the record that queued them.
+
+    :param conn: The connection, already inside a transaction.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        # Key of the record whose writes are being queued (set by the caller)
+        self.record: Any = None
+        self.failures: Dict[Any, BaseException] = {}
+        # table -> [(sql, params, record)] not yet sent to SQLite
+        self._pending: Dict[str, List[Tuple[str, Tuple[Any, ...], Any]]] = {}
+        self._callbacks: List[Tuple[Any, Callable[..., Any], Tuple[Any, ...]]] = []
+
+    def add(self, table: str, sql: str, params: Tuple[Any, ...]) -> None:
+        """Queue one row for ``table``."""
+        self._pending.setdefault(table, []).append((sql, params, self.record))
+
+    def execute(self, table: str, sql: str, params: Tuple[Any, ...]) -> int:
+        """
+        Run one statement now, after the rows queued for ``table``.
+
+        :return: The statement's row count.
+        :raises sqlite3.Error: If the statement fails; its effects are rolled back.
+        """
+        self.flush(table)
+        with self._savepoint():
+            return self.conn.execute(sql, params).rowcount
+
+    def after_commit(self, callback: Callable[..., Any], *args: Any) -> None:
+        """Call ``callback(*args)`` once the batch commits, unless the current record fails."""
+        self._callbacks.append((self.record, callback, args))
+
+    def fail(self, error: BaseException) -> None:
+        """Reject the current record, dropping any rows it has queued."""
+        self.failures.setdefault(self.record, error)
+        for table, rows in self._pending.items():
+            self._pending[table] = [row for row in rows if row[2] != self.record]
+
+    def flush(self, table: Optional[str] = None) -> None:
+        """Send the rows queued for ``table`` (or every table) to SQLite."""
+        for name in list(self._pending) if table is None else [table]:
+            rows = self._pending.pop(name, None)
+            start = 0
+            for end in range(1, len(rows or ()) + 1):
+                if end == len(rows) or rows[end][0] != rows[start][0]:
+                    self._apply_run(rows[start:end])
+                    start = end
+
+    def _apply_run(self, rows: List[Tuple[str, Tuple[Any, ...], Any]]) -> None:
+        sql = rows[0][0]
+        if len(rows) > 1:
+            try:
+                with self._savepoint():
+                    self.conn.executemany(sql, [params for _, params, _ in rows])
+                return
+            except sqlite3.Error as exc:
+                logger.debug("Batch of %d rows failed (%s); applying them one at a time", len(rows), exc)
+        for _, params, record in rows:
+            try:
+                with self._savepoint():
+                    self.conn.execute(sql, params)
+            except sqlite3.Error as exc:
+                self.failures.setdefault(record, exc)
+
+    @contextlib.contextmanager
+    def _savepoint(self) -> Iterator[None]:
+        self.conn.execute(f"SAVEPOINT {_SAVEPOINT}")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute(f"ROLLBACK TO {_SAVEPOINT}")
+            self.conn.execute(f"RELEASE {_SAVEPOINT}")
+            raise
+        self.conn.execute(f"RELEASE {_SAVEPOINT}")
+
+    def _run_callbacks(self) -> None:
+        for record, callback, args in self._callbacks:
+            if record not in self.failures:
+                callback(*args)
+
+
+class SqliteStore:
+    """
+    One SQLite database, with a persistent connection per thread.
+
+    :param db_path: Path to the SQLite database file.
+    :param pragmas: Overrides for ``DEFAULT_PRAGMAS`` (a value of None drops that pragma).
+    :param statement_cache_size: Prepared statements cached per connection.
+    """
+
+    # Set by subclasses for log messages, e.g. "Party"
+    kind: ClassVar[str] = "SQLite"
+
+    def __init__(
+        self,
+        db_path: str,
+        pragmas: Optional[Mapping[str, Any]] = None,
+        statement_cache_size: int = DEFAULT_STATEMENT_CACHE_SIZE,
+    ) -> None:
+        self.db_path = db_path
+        merged = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        self.pragmas = {name: value for name, value in merged.items() if value is not None}
+        self.statement_cache_size = statement_cache_size
+        self._local = threading.local()
+        # thread ident -> connection, so close() can reach every thread's connection
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+        self._identity: Optional[Tuple[int, int]] = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.db_path!r})"
+
+    def __enter__(self: _StoreT) -> _StoreT:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @classmethod
+    def shared(cls: Type[_StoreT], db_path: str) -> _StoreT:
+        """
+        Return the process-wide store of this class for ``db_path``.
+
+        :param db_path: Path to the SQLite database file.
+        :return: The shared store, replaced by a new one if the file was deleted or swapped.
+        """
+        key = (cls, os.path.abspath(db_path))
+        store = _shared.get(key)
+        identity = _file_identity(db_path)
+        if store is not None and store._identity == identity and identity is not None:
+            return store
+        with _shared_lock:
+            store = _shared.get(key)
+            if store is None or (store._identity is not None and store._identity != identity):
+                if store is not None:
+                    logger.info("%s database %s was replaced; reopening", cls.kind, db_path)
+                    store.close()
+                store = _shared[key] = cls(db_path)
+            if store._identity is None:
+                store._identity = identity
+        return store
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        # Shared across threads only so that close() may be called from any of them;
+        # each connection is otherwise used by the thread that opened it
+        conn = sqlite3.connect(self.db_path, cached_statements=self.statement_cache_size, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        with self._lock:
+            self._close_dead_threads()
+            self._connections[threading.get_ident()] = conn
+        self._local.conn = conn
+        self._local.depth = 0
+        self._local.batch = None
+        return conn
+
+    def _close_dead_threads(self) -> None:
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._connections if ident not in alive]:
+            self._connections.pop(ident).close()
+
+    def close(self) -> None:
+        """Close every thread's connection; the store reopens them on next use."""
+        with self._lock:
+            connections, self._connections = list(self._connections.values()), {}
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Transactions
+    # ------------------------------------------------------------------
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run a block of writes as one transaction on this thread's connection.
+
+        Nested blocks join the outermost one, which commits on success and
+        rolls back if an exception escapes.
+        """
+        conn = self.connection
+        depth = self._local.depth
+        self._local.depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            if depth == 0:
+                conn.rollback()
+            raise
+        else:
+            if depth == 0:
+                conn.commit()
+        finally:
+            self._local.depth = depth
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[WriteBatch]:
+        """
+        Queue this thread's writes through the store methods and apply them as one transaction.
+
+        Rows that fail are reported in ``WriteBatch.failures`` rather than
+        raised; the batch commits everything else when the block exits.
+        Nested blocks join the open batch.
+        """
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            yield batch
+            return
+        with self.transaction() as conn:
+            if not conn.in_transaction:
+                # Otherwise the first SAVEPOINT would open, and its RELEASE commit, the transaction.
+                # IMMEDIATE takes the write lock now: a batch that reads before it writes would
+                # otherwise fail with SQLITE_BUSY if another connection committed in between.
+                conn.execute("BEGIN IMMEDIATE")
+            batch = self._local.batch = WriteBatch(conn)
+            try:
+                yield batch
+                batch.flush()
+            finally:
+                self._local.batch = None
+        batch._run_callbacks()
+
+    def after_commit(self, callback: Callable[..., Any], *args: Any) -> None:
+        """Call ``callback(*args)`` once this thread's open batch commits, or now if there is none."""
+        batch = getattr(self._local, "batch", None)
+        if batch is None:
+            callback(*args)
+        else:
+            batch.after_commit(callback, *args)
+
+    def _write(self, table: str, sql: str, params: Tuple[Any, ...]) -> None:
+        """Run one write, or queue it on this thread's open batch."""
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            batch.add(table, sql, params)
+            return
+        with self.transaction() as conn:
+            conn.execute(sql, params)
+
+    def _execute(self, table: str, sql: str, params: Tuple[Any, ...]) -> int:
+        """Run one write now (after any rows a batch has queued for ``table``) and return its row count."""
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            return batch.execute(table, sql, params)
+        with self.transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's connection for a read, which sees everything an open batch has queued."""
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            batch.flush()
+        return self.connection
+
+
+def close_shared_stores(db_path: Optional[str] = None) -> None:
+    """
+    Close and forget the stores returned by ``SqliteStore.shared``.
+
+    :param db_path: Only close the stores for this database file (default: all of them).
+    """
+    path = None if db_path is None else os.path.abspath(db_path)
+    with _shared_lock:
+        keys = [key for key in _shared if path is None or key[1] == path]
+        stores = [_shared.pop(key) for key in keys]
+    for store in stores:
+        store.close()
@@ -0,0 +1,389 @@
+"""
+static_data_source.py
+
+HTTP client for the static data API that ``run_pipeline`` loads
+counterparties from.
+
+The API returns a JSON array of records. Larger universes are paged: the
+client asks for ``?page=<n>&per_page=<page_size>`` and the API describes
+the other pages in a ``Link`` header (RFC 8288)::
+
+    Link: <...?page=2&per_page=500>; rel="next", <...?page=40&per_page=500>; rel="last"
+
+With a ``last`` link, pages 2..last are fetched concurrently (at most
+``concurrency`` in flight over one pooled keep-alive session) while page 1
+is decoded; with only ``next`` links they are followed one by one. An API
+without pagination simply returns everything as page 1. Records are
+yielded in page order either way.
+
+Page bodies are decoded incrementally (``iter_json_array``) as they are
+read, so no page is ever held as one string and records reach the caller
+before the page has finished downloading.
+
+The ``ETag`` and ``Last-Modified`` of page 1 version the data set for
+conditional requests only: ``fetch`` sends the validators of the previous
+sync as ``If-None-Match`` and ``If-Modified-Since``, and a ``304 Not
+Modified`` answer means nothing changed and no records are fetched. Later
+pages are not compared with them, since many APIs give each page its own
+ETag. If the API sends a data-set version header on every page (e.g.
+``X-Data-Version``), pass its name as ``version_header``: every page must
+then carry page 1's value, otherwise the data changed during the sync and
+the fetch fails rather than mixing two versions.
+
+Typical usage::
+
+    with StaticDataClient(api_url) as client:
+        fetch = client.fetch(previous_validators)
+        if fetch.modified:
+            for record in fetch:
+                ...
+"""
+
+import codecs
+import json
+import logging
+import random
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+__all__ = (
+    "DEFAULT_PAGE_SIZE",
+    "DEFAULT_CONCURRENCY",
+    "DEFAULT_MAX_RETRIES",
+    "DEFAULT_RETRY_BACKOFF",
+    "DEFAULT_TIMEOUT",
+    "StaticDataClient",
+    "StaticDataFetch",
+    "StaticDataSourceError",
+    "Validators",
+    "iter_json_array",
+)
+
+logger = logging.getLogger(__name__)
+
+# Records requested per page
+DEFAULT_PAGE_SIZE = 500
+
+# Concurrent page requests (and pooled connections)
+DEFAULT_CONCURRENCY = 4
+
+# Retries per request after the first attempt
+DEFAULT_MAX_RETRIES = 3
+
+# Base back-off in seconds; attempt n sleeps uniformly in [0, backoff * 2**n]
+DEFAULT_RETRY_BACKOFF = 0.5
+
+# Per-request (connect, read) timeout in seconds
+DEFAULT_TIMEOUT = 30.0
+
+# Bytes read from a response body at a time
+_CHUNK_SIZE = 64 * 1024
+
+# Responses worth retrying; other 4xx are caller errors
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_WHITESPACE = " \t\n\r"
+
+# What may follow an element of a JSON array
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+class StaticDataSourceError(Exception):
+    """A static data API request failed, or its response was not a JSON array."""
+
+
+class Validators(NamedTuple):
+    """Version of a data set, from the ``ETag`` and ``Last-Modified`` response headers."""
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """
+    Decode a JSON array from UTF-8 chunks, yielding each element as soon as it is complete.
+
+    :param chunks: The encoded array, split anywhere.
+    :return: Iterator of the array's elements.
+    :raises ValueError: If the input is not a JSON array.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buf, pos, started = "", 0, False
+    chunks = iter(chunks)
+    exhausted = False
+
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        if pos < len(buf):
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError(f"Expected a JSON array, got {buf[pos:pos + 20]!r}")
+                started, pos = True, pos + 1
+                continue
+            if buf[pos] == "]":
+                if buf[pos + 1 :].strip(_WHITESPACE) or (not exhausted and any(c.strip() for c in chunks)):
+                    raise ValueError("Extra data after the JSON array")
+                return
+            if buf[pos] == ",":
+                pos += 1
+                continue
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+            else:
+                # Until a delimiter follows, a value (e.g. a number) may continue in the next chunk
+                if exhausted or (end < len(buf) and buf[end] in _DELIMITERS):
+                    yield value
+                    pos = end
+                    continue
+        elif exhausted:
+            raise ValueError("Truncated JSON array")
+
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buf = buf[pos:] + text.decode(b"", final=True)
+        else:
+            buf = buf[pos:] + text.decode(chunk)
+        pos = 0
+
+
+class StaticDataFetch:
+    """
+    Result of :meth:`StaticDataClient.fetch`: iterate it for the records.
+
+    :ivar modified: ``False`` if the API answered ``304 Not Modified``; there are no records then.
+    :ivar validators: Version of the fetched data set, to pass to the next ``fetch``.
+    :ivar pages: Number of pages, or ``None`` while only ``next`` links are known.
+    """
+
+    def __init__(
+        self,
+        modified: bool,
+        validators: Validators,
+        records: Iterator[Dict[str, Any]],
+        pages: Optional[int] = None,
+    ) -> None:
+        self.modified = modified
+        self.validators = validators
+        self.pages = pages
+        self._records = records
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self._records
+
+
+class StaticDataClient:
+    """
+    Pooled, paginating client for the static data API.
+
+    :param api_url: Endpoint returning the records, e.g. ``http://static.internal/api/counterparties``.
+    :param page_size: Records requested per page.
+    :param concurrency: Maximum concurrent page requests and pooled connections.
+    :param max_retries: Retries per request after the first attempt.
+    :param retry_backoff: Base back-off in seconds (full jitter, doubled per retry).
+    :param timeout: Per-request timeout in seconds.
+    :param session: Optional pre-configured ``requests.Session`` (e.g. with auth).
+    :param version_header: Response header carrying the data-set version on every page; if given,
+                           a page whose version differs from page 1's fails the fetch.
+    :raises ValueError: If ``page_size`` or ``concurrency`` is less than 1.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        *,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        timeout: float = DEFAULT_TIMEOUT,
+        session: Optional[requests.Session] = None,
+        version_header: Optional[str] = None,
+    ) -> None:
+        for name, value in (("page_size", page_size), ("concurrency", concurrency)):
+            if value < 1:
+                raise ValueError(f"{name} must be >= 1, got {value}")
+
+        self.api_url = api_url
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self.version_header = version_header
+
+        self.session = session if session is not None else requests.Session()
+        # Retries are handled in _get (with jitter), not by urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.setdefault("Accept", "application/json")
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> "StaticDataClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+    def _get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """GET ``url`` with retries; the body is left unread (``stream=True``)."""
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                delay = random.uniform(0, self.retry_backoff * (2 ** (attempt - 1)))
+                logger.warning(
+                    "Static data API GET %s failed (%s); retry %d/%d in %.2fs",
+                    url,
+                    last_error,
+                    attempt,
+                    self.max_retries,
+                    delay,
+                )
+                time.sleep(delay)
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout, stream=True)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                last_error = exc
+                continue
+            if response.status_code in _RETRY_STATUSES:
+                response.close()
+                last_error = StaticDataSourceError(f"HTTP {response.status_code}")
+                continue
+            if response.status_code != 304:
+                try:
+                    response.raise_for_status()
+                except requests.HTTPError as exc:
+                    response.close()
+                    raise StaticDataSourceError(f"GET {url} failed: {exc}") from exc
+            return response
+
+        raise StaticDataSourceError(f"GET {url} failed after {self.max_retries + 1} attempts: {last_error}")
+
+    def _page_params(self, page: int) -> Dict[str, Any]:
+        return {"page": page, "per_page": self.page_size}
+
+    def _version(self, response: requests.Response) -> Optional[str]:
+        return response.headers.get(self.version_header) if self.version_header else None
+
+    def _records(self, response: requests.Response, version: Optional[str]) -> Iterator[Dict[str, Any]]:
+        """Decode one page as it downloads, checking it belongs to the data set version of page 1."""
+        with response:
+            page_version = self._version(response)
+            if version is not None and page_version is not None and page_version != version:
+                raise StaticDataSourceError(
+                    f"Static data changed during the sync ({response.url} has {self.version_header} "
+                    f"{page_version}, page 1 had {version})"
+                )
+            try:
+                yield from iter_json_array(response.iter_content(_CHUNK_SIZE))
+            except (ValueError, requests.RequestException) as exc:
+                raise StaticDataSourceError(f"Cannot read {response.url}: {exc}") from exc
+
+    def _fetch_page(self, page: int, version: Optional[str]) -> List[Dict[str, Any]]:
+        """Fetch and decode a whole page (on a worker thread), retrying if the body breaks off."""
+        attempt = 0
+        while True:
+            response = self._get(self.api_url, params=self._page_params(page))
+            try:
+                return list(self._records(response, version))
+            except StaticDataSourceError as exc:
+                if not isinstance(exc.__cause__, requests.RequestException) or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                logger.warning("Static data API page %d broke off (%s); fetching it again", page, exc.__cause__)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def fetch(self, validators: Optional[Validators] = None) -> StaticDataFetch:
+        """
+        Fetch the data set, unless it is unchanged since ``validators``.
+
+        Page 1 is requested before this returns; the records, including the
+        other pages, are fetched as the result is iterated.
+
+        :param validators: Version of the previous sync (``None`` = fetch unconditionally).
+        :return: The fetch; ``modified`` is ``False`` if the data set is unchanged.
+        :raises StaticDataSourceError: If page 1 fails after all retries.
+        """
+        headers: Dict[str, str] = {}
+        if validators is not None and validators.etag:
+            headers["If-None-Match"] = validators.etag
+        if validators is not None and validators.last_modified:
+            headers["If-Modified-Since"] = validators.last_modified
+
+        first = self._get(self.api_url, params=self._page_params(1), headers=headers)
+        if first.status_code == 304:
+            first.close()
+            logger.info("Static data at %s unchanged since the last sync", self.api_url)
+            return StaticDataFetch(False, validators or Validators(), iter(()), pages=0)
+
+        current = Validators(first.headers.get("ETag"), first.headers.get("Last-Modified"))
+        last = first.links.get("last", {}).get("url")
+        pages = None
+        if last is not None:
+            pages = int(parse_qs(urlparse(last).query).get("page", ["1"])[0])
+        elif "next" not in first.links:
+            pages = 1
+        return StaticDataFetch(True, current, self._iter_records(first, self._version(first), pages), pages=pages)
+
+    def _iter_records(
+        self, first: requests.Response, version: Optional[str], pages: Optional[int]
+    ) -> Iterator[Dict[str, Any]]:
+        if pages is None:
+            # Only "next" links: no page count to fan out over
+            response: Optional[requests.Response] = first
+            while response is not None:
+                next_url = response.links.get("next", {}).get("url")
+                yield from self._records(response, version)
+                response = self._get(next_url) if next_url else None
+            return
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="static-data") as executor:
+            in_flight: Deque[Future] = deque()
+            remaining = iter(range(2, pages + 1))
+
+            def submit(limit: int) -> None:
+                while len(in_flight) < limit:
+                    page = next(remaining, None)
+                    if page is None:
+                        return
+                    in_flight.append(executor.submit(self._fetch_page, page, version))
+
+            try:
+                # Page 1 holds a connection while it is decoded: prefetch one page fewer meanwhile
+                submit(self.concurrency - 1)
+                yield from self._records(first, version)
+                submit(self.concurrency)
+                while in_flight:
+                    records = in_flight.popleft().result()
+                    submit(self.concurrency)
+                    yield from records
+            finally:
+                first.close()
+                for future in in_flight:
+                    future.cancel()
@@ -0,0 +1,228 @@
+"""
+static_data_stub.py
+
+Local stand-in for the static data API, for tests and offline development.
+
+Serves a list of records as ``StaticDataClient`` expects: a JSON array per
+page (``?page=<n>&per_page=<m>``), ``Link`` headers to the next and last
+pages, and an ``ETag``/``Last-Modified`` pair for the whole data set that
+conditional requests (``If-None-Match``, ``If-Modified-Since``) are
+answered against with ``304 Not Modified``. Optionally the ETag hashes
+each page instead (``page_etags``), and the data-set version is sent in a
+header on every page (``version_header``). It counts requests, TCP
+connections and 304 answers, so tests can check that the client pools
+and skips unchanged data, and failures can be injected to exercise the
+retry path.
+
+Typical usage::
+
+    with StubStaticDataServer(records) as server:
+        run_pipeline(server.url, db_path)
+        server.replace(updated_records)  # new ETag and Last-Modified
+
+Or from the command line, serving a JSON file of records::
+
+    python -m hgraph_static_admin.static_data_stub counterparties.json --port 8080
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+__all__ = ("StubStaticDataServer",)
+
+logger = logging.getLogger(__name__)
+
+# Records per page when the request does not say
+_DEFAULT_PER_PAGE = 1000
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_StubHTTPServer"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.stub.lock:
+            self.server.stub.connections += 1
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("static data stub: " + format, *args)
+
+    def _send(self, status: int, payload: bytes = b"", headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(payload)
+
+    def _not_modified(self, etag: str, last_modified: float) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in (tag.strip() for tag in if_none_match.split(","))
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is not None:
+            try:
+                return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def do_GET(self) -> None:
+        stub = self.server.stub
+        parsed = urlparse(self.path)
+        with stub.lock:
+            stub.requests += 1
+            fail = stub.fail_next > 0
+            if fail:
+                stub.fail_next -= 1
+            records, version, last_modified = stub.records, stub.etag, stub.last_modified
+        if fail:
+            self._send(503, b'{"error": "injected failure"}')
+            return
+        if parsed.path.rstrip("/") != stub.path:
+            self._send(404, json.dumps({"error": f"no route for {self.path}"}).encode("utf-8"))
+            return
+
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        page = max(int(query.get("page", 1)), 1)
+        per_page = max(int(query.get("per_page", _DEFAULT_PER_PAGE)), 1)
+        payload = json.dumps(records[(page - 1) * per_page : page * per_page]).encode("utf-8")
+        etag = f'"{hashlib.sha256(payload).hexdigest()[:32]}"' if stub.page_etags else version
+        headers = {"ETag": etag, "Last-Modified": formatdate(last_modified, usegmt=True)}
+        if stub.version_header:
+            headers[stub.version_header] = version
+        if page == 1 and self._not_modified(etag, last_modified):
+            with stub.lock:
+                stub.not_modified += 1
+            self._send(304, headers=headers)
+            return
+
+        pages = max((len(records) + per_page - 1) // per_page, 1)
+        links = []
+        if page < pages:
+            links.append(f'<{stub.url}?{urlencode({"page": page + 1, "per_page": per_page})}>; rel="next"')
+        if stub.link_last:
+            links.append(f'<{stub.url}?{urlencode({"page": pages, "per_page": per_page})}>; rel="last"')
+        if links and pages > 1:
+            headers["Link"] = ", ".join(links)
+        self._send(200, payload, headers)
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    stub: "StubStaticDataServer"
+
+
+class StubStaticDataServer:
+    """
+    In-process HTTP static data API serving a list of records.
+
+    :param records: Raw records, as the real API returns them.
+    :param path: Path of the endpoint.
+    :param link_last: Include a ``rel="last"`` link (off: clients can only follow ``next``).
+    :param page_etags: Send a hash of each page as its ETag, rather than the data-set version.
+    :param version_header: Also send the data-set version in this header on every page.
+    :param host: Interface to bind.
+    :param port: Port to bind; 0 picks a free port.
+    """
+
+    def __init__(
+        self,
+        records: List[Dict[str, Any]],
+        path: str = "/api/counterparties",
+        link_last: bool = True,
+        page_etags: bool = False,
+        version_header: Optional[str] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.path = path.rstrip("/")
+        self.link_last = link_last
+        self.page_etags = page_etags
+        self.version_header = version_header
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.not_modified = 0
+        self.fail_next = 0
+        self.records: List[Dict[str, Any]] = []
+        self.etag = ""
+        self.last_modified = 0.0
+        self.replace(records)
+        self._httpd = _StubHTTPServer((host, port), _Handler)
+        self._httpd.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Endpoint URL to pass to ``run_pipeline`` or ``StaticDataClient``."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{self.path}"
+
+    def replace(self, records: List[Dict[str, Any]]) -> None:
+        """Serve ``records`` from now on, with a new ETag and Last-Modified."""
+        digest = hashlib.sha256(json.dumps(records, sort_keys=True).encode("utf-8")).hexdigest()
+        with self.lock:
+            self.records = list(records)
+            self.etag = f'"{digest[:32]}"'
+            # HTTP dates have whole seconds: move on by at least one so If-Modified-Since sees the change
+            self.last_modified = max(float(int(time.time())), self.last_modified + 1)
+
+    def start(self) -> "StubStaticDataServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, name="static-data-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket. Safe to call more than once."""
+        if self._thread is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> "StubStaticDataServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    """Serve a JSON file of records until interrupted."""
+    parser = argparse.ArgumentParser(description="Local stand-in for the static data API.")
+    parser.add_argument("records_file", help="JSON file holding an array of records")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    args = parser.parse_args()
+
+    with open(args.records_file, "r", encoding="utf-8") as fh:
+        records = json.load(fh)
+
+    server = StubStaticDataServer(records, port=args.port)
+    print(f"Serving {len(records)} record(s) at {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+store_benchmark.py
+
+Measures per-operation latency of the party store with a connection opened
+per call (how every store function used to work: connect, run one
+statement, commit, close) against the persistent-connection
+``PartyStore`` behind the module-level functions.
+
+Each mode upserts ``--records`` legal entities into a fresh WAL database and
+then reads each one back by symbol::
+
+    python -m hgraph_static_admin.store_benchmark --records 5000
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+from hg_oap.parties.party import LegalEntity, PartyClassification
+
+from hgraph_static_admin import party_store
+from hgraph_static_admin.sqlite_store import close_shared_stores
+
+__all__ = ("StoreBenchmarkResult", "run_benchmark", "main")
+
+
+@dataclass
+class StoreBenchmarkResult:
+    """Timings for one connection mode."""
+
+    mode: str
+    records: int
+    upsert_seconds: float
+    get_seconds: float
+
+    @property
+    def upsert_us(self) -> float:
+        return self.upsert_seconds / self.records * 1e6
+
+    @property
+    def get_us(self) -> float:
+        return self.get_seconds / self.records * 1e6
+
+
+def _entities(records: int) -> List[LegalEntity]:
+    return [
+        LegalEntity(
+            symbol=f"CPTY{i:06d}",
+            name=f"Counterparty {i}",
+            classification=PartyClassification.NON_FINANCIAL_END_USER,
+            lei=f"5299{i:016d}",
+            jurisdiction="US",
+        )
+        for i in range(records)
+    ]
+
+
+def _upsert_per_call(db_path: str, entity: LegalEntity) -> None:
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(party_store._UPSERT_LEGAL_ENTITY_SQL, party_store._legal_entity_params(entity))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _get_per_call(db_path: str, symbol: str) -> LegalEntity | None:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute(party_store._SELECT_LEGAL_ENTITY_SQL, (symbol,)).fetchone()
+    finally:
+        conn.close()
+    return None if row is None else party_store._row_to_legal_entity(row)
+
+
+# Mode name -> (upsert, get)
+_MODES: Dict[str, Tuple[Callable[[str, LegalEntity], None], Callable[[str, str], object]]] = {
+    "connection per call": (_upsert_per_call, _get_per_call),
+    "persistent (PartyStore)": (party_store.upsert_legal_entity, party_store.get_legal_entity),
+}
+
+
+def run_benchmark(records: int = 5_000, repeat: int = 3) -> List[StoreBenchmarkResult]:
+    """
+    Time upserts and point reads in each mode, keeping the fastest of ``repeat`` runs.
+
+    :param records: Entities upserted and read back per run.
+    :param repeat: Runs per mode.
+    :return: One result per mode, in order.
+    """
+    entities = _entities(records)
+    best: Dict[str, StoreBenchmarkResult] = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for run in range(repeat):
+            for index, (mode, (upsert, get)) in enumerate(_MODES.items()):
+                db_path = os.path.join(work_dir, f"party-{run}-{index}.db")
+                party_store.init_party_db(db_path)
+
+                start = time.perf_counter()
+                for entity in entities:
+                    upsert(db_path, entity)
+                upserted = time.perf_counter()
+                for entity in entities:
+                    get(db_path, entity.symbol)
+                finished = time.perf_counter()
+
+                result = StoreBenchmarkResult(mode, records, upserted - start, finished - upserted)
+                if mode not in best or result.upsert_seconds + result.get_seconds < (
+                    best[mode].upsert_seconds + best[mode].get_seconds
+                ):
+                    best[mode] = result
+        close_shared_stores()
+    return list(best.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-call connections with the persistent party store.")
+    parser.add_argument("--records", type=int, default=5_000, help="Entities per run (default: 5000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the fastest is reported (default: 3)")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.records, args.repeat)
+    print(f"{args.records} entities per run, best of {args.repeat}, SQLite {sqlite3.sqlite_version}")
+    print(f"{'mode':<26} {'upsert us/op':>13} {'get us/op':>10}")
+    for r in results:
+        print(f"{r.mode:<26} {r.upsert_us:13.1f} {r.get_us:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+subscriber_batch.py
+
+Applies one Kafka poll batch to a static data store as a single
+transaction.
+
+The subscribers' message handlers write through the store's module-level
+functions. Inside ``SqliteStore.batch()`` those writes queue instead of
+committing one by one: upserts reach SQLite as ``executemany`` runs under a
+savepoint, and deletes and lookups (e.g. the parties of a trading
+relationship) first flush what is queued, so later records see earlier
+ones. The transaction commits once, before the subscriber commits its
+Kafka offsets, and records the next offset of each partition it consumed
+(see ``subscriber_snapshot``), so the data and the offsets it reflects never
+disagree. A record that fails to parse or write is rolled back to its
+savepoint and reported; the rest of the batch is kept. An ``on_failure``
+callback (e.g. ``DeadLetterRouter.route``) runs for each failed record
+before the offsets are recorded, so a record is only consumed once it has
+been handed on.
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from hgraph_static_admin.sqlite_store import SqliteStore
+from hgraph_static_admin.subscriber_metrics import SubscriberMetrics
+from hgraph_static_admin.subscriber_snapshot import polled_offsets, save_offsets
+
+__all__ = ("apply_batch",)
+
+
+def apply_batch(
+    store: SqliteStore,
+    records: List[Dict[str, Any]],
+    handle: Callable[[str, Any], None],
+    metrics: Optional[SubscriberMetrics] = None,
+    *,
+    record_offsets: bool = True,
+    on_failure: Optional[Callable[[Dict[str, Any], BaseException], Any]] = None,
+) -> List[Optional[BaseException]]:
+    """
+    Apply polled records to ``store`` in one transaction.
+
+    :param store: The shared store the handler writes to.
+    :param records: Records from ``KafkaReceiver.poll`` (dicts with ``topic``, ``value`` and, from Kafka,
+        ``partition`` and ``offset``).
+    :param handle: Called with ``(topic, value)`` for each record, in order.
+    :param metrics: If given, each record is observed with an equal share of the batch time.
+    :param record_offsets: Record the batch's offsets with its writes. Off when the batch is one
+        worker's share of a poll and the worker pool commits the offsets (see ``kafka_workers``).
+    :param on_failure: Called with ``(record, exception)`` for each failed record, inside the
+        transaction; if it raises, nothing from the batch is kept.
+    :return: For each record, ``None`` if it was applied, else the exception that rejected it.
+    :raises sqlite3.Error: If the transaction cannot commit; nothing from the batch is kept.
+    :raises Exception: Whatever ``on_failure`` raises.
+    """
+    started = time.perf_counter()
+    with store.batch() as batch:
+        for index, record in enumerate(records):
+            batch.record = index
+            try:
+                handle(record["topic"], record["value"])
+            except Exception as exc:
+                batch.fail(exc)
+        batch.record = None
+        if on_failure is not None:
+            batch.flush()  # writes that fail on flush fail their record too
+            for index, exc in sorted(batch.failures.items()):
+                on_failure(records[index], exc)
+        if record_offsets:
+            # Failed records are consumed too: the offsets cover the whole batch
+            save_offsets(batch.conn, polled_offsets(records))
+    errors: List[Optional[BaseException]] = [batch.failures.get(index) for index in range(len(records))]
+
+    if metrics is not None and records:
+        share = (time.perf_counter() - started) / len(records)
+        for record, error in zip(records, errors):
+            metrics.observe(record["topic"], error is None, share)
+    return errors
@@ -0,0 +1,283 @@
+"""
+subscriber_dead_letter.py
+
+Retry and dead-letter topics for the static data subscribers.
+
+Without them a subscriber logs a record that fails, skips it, and stops
+after ``_MAX_CONSECUTIVE_ERRORS`` failures in a row. With a
+``DeadLetterRouter`` every failed record is published, wrapped in an
+envelope with its error, to the next retry tier or, once the tiers are
+used up, to the dead-letter topic, and the subscriber carries on::
+
+    party.legal_entity ─fail─> party.retry.1 (30 s) ─fail─> party.retry.2 (300 s) ─fail─> party.dead_letter
+
+The subscriber consumes its retry topics alongside its own. A retry record
+that is not yet due is not waited for: its partition is rewound to it and
+paused until then, so the main topics keep their throughput. Records in a
+tier all wait the same delay, so they fall due in the order they arrive.
+
+Failed records are published inside the poll batch's transaction, before
+its offsets are recorded: if publishing fails, the batch rolls back and is
+consumed again. Every consumer group has its own retries (the envelope
+names the group; others skip it), while ``replay_dead_letters`` sends the
+dead letters back to their original topics once the cause is fixed.
+
+Envelope::
+
+    {
+        "original_topic": "party.trading_relationship",
+        "original_partition": 3,
+        "original_offset": 1207,
+        "original_key": "HGDEALER|ACME",
+        "original_timestamp": 1792399990000,
+        "original_message": {...},
+        "error": {"type": "ValueError", "message": "Internal party not found: HGDEALER"},
+        "attempt": 1,
+        "subscriber": "party",
+        "group": "hgraph_platform",
+        "failed_at": 1792400000.0,
+        "retry_at": 1792400030.0
+    }
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from hgraph_trade.metrics import counter
+
+__all__ = (
+    "DEFAULT_RETRY_DELAYS",
+    "DeadLetterRouter",
+    "ReplayResult",
+    "dead_letter_topic",
+    "replay_dead_letters",
+    "retry_topic",
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds a failed record waits in each retry tier before it is tried again
+DEFAULT_RETRY_DELAYS: Tuple[float, ...] = (30.0, 300.0)
+
+_ROUTED = counter(
+    "hgraph_subscriber_dead_letters_total",
+    "Failed records a static data subscriber published to a retry or dead-letter topic.",
+    ("subscriber", "destination"),
+)
+
+
+def retry_topic(name: str, tier: int) -> str:
+    """
+    Topic of a subscriber's retry tier.
+
+    :param name: Subscriber name, e.g. ``"party"``.
+    :param tier: Tier number, from 1.
+    :returns: E.g. ``"party.retry.1"``.
+    """
+    return f"{name}.retry.{tier}"
+
+
+def dead_letter_topic(name: str) -> str:
+    """
+    Topic of a subscriber's dead letters.
+
+    :param name: Subscriber name, e.g. ``"party"``.
+    :returns: E.g. ``"party.dead_letter"``.
+    """
+    return f"{name}.dead_letter"
+
+
+def _key_text(key: Any) -> Optional[str]:
+    if isinstance(key, bytes):
+        return key.decode("utf-8", "replace")
+    return key
+
+
+class DeadLetterRouter:
+    """
+    Routes a subscriber's failed records to its retry tiers and dead-letter topic.
+
+    :param name: Subscriber name, used for the topic names and the metric label.
+    :param group_id: The subscriber's consumer group; only its own retries are processed.
+    :param sender: Publishes envelopes; anything with ``send_to_kafka(topic, message, key=...)``
+        (e.g. :class:`KafkaSender`) that raises if the message cannot be sent.
+    :param retry_delays: Delay of each retry tier in seconds; empty to dead-letter at once.
+    :param clock: Returns the current Unix time.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        group_id: str,
+        sender: Any,
+        retry_delays: Sequence[float] = DEFAULT_RETRY_DELAYS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.name = name
+        self.group_id = group_id
+        self.retry_delays = tuple(retry_delays)
+        self.topics = [retry_topic(name, tier) for tier in range(1, len(self.retry_delays) + 1)]
+        self.dead_letter_topic = dead_letter_topic(name)
+        self._sender = sender
+        self._clock = clock
+        self._tiers = {topic: tier for tier, topic in enumerate(self.topics, start=1)}
+        # (topic, partition) -> Unix time its next retry record falls due
+        self._paused: Dict[Tuple[str, int], float] = {}
+
+    def handler(self, handle: Callable[[str, Any], None]) -> Callable[[str, Any], None]:
+        """
+        Wrap a subscriber's message handler so that it also takes retry records.
+
+        :param handle: Called with ``(topic, message)``.
+        :returns: A handler that unwraps retry envelopes to their original topic and
+            message, and ignores retries of other consumer groups.
+        """
+
+        def handle_or_retry(topic: str, value: Any) -> None:
+            if topic not in self._tiers:
+                handle(topic, value)
+            elif value.get("group") == self.group_id:
+                handle(value["original_topic"], value["original_message"])
+
+        return handle_or_retry
+
+    def route(self, record: Mapping[str, Any], error: BaseException) -> str:
+        """
+        Publish a failed record to its next retry tier, or to the dead-letter topic.
+
+        :param record: The record from ``KafkaReceiver.poll`` (possibly a retry record).
+        :param error: Why it failed.
+        :returns: The topic it was published to.
+        :raises Exception: Whatever the sender raises if the envelope cannot be published.
+        """
+        tier = self._tiers.get(record["topic"])
+        if tier is None:
+            envelope = {
+                "original_topic": record["topic"],
+                "original_partition": record.get("partition"),
+                "original_offset": record.get("offset"),
+                "original_key": _key_text(record.get("key")),
+                "original_timestamp": record.get("timestamp"),
+                "original_message": record["value"],
+                "attempt": 0,
+            }
+            tier = 0
+        else:
+            envelope = dict(record["value"])
+        now = self._clock()
+        envelope.update(
+            error={"type": type(error).__name__, "message": str(error)},
+            attempt=envelope["attempt"] + 1,
+            subscriber=self.name,
+            group=self.group_id,
+            failed_at=now,
+        )
+        if tier < len(self.retry_delays):
+            destination = self.topics[tier]
+            envelope["retry_at"] = now + self.retry_delays[tier]
+        else:
+            destination = self.dead_letter_topic
+            envelope["retry_at"] = None
+        self._sender.send_to_kafka(destination, envelope, key=envelope["original_key"])
+        _ROUTED.labels(self.name, destination).inc()
+        logger.warning(
+            "Sent failed record %s[%s]@%s (attempt %d) to %s: %s",
+            envelope["original_topic"],
+            envelope["original_partition"],
+            envelope["original_offset"],
+            envelope["attempt"],
+            destination,
+            error,
+        )
+        return destination
+
+    def select(self, records: List[Dict[str, Any]], receiver: Any) -> List[Dict[str, Any]]:
+        """
+        Hold back retry records that are not yet due.
+
+        Call with every poll batch, including empty ones: a retry partition
+        whose next record is not due is rewound to it and paused, and resumed
+        once it falls due.
+
+        :param records: The poll batch.
+        :param receiver: The :class:`KafkaReceiver` that polled it.
+        :returns: The records to process now.
+        """
+        now = self._clock()
+        due = [tp for tp, retry_at in self._paused.items() if retry_at <= now]
+        if due:
+            receiver.resume(due)
+            for tp in due:
+                del self._paused[tp]
+
+        selected: List[Dict[str, Any]] = []
+        held: Dict[Tuple[str, int], float] = {}
+        for record in records:
+            tp = (record["topic"], record["partition"])
+            if tp in held:
+                continue  # rewound: consumed again once due
+            if record["topic"] in self._tiers:
+                retry_at = record["value"].get("retry_at") or 0.0
+                if retry_at > now and record["value"].get("group") == self.group_id:
+                    held[tp] = retry_at
+                    receiver.seek(record["topic"], record["partition"], record["offset"])
+                    continue
+            selected.append(record)
+        if held:
+            receiver.pause(list(held))
+            self._paused.update(held)
+        return selected
+
+
+class ReplayResult(NamedTuple):
+    """Outcome of :func:`replay_dead_letters`."""
+
+    replayed: int
+    by_topic: Dict[str, int]
+
+
+def replay_dead_letters(
+    receiver: Any,
+    sender: Any,
+    *,
+    limit: Optional[int] = None,
+    poll_interval_ms: int = 1000,
+    idle_polls: int = 3,
+) -> ReplayResult:
+    """
+    Publish dead-lettered messages back to their original topics.
+
+    Consumes the dead-letter topic until ``idle_polls`` polls in a row come
+    back empty (or ``limit`` messages were replayed), committing after each
+    batch, so a later replay with the same consumer group only sends newer
+    dead letters. Each message keeps its original key, and so its partition.
+
+    :param receiver: A :class:`KafkaReceiver` on a subscriber's dead-letter topic.
+    :param sender: Anything with ``send_to_kafka(topic, message, key=...)``.
+    :param limit: Replay at most this many messages.
+    :param poll_interval_ms: Poll timeout in milliseconds.
+    :param idle_polls: Empty polls in a row after which the topic counts as drained (the first
+        polls may be empty while the consumer joins its group).
+    :returns: How many messages were replayed, in total and by original topic.
+    """
+    by_topic: Dict[str, int] = {}
+    replayed = idle = 0
+    while (limit is None or replayed < limit) and idle < idle_polls:
+        max_records = 100 if limit is None else min(100, limit - replayed)
+        records = receiver.poll(timeout_ms=poll_interval_ms, max_records=max_records)
+        if not records:
+            idle += 1
+            continue
+        idle = 0
+        offsets: Dict[Tuple[str, int], int] = {}
+        for record in records:
+            envelope = record["value"]
+            topic = envelope["original_topic"]
+            sender.send_to_kafka(topic, envelope["original_message"], key=envelope.get("original_key"))
+            by_topic[topic] = by_topic.get(topic, 0) + 1
+            replayed += 1
+            offsets[(record["topic"], record["partition"])] = record["offset"] + 1
+        receiver.commit(offsets)
+    logger.info("Replayed %d dead-lettered messages: %s", replayed, by_topic)
+    return ReplayResult(replayed, by_topic)
@@ -0,0 +1,74 @@
+"""
+Metrics shared by the party, portfolio and credit Kafka subscribers.
+
+Each subscriber records every consumed message with :meth:`SubscriberMetrics.observe`,
+feeding three series labelled by subscriber:
+
+- ``hgraph_subscriber_messages_total{subscriber,topic,outcome}`` — messages
+  consumed, ``outcome`` being ``processed`` or ``failed``; rate() gives
+  messages/sec and the failed share gives the error rate.
+- ``hgraph_subscriber_message_seconds{subscriber}`` — processing latency.
+- ``hgraph_subscriber_last_message_timestamp_seconds{subscriber}`` — Unix time
+  of the last message, for staleness alerts.
+
+Label children are resolved once per subscriber, so recording a message is a
+dict lookup and three lock-protected adds.
+"""
+
+import time
+from typing import Iterable
+
+from hgraph_trade.metrics import counter, gauge, histogram
+
+__all__ = ("SubscriberMetrics",)
+
+_MESSAGES = counter(
+    "hgraph_subscriber_messages_total",
+    "Kafka messages consumed by the static data subscribers, by outcome.",
+    ("subscriber", "topic", "outcome"),
+)
+_PROCESSING_SECONDS = histogram(
+    "hgraph_subscriber_message_seconds",
+    "Time to process one Kafka message.",
+    ("subscriber",),
+)
+_LAST_MESSAGE = gauge(
+    "hgraph_subscriber_last_message_timestamp_seconds",
+    "Unix time of the last message consumed.",
+    ("subscriber",),
+)
+
+
+class SubscriberMetrics:
+    """Pre-resolved metric children for one subscriber.
+
+    :param subscriber: Subscriber name used as the ``subscriber`` label
+        (e.g. ``"party"``).
+    :param topics: Topics the subscriber consumes.
+    """
+
+    def __init__(self, subscriber: str, topics: Iterable[str]):
+        self.subscriber = subscriber
+        self._outcomes = {
+            topic: (_MESSAGES.labels(subscriber, topic, "processed"), _MESSAGES.labels(subscriber, topic, "failed"))
+            for topic in topics
+        }
+        self._latency = _PROCESSING_SECONDS.labels(subscriber)
+        self._last_message = _LAST_MESSAGE.labels(subscriber)
+
+    def observe(self, topic: str, ok: bool, seconds: float) -> None:
+        """Record one consumed message.
+
+        :param topic: Topic the message came from.
+        :param ok: Whether it was processed successfully.
+        :param seconds: Processing time.
+        """
+        outcomes = self._outcomes.get(topic)
+        if outcomes is None:
+            outcomes = self._outcomes[topic] = (
+                _MESSAGES.labels(self.subscriber, topic, "processed"),
+                _MESSAGES.labels(self.subscriber, topic, "failed"),
+            )
+        outcomes[0 if ok else 1].inc()
+        self._latency.observe(seconds)
+        self._last_message.set(time.time())
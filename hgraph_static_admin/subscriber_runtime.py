@@ -0,0 +1,297 @@
+"""
+subscriber_runtime.py
+
+Poll loop shared by the static data Kafka subscribers (party, portfolio,
+credit).
+
+``StoreSubscriber`` wires the pieces the subscribers have in common: the
+consumer starts from the offsets recorded in the database, each poll batch
+is applied in one store transaction (``subscriber_batch``), snapshots are
+restored and written (``subscriber_snapshot``), batches can be spread over
+a ``KafkaWorkerPool`` (``kafka_workers``), and failed records can be routed
+to retry and dead-letter topics (``subscriber_dead_letter``). A subscriber
+supplies its topics, its store class and its message handler.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Mapping, Sequence, Tuple, Type
+
+from hgraph_static_admin.sqlite_store import SqliteStore
+from hgraph_static_admin.subscriber_batch import apply_batch
+from hgraph_static_admin.subscriber_dead_letter import DEFAULT_RETRY_DELAYS, DeadLetterRouter
+from hgraph_static_admin.subscriber_metrics import SubscriberMetrics
+from hgraph_static_admin.subscriber_snapshot import (
+    DEFAULT_SNAPSHOT_INTERVAL_S,
+    SnapshotWriter,
+    load_offsets,
+    restore_latest_snapshot,
+    save_offsets,
+)
+
+__all__ = ("StoreSubscriber",)
+
+# Stop the subscriber after this many consecutive processing failures
+# to avoid infinite error loops on persistently bad data.
+_MAX_CONSECUTIVE_ERRORS = 50
+
+
+class StoreSubscriber:
+    """Base class of the subscribers that persist Kafka topics to a SQLite store.
+
+    Subclasses set :attr:`name`, :attr:`store_class` and :attr:`error_field`,
+    and implement :meth:`_topics` and :meth:`process_message`.
+
+    :param db_path: Path to the store's SQLite database.
+    :param bootstrap_servers: Kafka bootstrap servers.  Falls back to config.
+    :param group_id: Kafka consumer group.  Falls back to config.
+    :param snapshot_dir: Directory of database snapshots, restored from on a cold start and
+        written to every *snapshot_interval_s* seconds.
+    :param snapshot_interval_s: Minimum seconds between snapshots (``0`` = restore only).
+    :param workers: Worker threads processing poll batches (``1`` = process on the polling thread).
+    :param dispatch: How records are spread over the workers: ``"partition"`` or ``"key"``.
+    :param dead_letter: Publish records that fail to retry topics and then to a dead-letter
+        topic instead of skipping them (see ``subscriber_dead_letter``).
+    :param retry_delays: Seconds a failed record waits in each retry tier (empty = dead-letter at once).
+    """
+
+    #: Names the snapshots, metrics and retry topics, e.g. ``"party"``.
+    name: str = ""
+    #: Store the batches are applied to (via ``store_class.shared(db_path)``).
+    store_class: Type[SqliteStore] = SqliteStore
+    #: Message field identifying a record in error logs, and its label.
+    error_field: str = "symbol"
+    error_label: str = "symbol"
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        bootstrap_servers: str | None = None,
+        group_id: str | None = None,
+        snapshot_dir: str | None = None,
+        snapshot_interval_s: float = DEFAULT_SNAPSHOT_INTERVAL_S,
+        workers: int = 1,
+        dispatch: str = "partition",
+        dead_letter: bool = False,
+        retry_delays: Sequence[float] = DEFAULT_RETRY_DELAYS,
+    ):
+        from secure_config import config
+
+        self.db_path = db_path
+        self.bootstrap_servers = bootstrap_servers or config["KAFKA_BOOTSTRAP_SERVERS"]
+        self.group_id = group_id or config.get("KAFKA_CONSUMER_GROUP", "hgraph_platform")
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_interval_s = snapshot_interval_s
+        self.workers = workers
+        self.dispatch = dispatch
+        self.dead_letter = dead_letter
+        self.retry_delays = tuple(retry_delays)
+        self._running = False
+        self._receiver = None
+        self._processed_count = 0
+        self._router: DeadLetterRouter | None = None
+        self._sender = None
+        self._consecutive_errors = 0
+        self._lock = threading.Lock()
+        # Log as the subscriber's own module
+        self._logger = logging.getLogger(type(self).__module__)
+
+    # ------------------------------------------------------------------
+    # Supplied by subclasses
+    # ------------------------------------------------------------------
+    def _topics(self) -> List[str]:
+        """The topics this subscriber consumes (without retry topics)."""
+        raise NotImplementedError
+
+    def process_message(self, topic: str, message: Dict[str, Any]) -> None:
+        """Process a single Kafka message; raises if it cannot be applied."""
+        raise NotImplementedError
+
+    def _on_start(self) -> None:
+        """Called once the consumer is set up, before the first poll."""
+
+    def _on_rollback(self) -> None:
+        """Called when a batch transaction is rolled back."""
+
+    def _on_stop(self) -> None:
+        """Called when the poll loop ends."""
+
+    # ------------------------------------------------------------------
+    # Poll loop
+    # ------------------------------------------------------------------
+    def start(self, *, poll_interval_ms: int = 1000, max_messages: int | None = None) -> None:
+        """Start the subscriber loop.
+
+        Blocks until :meth:`stop` is called or *max_messages* have been
+        processed (useful for testing / batch mode).
+
+        Each poll batch is applied in a single store transaction (see
+        ``subscriber_batch``), committed before the Kafka offsets.
+
+        The consumer starts from the offsets recorded in the database. With
+        a *snapshot_dir*, a database that has never consumed a message is
+        first replaced by the latest snapshot, and new snapshots are written
+        between poll batches (see ``subscriber_snapshot``).
+
+        With *workers* > 1, records are routed to a ``KafkaWorkerPool`` by
+        partition or message key (*dispatch*); each worker applies its share
+        in its own transaction, and offsets are recorded and committed only
+        up to the lowest record of each partition not yet processed.
+
+        With *dead_letter*, a record that fails is published (in the batch's
+        transaction) to the next retry topic, which this subscriber also
+        consumes once the tier's delay has passed, and finally to the
+        dead-letter topic; the subscriber no longer stops on repeated errors.
+
+        :param poll_interval_ms: Kafka poll timeout in milliseconds.
+        :param max_messages: Stop after processing this many messages
+            (``None`` = run indefinitely).
+        """
+        from hgraph_trade.hgraph_trade_booker.kafka_consumer import KafkaReceiver
+        from hgraph_trade.hgraph_trade_booker.kafka_workers import KafkaWorkerPool
+
+        topics = self._topics()
+        snapshots = None
+        if self.snapshot_dir is not None:
+            restore_latest_snapshot(self.snapshot_dir, self.name, self.db_path)
+            if self.snapshot_interval_s > 0:
+                snapshots = SnapshotWriter(self.name, self.db_path, self.snapshot_dir, self.snapshot_interval_s)
+        self._router = None
+        if self.dead_letter:
+            from hgraph_trade.hgraph_trade_booker.kafka_sender import KafkaSender
+
+            if self._sender is None:
+                self._sender = KafkaSender(self.bootstrap_servers)
+            self._router = DeadLetterRouter(self.name, self.group_id, self._sender, self.retry_delays)
+            topics += self._router.topics
+        metrics = SubscriberMetrics(self.name, topics)
+        pool = None
+        if self.workers > 1:
+            pool = KafkaWorkerPool(
+                lambda records: self._apply(records, metrics, record_offsets=False),
+                lambda offsets: self._commit(offsets, snapshots),
+                workers=self.workers,
+                dispatch=self.dispatch,
+            )
+        self._receiver = KafkaReceiver(
+            topics,
+            bootstrap_servers=self.bootstrap_servers,
+            group_id=self.group_id,
+            start_offsets=lambda: load_offsets(self.db_path),
+            on_revoke=None if pool is None else pool.drain,
+        )
+
+        self._running = True
+        self._processed_count = 0
+        self._consecutive_errors = 0
+        self._on_start()
+        self._logger.info(
+            "%s subscriber started: topics=%s, group=%s, workers=%d",
+            self.name.capitalize(),
+            topics,
+            self.group_id,
+            self.workers,
+        )
+
+        router = self._router
+        select = None if router is None else lambda records: router.select(records, self._receiver)
+        try:
+            if pool is not None:
+                pool.run(
+                    self._receiver,
+                    running=lambda: self._keep_running(max_messages),
+                    poll_interval_ms=poll_interval_ms,
+                    select=select,
+                )
+            else:
+                while self._keep_running(max_messages):
+                    records = self._receiver.poll(timeout_ms=poll_interval_ms)
+                    if select is not None:
+                        records = select(records)
+                    if records:
+                        # One transaction per poll batch, committed before the offsets
+                        self._apply(records, metrics)
+                        self._receiver.commit()
+                        if snapshots is not None:
+                            snapshots.maybe_write()
+        finally:
+            self._running = False
+            self._on_stop()
+
+    def _keep_running(self, max_messages: int | None) -> bool:
+        """Whether the poll loop should go on."""
+        if max_messages is not None and self._processed_count >= max_messages:
+            self._logger.info(
+                "Reached max_messages=%d, stopping subscriber",
+                max_messages,
+            )
+            return False
+        return self._running
+
+    def _apply(self, records: List[Dict[str, Any]], metrics: SubscriberMetrics, *, record_offsets: bool = True) -> None:
+        """Apply a poll batch (or a worker's share of one) in one transaction and log the records that failed."""
+        router = self._router
+        try:
+            errors = apply_batch(
+                self.store_class.shared(self.db_path),
+                records,
+                self.process_message if router is None else router.handler(self.process_message),
+                metrics,
+                record_offsets=record_offsets,
+                on_failure=None if router is None else router.route,
+            )
+        except Exception:
+            self._on_rollback()
+            raise
+        with self._lock:
+            self._processed_count += errors.count(None)
+            for record, exc in zip(records, errors):
+                if exc is None:
+                    self._consecutive_errors = 0
+                    continue
+                value = record["value"]
+                self._consecutive_errors += 1
+                self._logger.error(
+                    "Error processing message on topic %s: %s — %s: %s",
+                    record["topic"],
+                    exc,
+                    self.error_label,
+                    value.get(self.error_field, "unknown") if isinstance(value, dict) else "unknown",
+                )
+                if router is None and self._consecutive_errors >= _MAX_CONSECUTIVE_ERRORS:
+                    self._logger.critical(
+                        "Too many consecutive errors (%d), stopping %s subscriber",
+                        self._consecutive_errors,
+                        self.name,
+                    )
+                    self._running = False
+                    break
+
+    def _commit(self, offsets: Mapping[Tuple[str, int], int], snapshots: SnapshotWriter | None) -> None:
+        """Record the offsets the worker pool has completed, then commit them to Kafka."""
+        with self.store_class.shared(self.db_path).transaction() as conn:
+            save_offsets(conn, offsets)
+        self._receiver.commit(offsets)
+        if snapshots is not None:
+            snapshots.maybe_write()
+
+    def stop(self) -> None:
+        """Signal the subscriber to stop after the current poll cycle."""
+        self._running = False
+        self._logger.info("%s subscriber stop requested", self.name.capitalize())
+
+    def close(self) -> None:
+        """Close the Kafka consumer and release resources."""
+        self.stop()
+        if self._receiver is not None:
+            self._receiver.close()
+            self._receiver = None
+        if self._sender is not None:
+            self._sender.close()
+            self._sender = None
+
+    @property
+    def processed_count(self) -> int:
+        """Number of messages successfully processed."""
+        return self._processed_count
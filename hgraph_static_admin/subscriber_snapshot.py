@@ -0,0 +1,325 @@
+"""
+subscriber_snapshot.py
+
+Offset tracking and snapshot bootstrap for the static data subscribers.
+
+Every poll batch records, in the same transaction as its writes, the next
+Kafka offset of each partition it consumed (``kafka_offsets`` table). The
+database therefore always knows exactly which messages it reflects, and a
+subscriber positions its consumer from that table on every partition
+assignment rather than trusting the group's committed offsets, which may
+be ahead of or behind the data after a crash or a restore.
+
+``SnapshotWriter`` periodically copies the database with ``VACUUM INTO``
+(one read transaction, so the copy and its ``kafka_offsets`` are
+consistent) into a snapshot directory, next to a JSON manifest listing the
+offsets. A new node whose database is missing, or has never consumed a
+message, restores the latest snapshot with ``restore_latest_snapshot`` and
+consumes only what was published after it::
+
+    party-20261019T101500123456Z.db
+    party-20261019T101500123456Z.json   {"name": "party", "created": ..., "offsets": [...]}
+
+The manifest is written last, so a snapshot without one is incomplete and
+ignored.
+"""
+
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from hgraph_static_admin.sqlite_store import close_shared_stores
+from hgraph_trade.metrics import gauge
+
+__all__ = (
+    "DEFAULT_SNAPSHOT_INTERVAL_S",
+    "DEFAULT_SNAPSHOTS_KEPT",
+    "OFFSETS_TABLE",
+    "Snapshot",
+    "SnapshotWriter",
+    "latest_snapshot",
+    "load_offsets",
+    "polled_offsets",
+    "restore_latest_snapshot",
+    "save_offsets",
+    "write_snapshot",
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_INTERVAL_S = 300.0
+DEFAULT_SNAPSHOTS_KEPT = 3
+
+OFFSETS_TABLE = "kafka_offsets"
+
+_CREATE_OFFSETS_SQL = f"""
+CREATE TABLE IF NOT EXISTS {OFFSETS_TABLE} (
+    topic       TEXT    NOT NULL,
+    partition   INTEGER NOT NULL,
+    next_offset INTEGER NOT NULL,
+    PRIMARY KEY (topic, partition)
+)
+"""
+
+_SAVE_OFFSET_SQL = f"""
+INSERT INTO {OFFSETS_TABLE} (topic, partition, next_offset) VALUES (?, ?, ?)
+ON CONFLICT (topic, partition) DO UPDATE SET next_offset = MAX(next_offset, excluded.next_offset)
+"""
+
+_SELECT_OFFSETS_SQL = f"SELECT topic, partition, next_offset FROM {OFFSETS_TABLE}"
+
+_LAST_SNAPSHOT = gauge(
+    "hgraph_subscriber_last_snapshot_timestamp_seconds",
+    "Unix time of the last database snapshot written by a static data subscriber.",
+    ("subscriber",),
+)
+
+Offsets = Dict[Tuple[str, int], int]
+
+
+class Snapshot(NamedTuple):
+    """A complete snapshot: the database copy and the offsets it reflects."""
+
+    name: str
+    path: Path
+    created: datetime
+    offsets: Offsets
+
+
+# ---------------------------------------------------------------------------
+# Offsets
+# ---------------------------------------------------------------------------
+
+
+def polled_offsets(records: Iterable[Mapping[str, Any]]) -> Offsets:
+    """
+    Next offset of each partition after ``records``.
+
+    :param records: Records from ``KafkaReceiver.poll``; records without an ``offset`` are ignored.
+    :returns: Next offset to consume by ``(topic, partition)``.
+    """
+    offsets: Offsets = {}
+    for record in records:
+        if record.get("offset") is None:
+            continue
+        key = (record["topic"], record["partition"])
+        offsets[key] = max(offsets.get(key, 0), record["offset"] + 1)
+    return offsets
+
+
+def save_offsets(conn: sqlite3.Connection, offsets: Mapping[Tuple[str, int], int]) -> None:
+    """
+    Record the next offset to consume by ``(topic, partition)``, in the caller's transaction.
+
+    Offsets only move forward: a lower offset than the one recorded is ignored.
+
+    :param conn: Connection with a transaction open.
+    :param offsets: Next offset to consume by ``(topic, partition)``.
+    """
+    if offsets:
+        conn.execute(_CREATE_OFFSETS_SQL)
+        conn.executemany(_SAVE_OFFSET_SQL, [(*key, offset) for key, offset in offsets.items()])
+
+
+def load_offsets(db_path: str) -> Offsets:
+    """
+    Read the offsets a database reflects.
+
+    :param db_path: Path to the SQLite database.
+    :returns: Next offset to consume by ``(topic, partition)``; empty if the database is missing
+        or has never consumed a message.
+    """
+    if not os.path.exists(db_path):
+        return {}
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return {(topic, partition): offset for topic, partition, offset in conn.execute(_SELECT_OFFSETS_SQL)}
+    except sqlite3.OperationalError:  # no offsets table yet
+        return {}
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Snapshots
+# ---------------------------------------------------------------------------
+
+
+def write_snapshot(db_path: str, snapshot_dir: str, name: str) -> Snapshot:
+    """
+    Copy ``db_path`` into ``snapshot_dir`` as one consistent snapshot.
+
+    :param db_path: Path to the SQLite database.
+    :param snapshot_dir: Directory for snapshots (created if missing).
+    :param name: Snapshot name prefix, e.g. ``"party"``.
+    :returns: The written snapshot.
+    :raises sqlite3.Error: If the database cannot be copied.
+    """
+    directory = Path(snapshot_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    created = datetime.now(timezone.utc)
+    stem = f"{name}-{created:%Y%m%dT%H%M%S%fZ}"
+    path = directory / f"{stem}.db"
+    partial = directory / f".{stem}.db.partial"
+    partial.unlink(missing_ok=True)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("VACUUM INTO ?", (str(partial),))
+    finally:
+        conn.close()
+    os.replace(partial, path)
+    # Read back from the copy, so the manifest matches it exactly
+    offsets = load_offsets(str(path))
+
+    manifest = {
+        "name": name,
+        "created": created.isoformat(),
+        "database": path.name,
+        "offsets": [
+            {"topic": topic, "partition": partition, "next_offset": offset}
+            for (topic, partition), offset in sorted(offsets.items())
+        ],
+    }
+    partial_manifest = directory / f".{stem}.json.partial"
+    partial_manifest.write_text(json.dumps(manifest, indent=2))
+    os.replace(partial_manifest, directory / f"{stem}.json")
+    return Snapshot(name, path, created, offsets)
+
+
+def _read_manifest(manifest: Path) -> Optional[Snapshot]:
+    try:
+        data = json.loads(manifest.read_text())
+        path = manifest.with_name(data["database"])
+        offsets = {(o["topic"], o["partition"]): o["next_offset"] for o in data["offsets"]}
+        created = datetime.fromisoformat(data["created"])
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        logger.warning("Ignoring unreadable snapshot manifest %s: %s", manifest, exc)
+        return None
+    if not path.exists():
+        return None
+    return Snapshot(data["name"], path, created, offsets)
+
+
+def _snapshots(snapshot_dir: str, name: str) -> List[Snapshot]:
+    """Complete snapshots named ``name``, oldest first."""
+    manifests = sorted(Path(snapshot_dir).glob(f"{name}-*.json"))
+    return [snapshot for snapshot in map(_read_manifest, manifests) if snapshot is not None]
+
+
+def latest_snapshot(snapshot_dir: str, name: str) -> Optional[Snapshot]:
+    """
+    Find the newest complete snapshot.
+
+    :param snapshot_dir: Directory the snapshots are written to.
+    :param name: Snapshot name prefix, e.g. ``"party"``.
+    :returns: The newest snapshot, or ``None`` if there is none.
+    """
+    snapshots = _snapshots(snapshot_dir, name) if os.path.isdir(snapshot_dir) else []
+    return snapshots[-1] if snapshots else None
+
+
+def restore_latest_snapshot(snapshot_dir: str, name: str, db_path: str) -> Optional[Snapshot]:
+    """
+    Replace ``db_path`` with the newest snapshot if it has never consumed a message.
+
+    Stores already open on the old file are closed first. A database with
+    recorded offsets is left alone, so restarting a node never loses its own
+    progress.
+
+    :param snapshot_dir: Directory the snapshots are written to.
+    :param name: Snapshot name prefix, e.g. ``"party"``.
+    :param db_path: Path to the subscriber's SQLite database.
+    :returns: The restored snapshot, or ``None`` if nothing was restored.
+    """
+    if load_offsets(db_path):
+        return None
+    snapshot = latest_snapshot(snapshot_dir, name)
+    if snapshot is None:
+        logger.info("No %s snapshot in %s; consuming from the start", name, snapshot_dir)
+        return None
+
+    restoring = f"{db_path}.restoring"
+    shutil.copyfile(snapshot.path, restoring)
+    conn = sqlite3.connect(restoring)
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+    finally:
+        conn.close()
+    close_shared_stores(db_path)
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    os.replace(restoring, db_path)
+    logger.info("Restored %s from snapshot %s (%d partitions)", db_path, snapshot.path.name, len(snapshot.offsets))
+    return snapshot
+
+
+class SnapshotWriter:
+    """
+    Writes a snapshot of a subscriber's database at most once per interval.
+
+    :param name: Snapshot name prefix and metric label, e.g. ``"party"``.
+    :param db_path: Path to the subscriber's SQLite database.
+    :param snapshot_dir: Directory for snapshots.
+    :param interval_s: Minimum seconds between snapshots.
+    :param keep: Newest snapshots kept; older ones are deleted after each write.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        db_path: str,
+        snapshot_dir: str,
+        interval_s: float = DEFAULT_SNAPSHOT_INTERVAL_S,
+        keep: int = DEFAULT_SNAPSHOTS_KEPT,
+    ) -> None:
+        if keep < 1:
+            raise ValueError(f"keep must be at least 1, got {keep}")
+        self.name = name
+        self.db_path = db_path
+        self.snapshot_dir = snapshot_dir
+        self.interval_s = interval_s
+        self.keep = keep
+        self._last = time.monotonic()
+        self._gauge = _LAST_SNAPSHOT.labels(name)
+
+    def maybe_write(self) -> Optional[Snapshot]:
+        """
+        Write a snapshot if the interval has passed since the last one.
+
+        Call between poll batches, when no transaction is open. A failed
+        write is logged and retried after the next interval.
+
+        :returns: The written snapshot, or ``None``.
+        """
+        if time.monotonic() - self._last < self.interval_s:
+            return None
+        self._last = time.monotonic()
+        try:
+            return self.write()
+        except (OSError, sqlite3.Error) as exc:
+            logger.error("Cannot write %s snapshot to %s: %s", self.name, self.snapshot_dir, exc)
+            return None
+
+    def write(self) -> Snapshot:
+        """
+        Write a snapshot now and prune old ones.
+
+        :returns: The written snapshot.
+        :raises sqlite3.Error: If the database cannot be copied.
+        """
+        started = time.perf_counter()
+        snapshot = write_snapshot(self.db_path, self.snapshot_dir, self.name)
+        for old in _snapshots(self.snapshot_dir, self.name)[: -self.keep]:
+            old.path.with_suffix(".json").unlink(missing_ok=True)
+            old.path.unlink(missing_ok=True)
+        self._gauge.set(snapshot.created.timestamp())
+        logger.info("Wrote %s snapshot %s in %.2fs", self.name, snapshot.path.name, time.perf_counter() - started)
+        return snapshot
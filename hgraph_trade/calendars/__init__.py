@@ -0,0 +1,52 @@
+"""
+Business-day calendars for date adjustment.
+
+- business_calendar.py: per-year holiday bitmaps with scalar and vectorised adjustment.
+- registry.py: loads calendars per business center from local holiday files.
+
+Public names are resolved lazily on first attribute access, so the trade
+builders can import the registry without importing numpy until a trade
+actually names a business center.
+"""
+
+from typing import TYPE_CHECKING, Dict
+
+from hgraph_trade.lazy_exports import lazy_exports
+
+if TYPE_CHECKING:
+    from .business_calendar import BUSINESS_DAY_CONVENTIONS, DEFAULT_WEEKMASK, BusinessCalendar
+    from .registry import (
+        CalendarRegistry,
+        adjust_date,
+        adjust_dates,
+        adjustable_date,
+        default_registry,
+        parse_business_centers,
+    )
+
+__all__ = (
+    "BUSINESS_DAY_CONVENTIONS",
+    "DEFAULT_WEEKMASK",
+    "BusinessCalendar",
+    "CalendarRegistry",
+    "adjust_date",
+    "adjust_dates",
+    "adjustable_date",
+    "default_registry",
+    "parse_business_centers",
+)
+
+# Public name -> module that defines it
+_LAZY_ATTRS: Dict[str, str] = {
+    "BUSINESS_DAY_CONVENTIONS": f"{__name__}.business_calendar",
+    "DEFAULT_WEEKMASK": f"{__name__}.business_calendar",
+    "BusinessCalendar": f"{__name__}.business_calendar",
+    "CalendarRegistry": f"{__name__}.registry",
+    "adjust_date": f"{__name__}.registry",
+    "adjust_dates": f"{__name__}.registry",
+    "adjustable_date": f"{__name__}.registry",
+    "default_registry": f"{__name__}.registry",
+    "parse_business_centers": f"{__name__}.registry",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_ATTRS)
@@ -0,0 +1,258 @@
+"""
+business_calendar.py
+
+Business-day calendars backed by precomputed per-year bitmaps.
+
+A ``BusinessCalendar`` keeps, for every year it has been asked about, a
+boolean array with one entry per day of the year (True = business day). A
+scalar adjustment is then a couple of list lookups; ``adjust_array`` works
+on whole ``datetime64[D]`` arrays at once. For that it keeps a contiguous
+window of years with, for each day, the index of the next and previous
+business day, so every convention becomes one or two fancy-indexing
+operations regardless of the number of dates.
+
+Supported conventions are those of FpML's ``BusinessDayConventionEnum``
+except ``FRN``, which depends on the period schedule rather than a single
+date: ``FOLLOWING``, ``MODFOLLOWING``, ``PRECEDING``, ``MODPRECEDING``,
+``NEAREST`` and ``NONE`` (``NotApplicable`` is accepted as an alias of
+``NONE``).
+"""
+
+import datetime
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+__all__ = (
+    "BUSINESS_DAY_CONVENTIONS",
+    "DEFAULT_WEEKMASK",
+    "BusinessCalendar",
+)
+
+# Monday..Sunday, "1" = working day
+DEFAULT_WEEKMASK = "1111100"
+
+BUSINESS_DAY_CONVENTIONS: Tuple[str, ...] = (
+    "FOLLOWING",
+    "MODFOLLOWING",
+    "PRECEDING",
+    "MODPRECEDING",
+    "NEAREST",
+    "NONE",
+    "NotApplicable",
+)
+_NO_ADJUSTMENT = frozenset({"NONE", "NotApplicable"})
+
+DateLike = Union[str, datetime.date, np.datetime64]
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def _to_date(value: DateLike) -> datetime.date:
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, np.datetime64):
+        return _EPOCH + datetime.timedelta(days=int(value.astype("datetime64[D]").astype(np.int64)))
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def _check_convention(convention: str) -> None:
+    if convention not in BUSINESS_DAY_CONVENTIONS:
+        raise ValueError(
+            f"Unsupported business day convention {convention!r}; expected one of {', '.join(BUSINESS_DAY_CONVENTIONS)}"
+        )
+
+
+class BusinessCalendar:
+    """
+    Holiday calendar for one business center, or the intersection of several.
+
+    :param holidays: Non-business dates (ISO strings, ``date`` or ``datetime64``).
+    :param weekmask: Seven ``0``/``1`` characters, Monday first; ``1`` marks a working weekday.
+    :param name: Business center code(s), e.g. ``"USNY"`` or ``"GBLO+USNY"``.
+    """
+
+    def __init__(self, holidays: Iterable[DateLike] = (), weekmask: str = DEFAULT_WEEKMASK, name: str = "") -> None:
+        if len(weekmask) != 7 or set(weekmask) - {"0", "1"} or "1" not in weekmask:
+            raise ValueError(f"weekmask must be seven 0/1 characters with at least one 1, got {weekmask!r}")
+        self.name = name
+        self.weekmask = weekmask
+        self._holidays_by_year: Dict[int, List[datetime.date]] = {}
+        for holiday in holidays:
+            day = _to_date(holiday)
+            self._holidays_by_year.setdefault(day.year, []).append(day)
+        self._weekday_mask = np.array([c == "1" for c in weekmask], dtype=bool)
+        # year -> business-day flags, one per day of the year
+        self._years: Dict[int, np.ndarray] = {}
+        # year -> (ordinal of 1 January, plain-list copy of the bitmap) for scalar lookups,
+        # which are faster on a list than on a numpy array
+        self._year_lists: Dict[int, Tuple[int, List[bool]]] = {}
+        # (first year, last year, first day as days since epoch, flags, next index, previous index)
+        self._window: Optional[Tuple[int, int, int, np.ndarray, np.ndarray, np.ndarray]] = None
+        self._lock = threading.Lock()
+        for year in self._holidays_by_year:
+            self._year_bitmap(year)
+
+    def __repr__(self) -> str:
+        return f"BusinessCalendar({self.name or 'weekends only'!r}, years={sorted(self._years)})"
+
+    @property
+    def holidays(self) -> List[datetime.date]:
+        """Holidays that fall on working weekdays, in date order."""
+        days = (day for year in self._holidays_by_year.values() for day in year)
+        return sorted(day for day in days if self._weekday_mask[day.weekday()])
+
+    @classmethod
+    def intersect(cls, calendars: Sequence["BusinessCalendar"]) -> "BusinessCalendar":
+        """
+        Combine calendars so a day is a business day only if it is one in every calendar.
+
+        :param calendars: The calendars to combine (at least one).
+        :return: The combined calendar.
+        """
+        if not calendars:
+            raise ValueError("At least one calendar is required")
+        weekmask = "".join("1" if all(c.weekmask[i] == "1" for c in calendars) else "0" for i in range(7))
+        holidays = {day for calendar in calendars for year in calendar._holidays_by_year.values() for day in year}
+        return cls(holidays, weekmask, "+".join(c.name for c in calendars))
+
+    # ------------------------------------------------------------------
+    # Bitmaps
+    # ------------------------------------------------------------------
+    def _year_bitmap(self, year: int) -> np.ndarray:
+        bitmap = self._years.get(year)
+        if bitmap is None:
+            start = np.datetime64(f"{year:04d}-01-01")
+            days = np.arange(start, np.datetime64(f"{year + 1:04d}-01-01"))
+            # 1970-01-01 was a Thursday (weekday 3)
+            bitmap = self._weekday_mask[(days.astype(np.int64) + 3) % 7]
+            first = datetime.date(year, 1, 1).toordinal()
+            for holiday in self._holidays_by_year.get(year, ()):
+                bitmap[holiday.toordinal() - first] = False
+            bitmap.flags.writeable = False
+            self._years[year] = bitmap
+            self._year_lists[year] = (first, bitmap.tolist())
+        return bitmap
+
+    def _window_for(self, first_year: int, last_year: int) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+        """Return ``(origin, flags, next index, previous index)`` covering the years plus a spare year each side."""
+        window = self._window
+        if window is None or not (window[0] < first_year and last_year < window[1]):
+            with self._lock:
+                window = self._window
+                if window is not None:
+                    first_year, last_year = min(first_year, window[0] + 1), max(last_year, window[1] - 1)
+                years = range(first_year - 1, last_year + 2)
+                flags = np.concatenate([self._year_bitmap(year) for year in years])
+                index = np.arange(len(flags))
+                n = len(flags)
+                next_index = np.minimum.accumulate(np.where(flags, index, n)[::-1])[::-1]
+                prev_index = np.maximum.accumulate(np.where(flags, index, -1))
+                # Ends of the window with no business day beyond them stay where they are
+                next_index = np.where(next_index == n, index, next_index)
+                prev_index = np.where(prev_index == -1, index, prev_index)
+                origin = int(np.datetime64(f"{years[0]:04d}-01-01").astype(np.int64))
+                window = self._window = (years[0], years[-1], origin, flags, next_index, prev_index)
+        return window[2:]
+
+    # ------------------------------------------------------------------
+    # Scalar API
+    # ------------------------------------------------------------------
+    def is_business_day(self, day: DateLike) -> bool:
+        """
+        :param day: The date to test.
+        :return: True if ``day`` is neither a weekend day nor a holiday.
+        """
+        return self._is_business_ordinal(_to_date(day).toordinal())
+
+    def _is_business_ordinal(self, ordinal: int) -> bool:
+        year = datetime.date.fromordinal(ordinal).year
+        entry = self._year_lists.get(year)
+        if entry is None:
+            self._year_bitmap(year)
+            entry = self._year_lists[year]
+        return entry[1][ordinal - entry[0]]
+
+    def _roll(self, day: datetime.date, step: int) -> datetime.date:
+        ordinal = day.toordinal() + step
+        while not self._is_business_ordinal(ordinal):
+            ordinal += step
+        return datetime.date.fromordinal(ordinal)
+
+    def adjust(self, day: DateLike, convention: str) -> datetime.date:
+        """
+        Adjust one date.
+
+        :param day: The unadjusted date.
+        :param convention: A value from ``BUSINESS_DAY_CONVENTIONS``.
+        :return: The adjusted date.
+        :raises ValueError: If the convention is not supported.
+        """
+        _check_convention(convention)
+        day = _to_date(day)
+        if convention in _NO_ADJUSTMENT or self._is_business_ordinal(day.toordinal()):
+            return day
+        if convention == "FOLLOWING":
+            return self._roll(day, 1)
+        if convention == "PRECEDING":
+            return self._roll(day, -1)
+        if convention == "MODFOLLOWING":
+            rolled = self._roll(day, 1)
+            return rolled if rolled.month == day.month else self._roll(day, -1)
+        if convention == "MODPRECEDING":
+            rolled = self._roll(day, -1)
+            return rolled if rolled.month == day.month else self._roll(day, 1)
+        # NEAREST: Sunday and Monday roll forward, any other day rolls back
+        return self._roll(day, 1 if day.weekday() in (6, 0) else -1)
+
+    # ------------------------------------------------------------------
+    # Vectorised API
+    # ------------------------------------------------------------------
+    def adjust_array(self, dates: Union[np.ndarray, Sequence[DateLike]], convention: str) -> np.ndarray:
+        """
+        Adjust many dates at once.
+
+        :param dates: ``datetime64`` array, or a sequence of ISO strings / dates.
+        :param convention: A value from ``BUSINESS_DAY_CONVENTIONS``.
+        :return: ``datetime64[D]`` array of adjusted dates, in input order.
+        :raises ValueError: If the convention is not supported.
+        """
+        _check_convention(convention)
+        days = np.asarray(dates, dtype="datetime64[D]")
+        if convention in _NO_ADJUSTMENT or days.size == 0:
+            return days.copy()
+
+        years = days.astype("datetime64[Y]").astype(np.int64) + 1970
+        origin, flags, next_index, prev_index = self._window_for(int(years.min()), int(years.max()))
+        offsets = days.astype(np.int64) - origin
+
+        if convention == "FOLLOWING":
+            adjusted = next_index[offsets]
+        elif convention == "PRECEDING":
+            adjusted = prev_index[offsets]
+        elif convention in ("MODFOLLOWING", "MODPRECEDING"):
+            first, second = (next_index, prev_index) if convention == "MODFOLLOWING" else (prev_index, next_index)
+            adjusted = first[offsets]
+            month = (offsets + origin).astype("datetime64[D]").astype("datetime64[M]")
+            crossed = (adjusted + origin).astype("datetime64[D]").astype("datetime64[M]") != month
+            adjusted = np.where(crossed, second[offsets], adjusted)
+        else:  # NEAREST
+            forward = np.isin((offsets + origin + 3) % 7, (6, 0))
+            adjusted = np.where(forward, next_index[offsets], prev_index[offsets])
+        return (adjusted + origin).astype("datetime64[D]")
+
+    def business_days_between(self, start: DateLike, end: DateLike) -> int:
+        """
+        :param start: First date (inclusive).
+        :param end: Last date (exclusive).
+        :return: Number of business days in ``[start, end)``; negative if ``end`` is before ``start``.
+        """
+        start_day, end_day = _to_date(start), _to_date(end)
+        if end_day < start_day:
+            return -self.business_days_between(end_day, start_day)
+        origin, flags, _, _ = self._window_for(start_day.year, end_day.year)
+        first = (start_day - _EPOCH).days - origin
+        return int(np.count_nonzero(flags[first : first + (end_day - start_day).days]))
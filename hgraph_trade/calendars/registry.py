@@ -0,0 +1,227 @@
+"""
+registry.py
+
+Loads holiday calendars per business center from a directory of local files
+and hands out (cached) ``BusinessCalendar`` instances, including combined
+calendars for a set of business centers.
+
+Each business center has one ``<CODE>.txt`` file (``USNY.txt``,
+``GBLO.txt``, ...) with one ISO date per line. Blank lines and ``#``
+comments are ignored, and a ``weekmask <0/1 x 7>`` line (Monday first)
+overrides the Saturday/Sunday weekend::
+
+    # New York
+    2025-01-01  # New Year's Day
+    2025-01-20
+    ...
+
+The default registry reads ``HOLIDAY_CALENDAR_DIR`` from the config.
+``business_calendar`` (and so numpy) is only imported once a calendar is
+actually loaded.
+"""
+
+import datetime
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from hgraph_trade.calendars.business_calendar import BusinessCalendar, DateLike
+
+__all__ = (
+    "CalendarRegistry",
+    "adjust_date",
+    "adjust_dates",
+    "adjustable_date",
+    "default_registry",
+    "parse_business_centers",
+)
+
+logger = logging.getLogger(__name__)
+
+_CALENDAR_SUFFIX = ".txt"
+
+_default: Optional["CalendarRegistry"] = None
+_default_lock = threading.Lock()
+
+
+def parse_business_centers(value: Union[None, str, Iterable[str]]) -> Tuple[str, ...]:
+    """
+    Normalise business centers given as ``"GBLO,USNY"``, ``"GBLO USNY"`` or a list.
+
+    :param value: The business centers, or None.
+    :return: Upper-cased, de-duplicated codes in sorted order (empty if none).
+    """
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = value.replace(",", " ").split()
+    return tuple(sorted({str(code).strip().upper() for code in value if str(code).strip()}))
+
+
+def _parse_calendar_file(path: str) -> Tuple[List[str], str]:
+    from hgraph_trade.calendars.business_calendar import DEFAULT_WEEKMASK
+
+    holidays: List[str] = []
+    weekmask = DEFAULT_WEEKMASK
+    with open(path, "r", encoding="utf-8") as fh:
+        for lineno, raw in enumerate(fh, 1):
+            line = raw.split("#", 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith("weekmask"):
+                weekmask = line[len("weekmask") :].strip()
+                continue
+            try:
+                datetime.date.fromisoformat(line)
+            except ValueError:
+                raise ValueError(f"{path}:{lineno}: expected an ISO date, got {line!r}") from None
+            holidays.append(line)
+    return holidays, weekmask
+
+
+class CalendarRegistry:
+    """
+    Loads and caches business-center calendars from ``directory``.
+
+    Each file is read once; combined calendars are cached per set of centers.
+
+    :param directory: Directory of ``<CODE>.txt`` holiday files.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._calendars: Dict[Tuple[str, ...], "BusinessCalendar"] = {}
+        # Re-entrant: a combined calendar loads its single-center calendars under the lock
+        self._lock = threading.RLock()
+
+    def available(self) -> List[str]:
+        """Business center codes with a holiday file in the directory."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name[: -len(_CALENDAR_SUFFIX)].upper()
+            for name in os.listdir(self.directory)
+            if name.endswith(_CALENDAR_SUFFIX)
+        )
+
+    def _load(self, code: str) -> "BusinessCalendar":
+        from hgraph_trade.calendars.business_calendar import BusinessCalendar
+
+        path = os.path.join(self.directory, f"{code}{_CALENDAR_SUFFIX}")
+        if not os.path.isfile(path):
+            raise ValueError(f"No holiday calendar for business center {code!r} (looked for {path})")
+        holidays, weekmask = _parse_calendar_file(path)
+        calendar = BusinessCalendar(holidays, weekmask, code)
+        logger.debug("Loaded %d holiday(s) for %s from %s", len(holidays), code, path)
+        return calendar
+
+    def get(self, centers: Union[str, Iterable[str]]) -> "BusinessCalendar":
+        """
+        Return the calendar for one or more business centers.
+
+        :param centers: A code, a comma/space separated string of codes, or a list of codes.
+        :return: The calendar; for several centers, their intersection.
+        :raises ValueError: If no centers are given or a center has no holiday file.
+        """
+        key = parse_business_centers(centers)
+        if not key:
+            raise ValueError("At least one business center is required")
+        calendar = self._calendars.get(key)
+        if calendar is None:
+            with self._lock:
+                calendar = self._calendars.get(key)
+                if calendar is None:
+                    if len(key) == 1:
+                        calendar = self._load(key[0])
+                    else:
+                        from hgraph_trade.calendars.business_calendar import BusinessCalendar
+
+                        calendar = BusinessCalendar.intersect([self.get(code) for code in key])
+                    self._calendars[key] = calendar
+        return calendar
+
+    def clear(self) -> None:
+        """Forget every loaded calendar so the files are read again on next use."""
+        with self._lock:
+            self._calendars.clear()
+
+
+def default_registry() -> CalendarRegistry:
+    """Return the process-wide registry for ``HOLIDAY_CALENDAR_DIR``."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                from secure_config import config
+
+                _default = CalendarRegistry(config["HOLIDAY_CALENDAR_DIR"])
+    return _default
+
+
+def adjust_date(
+    day: "DateLike", convention: str, centers: Union[str, Iterable[str]], registry: Optional[CalendarRegistry] = None
+) -> str:
+    """
+    Adjust one date against the calendars of ``centers``.
+
+    :param day: The unadjusted date.
+    :param convention: The business day convention.
+    :param centers: Business center code(s).
+    :param registry: Registry to load calendars from; defaults to ``default_registry()``.
+    :return: The adjusted date as an ISO string.
+    :raises ValueError: If the convention is unsupported or a center has no calendar.
+    """
+    return (registry or default_registry()).get(centers).adjust(day, convention).isoformat()
+
+
+def adjust_dates(
+    dates: Union["np.ndarray", Sequence["DateLike"]],
+    convention: str,
+    centers: Union[str, Iterable[str]],
+    registry: Optional[CalendarRegistry] = None,
+) -> "np.ndarray":
+    """
+    Vectorised ``adjust_date`` for schedules.
+
+    :param dates: ``datetime64`` array or sequence of dates.
+    :param convention: The business day convention.
+    :param centers: Business center code(s).
+    :param registry: Registry to load calendars from; defaults to ``default_registry()``.
+    :return: ``datetime64[D]`` array of adjusted dates.
+    :raises ValueError: If the convention is unsupported or a center has no calendar.
+    """
+    return (registry or default_registry()).get(centers).adjust_array(dates, convention)
+
+
+def adjustable_date(
+    unadjusted_date: str,
+    convention: str,
+    centers: Union[None, str, Iterable[str]] = None,
+    registry: Optional[CalendarRegistry] = None,
+) -> Dict[str, Any]:
+    """
+    Build an FpML ``adjustableDate`` body.
+
+    Without business centers the date is passed through as before; with them,
+    ``dateAdjustments.businessCenters`` and the ``adjustedDate`` are added.
+
+    :param unadjusted_date: The unadjusted date (ISO string).
+    :param convention: The business day convention.
+    :param centers: Business center code(s), if any.
+    :param registry: Registry to load calendars from; defaults to ``default_registry()``.
+    :return: ``{"unadjustedDate": ..., "dateAdjustments": {...}[, "adjustedDate": ...]}``.
+    :raises ValueError: If centers are given and the convention is unsupported or a center has no calendar.
+    """
+    body: Dict[str, Any] = {
+        "unadjustedDate": unadjusted_date,
+        "dateAdjustments": {"businessDayConvention": convention},
+    }
+    codes = parse_business_centers(centers)
+    if codes:
+        body["dateAdjustments"]["businessCenters"] = {"businessCenter": list(codes)}
+        body["adjustedDate"] = adjust_date(unadjusted_date, convention, codes, registry)
+    return body
@@ -0,0 +1,367 @@
+"""
+daemon.py
+
+Warm CLI daemon: runs ``hgraph-tools`` subcommands inside one long-lived
+process so a single-trade ``book`` does not pay interpreter start-up,
+imports and config loading on every call.
+
+``hgraph-tools daemon`` starts a ``DaemonServer`` on a local Unix socket
+(``HGRAPH_DAEMON_SOCKET``, default ``$XDG_RUNTIME_DIR/hgraph-tools.sock`` or
+``/tmp/hgraph-tools-<uid>.sock``, created with mode 0600). While it runs,
+``hgraph-tools <command> ...`` calls ``forward_if_running``, which sends the
+arguments, working directory and environment over the socket and relays the
+command's stdout, stderr and exit code. The command runs in-process as before
+if no daemon is listening, if the socket is not a socket owned by the current
+user, or if the daemon refuses it because the client's environment differs in
+a variable its configuration was loaded from (``secure_config`` is read once,
+when the daemon starts).
+
+Wire protocol: the client sends one JSON line, ``{"argv": [...], "cwd": ...,
+"env": {...}}`` (or ``{"control": "ping" | "stop"}``); the server answers with
+frames of a one-byte channel (``o`` stdout, ``e`` stderr, ``x`` exit code,
+``r`` refused, with the differing variable names), a 4-byte big-endian length
+and the payload.
+
+Commands run one at a time, because each one changes into the client's
+working directory and redirects the process-wide stdout and stderr.
+
+This module only imports the standard library, and only ``os`` at import
+time, so the client check costs nothing when no daemon is running.
+"""
+
+import os
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+__all__ = (
+    "DAEMON_COMMANDS",
+    "DaemonServer",
+    "default_socket_path",
+    "forward_if_running",
+    "send_control",
+)
+
+# Subcommands that are short-lived and safe to run inside the daemon
+# (long-running servers and subscribers always run in their own process)
+DAEMON_COMMANDS = frozenset({"book", "requeue", "entitlements", "notify", "parse-xsd", "static-admin"})
+
+_HEADER_SIZE = 5
+_STDOUT, _STDERR, _EXIT, _REFUSED = b"o", b"e", b"x", b"r"
+
+
+def default_socket_path() -> str:
+    """Return ``HGRAPH_DAEMON_SOCKET``, or a per-user socket path in the runtime or temp directory."""
+    path = os.environ.get("HGRAPH_DAEMON_SOCKET")
+    if path:
+        return path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "hgraph-tools.sock")
+    return f"/tmp/hgraph-tools-{os.getuid()}.sock"
+
+
+def _daemon_disabled() -> bool:
+    return os.environ.get("HGRAPH_DAEMON", "").strip().lower() in ("0", "false", "no", "off")
+
+
+def _owned_socket(path: str) -> bool:
+    """Whether ``path`` is a Unix socket owned by this user (not a file someone else planted in /tmp)."""
+    import stat
+
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def _connect(path: str, timeout: Optional[float]):
+    import socket
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _read_exact(stream, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ConnectionError("daemon connection closed mid-response")
+    return data
+
+
+def forward_if_running(argv: Sequence[str], path: Optional[str] = None) -> Optional[int]:
+    """
+    Run a CLI command in the daemon, if one is listening.
+
+    Not forwarded: commands outside ``DAEMON_COMMANDS``, anything reading stdin
+    (a ``-`` argument), ``--no-daemon``, or ``HGRAPH_DAEMON=0``; nor if ``path``
+    is not a socket owned by this user, or the daemon refuses the command
+    because its configuration was loaded from a different environment.
+
+    :param argv: CLI arguments, without the program name.
+    :param path: Socket path; defaults to ``default_socket_path()``.
+    :return: The command's exit code, or None if it was not forwarded (run it locally).
+    """
+    if "--no-daemon" in argv or "-" in argv or _daemon_disabled():
+        return None
+    command = next((arg for arg in argv if not arg.startswith("-")), None)
+    if command not in DAEMON_COMMANDS:
+        return None
+    path = path or default_socket_path()
+    if not _owned_socket(path):
+        return None
+    try:
+        sock = _connect(path, timeout=1.0)
+    except OSError:
+        return None  # stale socket file: no daemon behind it
+
+    import json
+    import sys
+
+    # Bound before the request goes out: a daemon running in this process (as in
+    # the tests) swaps sys.stdout/sys.stderr while it serves the command
+    outputs = {_STDOUT: sys.stdout, _STDERR: sys.stderr}
+    with sock:
+        sock.settimeout(None)
+        request = {"argv": list(argv), "cwd": os.getcwd(), "env": dict(os.environ)}
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        try:
+            with sock.makefile("rb") as stream:
+                while True:
+                    header = _read_exact(stream, _HEADER_SIZE)
+                    payload = _read_exact(stream, int.from_bytes(header[1:], "big"))
+                    channel = header[:1]
+                    if channel == _EXIT:
+                        return int(payload)
+                    if channel == _REFUSED:
+                        return None  # nothing ran; the daemon's config does not match ours
+                    out = outputs.get(channel)
+                    if out is not None:
+                        out.buffer.write(payload)
+                        out.flush()
+        except (ConnectionError, OSError) as exc:
+            # The command may already have run; do not retry it locally
+            outputs[_STDERR].write(f"hgraph-tools: lost connection to daemon at {path}: {exc}\n")
+            return 1
+
+
+def send_control(action: str, path: Optional[str] = None, timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+    """
+    Send a control request (``"ping"`` or ``"stop"``) to the daemon.
+
+    :param action: The control action.
+    :param path: Socket path; defaults to ``default_socket_path()``.
+    :param timeout: Socket timeout in seconds.
+    :return: The daemon's JSON reply, or None if no daemon is listening.
+    """
+    import json
+
+    path = path or default_socket_path()
+    if not _owned_socket(path):
+        return None
+    try:
+        sock = _connect(path, timeout)
+    except OSError:
+        return None
+    with sock, sock.makefile("rb") as stream:
+        sock.sendall(json.dumps({"control": action}).encode("utf-8") + b"\n")
+        line = stream.readline()
+    return json.loads(line) if line else None
+
+
+class _FrameWriter:
+    """Binary file-like object that sends each write as one frame on ``channel``."""
+
+    def __init__(self, sock, lock, channel: bytes) -> None:
+        self._sock = sock
+        self._lock = lock
+        self._channel = channel
+        self.closed = False
+
+    def writable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return False
+
+    def seekable(self) -> bool:
+        return False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        if data:
+            with self._lock:
+                try:
+                    self._sock.sendall(self._channel + len(data).to_bytes(4, "big") + data)
+                except OSError:
+                    pass  # client went away; keep running the command to completion
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class DaemonServer:
+    """
+    Serves CLI commands on a Unix socket until stopped.
+
+    :param run: Runs one command: CLI arguments -> exit code (e.g. ``cli.run``).
+    :param path: Socket path; defaults to ``default_socket_path()``.
+    :param after_command: Called after every command, e.g. to restore the daemon's own logging.
+    :param config_env: Values (None for unset) of the environment variables the daemon's
+                       configuration was loaded from. Commands from clients whose environment
+                       differs in any of them are refused, so the client runs them itself.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[List[str]], int],
+        path: Optional[str] = None,
+        after_command: Optional[Callable[[], None]] = None,
+        config_env: Optional[Mapping[str, Optional[str]]] = None,
+    ) -> None:
+        import threading
+
+        self.run_command = run
+        self.path = path or default_socket_path()
+        self.after_command = after_command
+        self.config_env = dict(config_env or {})
+        self.commands_served = 0
+        self._run_lock = threading.Lock()
+        self._server = None
+        self._started = None
+
+    def bind(self) -> "DaemonServer":
+        """
+        Create the listening socket, replacing a stale socket file.
+
+        :raises RuntimeError: If another daemon is already listening on the path, or the
+                              path exists and is not a socket owned by this user.
+        """
+        import socketserver
+        import time
+
+        if os.path.lexists(self.path):
+            if not _owned_socket(self.path):
+                raise RuntimeError(f"{self.path} exists and is not a socket owned by this user")
+            try:
+                _connect(self.path, timeout=1.0).close()
+            except OSError:
+                os.unlink(self.path)
+            else:
+                raise RuntimeError(f"A daemon is already listening on {self.path}")
+
+        daemon = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                daemon._handle(self.request, self.rfile)
+
+        class _Server(socketserver.ThreadingUnixStreamServer):
+            daemon_threads = True
+
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _Server(self.path, _Handler)
+        finally:
+            os.umask(old_umask)
+        self._started = time.monotonic()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve until ``stop()`` (or a ``stop`` control request); removes the socket file on exit."""
+        if self._server is None:
+            self.bind()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def stop(self) -> None:
+        """Stop ``serve_forever`` from another thread (or a signal handler running in one)."""
+        import threading
+
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def _handle(self, sock, rfile) -> None:
+        import json
+        import threading
+
+        line = rfile.readline()
+        if not line:
+            return
+        request = json.loads(line)
+
+        control = request.get("control")
+        if control is not None:
+            import time
+
+            reply = {
+                "pid": os.getpid(),
+                "uptime_seconds": round(time.monotonic() - self._started, 3),
+                "commands_served": self.commands_served,
+            }
+            sock.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+            if control == "stop":
+                self.stop()
+            return
+
+        client_env = request.get("env") or {}
+        differing = sorted(name for name, value in self.config_env.items() if client_env.get(name) != value)
+        if differing:
+            payload = ",".join(differing).encode("utf-8")
+            sock.sendall(_REFUSED + len(payload).to_bytes(4, "big") + payload)
+            return
+
+        lock = threading.Lock()
+        with self._run_lock:
+            code = self._run(request.get("argv") or [], request.get("cwd") or os.getcwd(), sock, lock)
+            self.commands_served += 1
+        with lock:
+            try:
+                sock.sendall(_EXIT + len(str(code)).to_bytes(4, "big") + str(code).encode("ascii"))
+            except OSError:
+                pass
+
+    def _run(self, argv: List[str], cwd: str, sock, lock) -> int:
+        import contextlib
+        import io
+        import sys
+        import traceback
+
+        home = os.getcwd()
+        stdout = io.TextIOWrapper(_FrameWriter(sock, lock, _STDOUT), encoding="utf-8", write_through=True)
+        stderr = io.TextIOWrapper(_FrameWriter(sock, lock, _STDERR), encoding="utf-8", write_through=True)
+        try:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    os.chdir(cwd)
+                    code = self.run_command(argv)
+                except SystemExit as exc:
+                    code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+                except Exception:
+                    traceback.print_exc()
+                    code = 1
+                finally:
+                    os.chdir(home)
+                    stdout.flush()
+                    stderr.flush()
+        finally:
+            # Outside the redirect, so handlers it installs get the daemon's own streams;
+            # before detaching, so records the command left queued still reach the client
+            if self.after_command is not None:
+                self.after_command()
+            stdout.detach()
+            stderr.detach()
+        return code
@@ -2,40 +2,83 @@
 fpml_xsd_reference_files package.
 
 Contains FpML 5.12 XSD schema files and tooling to parse them into a
-structured JSON dictionary.
+structured JSON dictionary and a compact memory-mapped index.
 
 Usage:
-    from hgraph_trade.fpml_xsd_reference_files import get_fpml_tags
+    from hgraph_trade.fpml_xsd_reference_files import get_fpml_tags, get_fpml_tag_index
 
-    tags = get_fpml_tags()            # lazy-loaded from fpml_tags.json
+    tags = get_fpml_tags()            # fpml_tags.idx if built, else fpml_tags.json
     bullion = tags["bullionPhysicalLeg"]
 
-If fpml_tags.json does not exist, run the parser first:
+    index = get_fpml_tag_index()      # memory-mapped, decoded on access
+    index.lookup("bullionPhysicalLeg/deliveryLocation")
+
+If neither file exists, run the parser first (it writes both):
     python -m hgraph_trade.fpml_xsd_reference_files.fpml_XSD_parser
 """
 
 import json
 import os
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Mapping, Optional
+
+if TYPE_CHECKING:
+    from hgraph_trade.fpml_xsd_reference_files.fpml_tag_index import FpmlTagIndex
 
 _THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 _JSON_PATH = os.path.join(_THIS_DIR, "fpml_tags.json")
-_CACHE: Optional[Dict[str, Any]] = None
+_INDEX_PATH = os.path.join(_THIS_DIR, "fpml_tags.idx")
+_CACHE: Optional[Mapping[str, Any]] = None
+_INDEX: Optional["FpmlTagIndex"] = None
+
+
+def get_fpml_tag_index() -> "FpmlTagIndex":
+    """
+    Open and return the memory-mapped FpML tag index.
 
+    The index is opened once per process; element definitions are decoded
+    only when accessed, so this is cheap even for services that touch a
+    handful of elements.
 
-def get_fpml_tags() -> Dict[str, Any]:
+    :return: The shared ``FpmlTagIndex``.
+    :raises FileNotFoundError: If fpml_tags.idx has not been generated yet.
     """
-    Lazy-load and return the FpML tags dictionary from the generated JSON file.
+    global _INDEX
+    if _INDEX is not None:
+        return _INDEX
 
+    if not os.path.exists(_INDEX_PATH):
+        raise FileNotFoundError(
+            f"FpML tag index not found at {_INDEX_PATH}. "
+            f"Run the parser first:\n"
+            f"  python -m hgraph_trade.fpml_xsd_reference_files.fpml_XSD_parser"
+        )
+
+    from hgraph_trade.fpml_xsd_reference_files.fpml_tag_index import FpmlTagIndex
+
+    _INDEX = FpmlTagIndex.open(_INDEX_PATH)
+    return _INDEX
+
+
+def get_fpml_tags() -> Mapping[str, Any]:
+    """
+    Lazy-load and return the FpML tags mapping.
+
+    Prefers the memory-mapped index (see :func:`get_fpml_tag_index`), whose
+    elements are read-only mappings with the same keys as the JSON dicts.
+    Falls back to loading fpml_tags.json when no index has been built.
     The result is cached after the first call so subsequent calls are instant.
 
-    :return: Dictionary mapping FpML element names to their parsed structure.
-    :raises FileNotFoundError: If fpml_tags.json has not been generated yet.
+    :return: Mapping of FpML element names to their parsed structure.
+    :raises FileNotFoundError: If neither fpml_tags.idx nor fpml_tags.json exists.
     """
     global _CACHE
     if _CACHE is not None:
         return _CACHE
 
+    if os.path.exists(_INDEX_PATH):
+        _CACHE = get_fpml_tag_index()
+        return _CACHE
+
     if not os.path.exists(_JSON_PATH):
         raise FileNotFoundError(
             f"FpML tags JSON not found at {_JSON_PATH}. "
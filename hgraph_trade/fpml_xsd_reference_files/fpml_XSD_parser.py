@@ -3,7 +3,8 @@
 fpml_XSD_parser.py
 
 Parse FpML XSD schema files and generate a JSON dictionary of all elements,
-their types, documentation, and children.
+their types, documentation, and children, plus the compact memory-mapped
+index read by ``get_fpml_tags()`` (see ``fpml_tag_index.py``).
 
 The generated JSON replaces the old 3-4 MB Python files (fpml_tags.py,
 output_fpml_tags.py) that were committed to the repository. Those files
@@ -14,15 +15,35 @@ Usage:
     python fpml_XSD_parser.py                         # parse default XSD, write JSON
     python fpml_XSD_parser.py --xsd path/to/file.xsd  # parse a specific XSD
     python fpml_XSD_parser.py --output custom.json     # custom output path
+    python fpml_XSD_parser.py --index custom.idx       # custom index path
+    python fpml_XSD_parser.py --workers 4              # parse top-level elements in parallel
+    python fpml_XSD_parser.py --force                  # regenerate even if XSDs are unchanged
+
+Complex types are expanded once and shared between the elements that use
+them; recursive types become reference nodes (``"ref": "<TypeName>"`` with no
+children). Simple values carry the Python type of their built-in XSD base
+(``python_type``), and elements in a substitution group name its head
+(``substitution_group``), e.g. ``fixedLeg`` -> ``commoditySwapLeg``. Complex
+types that declare XSD attributes list their names (``attributes``), e.g.
+``["id"]`` or ``["currencyScheme", "id"]``.
+
+A fingerprint of the XSD files is written next to the JSON, and the parse is
+skipped entirely when the schemas have not changed.
 """
 
 import argparse
+import hashlib
 import json
 import logging
 import os
-from typing import Any, Dict
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 
-import xmlschema
+from hgraph_trade.fpml_xsd_reference_files.fpml_tag_index import DEFAULT_INDEX, build_tag_index
+
+if TYPE_CHECKING:
+    import xmlschema
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +52,11 @@ _THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 DEFAULT_XSD = os.path.join(_THIS_DIR, "fpml-com-5-12.xsd")
 DEFAULT_OUTPUT = os.path.join(_THIS_DIR, "fpml_tags.json")
 
+# Bump when the generated structure changes so cached outputs are rebuilt
+PARSER_VERSION = 4
+
+_SCHEMA_LOCATION_RE = re.compile(rb'schemaLocation\s*=\s*["\']([^"\']+)["\']')
+
 
 def strip_namespace(tag: str) -> str:
     """
@@ -56,26 +82,135 @@ def extract_documentation(element) -> str:
     return doc_text
 
 
+_XSD_TO_PYTHON = {
+    "decimal": "float",
+    "float": "float",
+    "double": "float",
+    "int": "int",
+    "integer": "int",
+    "long": "int",
+    "string": "str",
+    "boolean": "bool",
+    "date": "date",
+    "dateTime": "datetime",
+}
+
+
 def map_xsd_type_to_python(xsd_type: str) -> str:
     """
     Map an XSD data type string to a Python type name.
 
-    :param xsd_type: XSD type (e.g. ``xsd:decimal``).
+    :param xsd_type: XSD type, prefixed (``xsd:decimal``), namespaced
+                     (``{http://www.w3.org/2001/XMLSchema}decimal``) or bare.
     :return: Python type name string.
     """
-    type_mapping = {
-        "xsd:decimal": "float",
-        "xsd:float": "float",
-        "xsd:double": "float",
-        "xsd:int": "int",
-        "xsd:integer": "int",
-        "xsd:long": "int",
-        "xsd:string": "str",
-        "xsd:boolean": "bool",
-        "xsd:date": "date",
-        "xsd:dateTime": "datetime",
-    }
-    return type_mapping.get(xsd_type, "unknownType")
+    return _XSD_TO_PYTHON.get(strip_namespace(xsd_type).split(":")[-1], "unknownType")
+
+
+def resolve_python_type(xsd_type) -> str:
+    """
+    Resolve the Python type of a simple type, or of a complex type's simple content.
+
+    Walks the restriction chain until it reaches a built-in type that
+    :func:`map_xsd_type_to_python` knows, so e.g. ``PositiveDecimal`` maps to
+    ``float`` and ``nonNegativeInteger`` to ``int``.
+
+    :param xsd_type: An xmlschema type object.
+    :return: Python type name string (``unknownType`` if unresolved).
+    """
+    if xsd_type.is_complex():
+        if not xsd_type.has_simple_content():
+            return "unknownType"
+        xsd_type = xsd_type.content
+    while xsd_type is not None:
+        if xsd_type.name:
+            python_type = map_xsd_type_to_python(xsd_type.name)
+            if python_type != "unknownType":
+                return python_type
+        xsd_type = getattr(xsd_type, "base_type", None)
+    return "unknownType"
+
+
+class ElementProcessor:
+    """
+    Expands XSD elements into tag dictionaries, memoizing per XSD type.
+
+    FpML reuses a small set of complex types (party references, schedules,
+    quantities...) across thousands of elements. The children of each type
+    are expanded once and the resulting dict is shared by every element of
+    that type. A type that is reached again while it is still being expanded
+    (a recursive content model) becomes a reference node: ``children`` is
+    empty and ``ref`` names the type, so expansion always terminates.
+    """
+
+    def __init__(self) -> None:
+        from xmlschema.validators import XsdAtomicRestriction
+
+        self._atomic_restriction = XsdAtomicRestriction
+        self._children: Dict[int, Dict[str, Any]] = {}
+        self._attributes: Dict[int, List[str]] = {}
+        self._in_progress: Set[int] = set()
+        self.cache_hits = 0
+        self.references = 0
+
+    def process_element(self, element) -> Dict[str, Any]:
+        """
+        Build a dictionary with the element's type, documentation, and children.
+
+        :param element: An xmlschema element object.
+        :return: Dict describing the element.
+        """
+        tag_info: Dict[str, Any] = {
+            "type": None,
+            "documentation": extract_documentation(element),
+            "python_type": "unknownType",
+            "children": {},
+        }
+
+        if getattr(element, "substitution_group", None):
+            tag_info["substitution_group"] = strip_namespace(element.substitution_group)
+
+        xsd_type = element.type
+        if xsd_type.is_simple() or isinstance(xsd_type, self._atomic_restriction):
+            tag_info["type"] = "simpleType"
+            tag_info["python_type"] = resolve_python_type(xsd_type)
+
+        elif xsd_type.is_complex():
+            tag_info["type"] = "complexType"
+            tag_info["python_type"] = resolve_python_type(xsd_type)
+            type_key = id(xsd_type)
+            attributes = self._attribute_names(xsd_type, type_key)
+            if attributes:
+                tag_info["attributes"] = attributes
+            if type_key in self._in_progress:
+                self.references += 1
+                tag_info["ref"] = strip_namespace(xsd_type.name or element.name)
+            elif type_key in self._children:
+                self.cache_hits += 1
+                tag_info["children"] = self._children[type_key]
+            else:
+                self._in_progress.add(type_key)
+                try:
+                    children: Dict[str, Any] = {}
+                    if hasattr(xsd_type.content, "iter_elements"):
+                        for child in xsd_type.content.iter_elements():
+                            children[strip_namespace(child.name)] = self.process_element(child)
+                finally:
+                    self._in_progress.discard(type_key)
+                self._children[type_key] = children
+                tag_info["children"] = children
+
+        return tag_info
+
+    def _attribute_names(self, xsd_type, type_key: int) -> List[str]:
+        # Wildcards (xsd:anyAttribute) are keyed by None and not listed
+        try:
+            return self._attributes[type_key]
+        except KeyError:
+            pass
+        names = sorted(strip_namespace(name) for name in getattr(xsd_type, "attributes", {}) if name)
+        self._attributes[type_key] = names
+        return names
 
 
 def process_element(element) -> Dict[str, Any]:
@@ -86,45 +221,109 @@ def process_element(element) -> Dict[str, Any]:
     :param element: An xmlschema element object.
     :return: Dict describing the element.
     """
-    tag_info: Dict[str, Any] = {
-        "type": None,
-        "documentation": extract_documentation(element),
-        "python_type": "unknownType",
-        "children": {},
-    }
+    return ElementProcessor().process_element(element)
+
+
+# Per-process state for parallel parsing (see parse_xsd_schema)
+_WORKER_SCHEMA: Optional["xmlschema.XMLSchema"] = None
+_WORKER_PROCESSOR: Optional[ElementProcessor] = None
+
 
-    if element.type.is_simple() or isinstance(element.type, xmlschema.validators.XsdAtomicRestriction):
-        tag_info["type"] = "simpleType"
-        base = str(element.type.base_type) if element.type.base_type else ""
-        tag_info["python_type"] = map_xsd_type_to_python(base)
+def _init_worker(xsd_file: str) -> None:
+    global _WORKER_SCHEMA, _WORKER_PROCESSOR
+    import xmlschema
 
-    elif element.type.is_complex():
-        tag_info["type"] = "complexType"
-        if hasattr(element.type.content, "iter_elements"):
-            for child in element.type.content.iter_elements():
-                tag_info["children"][strip_namespace(child.name)] = process_element(child)
+    _WORKER_SCHEMA = xmlschema.XMLSchema(xsd_file)
+    _WORKER_PROCESSOR = ElementProcessor()
 
-    return tag_info
 
+def _process_elements(elem_names: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+    return [
+        (strip_namespace(name), _WORKER_PROCESSOR.process_element(_WORKER_SCHEMA.elements[name])) for name in elem_names
+    ]
 
-def parse_xsd_schema(xsd_file: str) -> Dict[str, dict]:
+
+def parse_xsd_schema(xsd_file: str, workers: int = 1) -> Dict[str, dict]:
     """
     Parse an XSD file and return a dictionary of all top-level elements.
 
+    With ``workers > 1`` the top-level elements are split across a process
+    pool. Each worker loads the schema once and keeps its own type cache, so
+    this only pays off when expansion, rather than schema loading, dominates.
+
     :param xsd_file: Path to the FpML XSD file.
+    :param workers: Number of worker processes (1 parses in-process).
     :return: Dict mapping element names to their parsed structure.
+    :raises ValueError: If ``workers`` is less than 1.
     """
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1, got {workers}")
+
+    import xmlschema
+
     logger.info("Parsing XSD schema: %s", xsd_file)
     schema = xmlschema.XMLSchema(xsd_file)
+    elem_names = list(schema.elements)
 
     fpml_tags: Dict[str, dict] = {}
-    for elem_name, element in schema.elements.items():
-        fpml_tags[strip_namespace(elem_name)] = process_element(element)
+    if workers == 1 or len(elem_names) < 2:
+        processor = ElementProcessor()
+        for elem_name in elem_names:
+            fpml_tags[strip_namespace(elem_name)] = processor.process_element(schema.elements[elem_name])
+        logger.debug("Type cache: %d hits, %d recursive references", processor.cache_hits, processor.references)
+    else:
+        chunks = [elem_names[i::workers] for i in range(workers)]
+        parsed: Dict[str, dict] = {}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(xsd_file,)) as executor:
+            for results in executor.map(_process_elements, chunks):
+                parsed.update(results)
+        # Preserve schema order regardless of how the work was split
+        for elem_name in elem_names:
+            name = strip_namespace(elem_name)
+            fpml_tags[name] = parsed[name]
 
     logger.info("Parsed %d top-level elements", len(fpml_tags))
     return fpml_tags
 
 
+def schema_fingerprint(xsd_file: str) -> Dict[str, str]:
+    """
+    Hash an XSD file and every schema it includes, imports or redefines.
+
+    Referenced files are found by scanning ``schemaLocation`` attributes, so
+    the fingerprint can be computed without loading the schema. References
+    that do not exist locally (e.g. remote imports) are skipped.
+
+    :param xsd_file: Path to the root XSD file.
+    :return: Dict mapping each absolute file path to its SHA-256 hex digest.
+    """
+    fingerprint: Dict[str, str] = {}
+    pending = [os.path.abspath(xsd_file)]
+    while pending:
+        path = pending.pop()
+        if path in fingerprint or not os.path.isfile(path):
+            continue
+        with open(path, "rb") as fh:
+            content = fh.read()
+        fingerprint[path] = hashlib.sha256(content).hexdigest()
+        base_dir = os.path.dirname(path)
+        for location in _SCHEMA_LOCATION_RE.findall(content):
+            pending.append(os.path.normpath(os.path.join(base_dir, location.decode("utf-8"))))
+    return dict(sorted(fingerprint.items()))
+
+
+def _fingerprint_path(output_file: str) -> str:
+    return output_file + ".fingerprint"
+
+
+def _load_fingerprint(output_file: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_fingerprint_path(output_file), "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (IOError, OSError, json.JSONDecodeError):
+        return None
+
+
 def save_fpml_tags(fpml_tags: Dict[str, dict], output_file: str) -> None:
     """
     Save the parsed FpML tags dictionary to a JSON file.
@@ -138,6 +337,46 @@ def save_fpml_tags(fpml_tags: Dict[str, dict], output_file: str) -> None:
     logger.info("Saved %d elements to %s (%.1f MB)", len(fpml_tags), output_file, size_mb)
 
 
+def generate_fpml_tags(
+    xsd_file: str = DEFAULT_XSD,
+    output_file: str = DEFAULT_OUTPUT,
+    index_file: Optional[str] = DEFAULT_INDEX,
+    *,
+    workers: int = 1,
+    force: bool = False,
+) -> bool:
+    """
+    Regenerate the tags JSON (and index) unless the XSD sources are unchanged.
+
+    A fingerprint of every XSD file in the include closure is stored next to
+    ``output_file``. When it matches and the outputs exist, nothing is parsed.
+
+    :param xsd_file: Path to the root XSD file.
+    :param output_file: Destination JSON path.
+    :param index_file: Destination index path, or ``None`` to skip the index.
+    :param workers: Number of worker processes for parsing.
+    :param force: Regenerate even if the fingerprint matches.
+    :return: ``True`` if the outputs were regenerated, ``False`` if up to date.
+    """
+    fingerprint = {
+        "parser_version": PARSER_VERSION,
+        "files": schema_fingerprint(xsd_file),
+    }
+    outputs = [output_file] + ([index_file] if index_file else [])
+
+    if not force and _load_fingerprint(output_file) == fingerprint and all(os.path.exists(p) for p in outputs):
+        logger.info("FpML tags are up to date with %s; skipping parse", xsd_file)
+        return False
+
+    fpml_tags = parse_xsd_schema(xsd_file, workers=workers)
+    save_fpml_tags(fpml_tags, output_file)
+    if index_file:
+        build_tag_index(fpml_tags, index_file)
+    with open(_fingerprint_path(output_file), "w", encoding="utf-8") as fh:
+        json.dump(fingerprint, fh, indent=2)
+    return True
+
+
 def main() -> None:
     """CLI entry point for generating the FpML tags JSON."""
     parser = argparse.ArgumentParser(description="Parse FpML XSD schemas and generate a JSON tag dictionary.")
@@ -153,6 +392,23 @@ def main() -> None:
         default=DEFAULT_OUTPUT,
         help=f"Output JSON file path (default: {DEFAULT_OUTPUT})",
     )
+    parser.add_argument(
+        "--index",
+        type=str,
+        default=DEFAULT_INDEX,
+        help=f"Output index file path (default: {DEFAULT_INDEX})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for parsing top-level elements (default: 1).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate even if the XSD files are unchanged.",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -165,9 +421,10 @@ def main() -> None:
         format="%(asctime)s [%(levelname)s] %(message)s",
     )
 
-    fpml_tags = parse_xsd_schema(args.xsd)
-    save_fpml_tags(fpml_tags, args.output)
-    print(f"Done. {len(fpml_tags)} elements written to {args.output}")
+    if generate_fpml_tags(args.xsd, args.output, args.index, workers=args.workers, force=args.force):
+        print(f"Done. FpML tags written to {args.output} and {args.index}")
+    else:
+        print(f"Up to date. {args.output} matches {args.xsd}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+fpml_tag_index.py
+
+Compile the parsed FpML tag dictionary into a compact binary index and read it
+back through a memory map.
+
+``get_fpml_tags()`` used to ``json.load`` the whole multi-MB tag dictionary on
+first use, which costs hundreds of milliseconds and tens of MB of RSS even when
+a service only needs a handful of element definitions. The index stores the
+same tree as fixed-size node records plus a deduplicated string table, so
+opening it is a single ``mmap`` call and only the nodes actually touched are
+decoded.
+
+File layout (all integers little-endian ``uint32``)::
+
+    header        magic, version, counts and section offsets
+    string index  (offset, length) per unique string
+    string data   concatenated UTF-8 bytes
+    nodes         one record per element, breadth-first, so the children of
+                  any node occupy a contiguous run of records
+    hash table    open-addressed (crc32(path), node_id + 1) slots keyed on the
+                  ``/``-separated element path
+
+Lookups hash the path, probe the table and confirm the hit by walking parent
+links, so finding any element by name or path is O(1) in the number of
+elements.
+
+Usage:
+    python fpml_tag_index.py --json fpml_tags.json --output fpml_tags.idx
+
+    index = FpmlTagIndex.open("fpml_tags.idx")
+    leg = index["bullionPhysicalLeg"]
+    leg["children"]["payerPartyReference"]["documentation"]
+    index.lookup("bullionPhysicalLeg/deliveryLocation")
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+from collections import deque
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+__all__ = (
+    "PATH_SEPARATOR",
+    "FpmlTagIndex",
+    "FpmlTagNode",
+    "build_tag_index",
+    "build_tag_index_from_json",
+)
+
+logger = logging.getLogger(__name__)
+
+_THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_JSON = os.path.join(_THIS_DIR, "fpml_tags.json")
+DEFAULT_INDEX = os.path.join(_THIS_DIR, "fpml_tags.idx")
+
+PATH_SEPARATOR = "/"
+
+_MAGIC = b"FPMLTIDX"
+_VERSION = 2
+_NONE = 0xFFFFFFFF
+
+# magic, version, root_count, node_count, string_count,
+# string_index_offset, string_data_offset, node_offset, hash_offset, hash_slots
+_HEADER = struct.Struct("<8s9I")
+_STRING_ENTRY = struct.Struct("<2I")
+# name, parent, flags, type, documentation, python_type, base, ref, substitution_group,
+# xsd_attributes, first_child, child_count
+_NODE = struct.Struct("<12I")
+_SLOT = struct.Struct("<2I")
+
+# Scalar attributes a parsed element may carry, in node-record order
+_ATTRIBUTES = ("type", "documentation", "python_type", "base", "ref", "substitution_group")
+_HAS_CHILDREN_FLAG = 1 << len(_ATTRIBUTES)
+# Declared XSD attribute names of a complex type, stored as one space-separated string
+_XSD_ATTRIBUTES = "attributes"
+_HAS_XSD_ATTRIBUTES_FLAG = _HAS_CHILDREN_FLAG << 1
+_XSD_ATTRIBUTES_FIELD = 3 + len(_ATTRIBUTES)
+
+
+def _path_hash(path: str) -> int:
+    return zlib.crc32(path.encode("utf-8"))
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+def build_tag_index(fpml_tags: Mapping[str, Any], output_file: str) -> int:
+    """
+    Compile a parsed FpML tag dictionary into a binary index file.
+
+    The dictionary is the structure produced by
+    :func:`~hgraph_trade.fpml_xsd_reference_files.fpml_XSD_parser.parse_xsd_schema`.
+    The file is written to a temporary name and renamed into place, so readers
+    never observe a half-written index.
+
+    :param fpml_tags: Mapping of top-level element names to parsed elements.
+    :param output_file: Destination index path.
+    :return: Number of element nodes written.
+    :raises ValueError: If an element carries an attribute the index cannot store.
+    """
+    strings: Dict[str, int] = {}
+
+    def intern(value: Optional[str]) -> int:
+        if value is None:
+            return _NONE
+        sid = strings.get(value)
+        if sid is None:
+            sid = strings[value] = len(strings)
+        return sid
+
+    # Breadth-first numbering keeps every node's children contiguous.
+    # Each entry: [name, parent_id, element, first_child, child_count, path]
+    nodes: List[list] = [[name, _NONE, elem, 0, 0, name] for name, elem in fpml_tags.items()]
+    queue = deque(range(len(nodes)))
+    while queue:
+        node_id = queue.popleft()
+        entry = nodes[node_id]
+        children = entry[2].get("children") or {}
+        entry[3] = len(nodes)
+        entry[4] = len(children)
+        for child_name, child in children.items():
+            queue.append(len(nodes))
+            nodes.append([child_name, node_id, child, 0, 0, entry[5] + PATH_SEPARATOR + child_name])
+
+    node_bytes = bytearray()
+    hash_slots = 1
+    while hash_slots < 2 * len(nodes):
+        hash_slots <<= 1
+    table = [(0, 0)] * hash_slots
+
+    for node_id, (name, parent, elem, first_child, child_count, path) in enumerate(nodes):
+        unknown = set(elem) - set(_ATTRIBUTES) - {"children", _XSD_ATTRIBUTES}
+        if unknown:
+            raise ValueError(f"Element {path!r} has unsupported attributes: {sorted(unknown)}")
+
+        flags = 0
+        attrs = []
+        for bit, attr in enumerate(_ATTRIBUTES):
+            value = elem.get(attr)
+            if attr in elem:
+                flags |= 1 << bit
+            attrs.append(intern(None if value is None else str(value)))
+        if "children" in elem:
+            flags |= _HAS_CHILDREN_FLAG
+        xsd_attributes = None
+        if _XSD_ATTRIBUTES in elem:
+            flags |= _HAS_XSD_ATTRIBUTES_FLAG
+            xsd_attributes = " ".join(elem[_XSD_ATTRIBUTES])
+
+        node_bytes += _NODE.pack(intern(name), parent, flags, *attrs, intern(xsd_attributes), first_child, child_count)
+
+        h = _path_hash(path)
+        slot = h & (hash_slots - 1)
+        while table[slot][1]:
+            slot = (slot + 1) & (hash_slots - 1)
+        table[slot] = (h, node_id + 1)
+
+    string_index = bytearray()
+    string_data = bytearray()
+    for value in strings:
+        encoded = value.encode("utf-8")
+        string_index += _STRING_ENTRY.pack(len(string_data), len(encoded))
+        string_data += encoded
+
+    string_index_offset = _HEADER.size
+    string_data_offset = string_index_offset + len(string_index)
+    node_offset = string_data_offset + len(string_data)
+    node_offset += -node_offset % 4
+    hash_offset = node_offset + len(node_bytes)
+
+    header = _HEADER.pack(
+        _MAGIC,
+        _VERSION,
+        len(fpml_tags),
+        len(nodes),
+        len(strings),
+        string_index_offset,
+        string_data_offset,
+        node_offset,
+        hash_offset,
+        hash_slots,
+    )
+
+    tmp_file = output_file + ".tmp"
+    with open(tmp_file, "wb") as fh:
+        fh.write(header)
+        fh.write(string_index)
+        fh.write(string_data)
+        fh.write(b"\0" * (node_offset - string_data_offset - len(string_data)))
+        fh.write(node_bytes)
+        for h, value in table:
+            fh.write(_SLOT.pack(h, value))
+    os.replace(tmp_file, output_file)
+
+    size_kb = os.path.getsize(output_file) / 1024
+    logger.info(
+        "Wrote FpML tag index %s: %d elements, %d strings (%.1f KB)", output_file, len(nodes), len(strings), size_kb
+    )
+    return len(nodes)
+
+
+def build_tag_index_from_json(json_file: str, output_file: str) -> int:
+    """
+    Compile an existing ``fpml_tags.json`` into a binary index file.
+
+    :param json_file: Path to the JSON written by ``fpml_XSD_parser``.
+    :param output_file: Destination index path.
+    :return: Number of element nodes written.
+    """
+    with open(json_file, "r", encoding="utf-8") as fh:
+        fpml_tags = json.load(fh)
+    return build_tag_index(fpml_tags, output_file)
+
+
+# ---------------------------------------------------------------------------
+# Read
+# ---------------------------------------------------------------------------
+class FpmlTagNode(Mapping[str, Any]):
+    """
+    Read-only view of one element in an :class:`FpmlTagIndex`.
+
+    Behaves like the element dict in ``fpml_tags.json`` (``type``,
+    ``documentation``, ``python_type``, ``attributes``, ``children``...), but every value is
+    decoded from the memory map on access and ``children`` is itself a lazy
+    mapping. Use :meth:`to_dict` to materialise the full subtree.
+    """
+
+    __slots__ = ("_index", "_node_id", "_path")
+
+    def __init__(self, index: "FpmlTagIndex", node_id: int, path: str) -> None:
+        self._index = index
+        self._node_id = node_id
+        self._path = path
+
+    @property
+    def name(self) -> str:
+        return self._path.rsplit(PATH_SEPARATOR, 1)[-1]
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def children(self) -> "FpmlTagChildren":
+        return FpmlTagChildren(self._index, self._node_id, self._path)
+
+    def _keys(self) -> List[str]:
+        flags = self._index._node(self._node_id)[2]
+        keys = [attr for bit, attr in enumerate(_ATTRIBUTES) if flags & (1 << bit)]
+        if flags & _HAS_XSD_ATTRIBUTES_FLAG:
+            keys.append(_XSD_ATTRIBUTES)
+        if flags & _HAS_CHILDREN_FLAG:
+            keys.append("children")
+        return keys
+
+    def __getitem__(self, key: str) -> Any:
+        record = self._index._node(self._node_id)
+        if key == "children" and record[2] & _HAS_CHILDREN_FLAG:
+            return self.children
+        if key == _XSD_ATTRIBUTES and record[2] & _HAS_XSD_ATTRIBUTES_FLAG:
+            names = self._index._string(record[_XSD_ATTRIBUTES_FIELD])
+            return names.split(" ") if names else []
+        if key in _ATTRIBUTES:
+            bit = _ATTRIBUTES.index(key)
+            if record[2] & (1 << bit):
+                return self._index._string(record[3 + bit])
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __repr__(self) -> str:
+        return f"FpmlTagNode({self._path!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialise this element and its whole subtree as plain dicts."""
+        result: Dict[str, Any] = {}
+        for key in self._keys():
+            if key == "children":
+                result[key] = {name: child.to_dict() for name, child in self.children.items()}
+            else:
+                result[key] = self[key]
+        return result
+
+
+class FpmlTagChildren(Mapping[str, FpmlTagNode]):
+    """Lazy mapping of an element's children, backed by the index."""
+
+    __slots__ = ("_index", "_node_id", "_path")
+
+    def __init__(self, index: "FpmlTagIndex", node_id: int, path: str) -> None:
+        self._index = index
+        self._node_id = node_id
+        self._path = path
+
+    def __getitem__(self, name: str) -> FpmlTagNode:
+        node = self._index.lookup(self._path + PATH_SEPARATOR + name)
+        if node is None:
+            raise KeyError(name)
+        return node
+
+    def __iter__(self) -> Iterator[str]:
+        first_child, child_count = self._index._node(self._node_id)[-2:]
+        for child_id in range(first_child, first_child + child_count):
+            yield self._index._string(self._index._node(child_id)[0])
+
+    def __len__(self) -> int:
+        return self._index._node(self._node_id)[-1]
+
+    def __repr__(self) -> str:
+        return f"FpmlTagChildren({self._path!r}, {len(self)} children)"
+
+
+class FpmlTagIndex(Mapping[str, FpmlTagNode]):
+    """
+    Memory-mapped FpML tag index.
+
+    Acts as a read-only mapping of top-level element names to
+    :class:`FpmlTagNode` views, and resolves nested elements by path with
+    :meth:`lookup`. Use :meth:`open` to construct and :meth:`close` (or a
+    ``with`` block) to release the mapping.
+    """
+
+    def __init__(self, buffer: mmap.mmap, path: str) -> None:
+        header = _HEADER.unpack_from(buffer, 0)
+        if header[0] != _MAGIC:
+            raise ValueError(f"{path} is not an FpML tag index")
+        if header[1] != _VERSION:
+            raise ValueError(f"{path} has index version {header[1]}, expected {_VERSION}")
+
+        self._buffer = buffer
+        self.path = path
+        (
+            self._root_count,
+            self._node_count,
+            self._string_count,
+            self._string_index_offset,
+            self._string_data_offset,
+            self._node_offset,
+            self._hash_offset,
+            self._hash_slots,
+        ) = header[2:]
+
+    @classmethod
+    def open(cls, path: str) -> "FpmlTagIndex":
+        """
+        Memory-map an index file written by :func:`build_tag_index`.
+
+        :param path: Path to the index file.
+        :return: An open ``FpmlTagIndex``.
+        :raises FileNotFoundError: If the file does not exist.
+        :raises ValueError: If the file is not a compatible index.
+        """
+        with open(path, "rb") as fh:
+            buffer = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(buffer, path)
+        except Exception:
+            buffer.close()
+            raise
+
+    def close(self) -> None:
+        self._buffer.close()
+
+    def __enter__(self) -> "FpmlTagIndex":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def node_count(self) -> int:
+        """Total number of elements (at every depth) in the index."""
+        return self._node_count
+
+    # -- raw access --------------------------------------------------------
+    def _node(self, node_id: int) -> Tuple[int, ...]:
+        return _NODE.unpack_from(self._buffer, self._node_offset + node_id * _NODE.size)
+
+    def _string(self, string_id: int) -> str:
+        offset, length = _STRING_ENTRY.unpack_from(
+            self._buffer, self._string_index_offset + string_id * _STRING_ENTRY.size
+        )
+        start = self._string_data_offset + offset
+        return self._buffer[start : start + length].decode("utf-8")
+
+    def _matches(self, node_id: int, parts: List[str]) -> bool:
+        for part in reversed(parts):
+            if node_id == _NONE:
+                return False
+            name_id, parent = self._node(node_id)[:2]
+            if self._string(name_id) != part:
+                return False
+            node_id = parent
+        return node_id == _NONE
+
+    # -- lookup ------------------------------------------------------------
+    def lookup(self, path: str) -> Optional[FpmlTagNode]:
+        """
+        Find an element by top-level name or ``/``-separated path.
+
+        :param path: e.g. ``"bullionPhysicalLeg"`` or
+                     ``"bullionPhysicalLeg/deliveryLocation"``.
+        :return: The element view, or ``None`` if no such element exists.
+        """
+        h = _path_hash(path)
+        mask = self._hash_slots - 1
+        slot = h & mask
+        parts: Optional[List[str]] = None
+        while True:
+            slot_hash, value = _SLOT.unpack_from(self._buffer, self._hash_offset + slot * _SLOT.size)
+            if not value:
+                return None
+            if slot_hash == h:
+                if parts is None:
+                    parts = path.split(PATH_SEPARATOR)
+                if self._matches(value - 1, parts):
+                    return FpmlTagNode(self, value - 1, path)
+            slot = (slot + 1) & mask
+
+    def __getitem__(self, name: str) -> FpmlTagNode:
+        node = self.lookup(name) if PATH_SEPARATOR not in name else None
+        if node is None:
+            raise KeyError(name)
+        return node
+
+    def __iter__(self) -> Iterator[str]:
+        for node_id in range(self._root_count):
+            yield self._string(self._node(node_id)[0])
+
+    def __len__(self) -> int:
+        return self._root_count
+
+    def __repr__(self) -> str:
+        return f"FpmlTagIndex({self.path!r}, {self._root_count} elements)"
+
+
+def main() -> None:
+    """CLI entry point for compiling fpml_tags.json into a binary index."""
+    parser = argparse.ArgumentParser(description="Compile the FpML tags JSON into a memory-mapped index.")
+    parser.add_argument(
+        "--json",
+        type=str,
+        default=DEFAULT_JSON,
+        help=f"Parsed FpML tags JSON (default: {DEFAULT_JSON})",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=DEFAULT_INDEX,
+        help=f"Output index file path (default: {DEFAULT_INDEX})",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    node_count = build_tag_index_from_json(args.json, args.output)
+    print(f"Done. {node_count} elements indexed in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,28 @@ hgraph_trade_booker package initialization.
 This package provides functionality to convert executed trades and filled orders
 from upstream systems into a bookable trade message (e.g., FpML format) for
 downstream trade processing applications.
+
+Public names are resolved lazily on first attribute access so that importing a
+single booker module (e.g. ``trade_booker``) does not pull in the whole package.
 """
 
-from .message_wrapper import (
-    create_message_header,
-    create_message_footer,
-    wrap_message_with_headers_and_footers,
-)
-from hgraph_trade.hgraph_trade_mapping import (
-    get_global_mapping,
-    get_instrument_mapping,
-    map_hgraph_to_fpml,
-    map_pricing_instrument,
-)
-from .decomposition import decompose_instrument  # Add this line if you want it publicly available
+from typing import TYPE_CHECKING, Dict
+
+from hgraph_trade.lazy_exports import lazy_exports
+
+if TYPE_CHECKING:
+    from .message_wrapper import (
+        create_message_header,
+        create_message_footer,
+        wrap_message_with_headers_and_footers,
+    )
+    from hgraph_trade.hgraph_trade_mapping import (
+        get_global_mapping,
+        get_instrument_mapping,
+        map_hgraph_to_fpml,
+        map_pricing_instrument,
+    )
+    from .decomposition import decompose_instrument
 
 __all__ = (
     "create_message_header",
@@ -29,3 +37,17 @@ __all__ = (
     "map_pricing_instrument",
     "decompose_instrument",
 )
+
+# Public name -> module that defines it
+_LAZY_ATTRS: Dict[str, str] = {
+    "create_message_header": f"{__name__}.message_wrapper",
+    "create_message_footer": f"{__name__}.message_wrapper",
+    "wrap_message_with_headers_and_footers": f"{__name__}.message_wrapper",
+    "get_global_mapping": "hgraph_trade.hgraph_trade_mapping",
+    "get_instrument_mapping": "hgraph_trade.hgraph_trade_mapping",
+    "map_hgraph_to_fpml": "hgraph_trade.hgraph_trade_mapping",
+    "map_pricing_instrument": "hgraph_trade.hgraph_trade_mapping",
+    "decompose_instrument": f"{__name__}.decomposition",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_ATTRS)
@@ -0,0 +1,507 @@
+"""
+async_pipeline.py
+
+Staged asyncio booking pipeline with bounded queues and backpressure.
+
+The synchronous ``book`` path loads, maps and books every file in one loop, so
+disk writes, Kafka sends and entitlement lookups all stall the CPU-bound
+mapping. This pipeline splits the work into stages connected by bounded
+queues::
+
+    reader -> [load] -> [validate] -> [map] -> [wrap] -> [sink]
+
+* ``load`` reads and pre-validates trade files (or archive members, see
+  ``trade_archive.py``) in worker threads (I/O bound).
+* ``validate`` checks the keys the mapper requires.
+* ``map`` runs ``map_trade_to_model`` in an executor (CPU bound; a process
+  pool by default, so mapping runs in parallel with everything else).
+* ``wrap`` fills in the footer checksum and, if a validator is given, checks
+  the message against FpML.
+* ``sink`` books each message (and optionally sends it to Kafka) in worker
+  threads, quarantining failures as ``book_trades_batch`` does.
+
+Every queue is bounded, so a slow sink fills its queue, blocks the stage
+feeding it, and so on back to the reader, which stops pulling new files. Each
+queue records its depth and how long producers were blocked on it; see
+:meth:`PipelineStats.bottleneck`.
+
+Typical usage::
+
+    pipeline = AsyncBookingPipeline("output", sink_concurrency=8)
+    result = asyncio.run(pipeline.run(paths))
+    print(pipeline.stats.summary())
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from hgraph_trade.hgraph_trade_booker.message_wrapper import seal_message
+from hgraph_trade.hgraph_trade_booker.pipeline_result import PipelineResult, TradeResult, TradeStatus
+from hgraph_trade.hgraph_trade_booker.trade_booker import (
+    BOOKED_MESSAGES,
+    DEFAULT_QUARANTINE_DIR,
+    _quarantine_trade,
+    book_trade,
+)
+from hgraph_trade.hgraph_trade_booker.trade_delta import extract_trade_id
+from hgraph_trade.hgraph_trade_booker.trade_loader import (
+    load_trade_from_dict,
+    load_trade_from_file,
+    load_trade_from_string,
+)
+from hgraph_trade.hgraph_trade_booker.trade_mapper import map_trade_to_model
+
+if TYPE_CHECKING:
+    from hgraph_trade.hgraph_trade_booker.fpml_validator import FpmlValidator
+    from hgraph_trade.hgraph_trade_booker.kafka_sender import KafkaSender
+    from hgraph_trade.hgraph_trade_booker.static_enrichment import StaticDataEnricher
+
+__all__ = (
+    "DEFAULT_QUEUE_SIZE",
+    "DEFAULT_LOAD_CONCURRENCY",
+    "DEFAULT_SINK_CONCURRENCY",
+    "STAGES",
+    "QueueStats",
+    "PipelineStats",
+    "AsyncBookingPipeline",
+    "book_files_async",
+)
+
+logger = logging.getLogger(__name__)
+
+# Default capacity of each inter-stage queue
+DEFAULT_QUEUE_SIZE = 64
+
+# Default number of concurrent file loads and sink writes
+DEFAULT_LOAD_CONCURRENCY = 4
+DEFAULT_SINK_CONCURRENCY = 8
+
+# Stage names, in pipeline order; each stage consumes the queue of the same name
+STAGES = ("load", "validate", "map", "wrap", "sink")
+
+# Keys map_trade_to_model needs to resolve and build a trade
+_REQUIRED_KEYS = frozenset({"instrument", "tradeType"})
+
+# Status recorded when a stage handler raises unexpectedly
+_STAGE_FAILURE = {
+    "load": TradeStatus.VALIDATION_FAILED,
+    "validate": TradeStatus.VALIDATION_FAILED,
+    "map": TradeStatus.MAPPING_FAILED,
+    "wrap": TradeStatus.MAPPING_FAILED,
+    "sink": TradeStatus.BOOKING_FAILED,
+}
+
+# A queue whose mean fill is at least this fraction of capacity is backed up
+_BACKED_UP_UTILISATION = 0.5
+
+_STOP = object()
+
+# Shared with book_trades_batch so both booking paths feed one series
+_BOOKED, _FAILED, _INVALID = (BOOKED_MESSAGES.labels(outcome) for outcome in ("booked", "failed", "invalid"))
+
+
+@dataclass
+class QueueStats:
+    """Depth and backpressure counters for one inter-stage queue.
+
+    :param name: Name of the stage consuming the queue.
+    :param maxsize: Queue capacity.
+    :param puts: Items put on the queue.
+    :param blocked_puts: Puts that had to wait because the queue was full.
+    :param blocked_seconds: Total time producers spent waiting on a full queue.
+    :param high_water: Largest depth observed.
+    """
+
+    name: str
+    maxsize: int
+    puts: int = 0
+    blocked_puts: int = 0
+    blocked_seconds: float = 0.0
+    high_water: int = 0
+    _depth_total: int = field(default=0, repr=False)
+
+    @property
+    def mean_depth(self) -> float:
+        """Mean depth seen by producers, including the item just put."""
+        return self._depth_total / self.puts if self.puts else 0.0
+
+    @property
+    def utilisation(self) -> float:
+        """Mean depth as a fraction of capacity."""
+        return self.mean_depth / self.maxsize if self.maxsize else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialise the counters for logging/reporting."""
+        return {
+            "name": self.name,
+            "maxsize": self.maxsize,
+            "puts": self.puts,
+            "blocked_puts": self.blocked_puts,
+            "blocked_seconds": round(self.blocked_seconds, 6),
+            "high_water": self.high_water,
+            "mean_depth": round(self.mean_depth, 3),
+        }
+
+
+@dataclass
+class PipelineStats:
+    """Per-queue statistics for a pipeline run, in stage order."""
+
+    queues: Dict[str, QueueStats] = field(default_factory=dict)
+
+    def bottleneck(self) -> Optional[str]:
+        """
+        Name of the stage limiting throughput, or None if no queue backed up.
+
+        Backpressure fills every queue upstream of a slow stage, so the
+        bottleneck is the consumer of the most downstream backed-up queue.
+        """
+        for name in reversed(STAGES):
+            stats = self.queues.get(name)
+            if stats is not None and stats.utilisation >= _BACKED_UP_UTILISATION:
+                return name
+        return None
+
+    def summary(self) -> str:
+        """Human-readable table of queue depths."""
+        lines = ["Queue depths:"]
+        for stats in self.queues.values():
+            lines.append(
+                f"  {stats.name:<9} mean {stats.mean_depth:6.1f}/{stats.maxsize:<4} "
+                f"high {stats.high_water:<4} blocked {stats.blocked_puts} put(s), {stats.blocked_seconds:.3f}s"
+            )
+        lines.append(f"  Bottleneck: {self.bottleneck() or 'none'}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialise all queue statistics."""
+        return {"queues": [stats.to_dict() for stats in self.queues.values()], "bottleneck": self.bottleneck()}
+
+
+class _MeteredQueue:
+    """Bounded asyncio queue that records depth and blocked-put time."""
+
+    def __init__(self, stats: QueueStats) -> None:
+        self.stats = stats
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=stats.maxsize)
+
+    async def put(self, item: Any) -> None:
+        if self._queue.full():
+            started = time.perf_counter()
+            await self._queue.put(item)
+            self.stats.blocked_puts += 1
+            self.stats.blocked_seconds += time.perf_counter() - started
+        else:
+            self._queue.put_nowait(item)
+        depth = self._queue.qsize()
+        self.stats.puts += 1
+        self.stats._depth_total += depth
+        if depth > self.stats.high_water:
+            self.stats.high_water = depth
+
+    async def get(self) -> Any:
+        return await self._queue.get()
+
+    def requeue_stop(self) -> None:
+        # Called by a worker that saw _STOP, so its siblings see it too. Only the
+        # single _STOP can be in the queue at this point, so it never blocks.
+        self._queue.put_nowait(_STOP)
+
+
+class AsyncBookingPipeline:
+    """
+    Books trade files through a staged asyncio pipeline.
+
+    :param output_dir: Directory for booked trades.
+    :param quarantine_dir: Directory for failed trades. Defaults to ``output_dir/quarantine``.
+    :param queue_size: Capacity of each inter-stage queue.
+    :param load_concurrency: Number of concurrent file loads.
+    :param map_workers: Number of concurrent mapping tasks (and process-pool
+                        workers if ``map_executor`` is not given). Defaults to the CPU count.
+    :param sink_concurrency: Number of concurrent book/send tasks.
+    :param map_executor: Executor for mapping. Defaults to a process pool owned by the pipeline.
+    :param validator: Optional ``FpmlValidator`` run on every mapped message.
+    :param sender: Optional ``KafkaSender``; booked messages are also sent to ``topic``.
+    :param topic: Kafka topic for ``sender``.
+    :param fail_fast: Stop reading new files after the first failure.
+    :param user_id: Passed to ``map_trade_to_model`` for the entitlements check.
+    :param enricher: Optional ``StaticDataEnricher`` applied to each mapped message. It runs
+                     on the event loop (lookups are in memory) so its snapshot is never
+                     shipped to the mapping processes.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        *,
+        quarantine_dir: Optional[str] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        load_concurrency: int = DEFAULT_LOAD_CONCURRENCY,
+        map_workers: Optional[int] = None,
+        sink_concurrency: int = DEFAULT_SINK_CONCURRENCY,
+        map_executor: Optional[Executor] = None,
+        validator: Optional["FpmlValidator"] = None,
+        sender: Optional["KafkaSender"] = None,
+        topic: Optional[str] = None,
+        fail_fast: bool = False,
+        user_id: Optional[str] = None,
+        enricher: Optional["StaticDataEnricher"] = None,
+    ) -> None:
+        if map_workers is None:
+            map_workers = os.cpu_count() or 1
+        for name, value in (
+            ("queue_size", queue_size),
+            ("load_concurrency", load_concurrency),
+            ("map_workers", map_workers),
+            ("sink_concurrency", sink_concurrency),
+        ):
+            if value < 1:
+                raise ValueError(f"{name} must be >= 1, got {value}")
+        if sender is not None and not topic:
+            raise ValueError("topic is required when a sender is given")
+
+        self.output_dir = output_dir
+        self.quarantine_dir = quarantine_dir or os.path.join(output_dir, DEFAULT_QUARANTINE_DIR)
+        self.queue_size = queue_size
+        self.concurrency = {
+            "load": load_concurrency,
+            "validate": 1,
+            "map": map_workers,
+            "wrap": 1,
+            "sink": sink_concurrency,
+        }
+        self.map_executor = map_executor
+        self.validator = validator
+        self.sender = sender
+        self.topic = topic
+        self.fail_fast = fail_fast
+        self.user_id = user_id
+        self.enricher = enricher
+        self.stats = PipelineStats()
+
+        self._result = PipelineResult()
+        self._stopping = False
+        self._executor: Optional[Executor] = None
+
+    # ------------------------------------------------------------------
+    # Bookkeeping
+    # ------------------------------------------------------------------
+    def _fail(self, trade_id: str, status: TradeStatus, stage: str, exc: Exception) -> None:
+        logger.error("Trade %s failed at %s: %s", trade_id, stage, exc)
+        self._result.add(TradeResult(trade_id=trade_id, status=status, message=str(exc), error=exc, stage=stage))
+        if self.fail_fast:
+            self._stopping = True
+
+    # ------------------------------------------------------------------
+    # Stage handlers: item -> list of items for the next stage
+    # ------------------------------------------------------------------
+    async def _load(self, item: Union[str, Tuple[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+        path, content = item if isinstance(item, tuple) else (item, None)
+        try:
+            if isinstance(content, Exception):
+                raise content
+            if content is None:
+                trade_data = await asyncio.to_thread(load_trade_from_file, path)
+            elif isinstance(content, dict):
+                trade_data = load_trade_from_dict(content, path)
+            else:
+                trade_data = await asyncio.to_thread(load_trade_from_string, content, path)
+        except (ValueError, OSError) as exc:
+            self._fail(path, TradeStatus.VALIDATION_FAILED, "loading", exc)
+            return []
+        return [(str(trade_data.get("trade_id", path)), trade_data)]
+
+    async def _validate(self, item: Tuple[str, Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+        trade_id, trade_data = item
+        missing = _REQUIRED_KEYS - trade_data.keys()
+        if missing:
+            self._fail(
+                trade_id, TradeStatus.VALIDATION_FAILED, "validation", ValueError(f"Missing required keys: {missing}")
+            )
+            return []
+        return [item]
+
+    async def _map(self, item: Tuple[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        trade_id, trade_data = item
+        loop = asyncio.get_running_loop()
+        try:
+            messages = await loop.run_in_executor(
+                self._executor,
+                functools.partial(map_trade_to_model, trade_data, fail_fast=self.fail_fast, user_id=self.user_id),
+            )
+            if not messages:
+                raise ValueError("Mapping produced zero trade messages")
+            if self.enricher is not None:
+                for message in messages:
+                    self.enricher.enrich(message)
+        except Exception as exc:
+            self._fail(trade_id, TradeStatus.MAPPING_FAILED, "mapping", exc)
+            return []
+        self._result.add(
+            TradeResult(
+                trade_id=trade_id,
+                status=TradeStatus.SUCCESS,
+                message=f"Mapped {len(messages)} message(s)",
+                stage="mapping",
+            )
+        )
+        return messages
+
+    async def _wrap(self, message: Dict[str, Any]) -> List[Tuple[Dict[str, Any], Optional[List[str]]]]:
+        seal_message(message)
+        violations = None
+        if self.validator is not None:
+            found = self.validator.validate(message)
+            if found:
+                violations = [str(v) for v in found]
+        return [(message, violations)]
+
+    async def _sink(self, item: Tuple[Dict[str, Any], Optional[List[str]]]) -> List[Any]:
+        message, violations = item
+        trade_id = extract_trade_id(message, "unknown")
+        filename = f"{trade_id}.json"
+
+        if violations is not None:
+            error = f"FpML validation failed with {len(violations)} violation(s)"
+            await asyncio.to_thread(
+                _quarantine_trade, message, trade_id, filename, self.quarantine_dir, error, violations
+            )
+            self._fail(trade_id, TradeStatus.VALIDATION_FAILED, "validation", ValueError(error))
+            _INVALID.inc()
+            return []
+
+        try:
+            await asyncio.to_thread(book_trade, message, filename, self.output_dir)
+        except (IOError, OSError) as exc:
+            await asyncio.to_thread(_quarantine_trade, message, trade_id, filename, self.quarantine_dir, str(exc))
+            self._fail(trade_id, TradeStatus.BOOKING_FAILED, "booking", exc)
+            _FAILED.inc()
+            return []
+        _BOOKED.inc()
+
+        if self.sender is not None:
+            try:
+                await asyncio.to_thread(self.sender.send_to_kafka, self.topic, message)
+            except Exception as exc:
+                self._fail(trade_id, TradeStatus.SEND_FAILED, "sending", exc)
+        return []
+
+    # ------------------------------------------------------------------
+    # Plumbing
+    # ------------------------------------------------------------------
+    async def _worker(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[List[Any]]],
+        inbox: _MeteredQueue,
+        outbox: Optional[_MeteredQueue],
+    ) -> None:
+        while True:
+            item = await inbox.get()
+            if item is _STOP:
+                inbox.requeue_stop()
+                return
+            try:
+                outputs = await handler(item)
+            except Exception as exc:
+                # Handlers record expected failures themselves; never let one kill the stage.
+                logger.exception("Unexpected error in %s stage", name)
+                self._fail("unknown", _STAGE_FAILURE[name], name, exc)
+                continue
+            for out in outputs:
+                await outbox.put(out)
+
+    async def _stage(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[List[Any]]],
+        inbox: _MeteredQueue,
+        outbox: Optional[_MeteredQueue],
+    ) -> None:
+        await asyncio.gather(*(self._worker(name, handler, inbox, outbox) for _ in range(self.concurrency[name])))
+        if outbox is not None:
+            await outbox.put(_STOP)
+
+    async def _read(self, paths: Iterable[str], outbox: _MeteredQueue) -> None:
+        # Advancing a lazy source may block (an HTTP fetch, a tar streamed from stdin):
+        # do it off the event loop so the other stages keep running meanwhile
+        in_memory = isinstance(paths, (list, tuple))
+        items = iter(paths)
+        while True:
+            path = next(items, _STOP) if in_memory else await asyncio.to_thread(next, items, _STOP)
+            if path is _STOP:
+                break
+            if self._stopping:
+                logger.warning("Stopping after first failure; remaining files not read")
+                break
+            await outbox.put(path)
+        await outbox.put(_STOP)
+
+    async def run(self, paths: Iterable[Union[str, Tuple[str, Any]]]) -> PipelineResult:
+        """
+        Book every file in ``paths``.
+
+        ``paths`` is consumed lazily, only as fast as the pipeline drains.
+
+        :param paths: Trade file paths, ``(name, content)`` pairs as yielded by
+                      ``iter_archive_members``, or ``(trade_id, trade_data)`` pairs
+                      for already-fetched trades (any iterable, e.g. a generator).
+        :return: A finalised ``PipelineResult``: one mapping result per file
+                 plus one failure per message that could not be booked or sent.
+        """
+        self._result = PipelineResult()
+        self._stopping = False
+        self.stats = PipelineStats({name: QueueStats(name, self.queue_size) for name in STAGES})
+        queues = {name: _MeteredQueue(stats) for name, stats in self.stats.queues.items()}
+        handlers = {
+            "load": self._load,
+            "validate": self._validate,
+            "map": self._map,
+            "wrap": self._wrap,
+            "sink": self._sink,
+        }
+
+        owns_executor = self.map_executor is None
+        self._executor = ProcessPoolExecutor(self.concurrency["map"]) if owns_executor else self.map_executor
+        try:
+            stages = [
+                self._stage(name, handlers[name], queues[name], queues[STAGES[i + 1]] if i + 1 < len(STAGES) else None)
+                for i, name in enumerate(STAGES)
+            ]
+            await asyncio.gather(self._read(paths, queues["load"]), *stages)
+        finally:
+            if owns_executor:
+                self._executor.shutdown(wait=True)
+
+        self._result.finalise()
+        logger.info(
+            "Async pipeline complete: %d succeeded, %d failed; bottleneck: %s",
+            self._result.success_count,
+            self._result.failure_count,
+            self.stats.bottleneck() or "none",
+        )
+        return self._result
+
+
+def book_files_async(
+    paths: Iterable[Union[str, Tuple[str, Any]]],
+    output_dir: str,
+    **options: Any,
+) -> Tuple[PipelineResult, PipelineStats]:
+    """
+    Run an :class:`AsyncBookingPipeline` to completion from synchronous code.
+
+    :param paths: Trade file paths or ``(name, content)`` archive members.
+    :param output_dir: Directory for booked trades.
+    :param options: Keyword arguments for ``AsyncBookingPipeline``.
+    :return: ``(result, stats)`` for the run.
+    """
+    pipeline = AsyncBookingPipeline(output_dir, **options)
+    result = asyncio.run(pipeline.run(paths))
+    return result, pipeline.stats
@@ -0,0 +1,292 @@
+"""
+duplicate_filter.py
+
+Probabilistic duplicate suppression for trade booking.
+
+Upstream retries re-send trades that have already been booked. Checking the
+output directory for every message costs a filesystem stat (or read) per
+trade; a Bloom filter of booked ``(tradeId, message checksum)`` pairs answers
+"definitely not booked" from memory for the overwhelming majority of
+messages. Only positive hits fall through to an exact check, which is answered
+from the pairs booked in this process when possible and from disk otherwise.
+
+The filter is persisted next to the booked trades (``booked_trades.bloom``)
+and can be rebuilt from the output directory at any time, so losing or
+deleting it never loses correctness, only speed.
+
+Typical usage::
+
+    dup_filter = BookedTradeFilter.open_or_rebuild("output")
+    result = book_trades_batch(messages, "output", duplicate_filter=dup_filter)
+    dup_filter.save()
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import struct
+from typing import Callable, Dict, Optional, Tuple
+
+from hgraph_trade.hgraph_trade_booker.trade_delta import (
+    content_checksum,
+    extract_trade_content,
+    extract_trade_id,
+    message_checksum,
+)
+
+__all__ = (
+    "DEFAULT_FILTER_FILE",
+    "DEFAULT_FILTER_CAPACITY",
+    "DEFAULT_FILTER_ERROR_RATE",
+    "BloomFilter",
+    "BookedTradeFilter",
+    "booked_trade_key",
+)
+
+logger = logging.getLogger(__name__)
+
+# Filter file written in the output directory
+DEFAULT_FILTER_FILE = "booked_trades.bloom"
+
+# Sized for a million booked trades at a 0.1% false-positive rate (~1.8 MB)
+DEFAULT_FILTER_CAPACITY = 1_000_000
+DEFAULT_FILTER_ERROR_RATE = 0.001
+
+# Version 2: keys carry the message type (see message_checksum); older filters are rebuilt
+_MAGIC = b"HGBLOOM2"
+# magic, bit_count, hash_count, item_count, capacity
+_HEADER = struct.Struct("<8sQIQQ")
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over string keys.
+
+    Bit positions come from double hashing a single 128-bit BLAKE2b digest,
+    so each operation hashes the key once regardless of ``hash_count``.
+
+    :param capacity: Expected number of items.
+    :param error_rate: Target false-positive rate at ``capacity`` items.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_FILTER_CAPACITY, error_rate: float = DEFAULT_FILTER_ERROR_RATE) -> None:
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+        if not 0 < error_rate < 1:
+            raise ValueError(f"error_rate must be between 0 and 1, got {error_rate}")
+        bit_count = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.bit_count = max(8, bit_count)
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0
+        self._bits = bytearray((self.bit_count + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        bit_count = self.bit_count
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % bit_count
+
+    def add(self, key: str) -> None:
+        bits = self._bits
+        for pos in self._positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+        if self.count == self.capacity + 1:
+            logger.warning(
+                "Bloom filter exceeded its capacity of %d items; false positives will rise until it is rebuilt larger",
+                self.capacity,
+            )
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def save(self, path: str) -> None:
+        """Write the filter to ``path`` atomically."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(_HEADER.pack(_MAGIC, self.bit_count, self.hash_count, self.count, self.capacity))
+            fh.write(self._bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        """
+        Read a filter written by :meth:`save`.
+
+        :raises FileNotFoundError: If ``path`` does not exist.
+        :raises ValueError: If the file is not a valid filter.
+        """
+        with open(path, "rb") as fh:
+            header = fh.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError(f"{path} is not a Bloom filter file")
+            magic, bit_count, hash_count, count, capacity = _HEADER.unpack(header)
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a Bloom filter file")
+            bits = fh.read()
+        if len(bits) != (bit_count + 7) // 8:
+            raise ValueError(f"{path} is truncated")
+
+        bloom = cls.__new__(cls)
+        bloom.bit_count = bit_count
+        bloom.hash_count = hash_count
+        bloom.capacity = capacity
+        bloom.count = count
+        bloom._bits = bytearray(bits)
+        return bloom
+
+
+def booked_trade_key(trade_id: str, checksum: str) -> str:
+    """Filter key for a booked ``(tradeId, message_checksum)`` pair."""
+    return f"{trade_id}\x1f{checksum}"
+
+
+def _message_key(message: Dict, default_trade_id: str) -> Optional[Tuple[str, str]]:
+    """(tradeId, message_checksum) of a booked file's message, full or delta."""
+    delta = message.get("tradeDelta")
+    if isinstance(delta, dict):
+        if delta.get("tradeId") and delta.get("checksum"):
+            return delta["tradeId"], message_checksum(delta.get("tradeType", ""), delta["checksum"])
+        return None
+    content = extract_trade_content(message)
+    if not content:
+        return None
+    message_type = message.get("messageHeader", {}).get("messageType", "newTrade")
+    return extract_trade_id(message, default_trade_id), message_checksum(message_type, content_checksum(content))
+
+
+class BookedTradeFilter:
+    """
+    Duplicate detector for booked trades: a Bloom filter plus exact confirmation.
+
+    :param bloom: The underlying Bloom filter.
+    :param path: Where :meth:`save` writes the filter (``None`` keeps it in memory).
+    """
+
+    def __init__(self, bloom: Optional[BloomFilter] = None, path: Optional[str] = None) -> None:
+        self.bloom = bloom if bloom is not None else BloomFilter()
+        self.path = path
+        # Pairs booked by this process, so in-process retries never touch disk
+        self._booked: Dict[str, str] = {}
+        self.negatives = 0
+        self.positives = 0
+        self.false_positives = 0
+        self.duplicates = 0
+
+    @classmethod
+    def rebuild(
+        cls,
+        output_dir: str,
+        path: Optional[str] = None,
+        capacity: int = DEFAULT_FILTER_CAPACITY,
+        error_rate: float = DEFAULT_FILTER_ERROR_RATE,
+    ) -> "BookedTradeFilter":
+        """
+        Build a filter from every booked message in an output directory.
+
+        Every message contributes its tradeId and the ``message_checksum`` of its
+        message type and content: ``messageType`` and the checksum of
+        ``tradeHeader`` + ``tradeEconomics`` for full messages, ``tradeType`` and
+        ``checksum`` for delta messages. Files that cannot be read or are not
+        trade messages are skipped.
+
+        :param output_dir: Directory written by ``book_trades_batch``.
+        :param path: Where the filter is saved (defaults to ``output_dir/booked_trades.bloom``).
+        :param capacity: Expected number of booked trades.
+        :param error_rate: Target false-positive rate.
+        :return: The rebuilt (unsaved) filter.
+        """
+        dup_filter = cls(
+            BloomFilter(capacity, error_rate),
+            path if path is not None else os.path.join(output_dir, DEFAULT_FILTER_FILE),
+        )
+        if not os.path.isdir(output_dir):
+            return dup_filter
+
+        with os.scandir(output_dir) as entries:
+            for entry in entries:
+                if not (entry.is_file() and entry.name.endswith(".json")):
+                    continue
+                try:
+                    with open(entry.path, "r", encoding="utf-8") as fh:
+                        message = json.load(fh)
+                except (IOError, OSError, json.JSONDecodeError) as exc:
+                    logger.warning("Skipping unreadable booked file %s: %s", entry.path, exc)
+                    continue
+                key = _message_key(message, os.path.splitext(entry.name)[0]) if isinstance(message, dict) else None
+                if key is not None:
+                    dup_filter.bloom.add(booked_trade_key(*key))
+
+        logger.info("Rebuilt duplicate filter from %s: %d booked trade(s)", output_dir, len(dup_filter.bloom))
+        return dup_filter
+
+    @classmethod
+    def open_or_rebuild(
+        cls,
+        output_dir: str,
+        capacity: int = DEFAULT_FILTER_CAPACITY,
+        error_rate: float = DEFAULT_FILTER_ERROR_RATE,
+    ) -> "BookedTradeFilter":
+        """
+        Load ``output_dir/booked_trades.bloom``, rebuilding it if missing or unreadable.
+
+        :param output_dir: Directory written by ``book_trades_batch``.
+        :param capacity: Capacity used when a rebuild is needed.
+        :param error_rate: Error rate used when a rebuild is needed.
+        :return: The filter, with :attr:`path` set so :meth:`save` persists it.
+        """
+        path = os.path.join(output_dir, DEFAULT_FILTER_FILE)
+        try:
+            return cls(BloomFilter.load(path), path)
+        except FileNotFoundError:
+            pass
+        except (IOError, OSError, ValueError) as exc:
+            logger.warning("Discarding unreadable duplicate filter %s: %s", path, exc)
+        return cls.rebuild(output_dir, path, capacity, error_rate)
+
+    def save(self) -> None:
+        """Persist the filter to :attr:`path` (no-op for in-memory filters)."""
+        if self.path is not None:
+            self.bloom.save(self.path)
+
+    def add(self, trade_id: str, checksum: str) -> None:
+        """Record a booked ``(tradeId, checksum)`` pair."""
+        self.bloom.add(booked_trade_key(trade_id, checksum))
+        self._booked[trade_id] = checksum
+
+    def is_duplicate(
+        self,
+        trade_id: str,
+        checksum: str,
+        booked_checksum: Callable[[str], Optional[str]],
+    ) -> bool:
+        """
+        Return True if exactly this trade content has already been booked.
+
+        :param trade_id: The trade identifier.
+        :param checksum: ``message_checksum`` of the message being booked.
+        :param booked_checksum: Exact check, called only on a filter hit that
+                                this process did not book itself. Returns the
+                                checksum currently booked for a tradeId, or None.
+        :return: True for an exact duplicate.
+        """
+        if booked_trade_key(trade_id, checksum) not in self.bloom:
+            self.negatives += 1
+            return False
+
+        self.positives += 1
+        if self._booked.get(trade_id) == checksum or booked_checksum(trade_id) == checksum:
+            self.duplicates += 1
+            return True
+
+        self.false_positives += 1
+        return False
@@ -0,0 +1,287 @@
+"""
+fpml_validator.py
+
+Structural validation of booked trade messages against the FpML element tree.
+
+The validator is compiled from the parsed FpML tag dictionary (see
+:func:`hgraph_trade.fpml_xsd_reference_files.get_fpml_tags`) into one checker
+per element: the set of allowed child names (including substitution-group
+members, e.g. ``fixedLeg`` for ``commoditySwapLeg``), the XSD attributes its
+type declares (e.g. ``id``) and a coercion check for simple values. Checkers are compiled on first use and cached, so a validator
+only ever touches the products it actually sees, and validating a message is a
+single walk over its ``tradeEconomics`` block.
+
+Conventions of the trade model creators that the validator accepts:
+
+* ``""`` and ``None`` mean "not populated" and are never violations.
+* Lists stand for repeated elements; each item is checked on its own.
+* Dict keys may name the element's declared XSD attributes as well as its
+  children, e.g. ``{"id": ..., "calculationPeriodsDatesAdjustments": ...}``.
+* Complex elements without child elements (e.g. ``payerPartyReference``) may
+  be given as dicts of attributes such as ``{"href": ...}``.
+* Recursive references (``"ref"`` nodes) accept any content.
+* A ``compactQuantityStep`` (see ``hgraph_trade_model.quantity_schedule``) is
+  checked as the ``quantityStep`` it expands to; every step shares its unit
+  and frequency, so one representative step is checked.
+
+Typical usage::
+
+    validator = FpmlValidator.from_reference_files()
+    violations = validator.validate(message)
+    if violations:
+        ...  # quarantine
+"""
+
+import datetime
+import logging
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional
+
+__all__ = (
+    "FpmlViolation",
+    "FpmlValidator",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class FpmlViolation(NamedTuple):
+    """A single structural problem found in a message."""
+
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
+# ---------------------------------------------------------------------------
+# Simple-type coercion
+# ---------------------------------------------------------------------------
+def _coerces_to_float(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return True
+    try:
+        float(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _coerces_to_int(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return True
+    if isinstance(value, float):
+        return value.is_integer()
+    try:
+        int(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _coerces_to_bool(value: Any) -> bool:
+    return isinstance(value, bool) or value in ("true", "false", "1", "0")
+
+
+def _coerces_to_date(value: Any) -> bool:
+    if isinstance(value, datetime.date):
+        return True
+    try:
+        # FpML dates may carry a timezone suffix ("2024-01-01Z")
+        datetime.date.fromisoformat(value[:10])
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _coerces_to_datetime(value: Any) -> bool:
+    if isinstance(value, datetime.datetime):
+        return True
+    try:
+        datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, TypeError, ValueError):
+        return False
+    return True
+
+
+def _is_scalar(value: Any) -> bool:
+    return isinstance(value, (str, int, float, bool))
+
+
+_COERCERS: Dict[str, Callable[[Any], bool]] = {
+    "float": _coerces_to_float,
+    "int": _coerces_to_int,
+    "bool": _coerces_to_bool,
+    "date": _coerces_to_date,
+    "datetime": _coerces_to_datetime,
+}
+
+
+# Compact shaped-quantity encoding; mirrors quantity_schedule.COMPACT_STEP_KEY
+# (not imported, to keep numpy out of the validator)
+_COMPACT_STEP_KEY = "compactQuantityStep"
+
+
+def _representative_step(encoded: Mapping[str, Any]) -> Dict[str, Any]:
+    """One ``quantityStep`` standing for every step of a compact schedule."""
+    quantity: Any = None
+    if encoded.get("encoding") == "blocks":
+        values = [row[0] for row in encoded.get("blocks") or () if row] + list(encoded.get("tail") or ())
+        quantity = values[0] if values else None
+    elif encoded.get("runs"):
+        quantity = encoded["runs"][0][0]
+    return {
+        "quantityUnit": encoded.get("quantityUnit", ""),
+        "quantityFrequency": encoded.get("quantityFrequency", ""),
+        "quantity": quantity,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Compiled element checkers
+# ---------------------------------------------------------------------------
+class _ElementChecker:
+    """Checker for one FpML element, with child checkers compiled lazily."""
+
+    __slots__ = (
+        "_validator",
+        "_definition",
+        "_children",
+        "python_type",
+        "is_simple",
+        "has_children",
+        "is_open",
+        "attributes",
+    )
+
+    def __init__(self, validator: "FpmlValidator", definition: Mapping[str, Any]) -> None:
+        self._validator = validator
+        self._definition = definition
+        self._children: Dict[str, Optional["_ElementChecker"]] = {}
+        self.python_type = definition.get("python_type", "unknownType")
+        self.is_simple = definition.get("type") == "simpleType"
+        self.has_children = bool(definition.get("children"))
+        self.is_open = bool(definition.get("ref"))
+        self.attributes = frozenset(definition.get("attributes") or ())
+
+    def child(self, name: str) -> Optional["_ElementChecker"]:
+        try:
+            return self._children[name]
+        except KeyError:
+            pass
+        checker = None
+        children = self._definition.get("children") or {}
+        if name in children:
+            checker = _ElementChecker(self._validator, children[name])
+        else:
+            head = self._validator._substitution_head(name)
+            if head is not None and head in children:
+                checker = self._validator._top_level_checker(name)
+        self._children[name] = checker
+        return checker
+
+    def check(self, value: Any, path: str, violations: List[FpmlViolation]) -> None:
+        if value is None or value == "":
+            return
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                self.check(item, f"{path}[{i}]", violations)
+            return
+
+        if isinstance(value, dict):
+            if self.is_open:
+                return
+            if self.is_simple:
+                violations.append(FpmlViolation(path, "expected a simple value, got a structure"))
+                return
+            if not self.has_children:
+                # Attribute-only complex type, e.g. {"href": "party1"}
+                return
+            for name, child_value in value.items():
+                if name == _COMPACT_STEP_KEY and isinstance(child_value, dict):
+                    name, child_value = "quantityStep", _representative_step(child_value)
+                checker = self.child(name)
+                if checker is None:
+                    if name in self.attributes:
+                        continue
+                    violations.append(FpmlViolation(path, f"unexpected element {name!r}"))
+                else:
+                    checker.check(child_value, f"{path}/{name}", violations)
+            return
+
+        if not _is_scalar(value):
+            violations.append(FpmlViolation(path, f"unsupported value type {type(value).__name__}"))
+        elif self.has_children:
+            violations.append(FpmlViolation(path, f"expected element content, got {value!r}"))
+        else:
+            coercer = _COERCERS.get(self.python_type)
+            if coercer is not None and not coercer(value):
+                violations.append(FpmlViolation(path, f"cannot coerce {value!r} to {self.python_type}"))
+
+
+class FpmlValidator:
+    """
+    Validates the ``tradeEconomics`` block of booked messages against FpML.
+
+    :param fpml_tags: Parsed FpML tag mapping (JSON dict or ``FpmlTagIndex``).
+    :param strict_products: Report products that have no FpML definition as
+                            violations instead of skipping them.
+    """
+
+    def __init__(self, fpml_tags: Mapping[str, Any], strict_products: bool = False) -> None:
+        self._tags = fpml_tags
+        self._strict_products = strict_products
+        self._top_level: Dict[str, Optional[_ElementChecker]] = {}
+        self._substitution_heads: Dict[str, Optional[str]] = {
+            name: definition.get("substitution_group") for name, definition in fpml_tags.items()
+        }
+
+    @classmethod
+    def from_reference_files(cls, strict_products: bool = False) -> "FpmlValidator":
+        """
+        Build a validator from the generated tag index (or JSON) shipped with the package.
+
+        :raises FileNotFoundError: If ``hgraph-tools parse-xsd`` has not been run.
+        """
+        from hgraph_trade.fpml_xsd_reference_files import get_fpml_tags
+
+        return cls(get_fpml_tags(), strict_products=strict_products)
+
+    def _substitution_head(self, name: str) -> Optional[str]:
+        return self._substitution_heads.get(name)
+
+    def _top_level_checker(self, name: str) -> Optional[_ElementChecker]:
+        try:
+            return self._top_level[name]
+        except KeyError:
+            pass
+        definition = self._tags.get(name)
+        checker = _ElementChecker(self, definition) if definition is not None else None
+        self._top_level[name] = checker
+        return checker
+
+    def validate(self, message: Mapping[str, Any]) -> List[FpmlViolation]:
+        """
+        Check a message's ``tradeEconomics`` products against their FpML definitions.
+
+        :param message: A fully assembled trade message.
+        :return: List of violations (empty if the message conforms).
+        """
+        violations: List[FpmlViolation] = []
+        economics = message.get("tradeEconomics")
+        if not isinstance(economics, dict):
+            return [FpmlViolation("tradeEconomics", "missing or not a structure")]
+
+        for product, block in economics.items():
+            checker = self._top_level_checker(product)
+            path = f"tradeEconomics/{product}"
+            if checker is None:
+                if self._strict_products:
+                    violations.append(FpmlViolation(path, "no FpML definition for product"))
+                continue
+            checker.check(block, path, violations)
+        return violations
@@ -13,13 +13,21 @@ Typical usage::
         process(msg)
     receiver.commit()
     receiver.close()
+
+A consumer that keeps its own record of what it has applied (e.g. the static
+data subscribers, whose databases store their Kafka offsets) passes
+``start_offsets``: each time partitions are assigned it is called and the
+consumer seeks to the offsets it returns, falling back to the group's
+committed offset for partitions it does not know. ``on_revoke`` is called
+before partitions move to another consumer, e.g. to commit work in flight
+(see ``kafka_workers.py``).
 """
 
 import json
 import logging
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Mapping, Tuple
 
-from kafka import KafkaConsumer
+from kafka import ConsumerRebalanceListener, KafkaConsumer, OffsetAndMetadata, TopicPartition
 from kafka.consumer.fetcher import ConsumerRecord
 
 from secure_config import config
@@ -36,6 +44,34 @@ def _default_json_deserializer(raw: bytes) -> Dict[str, Any]:
     return json.loads(raw.decode("utf-8"))
 
 
+class _RebalanceListener(ConsumerRebalanceListener):
+    """Calls ``on_revoke`` for revoked partitions and seeks assigned ones to ``start_offsets``."""
+
+    def __init__(
+        self,
+        consumer: KafkaConsumer,
+        start_offsets: Callable[[], Mapping[Tuple[str, int], int]] | None,
+        on_revoke: Callable[[List[Tuple[str, int]]], None] | None,
+    ):
+        self._consumer = consumer
+        self._start_offsets = start_offsets
+        self._on_revoke = on_revoke
+
+    def on_partitions_revoked(self, revoked: List[TopicPartition]) -> None:
+        if self._on_revoke is not None:
+            self._on_revoke([(tp.topic, tp.partition) for tp in revoked])
+
+    def on_partitions_assigned(self, assigned: List[TopicPartition]) -> None:
+        if self._start_offsets is None:
+            return
+        offsets = self._start_offsets()
+        for tp in assigned:
+            offset = offsets.get((tp.topic, tp.partition))
+            if offset is not None:
+                self._consumer.seek(tp, offset)
+                logger.info("Seeking %s[%d] to offset %d", tp.topic, tp.partition, offset)
+
+
 class KafkaReceiver:
     """Wraps :class:`KafkaConsumer` with config-driven defaults and JSON deserialisation.
 
@@ -51,6 +87,11 @@ class KafkaReceiver:
     :param enable_auto_commit: If ``True``, offsets are committed
         automatically.  Set to ``False`` for manual commit via
         :meth:`commit`.
+    :param start_offsets: Called on every partition assignment; returns the
+        next offset to consume by ``(topic, partition)``.  Assigned
+        partitions it has an offset for are positioned there.
+    :param on_revoke: Called with the ``(topic, partition)`` pairs being
+        revoked, before another consumer in the group takes them over.
     """
 
     def __init__(
@@ -62,6 +103,8 @@ class KafkaReceiver:
         auto_offset_reset: str = "earliest",
         value_deserializer: Callable[[bytes], Any] | None = None,
         enable_auto_commit: bool = False,
+        start_offsets: Callable[[], Mapping[Tuple[str, int], int]] | None = None,
+        on_revoke: Callable[[List[Tuple[str, int]]], None] | None = None,
     ):
         if bootstrap_servers is None:
             bootstrap_servers = config["KAFKA_BOOTSTRAP_SERVERS"]
@@ -76,13 +119,18 @@ class KafkaReceiver:
         self._deserializer = value_deserializer
 
         self.consumer = KafkaConsumer(
-            *topics,
+            *(topics if start_offsets is None and on_revoke is None else ()),
             bootstrap_servers=bootstrap_servers,
             group_id=group_id,
             auto_offset_reset=auto_offset_reset,
             enable_auto_commit=enable_auto_commit,
             value_deserializer=value_deserializer,
         )
+        self._listener = None
+        if start_offsets is not None or on_revoke is not None:
+            # Subscribing with a listener is not possible through the constructor
+            self._listener = _RebalanceListener(self.consumer, start_offsets, on_revoke)
+            self.consumer.subscribe(topics, listener=self._listener)
         logger.info(
             "KafkaReceiver initialised: topics=%s, group=%s, servers=%s",
             topics,
@@ -123,12 +171,53 @@ class KafkaReceiver:
         :param topics: Full list of topics to subscribe to.
         """
         self._topics = list(topics)
-        self.consumer.subscribe(topics)
+        if self._listener is None:
+            self.consumer.subscribe(topics)
+        else:
+            self.consumer.subscribe(topics, listener=self._listener)
         logger.info("KafkaReceiver subscription updated: topics=%s", topics)
 
-    def commit(self) -> None:
-        """Manually commit current offsets for all assigned partitions."""
-        self.consumer.commit()
+    def seek(self, topic: str, partition: int, offset: int) -> None:
+        """Consume ``topic[partition]`` from ``offset`` on the next poll.
+
+        :param topic: Topic name.
+        :param partition: Partition number (must be assigned to this consumer).
+        :param offset: Offset of the next record to return.
+        """
+        self.consumer.seek(TopicPartition(topic, partition), offset)
+
+    def pause(self, partitions: List[Tuple[str, int]]) -> None:
+        """Stop returning records for ``partitions`` until :meth:`resume`, without leaving the group.
+
+        :param partitions: ``(topic, partition)`` pairs assigned to this consumer.
+        """
+        self.consumer.pause(*(TopicPartition(topic, partition) for topic, partition in partitions))
+
+    def resume(self, partitions: List[Tuple[str, int]]) -> None:
+        """Return records for paused ``partitions`` again.
+
+        Partitions no longer assigned to this consumer (after a rebalance) are skipped.
+
+        :param partitions: ``(topic, partition)`` pairs paused with :meth:`pause`.
+        """
+        assigned = self.consumer.assignment()
+        self.consumer.resume(*(tp for tp in (TopicPartition(*p) for p in partitions) if tp in assigned))
+
+    def commit(self, offsets: Mapping[Tuple[str, int], int] | None = None) -> None:
+        """Manually commit offsets.
+
+        :param offsets: Next offset to consume by ``(topic, partition)``.
+            Defaults to the current position of every assigned partition.
+        """
+        if offsets is None:
+            self.consumer.commit()
+            return
+        self.consumer.commit(
+            {
+                TopicPartition(topic, partition): OffsetAndMetadata(offset, "", -1)
+                for (topic, partition), offset in offsets.items()
+            }
+        )
 
     def close(self) -> None:
         """Close the Kafka consumer connection.
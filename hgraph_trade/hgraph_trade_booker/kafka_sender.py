@@ -6,7 +6,9 @@ messages to a Kafka topic. It encapsulates the logic for connecting to a Kafka
 cluster, optionally serializing messages to JSON, and safely closing the
 producer when done.
 
-Includes configurable retry logic with exponential back-off.
+Includes configurable retry logic with exponential back-off. Each send waits
+for the broker to acknowledge the record, so a failed delivery raises rather
+than being lost in the producer's buffer.
 
 Typical usage:
     sender = KafkaSender()
@@ -19,13 +21,15 @@ import logging
 import time
 from typing import Any
 
-from kafka import KafkaProducer, KafkaError
+from kafka import KafkaProducer
+from kafka.errors import KafkaError
 
 from secure_config import config
 
 __all__ = (
     "DEFAULT_MAX_RETRIES",
     "DEFAULT_RETRY_BACKOFF",
+    "DEFAULT_SEND_TIMEOUT",
     "KafkaSender",
 )
 
@@ -34,6 +38,7 @@ logger = logging.getLogger(__name__)
 # Defaults — can be overridden per-instance
 DEFAULT_MAX_RETRIES = 3
 DEFAULT_RETRY_BACKOFF = 1.0  # seconds; doubled on each retry
+DEFAULT_SEND_TIMEOUT = 30.0  # seconds to wait for the broker to acknowledge a send
 
 
 class KafkaSender:
@@ -50,6 +55,7 @@ class KafkaSender:
         bootstrap_servers: str = None,
         max_retries: int = DEFAULT_MAX_RETRIES,
         retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        send_timeout: float = DEFAULT_SEND_TIMEOUT,
     ):
         """
         Initialise the Kafka producer.
@@ -58,12 +64,14 @@ class KafkaSender:
                                   Falls back to ``config["KAFKA_BOOTSTRAP_SERVERS"]``.
         :param max_retries: Number of times to retry a failed send before giving up.
         :param retry_backoff: Initial back-off in seconds; doubled after each retry.
+        :param send_timeout: Seconds to wait for each send to be acknowledged before it counts as failed.
         """
         if bootstrap_servers is None:
             bootstrap_servers = config["KAFKA_BOOTSTRAP_SERVERS"]
         self.bootstrap_servers = bootstrap_servers
         self.max_retries = max_retries
         self.retry_backoff = retry_backoff
+        self.send_timeout = send_timeout
         self.producer = KafkaProducer(bootstrap_servers=bootstrap_servers)
 
     def send_to_kafka(
@@ -71,9 +79,11 @@ class KafkaSender:
         topic: str,
         message: Any,
         serialize_as_json: bool = True,
+        key: bytes | str | None = None,
     ) -> None:
         """
-        Send a message to the specified Kafka topic with automatic retry.
+        Send a message to the specified Kafka topic with automatic retry, waiting for the
+        broker to acknowledge it.
 
         If ``serialize_as_json`` is True and ``message`` is a dictionary, it will
         be serialised to a JSON string before sending. Otherwise ``message`` is
@@ -82,19 +92,22 @@ class KafkaSender:
         :param topic: The Kafka topic to send to.
         :param message: The message payload (string or dict).
         :param serialize_as_json: Serialise dicts to JSON if True.
-        :raises KafkaError: If all retry attempts are exhausted.
+        :param key: Message key (strings are UTF-8 encoded); records with the same key go to the same partition.
+        :raises KafkaError: If all retry attempts are exhausted (including unacknowledged sends).
         """
         if serialize_as_json and isinstance(message, dict):
             message = json.dumps(message)
 
         encoded = message.encode("utf-8")
+        if isinstance(key, str):
+            key = key.encode("utf-8")
         last_error: Exception | None = None
         backoff = self.retry_backoff
 
         for attempt in range(1, self.max_retries + 1):
             try:
-                self.producer.send(topic, encoded)
-                self.producer.flush()
+                # flush() does not report delivery errors; the record's future does
+                self.producer.send(topic, encoded, key=key).get(timeout=self.send_timeout)
                 if attempt > 1:
                     logger.info(
                         "Kafka send succeeded on attempt %d for topic '%s'",
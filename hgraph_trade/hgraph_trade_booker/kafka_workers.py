@@ -0,0 +1,304 @@
+"""
+kafka_workers.py
+
+Partition-parallel processing of the records a :class:`KafkaReceiver` polls.
+
+A single poll-process loop handles one batch at a time, however many
+partitions the topics have. ``KafkaWorkerPool`` keeps the poll loop on the
+calling thread and hands records to N worker threads, each with a bounded
+queue::
+
+    poll -> route by partition (or key) -> worker queues -> process(records)
+                                                         -> completed offsets
+    commit(lowest fully processed offset per partition) <-
+
+Records are routed by ``dispatch``:
+
+* ``"partition"`` — every record of a partition goes to the same worker, so
+  partition order is kept exactly.
+* ``"key"`` — records are spread by message key (records without one by
+  partition), so the records of one entity stay in order when producers key
+  by entity, and a hot partition is shared among the workers.
+
+Either way a worker may finish later records before an earlier one on
+another worker. :class:`OffsetTracker` therefore commits, per partition, only
+up to the lowest offset that is not yet processed: after a crash, nothing
+unprocessed is skipped (some processed records may be consumed again).
+
+A full worker queue blocks the poll loop, which stops fetching until the
+worker catches up. When partitions are revoked (pass :meth:`drain` as the
+receiver's ``on_revoke``) the pool finishes and commits everything in flight
+before the partitions move to another consumer.
+
+Typical usage::
+
+    pool = KafkaWorkerPool(process, receiver_commit, workers=4, dispatch="key")
+    receiver = KafkaReceiver(topics, on_revoke=pool.drain)
+    pool.run(receiver, running=lambda: not stopping)
+"""
+
+import logging
+import queue
+import threading
+import zlib
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+__all__ = (
+    "DEFAULT_WORKER_QUEUE_SIZE",
+    "DISPATCH_MODES",
+    "KafkaWorkerPool",
+    "OffsetTracker",
+)
+
+logger = logging.getLogger(__name__)
+
+# Poll batches (one list of records per worker per poll) queued per worker
+DEFAULT_WORKER_QUEUE_SIZE = 16
+
+DISPATCH_MODES = ("partition", "key")
+
+# Records a worker takes off its queue for one call of ``process``
+_MAX_WORKER_BATCH = 1_000
+
+_STOP = object()
+
+TopicPartition = Tuple[str, int]
+
+
+class OffsetTracker:
+    """
+    Tracks dispatched and processed offsets to find what can safely be committed.
+
+    Offsets of each partition must be dispatched in increasing order (as a
+    consumer polls them); they may complete in any order. Thread-safe.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # (topic, partition) -> offsets dispatched and not yet below the watermark, in order
+        self._dispatched: Dict[TopicPartition, Deque[int]] = {}
+        # (topic, partition) -> processed offsets still in _dispatched
+        self._done: Dict[TopicPartition, Set[int]] = {}
+        # (topic, partition) -> next offset to commit (everything before it is processed)
+        self._watermarks: Dict[TopicPartition, int] = {}
+        self._committed: Dict[TopicPartition, int] = {}
+
+    def dispatched(self, topic: str, partition: int, offset: int) -> None:
+        """Note that ``offset`` was handed to a worker."""
+        tp = (topic, partition)
+        with self._lock:
+            if tp not in self._dispatched:
+                self._dispatched[tp] = deque()
+                self._done[tp] = set()
+            self._dispatched[tp].append(offset)
+
+    def completed(self, topic: str, partition: int, offset: int) -> None:
+        """Note that ``offset`` has been processed (successfully or not)."""
+        tp = (topic, partition)
+        with self._lock:
+            order = self._dispatched.get(tp)
+            if order is None:
+                return  # partition revoked and forgotten meanwhile
+            done = self._done[tp]
+            done.add(offset)
+            while order and order[0] in done:
+                first = order.popleft()
+                done.discard(first)
+                self._watermarks[tp] = first + 1
+
+    def committable(self) -> Dict[TopicPartition, int]:
+        """
+        Offsets to commit now: per partition, the lowest offset not yet processed.
+
+        :returns: Next offset to consume by ``(topic, partition)``, for partitions that advanced since the last call.
+        """
+        with self._lock:
+            ready = {tp: offset for tp, offset in self._watermarks.items() if self._committed.get(tp) != offset}
+            self._committed.update(ready)
+        return ready
+
+    def in_flight(self) -> int:
+        """Records dispatched and not yet processed."""
+        with self._lock:
+            return sum(len(order) - len(self._done[tp]) for tp, order in self._dispatched.items())
+
+    def forget(self, partitions: Iterable[TopicPartition]) -> None:
+        """Drop all state for ``partitions`` (e.g. after they were revoked)."""
+        with self._lock:
+            for tp in partitions:
+                self._dispatched.pop(tp, None)
+                self._done.pop(tp, None)
+                self._watermarks.pop(tp, None)
+                self._committed.pop(tp, None)
+
+
+class KafkaWorkerPool:
+    """
+    Processes polled records on worker threads and commits the offsets they complete.
+
+    :param process: Called on a worker thread with a list of records (dicts
+        from ``KafkaReceiver.poll``), in order for each partition or key. An
+        exception stops the pool and is raised from :meth:`run`; the failed
+        records are not committed.
+    :param commit: Called on the polling thread with the offsets to commit,
+        by ``(topic, partition)``, e.g. ``receiver.commit``.
+    :param workers: Number of worker threads.
+    :param dispatch: ``"partition"`` or ``"key"`` (see the module docstring).
+    :param queue_size: Poll batches queued per worker before polling blocks.
+    :raises ValueError: If ``workers`` or ``dispatch`` is invalid.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[List[Dict[str, Any]]], Any],
+        commit: Callable[[Mapping[TopicPartition, int]], None],
+        *,
+        workers: int,
+        dispatch: str = "partition",
+        queue_size: int = DEFAULT_WORKER_QUEUE_SIZE,
+    ):
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        if dispatch not in DISPATCH_MODES:
+            raise ValueError(f"dispatch must be one of {DISPATCH_MODES}, got {dispatch!r}")
+        self.workers = workers
+        self.dispatch = dispatch
+        self.tracker = OffsetTracker()
+        self._process = process
+        self._commit = commit
+        self._queues: List["queue.Queue[Any]"] = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self._threads: List[threading.Thread] = []
+        self._error: Optional[BaseException] = None
+
+    # ------------------------------------------------------------------
+    # Polling thread
+    # ------------------------------------------------------------------
+    def run(
+        self,
+        receiver: Any,
+        *,
+        running: Callable[[], bool],
+        poll_interval_ms: int = 1000,
+        select: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None,
+    ) -> None:
+        """
+        Poll ``receiver`` and dispatch its records until ``running()`` is false.
+
+        On return every dispatched record has been processed and the offsets
+        committed.
+
+        :param receiver: A :class:`KafkaReceiver` (anything with ``poll``).
+        :param running: Checked before each poll.
+        :param poll_interval_ms: Poll timeout in milliseconds.
+        :param select: Called with every poll batch (even an empty one) on the polling thread;
+            only the records it returns are dispatched, e.g. to hold back retries not yet due.
+        :raises Exception: The first exception raised by ``process``.
+        """
+        self._start_workers()
+        try:
+            while running() and self._error is None:
+                records = receiver.poll(timeout_ms=poll_interval_ms)
+                if select is not None:
+                    records = select(records)
+                if records:
+                    self.submit(records)
+                self._commit_ready()
+        finally:
+            self._stop_workers()
+            if self._error is None:
+                self._commit_ready()
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, records: List[Dict[str, Any]]) -> None:
+        """Route one poll batch to the worker queues (blocks while a queue is full)."""
+        routed: List[List[Dict[str, Any]]] = [[] for _ in self._queues]
+        for record in records:
+            self.tracker.dispatched(record["topic"], record["partition"], record["offset"])
+            routed[self._worker_for(record)].append(record)
+        for worker_queue, batch in zip(self._queues, routed):
+            if batch:
+                worker_queue.put(batch)
+
+    def drain(self, revoked: Optional[Iterable[TopicPartition]] = None) -> None:
+        """
+        Wait for every queued record to be processed and commit the offsets.
+
+        Pass as ``KafkaReceiver(on_revoke=...)`` so that revoked partitions are
+        committed before another consumer takes them over.
+
+        :param revoked: Partitions to forget once committed.
+        """
+        for worker_queue in self._queues:
+            worker_queue.join()
+        if self._error is None:
+            self._commit_ready()
+        if revoked is not None:
+            self.tracker.forget(revoked)
+
+    def _worker_for(self, record: Mapping[str, Any]) -> int:
+        key = record.get("key") if self.dispatch == "key" else None
+        if key is None:
+            key = f"{record['topic']}:{record['partition']}"
+        if isinstance(key, str):
+            key = key.encode("utf-8")
+        # crc32 rather than hash(): stable across processes
+        return zlib.crc32(key) % len(self._queues)
+
+    def _commit_ready(self) -> None:
+        offsets = self.tracker.committable()
+        if offsets:
+            self._commit(offsets)
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    def _start_workers(self) -> None:
+        self._error = None
+        self._threads = [
+            threading.Thread(target=self._work, args=(worker_queue,), name=f"kafka-worker-{index}", daemon=True)
+            for index, worker_queue in enumerate(self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _stop_workers(self) -> None:
+        for worker_queue in self._queues:
+            worker_queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _work(self, worker_queue: "queue.Queue[Any]") -> None:
+        while True:
+            item = worker_queue.get()
+            if item is _STOP:
+                worker_queue.task_done()
+                return
+            # Take whatever else is queued, for fewer and larger calls of process()
+            batch, taken, stop = list(item), 1, False
+            while len(batch) < _MAX_WORKER_BATCH:
+                try:
+                    more = worker_queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if more is _STOP:
+                    stop = True
+                    break
+                batch.extend(more)
+            try:
+                if self._error is None:
+                    self._process(batch)
+                    for record in batch:
+                        self.tracker.completed(record["topic"], record["partition"], record["offset"])
+            except Exception as exc:
+                logger.exception("Kafka worker failed on a batch of %d records", len(batch))
+                if self._error is None:
+                    self._error = exc
+            finally:
+                for _ in range(taken):
+                    worker_queue.task_done()
+            if stop:
+                return
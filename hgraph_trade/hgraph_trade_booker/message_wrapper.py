@@ -12,13 +12,12 @@ from typing import Dict, Any
 import datetime
 import hashlib
 
-from secure_config import config
-
 __all__ = (
     "create_message_header",
     "create_message_footer",
     "calculate_checksum",
     "filter_trade_data",
+    "seal_message",
     "wrap_message_with_headers_and_footers",
 )
 
@@ -32,6 +31,8 @@ def create_message_header(msg_type: str, sender: str, target: str) -> Dict[str,
     :param target: Target system identifier.
     :return: A dictionary representing the message header.
     """
+    from secure_config import config
+
     return {
         "messageType": msg_type,
         "senderCompID": sender,
@@ -71,6 +72,23 @@ def filter_trade_data(trade_data: Dict[str, Any]) -> Dict[str, Any]:
     return {key: value for key, value in trade_data.items() if key in allowed_keys}
 
 
+def seal_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fill in the footer checksum of an assembled message, in place.
+
+    The checksum covers the message header and the filtered trade data; the
+    footer itself is excluded.
+
+    :param message: A message with ``messageHeader`` and ``messageFooter`` sections.
+    :return: The same message, for chaining.
+    """
+    serialized_message = json.dumps(
+        {"messageHeader": message["messageHeader"], **filter_trade_data(message)}, separators=(",", ":")
+    )
+    message["messageFooter"]["checksum"] = calculate_checksum(serialized_message)
+    return message
+
+
 def wrap_message_with_headers_and_footers(
     trade_data: Dict[str, Any], msg_type: str, sender: str, target: str
 ) -> Dict[str, Any]:
@@ -95,12 +113,7 @@ def wrap_message_with_headers_and_footers(
         **filtered_trade_data,
         "messageFooter": footer,
     }
-
-    # Exclude the footer itself from checksum calculation
-    serialized_message = json.dumps({"messageHeader": header, **filtered_trade_data}, separators=(",", ":"))
-    message["messageFooter"]["checksum"] = calculate_checksum(serialized_message)
-
-    return message
+    return seal_message(message)
 
 
 # Example usage (Commented out to avoid running in production)
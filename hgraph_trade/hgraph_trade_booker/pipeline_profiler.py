@@ -0,0 +1,281 @@
+"""
+pipeline_profiler.py
+
+Opt-in profiling for the booking pipeline (``hgraph-tools book --profile OUT``).
+
+The pipeline wraps each unit of work in ``profiler.stage(name, instrument)``.
+``PipelineProfiler`` gives every (stage, instrument type) pair its own
+``cProfile.Profile`` and wall-clock total, and a background thread samples the
+booking thread's Python stack every ``sample_interval`` seconds. ``write(out_dir)``
+then produces:
+
+* ``profile_report.txt`` -- wall time per stage and per instrument type, time
+  in each instrument creator function (``create_commodity_swap``, ...) and the
+  top functions by own time for each stage / instrument type.
+* ``profile.collapsed`` -- sampled stacks in collapsed format
+  (``stage:map;instrument:swap;module:func;... <count>``), the input expected by
+  ``flamegraph.pl``, speedscope and similar tools.
+* ``<stage>[-<instrument>].pstats`` -- raw ``cProfile`` output for
+  ``python -m pstats`` or snakeviz.
+
+When profiling is off the pipeline uses ``NULL_PROFILER``, whose ``stage()``
+returns a shared no-op context manager, so the disabled cost is one method
+call per stage and ``cProfile`` is never imported.
+
+Typical usage::
+
+    profiler = PipelineProfiler().start()
+    with profiler.stage("map", instrument="swap"):
+        messages = map_trade_to_model(trade_data)
+    profiler.stop()
+    profiler.write("profile_out")
+"""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Any, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import cProfile
+
+__all__ = (
+    "DEFAULT_SAMPLE_INTERVAL",
+    "DEFAULT_TOP_FUNCTIONS",
+    "REPORT_FILE",
+    "COLLAPSED_FILE",
+    "NULL_PROFILER",
+    "NullProfiler",
+    "PipelineProfiler",
+)
+
+# Seconds between stack samples for the collapsed-stack output
+DEFAULT_SAMPLE_INTERVAL = 0.001
+
+# Functions listed per stage / instrument type in the report
+DEFAULT_TOP_FUNCTIONS = 15
+
+REPORT_FILE = "profile_report.txt"
+COLLAPSED_FILE = "profile.collapsed"
+
+# Frames from these modules are the profiler's own plumbing, not pipeline work
+_SKIP_MODULES = frozenset({__name__, "contextlib"})
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+_Key = Tuple[str, str]
+
+
+class NullProfiler:
+    """Profiler stand-in used when profiling is off; every stage is a no-op."""
+
+    enabled = False
+
+    def stage(self, name: str, instrument: Optional[str] = None) -> ContextManager[None]:
+        return _NULL_CONTEXT
+
+    def stop(self) -> None:
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}"
+
+
+def _key_label(key: _Key) -> str:
+    stage, instrument = key
+    return f"{stage} [{instrument}]" if instrument else stage
+
+
+class PipelineProfiler:
+    """
+    Per-stage deterministic profiles plus sampled stacks for one booking run.
+
+    Stages are expected to run on the thread that created the profiler.
+    Stages may nest; the outer stage's profile is paused while the inner one runs,
+    so each function call is attributed to the innermost stage.
+
+    :param sample_interval: Seconds between stack samples; 0 disables sampling.
+    :param top: Functions listed per stage / instrument type in the report.
+    """
+
+    enabled = True
+
+    def __init__(self, sample_interval: float = DEFAULT_SAMPLE_INTERVAL, top: int = DEFAULT_TOP_FUNCTIONS) -> None:
+        import cProfile
+
+        self._profile_factory = cProfile.Profile
+        self.sample_interval = sample_interval
+        self.top = top
+        self.profiles: Dict[_Key, "cProfile.Profile"] = {}
+        # key -> [calls, wall seconds]
+        self.timings: Dict[_Key, List[float]] = {}
+        self.samples: Counter = Counter()
+        self._active: List[_Key] = []
+        self._thread_id = threading.get_ident()
+        self._stop_event = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Collection
+    # ------------------------------------------------------------------
+    def start(self) -> "PipelineProfiler":
+        """Start the stack sampler (if ``sample_interval`` > 0)."""
+        if self.sample_interval > 0 and self._sampler is None:
+            self._stop_event.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="pipeline-profiler", daemon=True)
+            self._sampler.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the stack sampler. Safe to call more than once."""
+        if self._sampler is None:
+            return
+        self._stop_event.set()
+        self._sampler.join()
+        self._sampler = None
+
+    @contextlib.contextmanager
+    def stage(self, name: str, instrument: Optional[str] = None) -> Iterator[None]:
+        """
+        Profile the enclosed block as ``name``, optionally attributed to an instrument type.
+
+        :param name: Stage name, e.g. ``"load"``, ``"map"`` or ``"book"``.
+        :param instrument: Instrument type the work belongs to, e.g. ``"swap"``.
+        """
+        key = (name, instrument or "")
+        profile = self.profiles.get(key)
+        if profile is None:
+            profile = self.profiles[key] = self._profile_factory()
+        if self._active:
+            self.profiles[self._active[-1]].disable()
+        self._active.append(key)
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            self._active.pop()
+            if self._active:
+                self.profiles[self._active[-1]].enable()
+            timing = self.timings.setdefault(key, [0, 0.0])
+            timing[0] += 1
+            timing[1] += elapsed
+
+    def _sample_loop(self) -> None:
+        while not self._stop_event.wait(self.sample_interval):
+            try:
+                key = self._active[-1]
+            except IndexError:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                if frame.f_globals.get("__name__") not in _SKIP_MODULES:
+                    stack.append(_frame_label(frame))
+                frame = frame.f_back
+            prefix = [f"stage:{key[0]}"] + ([f"instrument:{key[1]}"] if key[1] else [])
+            self.samples[";".join(prefix + stack[::-1])] += 1
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def _stats(self, key: _Key) -> Dict[Tuple[str, int, str], Tuple[int, int, float, float, Dict]]:
+        import pstats
+
+        return pstats.Stats(self.profiles[key]).stats  # type: ignore[attr-defined]
+
+    def creator_times(self) -> Dict[str, Tuple[int, float]]:
+        """
+        Cumulative time in each instrument creator function, across all stages.
+
+        :return: ``{creator function name: (calls, cumulative seconds)}``.
+        """
+        from hgraph_trade.hgraph_trade_booker.trade_mapper import instrument_creator_names
+
+        creators = set(instrument_creator_names().values())
+        totals: Dict[str, List[float]] = {}
+        for key in self.profiles:
+            for (_filename, _line, func_name), (_cc, calls, _tt, cumulative, _callers) in self._stats(key).items():
+                if func_name in creators:
+                    total = totals.setdefault(func_name, [0, 0.0])
+                    total[0] += calls
+                    total[1] += cumulative
+        return {name: (int(calls), seconds) for name, (calls, seconds) in totals.items()}
+
+    def report(self) -> str:
+        """
+        Render the hotspot report.
+
+        :return: The report text.
+        """
+        lines = ["Booking pipeline profile", "=" * 24, "", "Wall time by stage:"]
+        stage_totals: Dict[str, List[float]] = {}
+        for (stage, _instrument), (calls, seconds) in self.timings.items():
+            total = stage_totals.setdefault(stage, [0, 0.0])
+            total[0] += calls
+            total[1] += seconds
+        for stage, (calls, seconds) in sorted(stage_totals.items(), key=lambda item: -item[1][1]):
+            lines.append(f"  {stage:<12} {seconds:9.3f}s  {int(calls):7d} call(s)")
+
+        by_instrument = [(key[1], timing) for key, timing in self.timings.items() if key[1]]
+        if by_instrument:
+            lines += ["", "Wall time by instrument type:"]
+            instrument_totals: Dict[str, List[float]] = {}
+            for instrument, (calls, seconds) in by_instrument:
+                total = instrument_totals.setdefault(instrument, [0, 0.0])
+                total[0] += calls
+                total[1] += seconds
+            for instrument, (calls, seconds) in sorted(instrument_totals.items(), key=lambda item: -item[1][1]):
+                mean_ms = seconds / calls * 1000 if calls else 0.0
+                lines.append(f"  {instrument:<12} {seconds:9.3f}s  {int(calls):7d} trade(s)  {mean_ms:8.3f} ms/trade")
+
+        creators = self.creator_times()
+        if creators:
+            lines += ["", "Cumulative time by creator function:"]
+            for name, (calls, seconds) in sorted(creators.items(), key=lambda item: -item[1][1]):
+                lines.append(f"  {name:<28} {seconds:9.3f}s  {calls:7d} call(s)")
+
+        for key in sorted(self.profiles, key=lambda k: -self.timings.get(k, [0, 0.0])[1]):
+            stats = self._stats(key)
+            if not stats:
+                continue
+            lines += ["", f"Top functions by own time -- {_key_label(key)}:"]
+            ranked = sorted(stats.items(), key=lambda item: -item[1][2])[: self.top]
+            for (filename, line, func_name), (_cc, calls, own, cumulative, _callers) in ranked:
+                location = f"{os.path.basename(filename)}:{line}" if line else filename
+                lines.append(f"  {own:9.4f}s own {cumulative:9.4f}s cum {calls:8d}  {func_name} ({location})")
+
+        if self.samples:
+            lines += ["", f"{sum(self.samples.values())} stack sample(s) written to {COLLAPSED_FILE}"]
+        return "\n".join(lines) + "\n"
+
+    def write(self, out_dir: str) -> str:
+        """
+        Write the report, collapsed stacks and per-stage ``.pstats`` files.
+
+        :param out_dir: Output directory; created if missing.
+        :return: Path of the report file.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        for (stage, instrument), profile in self.profiles.items():
+            name = f"{stage}-{instrument}" if instrument else stage
+            profile.dump_stats(os.path.join(out_dir, f"{name}.pstats"))
+
+        with open(os.path.join(out_dir, COLLAPSED_FILE), "w", encoding="utf-8") as fh:
+            for stack, count in sorted(self.samples.items()):
+                fh.write(f"{stack} {count}\n")
+
+        report_path = os.path.join(out_dir, REPORT_FILE)
+        with open(report_path, "w", encoding="utf-8") as fh:
+            fh.write(self.report())
+        return report_path
@@ -0,0 +1,299 @@
+"""
+quarantine_replay.py
+
+Replays trades that :func:`~hgraph_trade.hgraph_trade_booker.trade_booker.book_trades_batch`
+wrote to the dead-letter quarantine directory.
+
+Each quarantine file holds ``{"original_message": ..., "error": ...}``. Replay
+re-books the original message and, on success, either deletes the quarantine
+file or moves it to an archive directory. Files are processed by a bounded
+thread pool (booking is I/O bound) and streamed from the directory listing, so
+a quarantine of tens of thousands of trades never needs to be held in memory
+at once.
+
+Messages go through the same checks as ``book_trades_batch``: pass the
+validator, enricher, version store and duplicate filter the trades were booked
+with. Entries quarantined for FpML violations (they carry ``"violations"``)
+are only replayed with a validator, so a replay never books a message that
+failed validation without checking it again; a message that fails again is
+re-quarantined with its new error.
+
+Typical usage::
+
+    result = requeue_quarantined("output/quarantine", "output", concurrency=16)
+    print(result.summary())
+"""
+
+import json
+import logging
+import os
+import shutil
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Iterator, Optional, Set
+
+from hgraph_trade.hgraph_trade_booker.pipeline_result import PipelineResult, TradeResult, TradeStatus
+from hgraph_trade.hgraph_trade_booker.trade_booker import BookingLock, Outcome, book_message
+from hgraph_trade.hgraph_trade_booker.trade_delta import TradeVersionStore
+
+if TYPE_CHECKING:
+    from hgraph_trade.hgraph_trade_booker.duplicate_filter import BookedTradeFilter
+    from hgraph_trade.hgraph_trade_booker.fpml_validator import FpmlValidator
+    from hgraph_trade.hgraph_trade_booker.static_enrichment import StaticDataEnricher
+
+__all__ = (
+    "DEFAULT_REQUEUE_CONCURRENCY",
+    "iter_quarantine_files",
+    "requeue_file",
+    "requeue_quarantined",
+)
+
+logger = logging.getLogger(__name__)
+
+# Default number of quarantine files re-booked concurrently
+DEFAULT_REQUEUE_CONCURRENCY = 8
+
+
+def iter_quarantine_files(quarantine_dir: str) -> Iterator[str]:
+    """
+    Yield the paths of all quarantined trade files in a directory.
+
+    Uses :func:`os.scandir` so the listing is streamed rather than materialised.
+
+    :param quarantine_dir: Directory written by ``book_trades_batch``.
+    :return: Iterator of ``*.json`` file paths.
+    :raises FileNotFoundError: If the quarantine directory does not exist.
+    """
+    if not os.path.isdir(quarantine_dir):
+        raise FileNotFoundError(f"Quarantine directory not found: {quarantine_dir}")
+
+    with os.scandir(quarantine_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(".json"):
+                yield entry.path
+
+
+def _clear(quarantine_path: str, archive_dir: Optional[str], trade_id: str) -> None:
+    try:
+        if archive_dir is not None:
+            os.makedirs(archive_dir, exist_ok=True)
+            shutil.move(quarantine_path, os.path.join(archive_dir, os.path.basename(quarantine_path)))
+        else:
+            os.remove(quarantine_path)
+    except (IOError, OSError) as exc:
+        # The trade is booked; a stale quarantine file is only a nuisance.
+        logger.warning("Booked %s but could not clear quarantine file: %s", trade_id, exc)
+
+
+def requeue_file(
+    quarantine_path: str,
+    output_dir: str,
+    archive_dir: Optional[str] = None,
+    *,
+    validator: Optional["FpmlValidator"] = None,
+    enricher: Optional["StaticDataEnricher"] = None,
+    version_store: Optional[TradeVersionStore] = None,
+    duplicate_filter: Optional["BookedTradeFilter"] = None,
+    booking_lock: Optional[BookingLock] = None,
+) -> TradeResult:
+    """
+    Re-book a single quarantined trade and clear it from quarantine on success.
+
+    The message is booked as ``book_trades_batch`` books it. An entry that
+    failed FpML validation is left in place unless a ``validator`` is given.
+    A message that fails again is quarantined again (replacing this file) so
+    the replay can be retried.
+
+    :param quarantine_path: Path to the quarantine file.
+    :param output_dir: Directory for successfully booked trades.
+    :param archive_dir: If given, successfully replayed files are moved here
+                        instead of being deleted.
+    :param validator: Optional ``FpmlValidator`` run on the message before booking.
+    :param enricher: Optional ``StaticDataEnricher`` re-applied to the trade header.
+    :param version_store: Optional ``TradeVersionStore`` enabling delta booking.
+    :param duplicate_filter: Optional ``BookedTradeFilter``; exact re-sends are cleared
+                             without booking. The caller saves it.
+    :param booking_lock: ``BookingLock`` shared by concurrent calls that share a version
+                         store or duplicate filter.
+    :return: A ``TradeResult`` describing the outcome.
+    """
+    filename = os.path.basename(quarantine_path)
+    trade_id = os.path.splitext(filename)[0]
+
+    try:
+        with open(quarantine_path, "r", encoding="utf-8") as fh:
+            entry = json.load(fh)
+        message = entry["original_message"]
+        violations = entry.get("violations")
+    except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as exc:
+        logger.error("Quarantine file %s is malformed: %s", quarantine_path, exc)
+        return TradeResult(
+            trade_id=trade_id,
+            status=TradeStatus.VALIDATION_FAILED,
+            message=f"Malformed quarantine file: {exc}",
+            error=exc,
+            stage="requeue",
+        )
+    except (IOError, OSError) as exc:
+        logger.error("Cannot read quarantine file %s: %s", quarantine_path, exc)
+        return TradeResult(
+            trade_id=trade_id,
+            status=TradeStatus.BOOKING_FAILED,
+            message=str(exc),
+            error=exc,
+            stage="requeue",
+        )
+
+    if violations and validator is None:
+        return TradeResult(
+            trade_id=trade_id,
+            status=TradeStatus.VALIDATION_FAILED,
+            message=f"Quarantined for {len(violations)} FpML violation(s); replay with a validator",
+            stage="requeue",
+        )
+
+    if enricher is not None:
+        try:
+            enricher.enrich(message)
+        except ValueError as exc:
+            return TradeResult(
+                trade_id=trade_id,
+                status=TradeStatus.VALIDATION_FAILED,
+                message=str(exc),
+                error=exc,
+                stage="enrichment",
+            )
+
+    outcome, path = book_message(
+        message,
+        trade_id,
+        output_dir,
+        os.path.dirname(quarantine_path),
+        validator,
+        version_store,
+        duplicate_filter,
+        booking_lock,
+    )
+
+    if outcome in (Outcome.BOOKED, Outcome.DELTA, Outcome.DUPLICATE):
+        _clear(quarantine_path, archive_dir, trade_id)
+        return TradeResult(
+            trade_id=trade_id,
+            status=TradeStatus.SUCCESS,
+            message=(
+                f"Already booked; cleared {quarantine_path}"
+                if outcome == Outcome.DUPLICATE
+                else f"Re-booked from {quarantine_path}"
+            ),
+            stage="requeue",
+        )
+
+    if path is not None and os.path.abspath(path) != os.path.abspath(quarantine_path):
+        # Re-quarantined under another name: this entry is superseded
+        try:
+            os.remove(quarantine_path)
+        except OSError as exc:
+            logger.warning("Could not remove superseded quarantine file %s: %s", quarantine_path, exc)
+    invalid = outcome == Outcome.INVALID
+    return TradeResult(
+        trade_id=trade_id,
+        status=TradeStatus.VALIDATION_FAILED if invalid else TradeStatus.BOOKING_FAILED,
+        message=_quarantine_error(path) or "Re-booking failed and the trade could not be re-quarantined",
+        stage="validation" if invalid else "booking",
+    )
+
+
+def _quarantine_error(path: Optional[str]) -> Optional[str]:
+    """The error recorded in a quarantine file, if it can be read."""
+    if path is None:
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh).get("error")
+    except (IOError, OSError, ValueError, AttributeError):
+        return None
+
+
+def requeue_quarantined(
+    quarantine_dir: str,
+    output_dir: str,
+    *,
+    concurrency: int = DEFAULT_REQUEUE_CONCURRENCY,
+    archive_dir: Optional[str] = None,
+    fail_fast: bool = False,
+    validator: Optional["FpmlValidator"] = None,
+    enricher: Optional["StaticDataEnricher"] = None,
+    version_store: Optional[TradeVersionStore] = None,
+    duplicate_filter: Optional["BookedTradeFilter"] = None,
+) -> PipelineResult:
+    """
+    Re-book every trade in a quarantine directory in parallel.
+
+    At most ``concurrency * 2`` files are in flight at any time, which keeps
+    memory flat regardless of how many trades were quarantined.
+
+    :param quarantine_dir: Directory written by ``book_trades_batch``.
+    :param output_dir: Directory for successfully booked trades.
+    :param concurrency: Number of worker threads.
+    :param archive_dir: If given, replayed files are moved here instead of deleted.
+    :param fail_fast: Stop submitting new files after the first failure.
+    :param validator: Optional ``FpmlValidator`` run on every message before booking.
+    :param enricher: Optional ``StaticDataEnricher`` re-applied to every trade header.
+    :param version_store: Optional ``TradeVersionStore`` enabling delta booking.
+    :param duplicate_filter: Optional ``BookedTradeFilter``, saved once the replay is done.
+    :return: A finalised ``PipelineResult`` with one entry per quarantine file.
+    :raises ValueError: If ``concurrency`` is less than 1.
+    :raises FileNotFoundError: If the quarantine directory does not exist.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be >= 1, got {concurrency}")
+
+    pipeline = PipelineResult()
+    max_in_flight = concurrency * 2
+    in_flight: Set[Future] = set()
+    stop = False
+    # Delta numbering and the duplicate filter are per-trade state: files of one trade are booked in turn
+    booking_lock = BookingLock() if version_store is not None or duplicate_filter is not None else None
+    options = dict(
+        validator=validator,
+        enricher=enricher,
+        version_store=version_store,
+        duplicate_filter=duplicate_filter,
+        booking_lock=booking_lock,
+    )
+
+    def _drain() -> None:
+        nonlocal stop
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            in_flight.discard(future)
+            result = future.result()
+            pipeline.add(result)
+            if not result.succeeded:
+                logger.error("Requeue of %s failed: %s", result.trade_id, result.message)
+                if fail_fast:
+                    stop = True
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="requeue") as executor:
+        for path in iter_quarantine_files(quarantine_dir):
+            if stop:
+                break
+            in_flight.add(executor.submit(requeue_file, path, output_dir, archive_dir, **options))
+            if len(in_flight) >= max_in_flight:
+                _drain()
+        while in_flight:
+            _drain()
+
+    if duplicate_filter is not None:
+        try:
+            duplicate_filter.save()
+        except (IOError, OSError) as exc:
+            # Only costs speed: the filter is rebuilt from the output directory next time.
+            logger.error("Could not save duplicate filter: %s", exc)
+
+    pipeline.finalise()
+    logger.info(
+        "Requeue complete: %d re-booked, %d failed",
+        pipeline.success_count,
+        pipeline.failure_count,
+    )
+    return pipeline
@@ -0,0 +1,310 @@
+"""
+static_enrichment.py
+
+Enriches and validates trade headers against the static data held by
+``hgraph_static_admin`` (legal entities and trading relationships in the party
+store, portfolios and books in the portfolio store, credit limits in the
+credit store).
+
+``create_trade_header`` copies the party and portfolio symbols straight from
+the trade file. Looking each one up with a query per trade would put several
+SQLite round trips on the mapping path, so the stores are instead read once
+into a ``StaticDataSnapshot`` (one ``SELECT`` per table) and every trade is
+resolved against in-memory dictionaries. ``StaticDataEnricher.refresh()``
+reloads the snapshot, either on demand or automatically once it is older
+than ``max_age`` seconds.
+
+For each trade header the enricher:
+
+- adds ``lei`` and ``legalName`` to the internal and external party entries;
+- adds ``internalPortfolioName`` / ``externalPortfolioName`` for portfolios
+  (or books) it knows;
+- reports unknown parties, an unknown or inactive internal portfolio, a
+  portfolio owned by another legal entity, a missing trading relationship
+  and, optionally, a counterparty without an active credit limit.
+
+Typical usage::
+
+    enricher = StaticDataEnricher.from_stores("party_data.db", "portfolio_data.db", "credit_data.db")
+    messages = map_trade_to_model(trade_data, enricher=enricher)
+"""
+
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+__all__ = (
+    "StaticDataError",
+    "LegalEntityRef",
+    "PortfolioRef",
+    "StaticDataSnapshot",
+    "StaticDataEnricher",
+)
+
+logger = logging.getLogger(__name__)
+
+_ACTIVE = "Active"
+
+
+class StaticDataError(ValueError):
+    """Raised when a trade header does not resolve against the static data snapshot."""
+
+    def __init__(self, trade_id: str, violations: List[str]) -> None:
+        self.trade_id = trade_id
+        self.violations = violations
+        super().__init__(f"Trade {trade_id} failed static data checks: {'; '.join(violations)}")
+
+
+@dataclass(frozen=True)
+class LegalEntityRef:
+    """The legal entity fields used for enrichment."""
+
+    symbol: str
+    name: str
+    lei: Optional[str] = None
+    classification: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class PortfolioRef:
+    """The portfolio (or book) fields used for enrichment and validation."""
+
+    symbol: str
+    name: str
+    legal_entity_symbol: Optional[str] = None
+    status: str = _ACTIVE
+    is_book: bool = False
+
+
+def _select(db_path: str, sql: str) -> List[sqlite3.Row]:
+    # Read-only, so a mistyped path fails instead of creating an empty database
+    conn = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+@dataclass
+class StaticDataSnapshot:
+    """
+    In-memory indexes over the static data stores.
+
+    :param legal_entities: Symbol -> legal entity.
+    :param relationships: ``(internal symbol, external symbol)`` pairs with a trading relationship.
+    :param portfolios: Symbol -> portfolio or book. Portfolios win if a symbol is both.
+    :param credit_counterparties: Counterparty symbols with at least one active credit limit,
+                                  or ``None`` if no credit store was loaded.
+    :param loaded_at: ``time.monotonic()`` when the snapshot was taken.
+    """
+
+    legal_entities: Dict[str, LegalEntityRef] = field(default_factory=dict)
+    relationships: FrozenSet[Tuple[str, str]] = frozenset()
+    portfolios: Dict[str, PortfolioRef] = field(default_factory=dict)
+    credit_counterparties: Optional[FrozenSet[str]] = None
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def load(
+        cls, party_db: str, portfolio_db: Optional[str] = None, credit_db: Optional[str] = None
+    ) -> "StaticDataSnapshot":
+        """
+        Read the stores into a new snapshot, with one query per table.
+
+        :param party_db: Path to the party store (legal entities and trading relationships).
+        :param portfolio_db: Optional path to the portfolio store (portfolios and books).
+        :param credit_db: Optional path to the credit store (credit limits).
+        :return: The snapshot.
+        :raises sqlite3.Error: If a store cannot be read (e.g. it was never initialised).
+        """
+        started = time.perf_counter()
+        legal_entities = {
+            r["symbol"]: LegalEntityRef(r["symbol"], r["name"], r["lei"], r["classification"])
+            for r in _select(party_db, "SELECT symbol, name, lei, classification FROM legal_entities")
+        }
+        relationships = frozenset(
+            (r[0], r[1])
+            for r in _select(party_db, "SELECT internal_party_symbol, external_party_symbol FROM trading_relationships")
+        )
+
+        portfolios: Dict[str, PortfolioRef] = {}
+        if portfolio_db is not None:
+            for r in _select(portfolio_db, "SELECT symbol, name, legal_entity_symbol, status FROM books"):
+                portfolios[r["symbol"]] = PortfolioRef(
+                    r["symbol"], r["name"], r["legal_entity_symbol"], r["status"], is_book=True
+                )
+            for r in _select(portfolio_db, "SELECT symbol, name, legal_entity_symbol, status FROM portfolios"):
+                portfolios[r["symbol"]] = PortfolioRef(r["symbol"], r["name"], r["legal_entity_symbol"], r["status"])
+
+        credit_counterparties = None
+        if credit_db is not None:
+            credit_counterparties = frozenset(
+                r[0]
+                for r in _select(
+                    credit_db, f"SELECT DISTINCT counterparty_symbol FROM credit_limits WHERE status = '{_ACTIVE}'"
+                )
+            )
+
+        snapshot = cls(legal_entities, relationships, portfolios, credit_counterparties)
+        logger.info(
+            "Loaded static data snapshot in %.3fs: %d legal entities, %d relationships, %d portfolios/books%s",
+            time.perf_counter() - started,
+            len(legal_entities),
+            len(relationships),
+            len(portfolios),
+            "" if credit_counterparties is None else f", {len(credit_counterparties)} counterparties with credit",
+        )
+        return snapshot
+
+    def age(self) -> float:
+        """Seconds since the snapshot was taken."""
+        return time.monotonic() - self.loaded_at
+
+
+class StaticDataEnricher:
+    """
+    Resolves trade header parties and portfolios against a ``StaticDataSnapshot``.
+
+    :param snapshot: The snapshot to resolve against.
+    :param loader: Returns a fresh snapshot; required for ``refresh()`` and ``max_age``.
+    :param max_age: Reload the snapshot before enriching once it is older than this
+                    many seconds. ``None`` keeps it for the life of the enricher.
+    :param strict: Raise ``StaticDataError`` on violations. Otherwise they are logged
+                   and the header is enriched as far as possible.
+    :param require_credit_limit: Treat a counterparty without an active credit limit
+                                 as a violation. Needs a snapshot loaded with a credit store.
+    """
+
+    def __init__(
+        self,
+        snapshot: StaticDataSnapshot,
+        *,
+        loader: Optional[Callable[[], StaticDataSnapshot]] = None,
+        max_age: Optional[float] = None,
+        strict: bool = True,
+        require_credit_limit: bool = False,
+    ) -> None:
+        if max_age is not None and loader is None:
+            raise ValueError("max_age needs a loader to refresh from")
+        if require_credit_limit and snapshot.credit_counterparties is None:
+            raise ValueError("require_credit_limit needs a snapshot loaded with a credit store")
+        self.snapshot = snapshot
+        self.loader = loader
+        self.max_age = max_age
+        self.strict = strict
+        self.require_credit_limit = require_credit_limit
+
+    @classmethod
+    def from_stores(
+        cls,
+        party_db: str,
+        portfolio_db: Optional[str] = None,
+        credit_db: Optional[str] = None,
+        **options: Any,
+    ) -> "StaticDataEnricher":
+        """
+        Load a snapshot from the stores and return an enricher that can refresh from them.
+
+        :param party_db: Path to the party store.
+        :param portfolio_db: Optional path to the portfolio store.
+        :param credit_db: Optional path to the credit store.
+        :param options: Keyword arguments for ``StaticDataEnricher``.
+        :return: The enricher.
+        """
+
+        def loader() -> StaticDataSnapshot:
+            return StaticDataSnapshot.load(party_db, portfolio_db, credit_db)
+
+        return cls(loader(), loader=loader, **options)
+
+    def refresh(self) -> StaticDataSnapshot:
+        """
+        Replace the snapshot with a freshly loaded one.
+
+        :return: The new snapshot.
+        :raises ValueError: If the enricher has no loader.
+        """
+        if self.loader is None:
+            raise ValueError("Enricher was built without a loader; cannot refresh")
+        self.snapshot = self.loader()
+        return self.snapshot
+
+    def enrich(self, message: Mapping[str, Any]) -> List[str]:
+        """
+        Enrich the trade header of a mapped trade message in place.
+
+        :param message: A message from ``map_trade_to_model`` (or just its ``tradeHeader`` section).
+        :return: The violations found (empty if the header resolved cleanly).
+        :raises StaticDataError: If ``strict`` and there are violations.
+        """
+        section = message.get("tradeHeader", message)
+        return self.enrich_header(section.get("tradeHeader", section))
+
+    def enrich_header(self, header: Dict[str, Any]) -> List[str]:
+        """
+        Enrich a ``tradeHeader`` dictionary (as built by ``create_trade_header``) in place.
+
+        :param header: The trade header.
+        :return: The violations found (empty if the header resolved cleanly).
+        :raises StaticDataError: If ``strict`` and there are violations.
+        """
+        if self.max_age is not None and self.snapshot.age() > self.max_age:
+            self.refresh()
+        snapshot = self.snapshot
+        violations: List[str] = []
+
+        symbols: Dict[str, str] = {}
+        for entry in header.get("parties", ()):
+            for key in ("internalParty", "externalParty"):
+                if key not in entry:
+                    continue
+                symbol = entry[key]
+                symbols[key] = symbol
+                if not symbol:
+                    violations.append(f"{key} is missing")
+                    continue
+                entity = snapshot.legal_entities.get(symbol)
+                if entity is None:
+                    violations.append(f"{key} {symbol!r} is not a known legal entity")
+                    continue
+                entry["legalName"] = entity.name
+                if entity.lei:
+                    entry["lei"] = entity.lei
+        internal, external = symbols.get("internalParty"), symbols.get("externalParty")
+
+        portfolio = header.get("portfolio", {})
+        for side, party in (("internal", internal), ("external", external)):
+            symbol = portfolio.get(f"{side}Portfolio")
+            ref = snapshot.portfolios.get(symbol) if symbol else None
+            if ref is not None:
+                portfolio[f"{side}PortfolioName"] = ref.name
+                if ref.legal_entity_symbol and party and ref.legal_entity_symbol != party:
+                    violations.append(
+                        f"{side}Portfolio {symbol!r} belongs to {ref.legal_entity_symbol!r}, not {party!r}"
+                    )
+            # Only our own side is required to be in the portfolio store
+            if side == "internal" and snapshot.portfolios:
+                if not symbol:
+                    violations.append("internalPortfolio is missing")
+                elif ref is None:
+                    violations.append(f"internalPortfolio {symbol!r} is not a known portfolio or book")
+                elif ref.status != _ACTIVE:
+                    violations.append(f"internalPortfolio {symbol!r} is {ref.status}")
+
+        # Only worth reporting once both parties resolve
+        known = snapshot.legal_entities
+        if internal in known and external in known and (internal, external) not in snapshot.relationships:
+            violations.append(f"No trading relationship between {internal!r} and {external!r}")
+        if self.require_credit_limit and external and external not in snapshot.credit_counterparties:
+            violations.append(f"Counterparty {external!r} has no active credit limit")
+
+        if violations:
+            trade_id = str(header.get("partyTradeIdentifier", {}).get("tradeId", ""))
+            if self.strict:
+                raise StaticDataError(trade_id, violations)
+            logger.warning("Trade %s static data issues: %s", trade_id, "; ".join(violations))
+        return violations
@@ -0,0 +1,147 @@
+"""
+trade_archive.py
+
+Streams trade files straight out of ``.tar``/``.tar.gz``/``.tgz``/``.tar.bz2``/
+``.tar.xz`` and ``.zip`` bundles, so end-of-day drops can be booked without
+extracting them to scratch space first.
+
+Tar archives are opened in streaming mode (``r|*``): members are decompressed
+and yielded one at a time in archive order, so booking starts as soon as the
+first member has been read, and an archive piped on stdin works too. Zip
+archives keep their index at the end of the file, so they must be a seekable
+file; members are still read one at a time.
+
+Each member is identified by its name inside the archive (e.g.
+``eod/2024-11-20/SWAP-001.json``), which is what error reports show.
+
+Typical usage::
+
+    for name, content in iter_archive_members("eod_trades.tar.gz"):
+        trade_data = load_trade_from_string(content, name)
+"""
+
+import bz2
+import gzip
+import io
+import logging
+import lzma
+import posixpath
+import tarfile
+import zipfile
+from typing import BinaryIO, Iterator, Tuple, Union
+
+__all__ = (
+    "TRADE_FILE_SUFFIXES",
+    "is_trade_member",
+    "iter_archive_members",
+)
+
+logger = logging.getLogger(__name__)
+
+# Archive members booked as trade files; matches ``book --input_dir``
+TRADE_FILE_SUFFIXES = (".json", ".txt")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_BZIP2_MAGIC = b"BZh"
+_XZ_MAGIC = b"\xfd7zXZ\x00"
+
+
+def is_trade_member(name: str) -> bool:
+    """
+    Return True if an archive member name looks like a trade file.
+
+    Skips directories, hidden files and macOS resource forks (``__MACOSX/``, ``._*``).
+
+    :param name: Member name inside the archive.
+    """
+    base = posixpath.basename(name)
+    if not base or base.startswith(".") or name.startswith("__MACOSX/"):
+        return False
+    return base.lower().endswith(TRADE_FILE_SUFFIXES)
+
+
+def _decode(data: bytes, name: str) -> str:
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise ValueError(f"Archive member {name} is not UTF-8 text: {exc}") from exc
+
+
+def _open_decompressed(stream: BinaryIO) -> BinaryIO:
+    # tarfile's own "r|*" stream mode treats a truncated compressed stream as a
+    # clean end of archive; the stdlib decompressor files raise EOFError instead.
+    buffered = stream if hasattr(stream, "peek") else io.BufferedReader(stream)
+    magic = buffered.peek(len(_XZ_MAGIC))[: len(_XZ_MAGIC)]
+    if magic.startswith(_GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=buffered, mode="rb")
+    if magic.startswith(_BZIP2_MAGIC):
+        return bz2.BZ2File(buffered, mode="rb")
+    if magic.startswith(_XZ_MAGIC):
+        return lzma.LZMAFile(buffered, mode="rb")
+    return buffered
+
+
+def _iter_tar(source: Union[str, BinaryIO]) -> Iterator[Tuple[str, Union[str, Exception]]]:
+    raw = open(source, "rb") if isinstance(source, str) else source
+    try:
+        with tarfile.open(fileobj=_open_decompressed(raw), mode="r|") as archive:
+            for member in archive:
+                if not member.isfile() or not is_trade_member(member.name):
+                    continue
+                try:
+                    fh = archive.extractfile(member)
+                    yield member.name, _decode(fh.read(), member.name)
+                except ValueError as exc:
+                    yield member.name, exc
+    finally:
+        if raw is not source:
+            raw.close()
+
+
+def _iter_zip(path: str) -> Iterator[Tuple[str, Union[str, Exception]]]:
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not is_trade_member(info.filename):
+                continue
+            try:
+                yield info.filename, _decode(archive.read(info), info.filename)
+            except (ValueError, zipfile.BadZipFile, RuntimeError) as exc:
+                # RuntimeError: encrypted member
+                yield info.filename, exc
+
+
+def iter_archive_members(source: Union[str, BinaryIO]) -> Iterator[Tuple[str, Union[str, Exception]]]:
+    """
+    Yield ``(member_name, content)`` for every trade file in an archive, in archive order.
+
+    A member that cannot be read or decoded is yielded with the exception in
+    place of its content, so one bad member does not stop the rest of the drop.
+
+    :param source: Path to a tar or zip archive, or a binary stream holding a tar archive.
+    :return: Iterator of ``(member_name, text or exception)`` pairs.
+    :raises FileNotFoundError: If the archive path does not exist.
+    :raises ValueError: If the source is not a readable tar or zip archive.
+    """
+    if isinstance(source, str) and zipfile.is_zipfile(source):
+        return _iter_zip(source)
+
+    name = source if isinstance(source, str) else getattr(source, "name", "<stream>")
+    try:
+        members = _iter_tar(source)
+        first = next(members, None)
+    except (tarfile.ReadError, EOFError, gzip.BadGzipFile, lzma.LZMAError) as exc:
+        raise ValueError(f"Not a tar or zip archive: {name}: {exc}") from exc
+
+    def _chain() -> Iterator[Tuple[str, Union[str, Exception]]]:
+        if first is None:
+            return
+        yield first
+        try:
+            yield from members
+        except (tarfile.TarError, EOFError, OSError) as exc:
+            # Corrupt or truncated stream: everything before it has been yielded,
+            # so report the damage as a final failed entry rather than losing the run.
+            logger.error("Archive %s is corrupt or truncated: %s", name, exc)
+            yield name, ValueError(f"Archive is corrupt or truncated: {exc}")
+
+    return _chain()
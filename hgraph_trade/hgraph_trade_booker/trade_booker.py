@@ -5,22 +5,63 @@ This module provides functionality to finalise (or "book") a trade by writing th
 trade data to a specified output directory. The resulting file can then be used
 by downstream systems for further processing or confirmation.
 
-Includes optional dead-letter quarantine for trades that fail to book.
+Includes optional dead-letter quarantine for trades that fail to book,
+optional inline FpML structural validation (see ``fpml_validator.py``) that
+quarantines non-conforming messages before they are written, optional
+delta booking of amendments and cancellations (see ``trade_delta.py``), and
+optional suppression of exact re-sends (see ``duplicate_filter.py``).
 """
 
 import json
 import logging
 import os
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from hgraph_trade.hgraph_trade_booker.trade_delta import (
+    DELTA_TRADE_TYPES,
+    TradeVersionStore,
+    build_delta_message,
+    content_checksum,
+    extract_trade_content,
+    extract_trade_id,
+    message_checksum,
+)
+from hgraph_trade.metrics import counter, histogram
+
+if TYPE_CHECKING:
+    from hgraph_trade.hgraph_trade_booker.duplicate_filter import BookedTradeFilter
+    from hgraph_trade.hgraph_trade_booker.fpml_validator import FpmlValidator
 
 __all__ = (
+    "BOOKED_MESSAGES",
+    "BookingLock",
     "DEFAULT_QUARANTINE_DIR",
+    "Outcome",
+    "book_message",
     "book_trade",
     "book_trades_batch",
 )
 
 logger = logging.getLogger(__name__)
 
+BOOKED_MESSAGES = counter(
+    "hgraph_booker_messages_total",
+    "Trade messages handled by the booker, by outcome (booked, failed, invalid, duplicate).",
+    ("outcome",),
+)
+_BOOKED, _FAILED, _INVALID, _DUPLICATE = (
+    BOOKED_MESSAGES.labels(outcome) for outcome in ("booked", "failed", "invalid", "duplicate")
+)
+_BATCH_SECONDS = histogram(
+    "hgraph_booker_batch_seconds",
+    "Wall time of book_trades_batch calls.",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
 # Default quarantine directory for failed trades
 DEFAULT_QUARANTINE_DIR = "quarantine"
 
@@ -50,56 +91,306 @@ def book_trade(
         raise IOError(f"Error writing to {output_path}: {exc}") from exc
 
 
+def _quarantine_trade(
+    message: Dict[str, Any],
+    trade_id: str,
+    filename: str,
+    quarantine_dir: str,
+    error: str,
+    violations: Optional[List[str]] = None,
+) -> Optional[str]:
+    """Write a failed trade to the quarantine directory, returning its path (or None)."""
+    entry: Dict[str, Any] = {"original_message": message, "error": error}
+    if violations is not None:
+        entry["violations"] = violations
+    try:
+        os.makedirs(quarantine_dir, exist_ok=True)
+        quarantine_path = os.path.join(quarantine_dir, filename)
+        with open(quarantine_path, "w", encoding="utf-8") as fh:
+            json.dump(entry, fh, indent=4)
+        logger.info("Quarantined trade %s to %s", trade_id, quarantine_path)
+        return quarantine_path
+    except (IOError, OSError) as q_exc:
+        logger.critical("Failed to quarantine trade %s: %s", trade_id, q_exc)
+        return None
+
+
+def _message_type(message: Dict[str, Any]) -> str:
+    return message.get("messageHeader", {}).get("messageType", "newTrade")
+
+
+def _booked_checksum(trade_id: str, output_dir: str, version_store: Optional[TradeVersionStore]) -> Optional[str]:
+    """``message_checksum`` of the latest booked version of a trade, read from disk."""
+    if version_store is not None:
+        latest = version_store.get(trade_id)
+        return message_checksum(latest.message_type, latest.checksum) if latest is not None else None
+    try:
+        with open(os.path.join(output_dir, f"{trade_id}.json"), "r", encoding="utf-8") as fh:
+            booked = json.load(fh)
+    except (IOError, OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(booked, dict):
+        return None
+    return message_checksum(_message_type(booked), content_checksum(extract_trade_content(booked)))
+
+
+class Outcome(Enum):
+    """What ``book_message`` did with a message."""
+
+    BOOKED = "booked"
+    DELTA = "delta"
+    DUPLICATE = "duplicate"
+    INVALID = "invalid"
+    FAILED = "failed"
+
+
+class BookingLock:
+    """
+    Lets concurrent ``book_message`` calls share a version store and duplicate filter.
+
+    Only the duplicate-filter and version-store check-and-record steps run under
+    the shared lock; validation and writing the booked file run outside it.
+    Messages for the same tradeId are booked one at a time, so each sees the
+    version and checksum the previous one recorded.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._trades: Set[str] = set()
+
+    def __enter__(self) -> "BookingLock":
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._lock.release()
+
+    @contextmanager
+    def trade(self, trade_id: str) -> Iterator[None]:
+        """Claim ``trade_id`` for the duration of the block, waiting while another call holds it."""
+        with self._released:
+            while trade_id in self._trades:
+                self._released.wait()
+            self._trades.add(trade_id)
+        try:
+            yield
+        finally:
+            with self._released:
+                self._trades.discard(trade_id)
+                self._released.notify_all()
+
+
+def book_message(
+    message: Dict[str, Any],
+    default_trade_id: str,
+    output_dir: str,
+    quarantine_dir: str,
+    validator: Optional["FpmlValidator"] = None,
+    version_store: Optional[TradeVersionStore] = None,
+    duplicate_filter: Optional["BookedTradeFilter"] = None,
+    lock: Optional[BookingLock] = None,
+) -> Tuple[Outcome, Optional[str]]:
+    """
+    Book one message as ``book_trades_batch`` does, without saving the duplicate filter.
+
+    :param message: The fully assembled trade message.
+    :param default_trade_id: Name used for the message if it carries no tradeId.
+    :param output_dir: Directory for the booked trade.
+    :param quarantine_dir: Directory the message is quarantined to if it fails.
+    :param validator: Optional ``FpmlValidator`` run on the message before booking.
+    :param version_store: Optional ``TradeVersionStore`` enabling delta booking.
+    :param duplicate_filter: Optional ``BookedTradeFilter`` enabling duplicate suppression.
+    :param lock: ``BookingLock`` shared by concurrent calls that share a version store or
+                 duplicate filter.
+    :return: ``(outcome, path)``: the booked file for ``BOOKED``/``DELTA``, the tradeId
+             for ``DUPLICATE``, and the quarantine file for ``INVALID``/``FAILED``
+             (``None`` if it could not be written).
+    """
+    trade_id = extract_trade_id(message, default_trade_id)
+    if lock is None:
+        return _book_message(message, trade_id, output_dir, quarantine_dir, validator, version_store, duplicate_filter)
+    with lock.trade(trade_id):
+        return _book_message(
+            message, trade_id, output_dir, quarantine_dir, validator, version_store, duplicate_filter, lock
+        )
+
+
+def _book_message(
+    message: Dict[str, Any],
+    trade_id: str,
+    output_dir: str,
+    quarantine_dir: str,
+    validator: Optional["FpmlValidator"],
+    version_store: Optional[TradeVersionStore],
+    duplicate_filter: Optional["BookedTradeFilter"],
+    shared: AbstractContextManager = nullcontext(),
+) -> Tuple[Outcome, Optional[str]]:
+    """``book_message`` for a claimed tradeId; ``shared`` guards the version store and duplicate filter."""
+    filename = f"{trade_id}.json"
+    trade_type = _message_type(message)
+
+    checksum = None
+    if duplicate_filter is not None:
+        checksum = message_checksum(trade_type, content_checksum(extract_trade_content(message)))
+        with shared:
+            duplicate = duplicate_filter.is_duplicate(
+                trade_id, checksum, lambda tid: _booked_checksum(tid, output_dir, version_store)
+            )
+        if duplicate:
+            logger.info("Trade %s is an exact duplicate of the booked version, skipping", trade_id)
+            return Outcome.DUPLICATE, trade_id
+
+    if validator is not None:
+        violations = validator.validate(message)
+        if violations:
+            logger.error(
+                "Trade %s failed FpML validation (%d violation(s)), quarantining: %s",
+                trade_id,
+                len(violations),
+                violations[0],
+            )
+            quarantine_path = _quarantine_trade(
+                message,
+                trade_id,
+                filename,
+                quarantine_dir,
+                f"FpML validation failed with {len(violations)} violation(s)",
+                [str(v) for v in violations],
+            )
+            return Outcome.INVALID, quarantine_path
+
+    to_book = message
+    new_version = None
+    version = 1
+    if version_store is not None:
+        with shared:
+            latest = version_store.get(trade_id)
+        if latest is not None and trade_type in DELTA_TRADE_TYPES:
+            to_book, new_version = build_delta_message(message, trade_id, latest)
+            version = new_version.version
+            filename = f"{trade_id}.v{version}.json"
+        elif latest is not None:
+            # Booked in full as the next version, so the existing history stays intact
+            version = latest.version + 1
+            filename = f"{trade_id}.v{version}.json"
+            logger.warning("%s for already booked %s; booking in full as version %d", trade_type, trade_id, version)
+        elif trade_type in DELTA_TRADE_TYPES:
+            logger.warning("No booked version of %s found for %s; booking in full", trade_id, trade_type)
+
+    try:
+        book_trade(to_book, filename, output_dir)
+    except (IOError, OSError) as exc:
+        logger.error("Trade %s failed to book, quarantining: %s", trade_id, exc)
+        return Outcome.FAILED, _quarantine_trade(message, trade_id, filename, quarantine_dir, str(exc))
+
+    with shared:
+        if version_store is not None:
+            try:
+                version_store.put(trade_id, version, extract_trade_content(message), trade_type)
+            except (IOError, OSError) as exc:
+                # The trade is booked; the next amendment will be booked in full.
+                logger.error("Booked %s but could not record version %d: %s", trade_id, version, exc)
+        if duplicate_filter is not None:
+            duplicate_filter.add(trade_id, checksum)
+
+    return (Outcome.DELTA if new_version is not None else Outcome.BOOKED), os.path.join(output_dir, filename)
+
+
 def book_trades_batch(
     messages: List[Dict[str, Any]],
     output_dir: str,
     quarantine_dir: Optional[str] = None,
+    validator: Optional["FpmlValidator"] = None,
+    version_store: Optional[TradeVersionStore] = None,
+    duplicate_filter: Optional["BookedTradeFilter"] = None,
 ) -> Dict[str, List]:
     """
     Book a batch of trade messages, quarantining any that fail.
 
     Each message is written to its own file named after the trade_id (or index).
     Trades that fail to write are saved to the quarantine directory so they can
-    be inspected and retried later.
+    be inspected and retried later. If a validator is given, messages whose
+    ``tradeEconomics`` do not conform to FpML are quarantined without being
+    booked; their quarantine entry lists the violations.
+
+    If a version store is given, every booked trade's content is recorded in
+    it, and ``amendTrade``/``cancelTrade`` messages for a trade that has a
+    recorded version are booked as compact delta messages named
+    ``<tradeId>.v<version>.json`` instead of full rewrites. Any other message
+    for a trade that has a recorded version (e.g. a re-sent ``newTrade``) is
+    booked in full as the next version, ``<tradeId>.v<version>.json``.
+
+    If a duplicate filter is given, messages whose tradeId, message type and
+    content exactly match the latest booked version are skipped. The filter is updated with
+    every booked trade and saved at the end of the batch.
 
     :param messages: List of fully assembled trade message dictionaries.
     :param output_dir: Directory for successfully booked trades.
     :param quarantine_dir: Directory for failed trades. Defaults to ``output_dir/quarantine``.
-    :return: A dict with ``"booked"`` and ``"quarantined"`` lists of file paths.
+    :param validator: Optional ``FpmlValidator`` run on every message before booking.
+    :param version_store: Optional ``TradeVersionStore`` enabling delta booking.
+    :param duplicate_filter: Optional ``BookedTradeFilter`` enabling duplicate suppression.
+    :return: A dict with ``"booked"`` and ``"quarantined"`` lists of file paths,
+             ``"invalid"``, the subset of ``"quarantined"`` that failed validation,
+             ``"deltas"``, the subset of ``"booked"`` written as delta messages,
+             and ``"duplicates"``, the tradeIds skipped as exact re-sends.
     """
     if quarantine_dir is None:
         quarantine_dir = os.path.join(output_dir, DEFAULT_QUARANTINE_DIR)
 
+    started = time.perf_counter()
     booked: List[str] = []
     quarantined: List[str] = []
+    invalid: List[str] = []
+    deltas: List[str] = []
+    duplicates: List[str] = []
 
     for idx, message in enumerate(messages):
-        # Try to extract a meaningful trade ID for the filename
-        trade_id = message.get("tradeHeader", {}).get("partyTradeIdentifier", {}).get("tradeId", f"trade_{idx}")
-        filename = f"{trade_id}.json"
+        # Messages without a tradeId are named after their index
+        outcome, path = book_message(
+            message, f"trade_{idx}", output_dir, quarantine_dir, validator, version_store, duplicate_filter
+        )
+        if outcome == Outcome.DUPLICATE:
+            duplicates.append(path)
+            continue
+        if path is None:
+            continue
+        if outcome in (Outcome.BOOKED, Outcome.DELTA):
+            booked.append(path)
+            if outcome == Outcome.DELTA:
+                deltas.append(path)
+        else:
+            quarantined.append(path)
+            if outcome == Outcome.INVALID:
+                invalid.append(path)
 
+    if duplicate_filter is not None:
         try:
-            book_trade(message, filename, output_dir)
-            booked.append(os.path.join(output_dir, filename))
+            duplicate_filter.save()
         except (IOError, OSError) as exc:
-            logger.error("Trade %s failed to book, quarantining: %s", trade_id, exc)
-            try:
-                os.makedirs(quarantine_dir, exist_ok=True)
-                quarantine_path = os.path.join(quarantine_dir, filename)
-                with open(quarantine_path, "w", encoding="utf-8") as fh:
-                    json.dump(
-                        {"original_message": message, "error": str(exc)},
-                        fh,
-                        indent=4,
-                    )
-                quarantined.append(quarantine_path)
-                logger.info("Quarantined trade %s to %s", trade_id, quarantine_path)
-            except (IOError, OSError) as q_exc:
-                logger.critical("Failed to quarantine trade %s: %s", trade_id, q_exc)
+            # Only costs speed: the filter is rebuilt from the output directory next time.
+            logger.error("Could not save duplicate filter: %s", exc)
+
+    # Counted once per batch so the per-message loop carries no metrics cost
+    _BOOKED.inc(len(booked))
+    _FAILED.inc(len(quarantined) - len(invalid))
+    _INVALID.inc(len(invalid))
+    _DUPLICATE.inc(len(duplicates))
+    _BATCH_SECONDS.observe(time.perf_counter() - started)
 
     logger.info(
-        "Batch booking complete: %d booked, %d quarantined",
+        "Batch booking complete: %d booked (%d deltas), %d quarantined (%d invalid), %d duplicates skipped",
         len(booked),
+        len(deltas),
         len(quarantined),
+        len(invalid),
+        len(duplicates),
     )
-    return {"booked": booked, "quarantined": quarantined}
+    return {
+        "booked": booked,
+        "quarantined": quarantined,
+        "invalid": invalid,
+        "deltas": deltas,
+        "duplicates": duplicates,
+    }
@@ -0,0 +1,324 @@
+"""
+trade_delta.py
+
+Delta booking for amendments and cancellations.
+
+A new trade is booked in full and its ``tradeHeader`` and ``tradeEconomics``
+are recorded as version 1 in a :class:`TradeVersionStore`. When an
+``amendTrade`` or ``cancelTrade`` for the same tradeId arrives, the booker
+diffs it against the latest recorded version and books a compact delta
+message instead of the full trade::
+
+    {
+        "messageHeader": {...},
+        "tradeDelta": {
+            "tradeId": "SWAP-001",
+            "tradeType": "amendTrade",
+            "version": 2,
+            "baseVersion": 1,
+            "baseChecksum": "<sha256 of version 1 content>",
+            "checksum": "<sha256 of version 2 content>",
+            "operations": [
+                {"op": "replace", "path": "/tradeEconomics/commoditySwap/fixedLeg/fixedPrice/price", "value": 4.1}
+            ]
+        },
+        "messageFooter": {...}
+    }
+
+Operation paths are JSON Pointers (RFC 6901) into the trade content, and
+:func:`apply_delta` reconstructs the new version from the base, so a consumer
+can verify ``baseChecksum`` before applying and ``checksum`` after.
+"""
+
+import copy
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from hgraph_trade.hgraph_trade_booker.message_wrapper import calculate_checksum
+
+__all__ = (
+    "DEFAULT_VERSIONS_DIR",
+    "DELTA_TRADE_TYPES",
+    "TradeVersion",
+    "TradeVersionStore",
+    "extract_trade_id",
+    "extract_trade_content",
+    "content_checksum",
+    "message_checksum",
+    "diff_content",
+    "apply_delta",
+    "build_delta_message",
+)
+
+logger = logging.getLogger(__name__)
+
+# Default directory (under the output directory) for recorded trade versions
+DEFAULT_VERSIONS_DIR = "versions"
+
+# Trade types booked as deltas against the previously booked version
+DELTA_TRADE_TYPES = frozenset({"amendTrade", "cancelTrade"})
+
+# Message sections that make up the versioned trade content
+_CONTENT_SECTIONS = ("tradeHeader", "tradeEconomics")
+
+
+@dataclass(frozen=True)
+class TradeVersion:
+    """A recorded version of a booked trade.
+
+    :param trade_id: The trade identifier.
+    :param version: Version number, starting at 1 for the original booking.
+    :param checksum: ``content_checksum`` of ``content``.
+    :param content: The trade's ``tradeHeader`` and ``tradeEconomics`` sections.
+    :param message_type: ``messageHeader.messageType`` of the message booked as this version.
+    """
+
+    trade_id: str
+    version: int
+    checksum: str
+    content: Dict[str, Any]
+    message_type: str = "newTrade"
+
+
+def extract_trade_id(message: Mapping[str, Any], default: str) -> str:
+    """
+    Return the tradeId of a message, or ``default`` if it has none.
+
+    Accepts both a flat ``tradeHeader`` and the ``{"tradeHeader": {"tradeHeader": ...}}``
+    shape produced by ``create_trade_header``.
+
+    :param message: A fully assembled trade message.
+    :param default: Value returned when the message carries no tradeId.
+    :return: The trade identifier.
+    """
+    header = message.get("tradeHeader", {})
+    if "partyTradeIdentifier" not in header:
+        header = header.get("tradeHeader", {})
+    return header.get("partyTradeIdentifier", {}).get("tradeId") or default
+
+
+def extract_trade_content(message: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Return the versioned sections of a trade message.
+
+    :param message: A fully assembled trade message.
+    :return: Dict with the message's ``tradeHeader`` and ``tradeEconomics``.
+    """
+    return {section: message[section] for section in _CONTENT_SECTIONS if section in message}
+
+
+def content_checksum(content: Mapping[str, Any]) -> str:
+    """
+    SHA-256 of the canonical (key-sorted, compact) JSON form of trade content.
+
+    :param content: Trade content as returned by ``extract_trade_content``.
+    :return: Hex digest, independent of dict key order.
+    """
+    serialized = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return calculate_checksum(serialized)
+
+
+def message_checksum(message_type: str, checksum: str) -> str:
+    """
+    Checksum of a booked message's type and content, so that e.g. a ``cancelTrade``
+    carrying the same content as the booked ``newTrade`` is not taken for a re-send.
+
+    :param message_type: ``messageHeader.messageType`` of the message.
+    :param checksum: ``content_checksum`` of its content.
+    :return: Hex digest.
+    """
+    return calculate_checksum(f"{message_type}\x1f{checksum}")
+
+
+def _escape(token: str) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def diff_content(base: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Compute a structural diff between two JSON-compatible values.
+
+    Dicts are compared key by key and lists of equal length element by
+    element; any other difference replaces the value at that path.
+
+    :param base: The previous value.
+    :param new: The new value.
+    :param path: JSON Pointer prefix for the generated operations.
+    :return: List of ``{"op", "path"[, "value"]}`` operations; empty if equal.
+    """
+    if isinstance(base, dict) and isinstance(new, dict):
+        operations: List[Dict[str, Any]] = []
+        for key in base:
+            if key not in new:
+                operations.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child_path = f"{path}/{_escape(key)}"
+            if key not in base:
+                operations.append({"op": "add", "path": child_path, "value": value})
+            else:
+                operations.extend(diff_content(base[key], value, child_path))
+        return operations
+
+    if isinstance(base, list) and isinstance(new, list) and len(base) == len(new):
+        operations = []
+        for idx, (base_item, new_item) in enumerate(zip(base, new)):
+            operations.extend(diff_content(base_item, new_item, f"{path}/{idx}"))
+        return operations
+
+    if base == new and type(base) is type(new):
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def apply_delta(base: Any, operations: List[Dict[str, Any]]) -> Any:
+    """
+    Apply operations produced by :func:`diff_content` to a copy of ``base``.
+
+    :param base: The base value (not modified).
+    :param operations: Diff operations.
+    :return: The reconstructed new value.
+    :raises ValueError: If an operation does not fit the base structure.
+    """
+    result = copy.deepcopy(base)
+    for operation in operations:
+        path = operation["path"]
+        if path == "":
+            result = copy.deepcopy(operation["value"])
+            continue
+
+        tokens = [_unescape(token) for token in path.split("/")[1:]]
+        target = result
+        try:
+            for token in tokens[:-1]:
+                target = target[int(token)] if isinstance(target, list) else target[token]
+            last = tokens[-1]
+            if isinstance(target, list):
+                last = int(last)
+            if operation["op"] == "remove":
+                del target[last]
+            else:
+                target[last] = copy.deepcopy(operation["value"])
+        except (KeyError, IndexError, TypeError, ValueError) as exc:
+            raise ValueError(f"Cannot apply {operation['op']} at {path}: {exc}") from exc
+    return result
+
+
+def build_delta_message(
+    message: Mapping[str, Any],
+    trade_id: str,
+    base: TradeVersion,
+) -> Tuple[Dict[str, Any], TradeVersion]:
+    """
+    Build the delta message for an amendment or cancellation.
+
+    :param message: The fully assembled amend/cancel message.
+    :param trade_id: The trade identifier.
+    :param base: The latest recorded version of the trade.
+    :return: ``(delta_message, new_version)``.
+    """
+    content = extract_trade_content(message)
+    checksum = content_checksum(content)
+    header = message.get("messageHeader", {})
+    new_version = TradeVersion(
+        trade_id=trade_id,
+        version=base.version + 1,
+        checksum=checksum,
+        content=content,
+        message_type=header.get("messageType", ""),
+    )
+
+    delta_message = {
+        "messageHeader": header,
+        "tradeDelta": {
+            "tradeId": trade_id,
+            "tradeType": header.get("messageType", ""),
+            "version": new_version.version,
+            "baseVersion": base.version,
+            "baseChecksum": base.checksum,
+            "checksum": checksum,
+            "operations": diff_content(base.content, content),
+        },
+        "messageFooter": message.get("messageFooter", {}),
+    }
+    return delta_message, new_version
+
+
+class TradeVersionStore:
+    """
+    Latest booked version of each trade, one JSON file per tradeId.
+
+    :param directory: Directory holding the version files. Created on first write.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def _path(self, trade_id: str) -> str:
+        return os.path.join(self.directory, f"{trade_id}.json")
+
+    def get(self, trade_id: str) -> Optional[TradeVersion]:
+        """
+        Return the latest recorded version of a trade.
+
+        :param trade_id: The trade identifier.
+        :return: The ``TradeVersion``, or ``None`` if the trade has not been booked.
+        """
+        try:
+            with open(self._path(trade_id), "r", encoding="utf-8") as fh:
+                record = json.load(fh)
+        except FileNotFoundError:
+            return None
+        except (IOError, OSError, json.JSONDecodeError) as exc:
+            logger.error("Cannot read version record for %s: %s", trade_id, exc)
+            return None
+        return TradeVersion(
+            trade_id=trade_id,
+            version=record["version"],
+            checksum=record["checksum"],
+            content=record["content"],
+            message_type=record.get("messageType", "newTrade"),
+        )
+
+    def put(self, trade_id: str, version: int, content: Dict[str, Any], message_type: str = "newTrade") -> TradeVersion:
+        """
+        Record a new latest version of a trade.
+
+        The record is written to a temporary file and renamed into place.
+
+        :param trade_id: The trade identifier.
+        :param version: The version number being recorded.
+        :param content: The trade content for this version.
+        :param message_type: ``messageHeader.messageType`` of the booked message.
+        :return: The recorded ``TradeVersion``.
+        :raises IOError: If the record cannot be written.
+        """
+        trade_version = TradeVersion(
+            trade_id=trade_id,
+            version=version,
+            checksum=content_checksum(content),
+            content=content,
+            message_type=message_type,
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(trade_id)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "version": trade_version.version,
+                    "checksum": trade_version.checksum,
+                    "messageType": message_type,
+                    "content": content,
+                },
+                fh,
+                default=str,
+            )
+        os.replace(tmp_path, path)
+        return trade_version
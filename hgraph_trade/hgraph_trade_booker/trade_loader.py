@@ -23,12 +23,17 @@ __all__ = (
     "validate_instrument_types",
     "validate_field_with_regex",
     "additional_validations",
+    "load_trade_from_dict",
+    "load_trade_from_string",
     "load_trade_from_file",
     "fetch_trade_from_hgraph",
 )
 
 logger = logging.getLogger(__name__)
 
+# Shared client for fetch_trade_from_hgraph, created on first use
+_trade_source_client = None
+
 
 def validate_required_keys(file_content: str, required_keys: Dict[str, Any]) -> None:
     """
@@ -121,28 +126,37 @@ def additional_validations(trade_data: Dict[str, Any]) -> None:
         )
 
 
-def load_trade_from_file(file_path: str) -> Dict[str, Any]:
+def load_trade_from_string(file_content: str, source: str) -> Dict[str, Any]:
     """
-    Load trade data from a local JSON file, performing regex validation and field checks.
+    Parse and validate trade data from the raw content of a trade file.
 
-    :param file_path: Path to the trade file.
+    :param file_content: Content of the trade file as a string.
+    :param source: Where the content came from (file path or archive member), for error messages.
     :return: Parsed and validated trade data as a dictionary.
-    :raises FileNotFoundError: If the file does not exist.
     :raises ValueError: If validation fails or JSON is invalid.
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Trade file not found: {file_path}")
-
-    with open(file_path, "r", encoding="utf-8") as file:
-        file_content = file.read()
-
     # Validate structure before parsing JSON
     validate_trade_file_with_regex(file_content)
 
     try:
         trade_data = json.loads(file_content)
     except json.JSONDecodeError as e:
-        raise ValueError(f"Invalid JSON format in file: {file_path}") from e
+        raise ValueError(f"Invalid JSON format in file: {source}") from e
+
+    return load_trade_from_dict(trade_data, source)
+
+
+def load_trade_from_dict(trade_data: Dict[str, Any], source: str) -> Dict[str, Any]:
+    """
+    Validate already-parsed trade data, e.g. a trade fetched from the trade service.
+
+    :param trade_data: Parsed trade data dictionary.
+    :param source: Where the trade came from, for error messages.
+    :return: The validated trade data.
+    :raises ValueError: If validation fails.
+    """
+    if not isinstance(trade_data, dict):
+        raise ValueError(f"Trade data from {source} is not a JSON object")
 
     # Validate instrument types and other fields
     validate_instrument_types(trade_data)
@@ -151,15 +165,47 @@ def load_trade_from_file(file_path: str) -> Dict[str, Any]:
     return trade_data
 
 
+def load_trade_from_file(file_path: str) -> Dict[str, Any]:
+    """
+    Load trade data from a local JSON file, performing regex validation and field checks.
+
+    :param file_path: Path to the trade file.
+    :return: Parsed and validated trade data as a dictionary.
+    :raises FileNotFoundError: If the file does not exist.
+    :raises ValueError: If validation fails or JSON is invalid.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Trade file not found: {file_path}")
+
+    with open(file_path, "r", encoding="utf-8") as file:
+        file_content = file.read()
+
+    return load_trade_from_string(file_content, file_path)
+
+
 def fetch_trade_from_hgraph(trade_id: str) -> Dict[str, Any]:
     """
-    Placeholder function to fetch trade data from the hgraph database.
+    Fetch and validate a single trade from the HTTP trade service.
+
+    Uses a shared ``TradeSourceClient`` for ``config["TRADE_SOURCE_API_URL"]``,
+    so repeated calls reuse pooled connections. For many trades, use
+    ``TradeSourceClient.iter_trades`` directly to batch the requests.
 
     :param trade_id: ID of the trade to fetch.
-    :return: Trade data from the hgraph database (currently an empty dictionary).
+    :return: Validated trade data, or an empty dictionary if the service does not know the trade.
+    :raises TradeSourceError: If the service cannot be reached after retries.
+    :raises ValueError: If the fetched trade fails validation.
     """
-    # Implement actual database fetch logic here if required
-    return {}
+    global _trade_source_client
+    if _trade_source_client is None:
+        from hgraph_trade.hgraph_trade_booker.trade_source import TradeSourceClient
+
+        _trade_source_client = TradeSourceClient.from_config()
+
+    trade_data = _trade_source_client.fetch_trade(trade_id)
+    if trade_data is None:
+        return {}
+    return load_trade_from_dict(trade_data, f"trade service ({trade_id})")
 
 
 # Example usage (for demonstration or testing)
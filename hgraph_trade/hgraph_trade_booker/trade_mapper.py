@@ -11,30 +11,22 @@ the ``errors`` list returned alongside the messages.
 The final output is a list of dictionaries, each representing a fully assembled trade message.
 """
 
+import importlib
 import logging
-import sqlite3
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
-from secure_config import config
-from hgraph_entitlements.checker import check_permission, PermissionDeniedError
 from hgraph_trade.hgraph_trade_booker.message_wrapper import create_message_header, create_message_footer
-from hgraph_trade.hgraph_trade_model import (
-    create_trade_header,
-    create_trade_footer,
-    create_commodity_swap,
-    create_commodity_option,
-    create_commodity_forward,
-    create_commodity_future,
-    create_commodity_physical,
-    create_commodity_swaption,
-    create_fx_trade,
-    create_cash_trade,
-    get_instrument_mapping,
-)
+from hgraph_trade.hgraph_trade_model.trade_header import create_trade_header
+from hgraph_trade.hgraph_trade_model.trade_footer import create_trade_footer
 from hgraph_trade.hgraph_trade_mapping.instrument_mappings import map_pricing_instrument
-from decomposition import decompose_instrument
+from hgraph_trade.hgraph_trade_booker.decomposition import decompose_instrument
 
-__all__ = ("map_trade_to_model",)
+if TYPE_CHECKING:
+    import sqlite3
+
+    from hgraph_trade.hgraph_trade_booker.static_enrichment import StaticDataEnricher
+
+__all__ = ("map_trade_to_model", "instrument_creator_names", "preload_instrument_creators")
 
 logger = logging.getLogger(__name__)
 
@@ -47,23 +39,71 @@ _ACTION_FOR_TRADE_TYPE: Dict[str, str] = {
     "approval": "approve_trade",
 }
 
-# Lookup table: instrument_type -> creator function
-_INSTRUMENT_CREATORS = {
-    "swap": lambda td, sub: create_commodity_swap(td, sub_instrument_type=sub),
-    "option": lambda td, _sub: create_commodity_option(td),
-    "forward": lambda td, _sub: create_commodity_forward(td),
-    "future": lambda td, _sub: create_commodity_future(td),
-    "physical": lambda td, _sub: create_commodity_physical(td),
-    "swaption": lambda td, _sub: create_commodity_swaption(td),
-    "fx": lambda td, _sub: create_fx_trade(td),
-    "cash": lambda td, _sub: create_cash_trade(td),
+# Registry: instrument_type -> (module, creator function, takes sub_instrument_type).
+# Modules are imported on first use so a run only pays for the instruments it books.
+_INSTRUMENT_CREATOR_SPECS: Dict[str, Tuple[str, str, bool]] = {
+    "swap": ("hgraph_trade.hgraph_trade_model.swap", "create_commodity_swap", True),
+    "option": ("hgraph_trade.hgraph_trade_model.option", "create_commodity_option", False),
+    "forward": ("hgraph_trade.hgraph_trade_model.forward", "create_commodity_forward", False),
+    "future": ("hgraph_trade.hgraph_trade_model.future", "create_commodity_future", False),
+    "physical": ("hgraph_trade.hgraph_trade_model.physical", "create_commodity_physical", False),
+    "swaption": ("hgraph_trade.hgraph_trade_model.swaption", "create_commodity_swaption", False),
+    "fx": ("hgraph_trade.hgraph_trade_model.fx", "create_fx_trade", False),
+    "cash": ("hgraph_trade.hgraph_trade_model.cash", "create_cash_trade", False),
 }
 
+# Resolved creators, populated lazily by _get_instrument_creator
+_INSTRUMENT_CREATORS: Dict[str, Callable[[Dict[str, Any], Optional[str]], Any]] = {}
+
+
+def instrument_creator_names() -> Dict[str, str]:
+    """
+    Return the creator function name for each supported instrument type.
+
+    :return: ``{instrument_type: function name}``, e.g. ``{"swap": "create_commodity_swap", ...}``.
+    """
+    return {instrument_type: spec[1] for instrument_type, spec in _INSTRUMENT_CREATOR_SPECS.items()}
+
+
+def _get_instrument_creator(instrument_type: str) -> Optional[Callable[[Dict[str, Any], Optional[str]], Any]]:
+    """
+    Return the creator for an instrument type, importing its module on first use.
+
+    :param instrument_type: The resolved instrument type (e.g. "swap").
+    :return: A callable ``(trade_data, sub_instrument_type) -> economics``, or None if unsupported.
+    """
+    creator = _INSTRUMENT_CREATORS.get(instrument_type)
+    if creator is not None:
+        return creator
+
+    spec = _INSTRUMENT_CREATOR_SPECS.get(instrument_type)
+    if spec is None:
+        return None
+
+    module_name, func_name, takes_sub = spec
+    func = getattr(importlib.import_module(module_name), func_name)
+    if takes_sub:
+        creator = lambda td, sub: func(td, sub_instrument_type=sub)  # noqa: E731
+    else:
+        creator = lambda td, _sub: func(td)  # noqa: E731
+    _INSTRUMENT_CREATORS[instrument_type] = creator
+    return creator
+
+
+def preload_instrument_creators() -> List[str]:
+    """
+    Import every instrument creator module now rather than on first use (for long-lived processes).
+
+    :return: The instrument types whose creators were loaded.
+    """
+    return [name for name in _INSTRUMENT_CREATOR_SPECS if _get_instrument_creator(name) is not None]
+
 
 def _build_single_message(
     single_trade_data: Dict[str, Any],
     instrument_type: str,
     sub_instrument_type: str,
+    enricher: Optional["StaticDataEnricher"] = None,
 ) -> Dict[str, Any]:
     """
     Build one fully assembled trade message from a single (possibly decomposed) trade.
@@ -71,10 +111,14 @@ def _build_single_message(
     :param single_trade_data: Trade data for one bookable trade.
     :param instrument_type: The resolved instrument type (e.g. "swap").
     :param sub_instrument_type: The resolved sub-instrument type (e.g. "fixedFloat").
+    :param enricher: Optional static data enricher applied to the trade header.
     :return: A dictionary containing messageHeader, tradeHeader, tradeEconomics,
              tradeFooter, and messageFooter.
     :raises ValueError: If the instrument type is unsupported.
+    :raises StaticDataError: If ``enricher`` is strict and the header does not resolve.
     """
+    from secure_config import config
+
     message: Dict[str, Any] = {}
 
     message["messageHeader"] = create_message_header(
@@ -84,8 +128,10 @@ def _build_single_message(
     )
 
     message["tradeHeader"] = create_trade_header(dict(single_trade_data))
+    if enricher is not None:
+        enricher.enrich(message)
 
-    creator = _INSTRUMENT_CREATORS.get(instrument_type)
+    creator = _get_instrument_creator(instrument_type)
     if creator is None:
         raise ValueError(f"Unsupported instrument: {instrument_type}")
 
@@ -109,7 +155,8 @@ def map_trade_to_model(
     *,
     fail_fast: bool = False,
     user_id: Optional[str] = None,
-    entitlements_conn: Optional[sqlite3.Connection] = None,
+    entitlements_conn: Optional["sqlite3.Connection"] = None,
+    enricher: Optional["StaticDataEnricher"] = None,
 ) -> List[Dict[str, Any]]:
     """
     Map raw trade data to one or more trade messages, depending on decomposition requirements.
@@ -132,11 +179,15 @@ def map_trade_to_model(
     :param entitlements_conn: Optional SQLite connection for entitlements lookups.
                               If user_id is given but conn is None, a default connection
                               is created automatically.
+    :param enricher: Optional ``StaticDataEnricher`` that adds LEIs and legal names to each
+                     trade header and checks parties and portfolios against static data.
     :return: A list of dictionaries, each representing a compiled trade message.
     :raises PermissionDeniedError: If user_id is provided and lacks the required permission.
     """
     # --- Entitlements pre-check ---
     if user_id is not None:
+        from hgraph_entitlements.checker import check_permission, PermissionDeniedError
+
         trade_type = trade_data.get("tradeType", "newTrade")
         required_action = _ACTION_FOR_TRADE_TYPE.get(trade_type, "execute_trade")
         if not check_permission(user_id, required_action, conn=entitlements_conn):
@@ -153,7 +204,7 @@ def map_trade_to_model(
     for idx, single_trade_data in enumerate(decomposed_trade_data_list):
         trade_id = single_trade_data.get("trade_id", f"unknown-{idx}")
         try:
-            message = _build_single_message(single_trade_data, instrument_type, sub_instrument_type)
+            message = _build_single_message(single_trade_data, instrument_type, sub_instrument_type, enricher)
             all_messages.append(message)
         except Exception as exc:
             if fail_fast:
@@ -0,0 +1,274 @@
+"""
+trade_source.py
+
+HTTP client for the upstream trade service, the network counterpart of
+``load_trade_from_file``.
+
+Trades are fetched in bulk rather than one round trip per trade:
+
+* ``POST {base_url}/trades/batch`` with ``{"trade_ids": [...]}`` returns
+  ``{"trades": [...], "missing": [...]}``. IDs are sent in batches of
+  ``batch_size``.
+* ``GET {base_url}/trades?from=<iso>&to=<iso>&limit=<n>[&cursor=<c>]`` returns
+  ``{"trades": [...], "next_cursor": <c or null>}``. A window is split into
+  ``concurrency`` equal slices that are paged through in parallel.
+
+Requests share one keep-alive ``requests.Session`` whose connection pool is
+sized to ``concurrency``, so N concurrent requests reuse N sockets. Failed
+requests (connection errors, timeouts, 429 and 5xx responses) are retried with
+exponential back-off and full jitter, so many clients recovering from the same
+outage do not retry in lock-step.
+
+Typical usage::
+
+    with TradeSourceClient("http://trades.internal/api") as client:
+        for trade_data in client.iter_trades(trade_ids):
+            ...
+"""
+
+import datetime
+import logging
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+import requests
+from requests.adapters import HTTPAdapter
+
+__all__ = (
+    "DEFAULT_BATCH_SIZE",
+    "DEFAULT_PAGE_SIZE",
+    "DEFAULT_CONCURRENCY",
+    "DEFAULT_MAX_RETRIES",
+    "DEFAULT_RETRY_BACKOFF",
+    "DEFAULT_TIMEOUT",
+    "TradeSourceError",
+    "TradeSourceClient",
+)
+
+logger = logging.getLogger(__name__)
+
+# Trade IDs per batch request
+DEFAULT_BATCH_SIZE = 500
+
+# Trades per page when fetching a time window
+DEFAULT_PAGE_SIZE = 1000
+
+# Concurrent requests (and pooled connections)
+DEFAULT_CONCURRENCY = 8
+
+# Retries per request after the first attempt
+DEFAULT_MAX_RETRIES = 3
+
+# Base back-off in seconds; attempt n sleeps uniformly in [0, backoff * 2**n]
+DEFAULT_RETRY_BACKOFF = 0.5
+
+# Per-request (connect, read) timeout in seconds
+DEFAULT_TIMEOUT = 30.0
+
+# Responses worth retrying; other 4xx are caller errors
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TradeSourceError(Exception):
+    """A trade service request failed after all retries."""
+
+
+class TradeSourceClient:
+    """
+    Pooled, batching client for the HTTP trade service.
+
+    :param base_url: Service root, e.g. ``http://trades.internal/api``.
+    :param batch_size: Trade IDs per batch request.
+    :param page_size: Trades per page for time-window fetches.
+    :param concurrency: Maximum concurrent requests and pooled connections.
+    :param max_retries: Retries per request after the first attempt.
+    :param retry_backoff: Base back-off in seconds (full jitter, doubled per retry).
+    :param timeout: Per-request timeout in seconds.
+    :param session: Optional pre-configured ``requests.Session`` (e.g. with auth).
+    :raises ValueError: If a size or count is less than 1.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        timeout: float = DEFAULT_TIMEOUT,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        for name, value in (("batch_size", batch_size), ("page_size", page_size), ("concurrency", concurrency)):
+            if value < 1:
+                raise ValueError(f"{name} must be >= 1, got {value}")
+
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+
+        self.session = session if session is not None else requests.Session()
+        # Retries are handled in _request (with jitter), not by urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.setdefault("Accept", "application/json")
+
+    @classmethod
+    def from_config(cls, **kwargs: Any) -> "TradeSourceClient":
+        """Build a client for ``config["TRADE_SOURCE_API_URL"]``."""
+        from secure_config import config
+
+        return cls(config["TRADE_SOURCE_API_URL"], **kwargs)
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> "TradeSourceClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+    def _request(self, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+        url = f"{self.base_url}{path}"
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                delay = random.uniform(0, self.retry_backoff * (2 ** (attempt - 1)))
+                logger.warning(
+                    "Trade service %s %s failed (%s); retry %d/%d in %.2fs",
+                    method,
+                    path,
+                    last_error,
+                    attempt,
+                    self.max_retries,
+                    delay,
+                )
+                time.sleep(delay)
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                last_error = exc
+                continue
+            if response.status_code in _RETRY_STATUSES:
+                last_error = TradeSourceError(f"HTTP {response.status_code}")
+                continue
+            try:
+                response.raise_for_status()
+                return response.json()
+            except (requests.HTTPError, ValueError) as exc:
+                raise TradeSourceError(f"{method} {url} failed: {exc}") from exc
+
+        raise TradeSourceError(f"{method} {url} failed after {self.max_retries + 1} attempts: {last_error}")
+
+    def _fetch_batch(self, trade_ids: List[str]) -> List[Dict[str, Any]]:
+        body = self._request("POST", "/trades/batch", json={"trade_ids": trade_ids})
+        missing = body.get("missing") or []
+        if missing:
+            logger.warning("Trade service has no trade for %d ID(s): %s", len(missing), ", ".join(missing[:10]))
+        return body.get("trades", [])
+
+    def _fetch_slice(self, start: datetime.datetime, end: datetime.datetime) -> List[Dict[str, Any]]:
+        trades: List[Dict[str, Any]] = []
+        params: Dict[str, Any] = {"from": start.isoformat(), "to": end.isoformat(), "limit": self.page_size}
+        while True:
+            body = self._request("GET", "/trades", params=params)
+            trades.extend(body.get("trades", []))
+            cursor = body.get("next_cursor")
+            if not cursor:
+                return trades
+            params["cursor"] = cursor
+
+    # ------------------------------------------------------------------
+    # Bounded fan-out
+    # ------------------------------------------------------------------
+    def _fan_out(self, fetch: Callable[..., List[Dict[str, Any]]], jobs: Iterable[tuple]) -> Iterator[Dict[str, Any]]:
+        """Run ``fetch(*job)`` for every job with at most ``concurrency * 2`` in flight."""
+        in_flight: Set[Future] = set()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="trade-source") as executor:
+            try:
+                for job in jobs:
+                    in_flight.add(executor.submit(fetch, *job))
+                    if len(in_flight) >= self.concurrency * 2:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield from future.result()
+                while in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            finally:
+                for future in in_flight:
+                    future.cancel()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def iter_trades(self, trade_ids: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Fetch trades by ID, in batches and in parallel.
+
+        ``trade_ids`` is consumed lazily and trades are yielded as their batch
+        completes, so the order is not the input order. IDs the service does
+        not know are logged and skipped.
+
+        :param trade_ids: Trade identifiers.
+        :return: Iterator of raw trade dictionaries, as ``load_trade_from_file`` returns.
+        :raises TradeSourceError: If a batch fails after all retries.
+        """
+
+        def _batches() -> Iterator[tuple]:
+            batch: List[str] = []
+            for trade_id in trade_ids:
+                batch.append(trade_id)
+                if len(batch) >= self.batch_size:
+                    yield (batch,)
+                    batch = []
+            if batch:
+                yield (batch,)
+
+        return self._fan_out(self._fetch_batch, _batches())
+
+    def iter_trades_in_window(self, start: datetime.datetime, end: datetime.datetime) -> Iterator[Dict[str, Any]]:
+        """
+        Fetch every trade in ``[start, end)``.
+
+        The window is split into ``concurrency`` equal slices, each paged
+        through on its own connection.
+
+        :param start: Window start (inclusive).
+        :param end: Window end (exclusive).
+        :return: Iterator of raw trade dictionaries.
+        :raises ValueError: If ``end`` is not after ``start``.
+        :raises TradeSourceError: If a page fails after all retries.
+        """
+        if end <= start:
+            raise ValueError(f"Window end {end.isoformat()} is not after start {start.isoformat()}")
+        step = (end - start) / self.concurrency
+        bounds = [start + step * i for i in range(self.concurrency)] + [end]
+        slices = ((bounds[i], bounds[i + 1]) for i in range(self.concurrency) if bounds[i] < bounds[i + 1])
+        return self._fan_out(self._fetch_slice, slices)
+
+    def fetch_trade(self, trade_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a single trade.
+
+        :param trade_id: Trade identifier.
+        :return: The raw trade dictionary, or ``None`` if the service does not know it.
+        :raises TradeSourceError: If the request fails after all retries.
+        """
+        trades = self._fetch_batch([trade_id])
+        return trades[0] if trades else None
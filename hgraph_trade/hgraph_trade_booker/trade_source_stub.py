@@ -0,0 +1,194 @@
+"""
+trade_source_stub.py
+
+Local stand-in for the HTTP trade service, for tests and offline development.
+
+Serves the two endpoints ``TradeSourceClient`` uses from an in-memory list of
+trades, over HTTP/1.1 keep-alive, and counts requests and TCP connections so
+tests can check that the client pools and batches. Failures can be injected
+to exercise the retry path.
+
+Typical usage::
+
+    with StubTradeSourceServer(trades) as server:
+        client = TradeSourceClient(server.url)
+        ...
+
+Or from the command line, serving every trade file in a directory::
+
+    python -m hgraph_trade.hgraph_trade_booker.trade_source_stub hgraph_trade/test_trades --port 8081
+"""
+
+import argparse
+import glob
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+__all__ = ("StubTradeSourceServer",)
+
+logger = logging.getLogger(__name__)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_StubHTTPServer"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.stub.lock:
+            self.server.stub.connections += 1
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("trade source stub: " + format, *args)
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _inject_failure(self) -> bool:
+        stub = self.server.stub
+        with stub.lock:
+            stub.requests += 1
+            if stub.fail_next > 0:
+                stub.fail_next -= 1
+                fail = True
+            else:
+                fail = False
+        if fail:
+            self._send_json(503, {"error": "injected failure"})
+        return fail
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self._inject_failure():
+            return
+        if urlparse(self.path).path.rstrip("/") == "/api/trades/batch":
+            trade_ids = json.loads(body or b"{}").get("trade_ids", [])
+            stub = self.server.stub
+            with stub.lock:
+                stub.batch_sizes.append(len(trade_ids))
+            trades = [stub.by_id[tid] for tid in trade_ids if tid in stub.by_id]
+            missing = [tid for tid in trade_ids if tid not in stub.by_id]
+            self._send_json(200, {"trades": trades, "missing": missing})
+        else:
+            self._send_json(404, {"error": f"no route for {self.path}"})
+
+    def do_GET(self) -> None:
+        if self._inject_failure():
+            return
+        parsed = urlparse(self.path)
+        if parsed.path.rstrip("/") != "/api/trades":
+            self._send_json(404, {"error": f"no route for {self.path}"})
+            return
+
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        start, end = query.get("from", ""), query.get("to", "\uffff")
+        limit = int(query.get("limit", 1000))
+        offset = int(query.get("cursor", 0))
+        # ISO timestamps in one offset compare correctly as strings
+        matching = [t for t in self.server.stub.trades if start <= t.get(self.server.stub.time_field, "") < end]
+        page = matching[offset : offset + limit]
+        next_cursor = str(offset + limit) if offset + limit < len(matching) else None
+        self._send_json(200, {"trades": page, "next_cursor": next_cursor})
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    stub: "StubTradeSourceServer"
+
+
+class StubTradeSourceServer:
+    """
+    In-process HTTP trade service serving a fixed list of trades.
+
+    :param trades: Raw trade dictionaries, each with a ``trade_id``.
+    :param time_field: Field used for time-window queries (ISO timestamp string).
+    :param host: Interface to bind.
+    :param port: Port to bind; 0 picks a free port.
+    """
+
+    def __init__(
+        self,
+        trades: List[Dict[str, Any]],
+        time_field: str = "execution_time",
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.trades = sorted(trades, key=lambda t: t.get(time_field, ""))
+        self.by_id = {t["trade_id"]: t for t in trades}
+        self.time_field = time_field
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.batch_sizes: List[int] = []
+        self.fail_next = 0
+        self._httpd = _StubHTTPServer((host, port), _Handler)
+        self._httpd.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass to ``TradeSourceClient``."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self) -> "StubTradeSourceServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, name="trade-source-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket. Safe to call more than once."""
+        if self._thread is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> "StubTradeSourceServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    """Serve every trade file in a directory until interrupted."""
+    parser = argparse.ArgumentParser(description="Local stand-in for the HTTP trade service.")
+    parser.add_argument("trade_dir", help="Directory of trade files (*.json, *.txt)")
+    parser.add_argument("--port", type=int, default=8081, help="Port to listen on")
+    args = parser.parse_args()
+
+    trades = []
+    for path in sorted(glob.glob(f"{args.trade_dir}/*.json") + glob.glob(f"{args.trade_dir}/*.txt")):
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                trades.append(json.load(fh))
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.warning("Skipping %s: %s", path, exc)
+
+    server = StubTradeSourceServer([t for t in trades if "trade_id" in t], port=args.port)
+    print(f"Serving {len(server.by_id)} trade(s) at {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,24 +14,32 @@ Modules:
 - trade_header.py
 - trade_footer.py
 - cash.py
+
+Public names are resolved lazily on first attribute access, so importing the
+package does not import every instrument module.
 """
 
-from .swap import create_commodity_swap
-from .option import create_commodity_option
-from .forward import create_commodity_forward
-from .future import create_commodity_future
-from .physical import create_commodity_physical
-from .swaption import create_commodity_swaption
-from .fx import create_fx_trade
-from .cash import create_cash_trade
-from .trade_header import create_trade_header
-from .trade_footer import create_trade_footer
-from hgraph_trade.hgraph_trade_mapping import (
-    get_global_mapping,
-    get_instrument_mapping,
-    map_hgraph_to_fpml,
-    map_pricing_instrument,
-)
+from typing import TYPE_CHECKING, Dict
+
+from hgraph_trade.lazy_exports import lazy_exports
+
+if TYPE_CHECKING:
+    from .swap import create_commodity_swap
+    from .option import create_commodity_option
+    from .forward import create_commodity_forward
+    from .future import create_commodity_future
+    from .physical import create_commodity_physical
+    from .swaption import create_commodity_swaption
+    from .fx import create_fx_trade
+    from .cash import create_cash_trade
+    from .trade_header import create_trade_header
+    from .trade_footer import create_trade_footer
+    from hgraph_trade.hgraph_trade_mapping import (
+        get_global_mapping,
+        get_instrument_mapping,
+        map_hgraph_to_fpml,
+        map_pricing_instrument,
+    )
 
 __all__ = (
     "create_commodity_swap",
@@ -49,3 +57,23 @@ __all__ = (
     "map_hgraph_to_fpml",
     "map_pricing_instrument",
 )
+
+# Public name -> module that defines it
+_LAZY_ATTRS: Dict[str, str] = {
+    "create_commodity_swap": f"{__name__}.swap",
+    "create_commodity_option": f"{__name__}.option",
+    "create_commodity_forward": f"{__name__}.forward",
+    "create_commodity_future": f"{__name__}.future",
+    "create_commodity_physical": f"{__name__}.physical",
+    "create_commodity_swaption": f"{__name__}.swaption",
+    "create_fx_trade": f"{__name__}.fx",
+    "create_cash_trade": f"{__name__}.cash",
+    "create_trade_header": f"{__name__}.trade_header",
+    "create_trade_footer": f"{__name__}.trade_footer",
+    "get_global_mapping": "hgraph_trade.hgraph_trade_mapping",
+    "get_instrument_mapping": "hgraph_trade.hgraph_trade_mapping",
+    "map_hgraph_to_fpml": "hgraph_trade.hgraph_trade_mapping",
+    "map_pricing_instrument": "hgraph_trade.hgraph_trade_mapping",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_ATTRS)
@@ -22,7 +22,8 @@ Supports:
 - Fixed and floating pricing legs
 """
 
-from typing import Dict, Any
+from typing import Any, Dict, List, Mapping
+from hgraph_trade.calendars.registry import adjustable_date
 from hgraph_trade.hgraph_trade_mapping.fpml_mappings import (
     get_global_mapping,
     get_instrument_mapping,
@@ -122,46 +123,79 @@ def _build_adjustable_date(fpml_data: Dict[str, Any], prefix: str) -> Dict[str,
     unadjusted_date = fpml_data.get(f"{prefix}.unadjustedDate") or fpml_data.get(prefix, "")
     if unadjusted_date:
         return {
-            "adjustableDate": {
-                "unadjustedDate": unadjusted_date,
-                "dateAdjustments": {
-                    "businessDayConvention": fpml_data.get(f"{prefix}.businessDayConvention", "NotApplicable")
-                },
-            }
+            "adjustableDate": adjustable_date(
+                unadjusted_date,
+                fpml_data.get(f"{prefix}.businessDayConvention", "NotApplicable"),
+                fpml_data.get(f"{prefix}.businessCenters"),
+            )
         }
     return {}
 
 
+def _quantity_steps(steps: Any, quantity_unit: str, quantity_frequency: str) -> List[Dict[str, Any]]:
+    """
+    ``quantityStep`` dicts for ``quantitySteps`` trade data, keeping the quantities as given.
+
+    :param steps: Legacy step dicts, or bare quantities (list or array) using ``quantity_unit``
+                  and ``quantity_frequency``.
+    :raises ValueError: If step dicts and bare quantities are mixed.
+    """
+    if hasattr(steps, "tolist"):
+        steps = steps.tolist()
+    dicts = [isinstance(step, Mapping) for step in steps]
+    if all(dicts):
+        return [
+            {
+                "quantityUnit": step.get("quantityUnit", ""),
+                "quantityFrequency": step.get("quantityFrequency", ""),
+                "quantity": step.get("quantity", ""),
+            }
+            for step in steps
+        ]
+    if any(dicts):
+        raise ValueError("quantitySteps mixes step dictionaries and bare quantities")
+    return [
+        {"quantityUnit": quantity_unit, "quantityFrequency": quantity_frequency, "quantity": quantity}
+        for quantity in steps
+    ]
+
+
 def _build_delivery_quantity(fpml_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Build the delivery quantity structure, supporting both simple and shaped quantities.
 
+    Shaped quantities (``quantitySteps``: legacy step dicts, or bare quantities with
+    ``quantityUnit``/``quantityFrequency``) are booked as a ``quantityStep`` list.
+    With ``compactQuantitySteps`` set they are booked instead as a run-length/block
+    encoded ``compactQuantityStep`` (see ``quantity_schedule.py``; not an FpML
+    element, so consumers must call ``expand_quantity_steps``), with quantities as
+    numbers; ``quantityBlockSize`` forces a block size.
+
     :param fpml_data: Mapped trade data dictionary.
     :return: Dictionary with deliveryQuantity structure.
+    :raises ValueError: If ``quantitySteps`` mixes step dicts and bare quantities.
     """
     if fpml_data.get("hasShapedQuantity"):
-        return {
-            "deliveryQuantity": {
-                "physicalQuantitySchedule": [
-                    {
-                        "quantityStep": [
-                            {
-                                "quantityUnit": step.get("quantityUnit", ""),
-                                "quantityFrequency": step.get("quantityFrequency", ""),
-                                "quantity": step.get("quantity", ""),
-                            }
-                            for step in fpml_data.get("quantitySteps", [])
-                        ],
-                        "deliveryPeriodsScheduleReference": {
-                            "href": fpml_data.get("deliveryPeriodsScheduleReference", "")
-                        },
-                        "settlementPeriodsReference": [
-                            {"href": ref} for ref in fpml_data.get("settlementPeriodsRefs", [])
-                        ],
-                    }
-                ]
-            }
+        steps = fpml_data.get("quantitySteps", [])
+        unit, frequency = fpml_data.get("quantityUnit", ""), fpml_data.get("quantityFrequency", "")
+        schedule_entry: Dict[str, Any] = {}
+        schedule = None
+        if fpml_data.get("compactQuantitySteps"):
+            from hgraph_trade.hgraph_trade_model.quantity_schedule import COMPACT_STEP_KEY, QuantitySchedule
+
+            schedule = QuantitySchedule.from_steps(steps, unit, frequency)
+        if schedule is not None:
+            block_size = fpml_data.get("quantityBlockSize")
+            schedule_entry[COMPACT_STEP_KEY] = schedule.encode([int(block_size)] if block_size else None)
+        else:
+            schedule_entry["quantityStep"] = _quantity_steps(steps, unit, frequency)
+        schedule_entry["deliveryPeriodsScheduleReference"] = {
+            "href": fpml_data.get("deliveryPeriodsScheduleReference", "")
         }
+        schedule_entry["settlementPeriodsReference"] = [
+            {"href": ref} for ref in fpml_data.get("settlementPeriodsRefs", [])
+        ]
+        return {"deliveryQuantity": {"physicalQuantitySchedule": [schedule_entry]}}
     else:
         delivery_quantity = {
             "physicalQuantity": {
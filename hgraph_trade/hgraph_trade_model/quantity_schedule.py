@@ -0,0 +1,272 @@
+"""
+quantity_schedule.py
+
+Array-backed shaped quantity schedules for physical legs.
+
+An hourly-shaped power deal has 8,760 quantity steps per year. Held as a
+list of ``{"quantityUnit", "quantityFrequency", "quantity"}`` dicts that is
+tens of thousands of Python objects to build and several megabytes of JSON
+to book. A ``QuantitySchedule`` keeps the quantities in one NumPy array (the
+unit and frequency are shared by every step) and, for trades that opt in with
+``compactQuantitySteps``, books them in a compact form under
+``compactQuantityStep``:
+
+- ``"rle"``: ``runs`` of ``[quantity, count]``, for flat or block-shaped
+  profiles (a baseload year is one run);
+- ``"blocks"``: the distinct ``blockSize``-step blocks (e.g. daily 24-hour
+  shapes) plus ``runs`` of ``[block index, count]`` and any partial ``tail``,
+  for profiles that repeat a daily or weekly shape.
+
+``encode()`` picks whichever is smaller. ``compactQuantityStep`` is not an
+FpML element: ``expand_quantity_steps()`` turns compact schedules in a booked
+message back into ``quantityStep`` lists for consumers that need every step.
+
+Schedules whose steps do not share one unit and frequency, or whose
+quantities are not numeric, are left as plain ``quantityStep`` lists.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+__all__ = (
+    "COMPACT_STEP_KEY",
+    "QuantitySchedule",
+    "expand_quantity_steps",
+)
+
+# Key of the compact encoding inside a physicalQuantitySchedule entry (replaces "quantityStep")
+COMPACT_STEP_KEY = "compactQuantityStep"
+
+# Block sizes tried by encode() when none is given, by quantity frequency
+_DEFAULT_BLOCK_SIZES: Dict[str, Tuple[int, ...]] = {
+    "PerHour": (24, 168),
+    "PerSettlementPeriod": (24, 48, 96),
+    "PerCalendarDay": (7,),
+}
+
+
+def _runs(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(starts, counts)`` of the runs of equal consecutive values (rows, for 2-D input)."""
+    n = len(values)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    changed = values[1:] != values[:-1]
+    if changed.ndim > 1:
+        changed = changed.any(axis=1)
+    starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+    counts = np.diff(np.concatenate((starts, [n])))
+    return starts, counts
+
+
+class QuantitySchedule:
+    """
+    Shaped quantities sharing one unit and frequency.
+
+    :param quantities: One quantity per step (anything ``np.asarray`` accepts).
+    :param quantity_unit: Unit of every step, e.g. ``"MW"``.
+    :param quantity_frequency: Frequency of every step, e.g. ``"PerHour"``.
+    :raises ValueError: If the quantities are not a 1-D numeric array.
+    """
+
+    __slots__ = ("quantities", "quantity_unit", "quantity_frequency")
+
+    def __init__(self, quantities: Any, quantity_unit: str = "", quantity_frequency: str = "") -> None:
+        array = np.asarray(quantities)
+        if array.dtype.kind not in "iuf":
+            try:
+                array = array.astype(np.float64)
+            except (TypeError, ValueError):
+                raise ValueError("Shaped quantities must be numeric") from None
+        if array.ndim != 1:
+            raise ValueError(f"Shaped quantities must be one-dimensional, got shape {array.shape}")
+        self.quantities = array
+        self.quantity_unit = quantity_unit
+        self.quantity_frequency = quantity_frequency
+
+    def __len__(self) -> int:
+        return len(self.quantities)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, QuantitySchedule):
+            return NotImplemented
+        return (
+            self.quantity_unit == other.quantity_unit
+            and self.quantity_frequency == other.quantity_frequency
+            and np.array_equal(self.quantities, other.quantities)
+        )
+
+    @property
+    def total(self) -> float:
+        """Sum of the step quantities."""
+        return self.quantities.sum().item()
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_steps(
+        cls, steps: Union[Sequence[Any], np.ndarray], quantity_unit: str = "", quantity_frequency: str = ""
+    ) -> Optional["QuantitySchedule"]:
+        """
+        Build a schedule from ``quantitySteps`` trade data.
+
+        :param steps: A numeric array / list of quantities (using ``quantity_unit`` and
+                      ``quantity_frequency``), or legacy ``{"quantityUnit", "quantityFrequency",
+                      "quantity"}`` dicts.
+        :param quantity_unit: Unit for bare quantities.
+        :param quantity_frequency: Frequency for bare quantities.
+        :return: The schedule, or None if dict steps differ in unit or frequency or are not numeric.
+        :raises ValueError: If step dicts and bare quantities are mixed.
+        """
+        if isinstance(steps, np.ndarray):
+            dicts = 0
+        else:
+            dicts = sum(isinstance(step, Mapping) for step in steps)
+            if 0 < dicts < len(steps):
+                raise ValueError("quantitySteps mixes step dictionaries and bare quantities")
+        if not dicts:
+            try:
+                return cls(steps, quantity_unit, quantity_frequency)
+            except ValueError:
+                return None
+        if not steps:
+            return cls([], quantity_unit, quantity_frequency)
+        unit = steps[0].get("quantityUnit", "")
+        frequency = steps[0].get("quantityFrequency", "")
+        if any(s.get("quantityUnit", "") != unit or s.get("quantityFrequency", "") != frequency for s in steps):
+            return None
+        try:
+            return cls([s.get("quantity", "") for s in steps], unit, frequency)
+        except ValueError:
+            return None
+
+    @classmethod
+    def decode(cls, encoded: Mapping[str, Any]) -> "QuantitySchedule":
+        """
+        Rebuild a schedule from its ``encode()`` output.
+
+        :param encoded: A ``compactQuantityStep`` dictionary.
+        :return: The schedule.
+        :raises ValueError: If the encoding is unknown or inconsistent with ``stepCount``.
+        """
+        encoding = encoded.get("encoding")
+        runs = np.asarray(encoded.get("runs") or np.zeros((0, 2)))
+        counts = runs[:, 1].astype(np.int64) if len(runs) else np.zeros(0, dtype=np.int64)
+        if encoding == "rle":
+            values = np.asarray([run[0] for run in encoded.get("runs", ())])
+            quantities = np.repeat(values, counts) if len(values) else np.zeros(0)
+        elif encoding == "blocks":
+            blocks = np.asarray(encoded["blocks"]).reshape(-1, int(encoded["blockSize"]))
+            ids = runs[:, 0].astype(np.int64) if len(runs) else np.zeros(0, dtype=np.int64)
+            quantities = blocks[np.repeat(ids, counts)].ravel()
+            tail = encoded.get("tail")
+            if tail:
+                quantities = np.concatenate((quantities, np.asarray(tail)))
+        else:
+            raise ValueError(f"Unknown quantity schedule encoding {encoding!r}")
+        step_count = encoded.get("stepCount")
+        if step_count is not None and len(quantities) != int(step_count):
+            raise ValueError(f"Quantity schedule decodes to {len(quantities)} steps, expected {step_count}")
+        return cls(quantities, encoded.get("quantityUnit", ""), encoded.get("quantityFrequency", ""))
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+    def _header(self, encoding: str) -> Dict[str, Any]:
+        return {
+            "encoding": encoding,
+            "stepCount": len(self.quantities),
+            "quantityUnit": self.quantity_unit,
+            "quantityFrequency": self.quantity_frequency,
+        }
+
+    def encode_rle(self) -> Dict[str, Any]:
+        """Run-length encode: ``runs`` of ``[quantity, count]``."""
+        starts, counts = _runs(self.quantities)
+        encoded = self._header("rle")
+        encoded["runs"] = [list(run) for run in zip(self.quantities[starts].tolist(), counts.tolist())]
+        return encoded
+
+    def encode_blocks(self, block_size: int) -> Dict[str, Any]:
+        """
+        Block encode: distinct ``block_size``-step blocks, run-length encoded by block index.
+
+        :param block_size: Steps per block, e.g. 24 for hourly steps with a daily shape.
+        """
+        if block_size < 1:
+            raise ValueError(f"block_size must be >= 1, got {block_size}")
+        full = len(self.quantities) // block_size * block_size
+        rows = self.quantities[:full].reshape(-1, block_size)
+        if len(rows):
+            # Distinct blocks, numbered in order of first appearance
+            _, first, inverse = np.unique(rows, axis=0, return_index=True, return_inverse=True)
+            order = np.argsort(first)
+            rank = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+            ids = rank[inverse.ravel()]
+            blocks = rows[first[order]]
+        else:
+            ids = np.zeros(0, dtype=np.int64)
+            blocks = rows
+        starts, counts = _runs(ids)
+        encoded = self._header("blocks")
+        encoded["blockSize"] = block_size
+        encoded["blocks"] = blocks.tolist()
+        encoded["runs"] = [list(run) for run in zip(ids[starts].tolist(), counts.tolist())]
+        if full < len(self.quantities):
+            encoded["tail"] = self.quantities[full:].tolist()
+        return encoded
+
+    def encode(self, block_sizes: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+        """
+        Encode as RLE or blocks, whichever has fewer numbers.
+
+        :param block_sizes: Block sizes to try; defaults to typical shapes for the
+                            quantity frequency (e.g. 24 and 168 for ``PerHour``).
+        :return: A ``compactQuantityStep`` dictionary.
+        """
+        best = self.encode_rle()
+        best_size = 2 * len(best["runs"])
+        if block_sizes is None:
+            block_sizes = _DEFAULT_BLOCK_SIZES.get(self.quantity_frequency, ())
+        for block_size in block_sizes:
+            # Not worth it unless the RLE has well over one run per block
+            if best_size <= 2 * len(self.quantities) // block_size or block_size > len(self.quantities):
+                continue
+            candidate = self.encode_blocks(block_size)
+            size = block_size * len(candidate["blocks"]) + 2 * len(candidate["runs"]) + len(candidate.get("tail", ()))
+            if size < best_size:
+                best, best_size = candidate, size
+        return best
+
+    def to_steps(self) -> List[Dict[str, Any]]:
+        """Expand into the legacy list of ``quantityStep`` dicts."""
+        unit, frequency = self.quantity_unit, self.quantity_frequency
+        return [
+            {"quantityUnit": unit, "quantityFrequency": frequency, "quantity": quantity}
+            for quantity in self.quantities.tolist()
+        ]
+
+
+def expand_quantity_steps(node: Any) -> Any:
+    """
+    Replace every ``compactQuantityStep`` under ``node`` with the ``quantityStep`` list it encodes.
+
+    Works on a whole booked message or any part of it, in place.
+
+    :param node: A message, or any dict/list inside one.
+    :return: ``node``, for chaining.
+    """
+    if isinstance(node, dict):
+        encoded = node.pop(COMPACT_STEP_KEY, None)
+        if encoded is not None:
+            node["quantityStep"] = QuantitySchedule.decode(encoded).to_steps()
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                expand_quantity_steps(value)
+    elif isinstance(node, list):
+        for item in node:
+            if isinstance(item, (dict, list)):
+                expand_quantity_steps(item)
+    return node
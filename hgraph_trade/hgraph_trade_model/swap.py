@@ -16,6 +16,7 @@ We assume ignoring physical legs as requested, focusing only on financial legs (
 import json
 import sys
 from typing import Dict, Any
+from hgraph_trade.calendars.registry import adjustable_date
 from hgraph_trade.hgraph_trade_mapping.fpml_mappings import (
     get_global_mapping,
     get_instrument_mapping,
@@ -36,12 +37,11 @@ def create_commodity_swap(trade_data: Dict[str, Any], sub_instrument_type: str)
     def build_adjustable_date(prefix: str) -> Dict[str, Any]:
         if fpml_data.get(f"{prefix}.unadjustedDate"):
             return {
-                "adjustableDate": {
-                    "unadjustedDate": fpml_data.get(f"{prefix}.unadjustedDate", ""),
-                    "dateAdjustments": {
-                        "businessDayConvention": fpml_data.get(f"{prefix}.businessDayConvention", "NotApplicable")
-                    },
-                }
+                "adjustableDate": adjustable_date(
+                    fpml_data.get(f"{prefix}.unadjustedDate", ""),
+                    fpml_data.get(f"{prefix}.businessDayConvention", "NotApplicable"),
+                    fpml_data.get(f"{prefix}.businessCenters"),
+                )
             }
         return {}
 
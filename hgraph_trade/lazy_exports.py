@@ -0,0 +1,40 @@
+"""
+lazy_exports.py
+
+Module-level ``__getattr__``/``__dir__`` for package facades whose public
+names are imported on first use (PEP 562), so importing one module of a
+package does not import every sibling. Used as::
+
+    __getattr__, __dir__ = lazy_exports(__name__, {"create_commodity_swap": f"{__name__}.swap"})
+"""
+
+import importlib
+import sys
+from typing import Any, Callable, List, Mapping, Tuple
+
+__all__ = ("lazy_exports",)
+
+
+def lazy_exports(package: str, attrs: Mapping[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build the ``__getattr__`` and ``__dir__`` of a lazily exporting package.
+
+    :param package: The package's ``__name__``.
+    :param attrs: Public name -> module that defines it.
+    :returns: ``(__getattr__, __dir__)`` to assign at module level. A resolved name is
+        cached in the package's namespace, so ``__getattr__`` is hit once per name.
+    """
+    attrs = dict(attrs)
+
+    def __getattr__(name: str) -> Any:
+        module_name = attrs.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(attrs))
+
+    return __getattr__, __dir__
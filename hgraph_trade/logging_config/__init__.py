@@ -1 +1 @@
-from .logging_config import setup_logging
+from .logging_config import DEFAULT_RATE_LIMITED_LOGGERS, setup_logging, shutdown_logging
@@ -0,0 +1,139 @@
+"""
+benchmark.py
+
+Measures the cost of ``setup_logging``'s modes on a booking-style workload:
+each iteration writes a small trade JSON file, as ``book_trade`` does, and
+logs one INFO record from the booker's logger to the console stream and a
+log file (both redirected to temporary files). ``--no-work`` drops the file
+write to show the worst case of a loop that does nothing but log.
+
+For each mode it reports the loop time (what the booking thread pays), the
+overhead relative to logging switched off, and the total time until every
+record is on disk::
+
+    python -m hgraph_trade.logging_config.benchmark --records 20000
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from hgraph_trade.logging_config.logging_config import setup_logging, shutdown_logging
+
+__all__ = ("BenchmarkResult", "MODES", "run_benchmark", "main")
+
+_LOGGER_NAME = "hgraph_trade.hgraph_trade_booker.trade_booker"
+
+# Mode name -> setup_logging keyword arguments
+MODES: Dict[str, dict] = {
+    "off (WARNING)": {"level": "WARNING", "fmt": "text", "use_queue": False},
+    "text (current)": {"fmt": "text", "use_queue": False},
+    "json": {"fmt": "json", "use_queue": False},
+    "text + queue": {"fmt": "text", "use_queue": True},
+    "json + queue": {"fmt": "json", "use_queue": True},
+    "json + queue + 1000/s limit": {"fmt": "json", "use_queue": True, "rate_limits": {_LOGGER_NAME: 1000.0}},
+}
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings for one logging mode."""
+
+    mode: str
+    records: int
+    caller_seconds: float
+    total_seconds: float
+    lines_written: int
+
+    @property
+    def caller_us_per_record(self) -> float:
+        return self.caller_seconds / self.records * 1e6
+
+
+_TRADE = {
+    "tradeHeader": {"partyTradeIdentifier": {"tradeId": ""}, "tradeDate": "2024-11-20"},
+    "tradeEconomics": {"legs": [{"notional": 10_000.0, "currency": "USD", "index": "NG-HH"}] * 8},
+}
+
+
+def _run_mode(mode: str, options: dict, records: int, work_dir: str, work: bool) -> BenchmarkResult:
+    log_file = os.path.join(work_dir, f"{len(os.listdir(work_dir))}.log")
+    output_dir = os.path.join(work_dir, "output")
+    os.makedirs(output_dir, exist_ok=True)
+    options = {"level": "INFO", **options}
+    with open(os.path.join(work_dir, "stderr.out"), "w", encoding="utf-8") as stderr:
+        with contextlib.redirect_stderr(stderr):
+            setup_logging(log_file=log_file, **options)
+            logger = logging.getLogger(_LOGGER_NAME)
+
+            started = time.perf_counter()
+            for i in range(records):
+                filename = f"SWAP-{i % 1000:07d}.json"
+                if work:
+                    with open(os.path.join(output_dir, filename), "w", encoding="utf-8") as fh:
+                        json.dump(_TRADE, fh, indent=2)
+                logger.info("Trade booked to %s", os.path.join(output_dir, filename))
+            caller = time.perf_counter() - started
+            shutdown_logging()
+            logging.getLogger().handlers[0].flush()
+            total = time.perf_counter() - started
+            logging.shutdown()
+
+    with open(log_file, "r", encoding="utf-8") as fh:
+        lines = sum(1 for _ in fh)
+    return BenchmarkResult(mode, records, caller, total, lines)
+
+
+def run_benchmark(
+    records: int = 20_000, modes: Optional[Dict[str, dict]] = None, work: bool = True, repeat: int = 3
+) -> List[BenchmarkResult]:
+    """
+    Time each logging mode, keeping the fastest of ``repeat`` runs.
+
+    Runs are interleaved across modes so machine noise affects them alike.
+
+    :param records: Trades booked (and records emitted) per mode.
+    :param modes: Mode name -> ``setup_logging`` keyword arguments; defaults to ``MODES``.
+    :param work: Write a trade file per record, as booking does.
+    :param repeat: Runs per mode.
+    :return: One result per mode, in order.
+    """
+    best: Dict[str, BenchmarkResult] = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for _ in range(repeat):
+            for mode, options in (modes or MODES).items():
+                result = _run_mode(mode, options, records, work_dir, work)
+                if mode not in best or result.caller_seconds < best[mode].caller_seconds:
+                    best[mode] = result
+    results = list(best.values())
+    setup_logging()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare setup_logging modes on a per-trade INFO workload.")
+    parser.add_argument("--records", type=int, default=20_000, help="Records per mode (default: 20000)")
+    parser.add_argument("--no-work", action="store_true", help="Log in a tight loop without writing trade files")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the fastest is reported (default: 3)")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.records, work=not args.no_work, repeat=args.repeat)
+    baseline = results[0].caller_seconds
+    print(f"{args.records} trade(s) per mode, best of {args.repeat}, {os.cpu_count()} CPU(s)")
+    print(f"{'mode':<30} {'loop s':>8} {'us/trade':>9} {'log us/trade':>13} {'total s':>8} {'lines':>7}")
+    for r in results:
+        overhead = (r.caller_seconds - baseline) / r.records * 1e6
+        print(
+            f"{r.mode:<30} {r.caller_seconds:8.3f} {r.caller_us_per_record:9.2f} {overhead:13.2f} "
+            f"{r.total_seconds:8.3f} {r.lines_written:7d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
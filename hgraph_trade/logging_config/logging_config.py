@@ -11,24 +11,72 @@ entry point). Individual modules should simply do::
 
 The root logger's level can be overridden after setup by passing ``level``
 to ``setup_logging()``, or by setting the ``LOG_LEVEL`` environment variable.
+
+For large batches and long-running subscribers, ``setup_logging`` can also:
+
+- emit one JSON object per line (``fmt="json"`` / ``LOG_FORMAT=json``);
+- hand records to a background thread through a ``QueueHandler`` so callers
+  never block on stream or file I/O (``use_queue=True`` / ``LOG_QUEUE=1``);
+- rate-limit INFO/DEBUG records from chatty loggers
+  (``rate_limits={...}`` / ``LOG_RATE_LIMIT=<records per second>``, which
+  applies to ``DEFAULT_RATE_LIMITED_LOGGERS``).
+
+Queued records are flushed by ``shutdown_logging()``, which is also registered
+with ``atexit``. ``python -m hgraph_trade.logging_config.benchmark`` compares
+the modes.
 """
 
+import atexit
 import logging
 import logging.config
+import logging.handlers
 import os
-from typing import Dict, Optional
+import queue
+from typing import Dict, Mapping, Optional, Tuple
 
-__all__ = ("setup_logging",)
+__all__ = ("DEFAULT_RATE_LIMITED_LOGGERS", "setup_logging", "shutdown_logging")
 
 # Consistent format across the entire platform
 _DEFAULT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s — %(message)s"
 _DEFAULT_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# Loggers that emit a record per trade or per Kafka message
+DEFAULT_RATE_LIMITED_LOGGERS: Tuple[str, ...] = (
+    "hgraph_trade.hgraph_trade_booker.trade_booker",
+    "hgraph_static_admin.party_kafka_subscriber",
+    "hgraph_static_admin.portfolio_kafka_subscriber",
+    "hgraph_static_admin.credit_kafka_subscriber",
+)
+
+# Listener draining the queue in queue mode; replaced on each setup_logging call
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def shutdown_logging() -> None:
+    """Flush and stop the queue listener, if queue mode is active. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
 
 def setup_logging(
     level: Optional[str] = None,
     log_file: Optional[str] = None,
     config: Optional[Dict] = None,
+    *,
+    fmt: Optional[str] = None,
+    use_queue: Optional[bool] = None,
+    rate_limits: Optional[Mapping[str, float]] = None,
 ) -> None:
     """
     Configure logging for the entire application.
@@ -38,42 +86,82 @@ def setup_logging(
     :param log_file: Optional file path. If provided, a file handler is added
                      alongside the console handler.
     :param config: An optional full ``dictConfig`` dictionary. If provided,
-                   ``level`` and ``log_file`` are ignored.
+                   all other arguments are ignored.
+    :param fmt: ``"text"`` or ``"json"``. Falls back to ``LOG_FORMAT``, then "text".
+    :param use_queue: Route records through a ``QueueHandler`` to a background
+                      listener that owns the real handlers. Falls back to ``LOG_QUEUE``.
+    :param rate_limits: Logger name (or prefix) -> max INFO/DEBUG records per
+                        second. Falls back to ``LOG_RATE_LIMIT`` applied to
+                        ``DEFAULT_RATE_LIMITED_LOGGERS``; unset means no limit.
+    :raises ValueError: If ``fmt`` is not "text" or "json", or a rate is not positive.
     """
+    shutdown_logging()
+
     if config is not None:
         logging.config.dictConfig(config)
         return
 
     if level is None:
         level = os.getenv("LOG_LEVEL", "INFO").upper()
+    if fmt is None:
+        fmt = os.getenv("LOG_FORMAT", "text").strip().lower()
+    if fmt not in ("text", "json"):
+        raise ValueError(f"Unknown log format {fmt!r}; expected 'text' or 'json'")
+    if use_queue is None:
+        use_queue = _env_flag("LOG_QUEUE")
+    if rate_limits is None and os.getenv("LOG_RATE_LIMIT"):
+        rate = float(os.environ["LOG_RATE_LIMIT"])
+        rate_limits = {name: rate for name in DEFAULT_RATE_LIMITED_LOGGERS}
+    for name, rate in (rate_limits or {}).items():
+        if rate <= 0:
+            raise ValueError(f"Log rate limit for {name!r} must be > 0, got {rate}")
+
+    # In queue mode the listener flushes once per drained batch, not per record
+    stream_class, file_class = "logging.StreamHandler", "logging.FileHandler"
+    if use_queue:
+        stream_class = "hgraph_trade.logging_config.structured.DeferredFlushStreamHandler"
+        file_class = "hgraph_trade.logging_config.structured.DeferredFlushFileHandler"
 
     handlers: Dict[str, dict] = {
         "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "standard",
+            "class": stream_class,
+            "formatter": fmt,
             "level": "DEBUG",
         }
     }
 
     if log_file is not None:
         handlers["file"] = {
-            "class": "logging.FileHandler",
-            "formatter": "standard",
+            "class": file_class,
+            "formatter": fmt,
             "level": "DEBUG",
             "filename": log_file,
             "mode": "a",
             "encoding": "utf-8",
         }
 
+    filters: Dict[str, dict] = {}
+    if rate_limits:
+        filters["rate_limit"] = {
+            "()": "hgraph_trade.logging_config.structured.RateLimitFilter",
+            "rates": dict(rate_limits),
+        }
+        for handler in handlers.values():
+            handler["filters"] = ["rate_limit"]
+
     dict_config = {
         "version": 1,
         "disable_existing_loggers": False,
         "formatters": {
-            "standard": {
+            "text": {
                 "format": _DEFAULT_FORMAT,
                 "datefmt": _DEFAULT_DATE_FORMAT,
-            }
+            },
+            "json": {
+                "()": "hgraph_trade.logging_config.structured.JsonFormatter",
+            },
         },
+        "filters": filters,
         "handlers": handlers,
         "root": {
             "handlers": list(handlers.keys()),
@@ -82,3 +170,26 @@ def setup_logging(
     }
 
     logging.config.dictConfig(dict_config)
+
+    if use_queue:
+        _install_queue()
+
+
+def _install_queue() -> None:
+    """Move the root handlers behind a QueueHandler drained by a background listener."""
+    global _listener
+    from hgraph_trade.logging_config.structured import BatchingQueueListener, PreparedQueueHandler
+
+    root = logging.getLogger()
+    targets = list(root.handlers)
+    queue_handler = PreparedQueueHandler(queue.SimpleQueue())
+    # Rate limiting runs on the calling thread so dropped records are never enqueued
+    for target in targets:
+        for rate_filter in list(target.filters):
+            target.removeFilter(rate_filter)
+            queue_handler.addFilter(rate_filter)
+        root.removeHandler(target)
+    root.addHandler(queue_handler)
+
+    _listener = BatchingQueueListener(queue_handler.queue, *targets, respect_handler_level=True)
+    _listener.start()
@@ -0,0 +1,216 @@
+"""
+structured.py
+
+Building blocks for ``setup_logging``'s structured and queued modes:
+
+- ``JsonFormatter`` renders each record as one JSON object per line.
+- ``RateLimitFilter`` caps INFO/DEBUG records per logger with a token bucket,
+  so a logger that fires once per trade or per Kafka message cannot dominate
+  a run. WARNING and above always pass. The first record let through after a
+  suppression carries the number dropped.
+- ``PreparedQueueHandler`` is a ``QueueHandler`` that keeps the traceback
+  separate from the message, so the formatter on the listener side (text or
+  JSON) still controls the layout.
+- ``BatchingQueueListener`` drains whatever is queued, writes it, then
+  flushes each handler once, instead of once per record. It is used with
+  ``DeferredFlushStreamHandler`` / ``DeferredFlushFileHandler``, whose
+  ``emit`` does not flush.
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+__all__ = (
+    "JsonFormatter",
+    "RateLimitFilter",
+    "PreparedQueueHandler",
+    "BatchingQueueListener",
+    "DeferredFlushStreamHandler",
+    "DeferredFlushFileHandler",
+)
+
+# Records handled per listener batch before the handlers are flushed
+_MAX_BATCH = 1024
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as single-line JSON objects.
+
+    Every record has ``ts`` (ISO-8601, UTC), ``level``, ``logger`` and ``msg``;
+    ``exc`` holds the traceback if there is one, ``suppressed`` the count set
+    by ``RateLimitFilter``, and any ``extra={...}`` fields are included as-is
+    (falling back to ``str()`` for values JSON cannot encode).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        extra = record.__dict__.keys() - _RESERVED_ATTRS
+        if extra:
+            for key in extra:
+                if key not in entry and not key.startswith("_"):
+                    entry[key] = record.__dict__[key]
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Per-logger token bucket for records below WARNING.
+
+    :param rates: Logger name (or dotted prefix) -> records per second. The
+        longest matching prefix applies; each logger gets its own bucket.
+        Loggers that match no entry are not limited.
+    :param burst_seconds: Bucket size, in seconds' worth of ``rate``.
+    """
+
+    def __init__(self, rates: Mapping[str, float], burst_seconds: float = 1.0) -> None:
+        super().__init__()
+        for name, rate in rates.items():
+            if rate <= 0:
+                raise ValueError(f"Rate for logger {name!r} must be > 0, got {rate}")
+        # Longest prefix first, so the most specific entry wins
+        self._rates = sorted(rates.items(), key=lambda item: -len(item[0]))
+        self.burst_seconds = burst_seconds
+        # logger name -> (rate or None, tokens, last refill, suppressed since last pass)
+        self._buckets: Dict[str, Tuple[Optional[float], float, float, int]] = {}
+        self._lock = threading.Lock()
+
+    def _rate_for(self, name: str) -> Optional[float]:
+        for prefix, rate in self._rates:
+            if name == prefix or name.startswith(prefix + ".") or prefix == "":
+                return rate
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        # The same filter instance may sit on several handlers; decide once per record
+        verdict = getattr(record, "_rate_limit_verdict", None)
+        if verdict is not None:
+            return verdict
+        verdict = self._admit(record)
+        record._rate_limit_verdict = verdict
+        return verdict
+
+    def _admit(self, record: logging.LogRecord) -> bool:
+        name = record.name
+        with self._lock:
+            bucket = self._buckets.get(name)
+            if bucket is None:
+                rate = self._rate_for(name)
+                bucket = (rate, (rate or 0.0) * self.burst_seconds, record.created, 0)
+            rate, tokens, last, suppressed = bucket
+            if rate is None:
+                self._buckets[name] = bucket
+                return True
+            tokens = min(rate * self.burst_seconds, tokens + (record.created - last) * rate)
+            if tokens < 1.0:
+                self._buckets[name] = (rate, tokens, record.created, suppressed + 1)
+                return False
+            self._buckets[name] = (rate, tokens - 1.0, record.created, 0)
+        if suppressed:
+            record.suppressed = suppressed
+            record.msg = f"{record.msg} [{suppressed} similar record(s) suppressed]"
+        return True
+
+
+class PreparedQueueHandler(logging.handlers.QueueHandler):
+    """
+    ``QueueHandler`` that merges the message arguments on the calling thread
+    but leaves formatting to the listener's handlers.
+
+    The stock handler formats the whole record (traceback included) into
+    ``msg`` before enqueueing, which would put a text traceback inside the
+    JSON ``msg`` field, and copies the record first.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now: they may be mutable objects changed before the listener runs
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        # Updated in place rather than copied: as the root logger's only handler this
+        # runs after every other handler on the propagation path has seen the record
+        record.message = message
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+
+
+class DeferredFlushStreamHandler(logging.StreamHandler):
+    """``StreamHandler`` whose ``emit`` leaves flushing to ``BatchingQueueListener``."""
+
+    def flush(self) -> None:
+        pass
+
+    def flush_batch(self) -> None:
+        logging.StreamHandler.flush(self)
+
+    def close(self) -> None:
+        self.flush_batch()
+        super().close()
+
+
+class DeferredFlushFileHandler(logging.FileHandler):
+    """``FileHandler`` whose ``emit`` leaves flushing to ``BatchingQueueListener``."""
+
+    def flush(self) -> None:
+        pass
+
+    def flush_batch(self) -> None:
+        logging.StreamHandler.flush(self)
+
+    def close(self) -> None:
+        self.flush_batch()
+        super().close()
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """
+    ``QueueListener`` that handles every queued record, then flushes once.
+
+    A burst of N records costs one flush per handler instead of N. Handlers
+    without ``flush_batch`` are flushed with ``flush``.
+    """
+
+    def _flush(self) -> None:
+        for handler in self.handlers:
+            getattr(handler, "flush_batch", handler.flush)()
+
+    def _monitor(self) -> None:
+        q = self.queue
+        while True:
+            batch = [q.get()]
+            while len(batch) < _MAX_BATCH:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            for record in batch:
+                if record is self._sentinel:
+                    self._flush()
+                    return
+                self.handle(record)
+            self._flush()
@@ -0,0 +1,32 @@
+"""
+In-process metrics for the hgraph platform.
+
+- registry.py: counters, gauges and histograms with Prometheus text rendering.
+- exporter.py: stand-alone HTTP ``/metrics`` endpoint for CLI processes.
+"""
+
+from .registry import (
+    CONTENT_TYPE,
+    DEFAULT_BUCKETS,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    counter,
+    gauge,
+    histogram,
+)
+
+__all__ = (
+    "CONTENT_TYPE",
+    "DEFAULT_BUCKETS",
+    "REGISTRY",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "counter",
+    "gauge",
+    "histogram",
+)
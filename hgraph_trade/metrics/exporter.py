@@ -0,0 +1,92 @@
+"""
+exporter.py
+
+Minimal HTTP exporter serving a ``MetricsRegistry`` at ``/metrics`` for
+processes that have no web server of their own, such as the Kafka
+subscribers started from the CLI::
+
+    with MetricsExporter(port=9108):
+        subscriber.start()
+
+The API serves the same registry from its own ``/metrics`` route instead.
+"""
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+from hgraph_trade.metrics.registry import CONTENT_TYPE, REGISTRY, MetricsRegistry
+
+__all__ = ("MetricsExporter",)
+
+logger = logging.getLogger(__name__)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_ExporterHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("metrics exporter: " + format, *args)
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0].rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        payload = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class _ExporterHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    registry: MetricsRegistry
+
+
+class MetricsExporter:
+    """
+    Serve a metrics registry over HTTP on a background thread.
+
+    :param port: Port to bind; 0 picks a free port.
+    :param host: Interface to bind.
+    :param registry: Registry to serve; defaults to the process-wide ``REGISTRY``.
+    :raises OSError: If the port cannot be bound.
+    """
+
+    def __init__(self, port: int, host: str = "0.0.0.0", registry: MetricsRegistry = REGISTRY) -> None:
+        self._httpd = _ExporterHTTPServer((host, port), _Handler)
+        self._httpd.registry = registry
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """URL of the ``/metrics`` endpoint."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> "MetricsExporter":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.1}, name="metrics-exporter", daemon=True
+        )
+        self._thread.start()
+        logger.info("Serving metrics at %s", self.url)
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket. Safe to call more than once."""
+        if self._thread is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> "MetricsExporter":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
@@ -44,6 +44,7 @@ def load_secure_config() -> Dict[str, str]:
         "STATIC_DATA_DB_PATH": os.getenv("STATIC_DATA_DB_PATH", "static_data.db"),
         # --- API ---
         "STATIC_DATA_API_URL": os.getenv("STATIC_DATA_API_URL", "http://localhost:8080/api/counterparties"),
+        "TRADE_SOURCE_API_URL": os.getenv("TRADE_SOURCE_API_URL", "http://localhost:8081/api"),
         # --- Kafka ---
         "KAFKA_BOOTSTRAP_SERVERS": os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092"),
         "KAFKA_CONSUMER_GROUP": os.getenv("KAFKA_CONSUMER_GROUP", "hgraph_platform"),
@@ -63,6 +64,8 @@ def load_secure_config() -> Dict[str, str]:
         "MESSAGE_SENDER_ID": os.getenv("MESSAGE_SENDER_ID", "hgraph_platform"),
         "MESSAGE_TARGET_ID": os.getenv("MESSAGE_TARGET_ID", "booking_system"),
         "MESSAGE_VERSION": os.getenv("MESSAGE_VERSION", "1.0"),
+        # --- Holiday calendars (one <BUSINESS_CENTER>.txt per center) ---
+        "HOLIDAY_CALENDAR_DIR": os.getenv("HOLIDAY_CALENDAR_DIR", "holiday_calendars"),
         # --- Notification templates ---
         "NOTIFICATION_TEMPLATE_DIR": os.getenv("NOTIFICATION_TEMPLATE_DIR", "hgraph_notification/templates"),
     }
@@ -1,7 +1,11 @@
 """Shared test fixtures for hgraph_platform_tools test suite."""
 
+import sqlite3
+
 import pytest
 
+from hgraph_static_admin.sqlite_store import SqliteStore, close_shared_stores
+
 
 @pytest.fixture
 def base_trade_data():
@@ -194,3 +198,133 @@ def physical_gas_data(base_trade_data):
         "fixedLeg.priceUnit": "MMBTU",
         "fixedLeg.quantityReference": "deliveryQuantity",
     }
+
+
+# ---------------------------------------------------------------------------
+# Kafka subscribers: an ``items`` store and test doubles for the Kafka clients
+# ---------------------------------------------------------------------------
+
+
+class _ItemStore(SqliteStore):
+    """Minimal store over the ``items`` table created by ``make_items_db``."""
+
+    def put(self, key, value):
+        self._write("items", "INSERT INTO items VALUES (?, ?)", (key, value))
+
+    def upsert(self, key, value):
+        self._write("items", "INSERT OR REPLACE INTO items VALUES (?, ?)", (key, value))
+
+    def remove(self, key):
+        return self._execute("items", "DELETE FROM items WHERE key = ?", (key,)) > 0
+
+    def get(self, key):
+        row = self._reader().execute("SELECT value FROM items WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+
+class _FakeReceiver:
+    """Returns the given poll batches in turn, then nothing; records seeks, pauses, resumes and commits."""
+
+    def __init__(self, batches=()):
+        self.batches = list(batches)
+        self.polls = 0
+        self.calls = []
+
+    def poll(self, timeout_ms=1000, max_records=100):
+        self.polls += 1
+        return self.batches.pop(0) if self.batches else []
+
+    def seek(self, topic, partition, offset):
+        self.calls.append(("seek", topic, partition, offset))
+
+    def pause(self, partitions):
+        self.calls.append(("pause", sorted(partitions)))
+
+    def resume(self, partitions):
+        self.calls.append(("resume", sorted(partitions)))
+
+    def commit(self, offsets=None):
+        self.calls.append(("commit", dict(offsets)))
+
+
+class _FakeSender:
+    """Records what would be published; raises ``error`` if set."""
+
+    def __init__(self):
+        self.sent = []
+        self.error = None
+
+    def send_to_kafka(self, topic, message, key=None):
+        if self.error is not None:
+            raise self.error
+        self.sent.append((topic, message, key))
+
+
+def _kafka_record(topic, offset, value, partition=0, key=b"k"):
+    return {"topic": topic, "partition": partition, "offset": offset, "key": key, "value": value, "timestamp": 5}
+
+
+def _consume_items(db_path, records, router=None):
+    """Apply ``{"key", "value"}`` records to the ``items`` store as one poll batch; a None value fails."""
+    from hgraph_static_admin.subscriber_batch import apply_batch
+
+    store = _ItemStore.shared(db_path)
+
+    def handle(topic, value):
+        if value["value"] is None:
+            raise ValueError("no value")
+        store.upsert(value["key"], value["value"])
+
+    if router is None:
+        return apply_batch(store, records, handle)
+    return apply_batch(store, records, router.handler(handle), on_failure=router.route)
+
+
+@pytest.fixture
+def make_items_db():
+    """Factory: create an ``items`` table (WAL) in the database at a path; closes shared stores afterwards."""
+
+    def make(path):
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS items (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        conn.commit()
+        conn.close()
+        return path
+
+    yield make
+    close_shared_stores()
+
+
+@pytest.fixture
+def items_db(make_items_db, tmp_path):
+    return make_items_db(str(tmp_path / "items.db"))
+
+
+@pytest.fixture
+def item_store():
+    """``item_store(path)``: the shared ``items`` store for a database."""
+    return _ItemStore.shared
+
+
+@pytest.fixture
+def fake_receiver():
+    """``fake_receiver(batches)``: a Kafka receiver double."""
+    return _FakeReceiver
+
+
+@pytest.fixture
+def fake_sender():
+    return _FakeSender()
+
+
+@pytest.fixture
+def kafka_record():
+    """``kafka_record(topic, offset, value, partition=0, key=b"k")``: a polled record."""
+    return _kafka_record
+
+
+@pytest.fixture
+def consume_items():
+    """``consume_items(db_path, records, router=None)``: apply records to the ``items`` store as one batch."""
+    return _consume_items
@@ -200,6 +200,15 @@ def test_health(client):
     assert r.json() == {"status": "ok"}
 
 
+def test_metrics_endpoint_records_requests(client):
+    client.get("/api/v1/health")
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'hgraph_api_requests_total{method="GET",route="/api/v1/health",status="200"}' in r.text
+    assert 'hgraph_api_request_seconds_count{method="GET",route="/api/v1/health"}' in r.text
+
+
 # ---------------------------------------------------------------------------
 # Credit endpoints
 # ---------------------------------------------------------------------------
@@ -18,8 +18,10 @@ from hgraph_static_admin.credit_store import (
     get_all_credit_limits,
     get_all_credit_utilizations,
     get_credit_limit,
+    get_credit_limits_for_counterparties,
     get_credit_limits_for_counterparty,
     get_credit_utilization,
+    get_credit_utilizations,
     init_credit_db,
     upsert_credit_limit,
     upsert_credit_utilization,
@@ -147,6 +149,15 @@ def test_get_limits_for_counterparty_empty(db_path):
     assert get_credit_limits_for_counterparty(db_path, "NONEXISTENT") == []
 
 
+def test_get_limits_for_counterparties(db_path, bilateral_limit, cleared_limit):
+    upsert_credit_limit(db_path, bilateral_limit)
+    upsert_credit_limit(db_path, cleared_limit)
+    results = get_credit_limits_for_counterparties(db_path, ["ACME", "NONEXISTENT"])
+    assert set(results) == {"ACME", "NONEXISTENT"}
+    assert results["ACME"] == get_credit_limits_for_counterparty(db_path, "ACME")
+    assert results["NONEXISTENT"] == []
+
+
 def test_get_all_limits_empty(db_path):
     assert get_all_credit_limits(db_path) == []
 
@@ -274,6 +285,12 @@ def test_get_all_utilizations_multiple(db_path, utilization):
     assert symbols == {"ACME", "BIGCO"}
 
 
+def test_get_many_utilizations(db_path, utilization):
+    upsert_credit_utilization(db_path, utilization)
+    results = get_credit_utilizations(db_path, ["ACME", "NONEXISTENT"])
+    assert results == {"ACME": get_credit_utilization(db_path, "ACME")}
+
+
 def test_delete_utilization(db_path, utilization):
     upsert_credit_utilization(db_path, utilization)
     assert delete_credit_utilization(db_path, "ACME") is True
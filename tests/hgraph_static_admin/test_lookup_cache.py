@@ -0,0 +1,95 @@
+"""Tests for the LRU read-through cache in front of static data lookups."""
+
+import pytest
+
+from hgraph_static_admin.lookup_cache import LookupCache
+from hgraph_trade.metrics import REGISTRY
+
+
+class _Store:
+    def __init__(self, data):
+        self.data = dict(data)
+        self.loads = []
+
+    def load_many(self, keys):
+        self.loads.append(list(keys))
+        return {key: self.data[key] for key in keys if key in self.data}
+
+
+def _value(name, *labels):
+    return REGISTRY.get(name).labels(*labels).value
+
+
+def test_misses_loaded_in_one_call_then_hit():
+    store = _Store({"A": 1, "B": 2})
+    cache = LookupCache("test.bulk", store.load_many)
+
+    assert cache.get_many(["A", "B", "A", "X"]) == {"A": 1, "B": 2}
+    assert store.loads == [["A", "B", "X"]]
+    assert cache.get("A") == 1 and cache.get("B") == 2
+    assert len(store.loads) == 1
+    assert (cache.hits, cache.misses) == (2, 3)
+    assert cache.hit_rate == pytest.approx(0.4)
+
+
+def test_missing_keys_not_cached():
+    store = _Store({})
+    cache = LookupCache("test.missing", store.load_many)
+    assert cache.get("A") is None
+    store.data["A"] = 1
+    assert cache.get("A") == 1
+
+
+def test_least_recently_used_evicted():
+    store = _Store({k: k.lower() for k in "ABC"})
+    cache = LookupCache("test.lru", store.load_many, maxsize=2)
+    evictions = _value("hgraph_static_cache_evictions_total", "test.lru")
+
+    cache.get("A")
+    cache.get("B")
+    cache.get("A")  # B is now least recently used
+    cache.get("C")
+
+    assert "A" in cache and "C" in cache and "B" not in cache
+    assert cache.evictions == 1
+    assert _value("hgraph_static_cache_evictions_total", "test.lru") == evictions + 1
+    assert _value("hgraph_static_cache_entries", "test.lru") == 2
+
+
+def test_invalidate_reloads():
+    store = _Store({"A": 1})
+    cache = LookupCache("test.invalidate", store.load_many)
+    assert cache.get("A") == 1
+    store.data["A"] = 2
+    assert cache.get("A") == 1
+    cache.invalidate("A")
+    assert cache.get("A") == 2
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_load_racing_an_invalidation_not_cached():
+    store = _Store({"A": 1})
+
+    def load_many(keys):
+        cache.invalidate("A")  # e.g. the owner wrote A while this load ran
+        return store.load_many(keys)
+
+    cache = LookupCache("test.race", load_many)
+    assert cache.get("A") == 1
+    assert "A" not in cache
+
+
+def test_hit_and_miss_metrics():
+    hits = _value("hgraph_static_cache_lookups_total", "test.metrics", "hit")
+    misses = _value("hgraph_static_cache_lookups_total", "test.metrics", "miss")
+    cache = LookupCache("test.metrics", _Store({"A": 1}).load_many)
+    for _ in range(4):
+        cache.get("A")
+    assert _value("hgraph_static_cache_lookups_total", "test.metrics", "hit") == hits + 3
+    assert _value("hgraph_static_cache_lookups_total", "test.metrics", "miss") == misses + 1
+
+
+def test_maxsize_must_be_positive():
+    with pytest.raises(ValueError):
+        LookupCache("test.size", dict, maxsize=0)
@@ -1,5 +1,8 @@
 """Tests for the party Kafka subscriber service."""
 
+import sys
+import types
+
 import pytest
 
 from hg_oap.parties.agreement import MasterAgreementType
@@ -17,6 +20,7 @@ from hgraph_static_admin.party_store import (
     init_party_db,
     upsert_legal_entity,
 )
+from hgraph_static_admin.subscriber_snapshot import load_offsets
 
 
 # ---------------------------------------------------------------------------
@@ -374,6 +378,69 @@ def test_multiple_entities_round_trip(db_path, subscriber):
     assert symbols == {"A", "B", "C"}
 
 
+def test_relationship_parties_cached_and_invalidated(db_path, subscriber, entity_upsert_msg, relationship_upsert_msg):
+    """Repeat relationships hit the entity cache; the subscriber's own entity upserts invalidate it."""
+    dealer_msg = {"action": "UPSERT", "symbol": "HGDEALER", "name": "HGraph Energy LLC", "classification": "SD"}
+    subscriber.process_message("party.legal_entity", dealer_msg)
+    subscriber.process_message("party.legal_entity", entity_upsert_msg)
+
+    for _ in range(3):
+        subscriber.process_message("party.trading_relationship", relationship_upsert_msg)
+    assert subscriber.entity_cache.misses == 2
+    assert subscriber.entity_cache.hits == 4
+
+    renamed = {**entity_upsert_msg, "name": "ACME Renamed"}
+    subscriber.process_message("party.legal_entity", renamed)
+    assert "ACME" not in subscriber.entity_cache
+    subscriber.process_message("party.trading_relationship", relationship_upsert_msg)
+    assert get_trading_relationship(db_path, "HGDEALER", "ACME").external_party.name == "ACME Renamed"
+    assert subscriber.entity_cache.get("ACME").name == "ACME Renamed"
+
+
+class _FakeReceiver:
+    """Returns one poll batch, then nothing; records offset commits and the start offsets callback."""
+
+    batches: list = []
+    commits = 0
+    start_offsets = None
+
+    def __init__(self, topics, **kwargs):
+        _FakeReceiver.start_offsets = kwargs.get("start_offsets")
+
+    def poll(self, timeout_ms=1000):
+        return _FakeReceiver.batches.pop(0) if _FakeReceiver.batches else []
+
+    def commit(self, offsets=None):
+        _FakeReceiver.commits += 1
+
+
+def test_start_applies_poll_batch_in_one_transaction(db_path, subscriber, monkeypatch):
+    """A relationship sees parties upserted earlier in the same batch; a bad record is skipped."""
+    fake = types.ModuleType("kafka_consumer")
+    fake.KafkaReceiver = _FakeReceiver
+    monkeypatch.setitem(sys.modules, "hgraph_trade.hgraph_trade_booker.kafka_consumer", fake)
+    entity = "party.legal_entity"
+    _FakeReceiver.commits = 0
+    _FakeReceiver.batches = [
+        [
+            {"topic": entity, "value": {"action": "UPSERT", "symbol": "A", "name": "A Corp", "classification": "SD"}},
+            {"topic": entity, "value": {"action": "UPSERT", "symbol": "B", "name": "B Corp", "classification": "??"}},
+            {"topic": entity, "value": {"action": "UPSERT", "symbol": "C", "name": "C Corp", "classification": "MSP"}},
+            {
+                "topic": "party.trading_relationship",
+                "value": {"action": "UPSERT", "internal_party_symbol": "A", "external_party_symbol": "C"},
+            },
+        ]
+    ]
+
+    subscriber.start(poll_interval_ms=0, max_messages=3)
+
+    assert subscriber.processed_count == 3
+    assert _FakeReceiver.commits == 1
+    assert {e.symbol for e in get_all_legal_entities(db_path)} == {"A", "C"}
+    assert get_trading_relationship(db_path, "A", "C") is not None
+
+
 # ---------------------------------------------------------------------------
 # Numeric validation
 # ---------------------------------------------------------------------------
@@ -390,3 +457,110 @@ def test_parse_agreement_non_numeric_threshold(db_path, dealer, counterparty):
     }
     with pytest.raises(ValueError, match="threshold_amount must be numeric"):
         parse_relationship_message(msg, db_path)
+
+
+def test_new_node_restores_latest_snapshot(db_path, tmp_path, monkeypatch):
+    """A node with an empty database starts from the snapshot another node wrote, at its offsets."""
+    fake = types.ModuleType("kafka_consumer")
+    fake.KafkaReceiver = _FakeReceiver
+    monkeypatch.setitem(sys.modules, "hgraph_trade.hgraph_trade_booker.kafka_consumer", fake)
+    snapshots = str(tmp_path / "snapshots")
+    entity = "party.legal_entity"
+    _FakeReceiver.batches = [
+        [
+            {
+                "topic": entity,
+                "partition": 0,
+                "offset": offset,
+                "value": {"action": "UPSERT", "symbol": symbol, "name": f"{symbol} Corp", "classification": "SD"},
+            }
+            for offset, symbol in enumerate(["A", "B"])
+        ]
+    ]
+    writer = PartyKafkaSubscriber(
+        db_path, bootstrap_servers="localhost:9092", snapshot_dir=snapshots, snapshot_interval_s=1e-6
+    )
+    writer.start(poll_interval_ms=0, max_messages=2)
+
+    node_db = str(tmp_path / "node.db")
+    init_party_db(node_db)
+    node = PartyKafkaSubscriber(node_db, bootstrap_servers="localhost:9092", snapshot_dir=snapshots)
+    node.start(poll_interval_ms=0, max_messages=0)
+
+    assert {e.symbol for e in get_all_legal_entities(node_db)} == {"A", "B"}
+    assert _FakeReceiver.start_offsets() == {(entity, 0): 2}
+
+
+def test_start_with_worker_pool(db_path, monkeypatch):
+    """With several workers every record is applied and the offsets of each partition are recorded."""
+    fake = types.ModuleType("kafka_consumer")
+    fake.KafkaReceiver = _FakeReceiver
+    monkeypatch.setitem(sys.modules, "hgraph_trade.hgraph_trade_booker.kafka_consumer", fake)
+    entity = "party.legal_entity"
+    _FakeReceiver.batches = [
+        [
+            {
+                "topic": entity,
+                "partition": partition,
+                "offset": offset,
+                "key": symbol.encode(),
+                "value": {"action": "UPSERT", "symbol": symbol, "name": f"{symbol} Corp", "classification": "SD"},
+            }
+            for partition in range(3)
+            for offset, symbol in enumerate(f"P{partition}E{i}" for i in range(10))
+        ]
+    ]
+    subscriber = PartyKafkaSubscriber(db_path, bootstrap_servers="localhost:9092", workers=3, dispatch="key")
+    subscriber.start(poll_interval_ms=0, max_messages=30)
+
+    assert subscriber.processed_count == 30
+    assert len(get_all_legal_entities(db_path)) == 30
+    assert load_offsets(db_path) == {(entity, partition): 10 for partition in range(3)}
+
+
+class _FakeSender:
+    sent: list = []
+
+    def __init__(self, bootstrap_servers=None):
+        pass
+
+    def send_to_kafka(self, topic, message, key=None):
+        _FakeSender.sent.append((topic, message, key))
+
+    def close(self):
+        pass
+
+
+def test_start_with_dead_letter(db_path, monkeypatch):
+    """A record that fails goes to the first retry topic, which the subscriber also consumes."""
+    consumer = types.ModuleType("kafka_consumer")
+    consumer.KafkaReceiver = _FakeReceiver
+    sender = types.ModuleType("kafka_sender")
+    sender.KafkaSender = _FakeSender
+    monkeypatch.setitem(sys.modules, "hgraph_trade.hgraph_trade_booker.kafka_consumer", consumer)
+    monkeypatch.setitem(sys.modules, "hgraph_trade.hgraph_trade_booker.kafka_sender", sender)
+    topics = []
+    monkeypatch.setattr(_FakeReceiver, "__init__", lambda self, t, **kwargs: topics.extend(t))
+    relationship = {"action": "UPSERT", "internal_party_symbol": "A", "external_party_symbol": "B"}
+    _FakeSender.sent = []
+    _FakeReceiver.batches = [
+        [
+            {"topic": "party.trading_relationship", "partition": 0, "offset": 0, "key": b"A|B", "value": relationship},
+            {
+                "topic": "party.legal_entity",
+                "partition": 0,
+                "offset": 0,
+                "key": b"A",
+                "value": {"action": "UPSERT", "symbol": "A", "name": "A Corp", "classification": "SD"},
+            },
+        ]
+    ]
+    subscriber = PartyKafkaSubscriber(db_path, bootstrap_servers="localhost:9092", dead_letter=True)
+    subscriber.start(poll_interval_ms=0, max_messages=1)
+
+    assert topics == ["party.legal_entity", "party.trading_relationship", "party.retry.1", "party.retry.2"]
+    [(topic, envelope, key)] = _FakeSender.sent
+    assert (topic, key) == ("party.retry.1", "A|B")
+    assert envelope["original_message"] == relationship
+    assert envelope["error"]["type"] == "ValueError"
+    assert load_offsets(db_path) == {("party.trading_relationship", 0): 1, ("party.legal_entity", 0): 1}
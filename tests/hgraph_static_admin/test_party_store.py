@@ -8,12 +8,15 @@ from hg_oap.parties.agreement import MasterAgreement, MasterAgreementType
 from hg_oap.parties.party import LegalEntity, PartyClassification
 from hg_oap.parties.relationship import ClearingStatus, TradingRelationship
 from hgraph_static_admin.party_store import (
+    PartyStore,
     delete_legal_entity,
     delete_trading_relationship,
     get_all_legal_entities,
     get_all_trading_relationships,
+    get_legal_entities,
     get_legal_entity,
     get_trading_relationship,
+    get_trading_relationships,
     init_party_db,
     upsert_legal_entity,
     upsert_trading_relationship,
@@ -315,6 +318,33 @@ def test_get_all_relationships_multiple(db_path, dealer, counterparty, msp):
     assert len(result) == 2
 
 
+def test_get_all_relationships_skips_missing_party(db_path, dealer, counterparty, msp):
+    upsert_legal_entity(db_path, dealer)
+    upsert_legal_entity(db_path, counterparty)
+    upsert_trading_relationship(db_path, TradingRelationship(internal_party=dealer, external_party=counterparty))
+    upsert_trading_relationship(db_path, TradingRelationship(internal_party=dealer, external_party=msp))
+
+    result = get_all_trading_relationships(db_path)
+    assert [(r.internal_party, r.external_party) for r in result] == [(dealer, counterparty)]
+    assert get_trading_relationship(db_path, "HGDEALER", msp.symbol) is None
+
+
+def test_get_many_entities_and_relationships(db_path, dealer, counterparty, msp, relationship):
+    for entity in (dealer, counterparty, msp):
+        upsert_legal_entity(db_path, entity)
+    upsert_trading_relationship(db_path, relationship)
+    upsert_trading_relationship(db_path, TradingRelationship(internal_party=dealer, external_party=msp))
+
+    entities = get_legal_entities(db_path, ["ACME", "HGDEALER", "NOBODY"])
+    assert entities == {"ACME": counterparty, "HGDEALER": dealer}
+    assert get_legal_entities(db_path, []) == {}
+
+    rels = get_trading_relationships(db_path, [("HGDEALER", "ACME"), ("ACME", "HGDEALER")])
+    assert list(rels) == [("HGDEALER", "ACME")]
+    assert rels[("HGDEALER", "ACME")] == get_trading_relationship(db_path, "HGDEALER", "ACME")
+    assert rels[("HGDEALER", "ACME")].isda == relationship.isda
+
+
 def test_upsert_relationship_updates(db_path, dealer, counterparty):
     upsert_legal_entity(db_path, dealer)
     upsert_legal_entity(db_path, counterparty)
@@ -353,3 +383,24 @@ def test_delete_relationship(db_path, dealer, counterparty):
 
 def test_delete_missing_relationship(db_path):
     assert delete_trading_relationship(db_path, "A", "B") is False
+
+
+# ---------------------------------------------------------------------------
+# PartyStore (persistent connection)
+# ---------------------------------------------------------------------------
+
+
+def test_store_shares_data_with_module_functions(db_path, dealer, counterparty):
+    with PartyStore(db_path) as store:
+        store.upsert_legal_entity(dealer)
+        upsert_legal_entity(db_path, counterparty)
+
+        assert get_legal_entity(db_path, "HGDEALER") == dealer
+        assert [e.symbol for e in store.get_all_legal_entities()] == ["ACME", "HGDEALER"]
+        assert store.delete_legal_entity("ACME") is True
+        assert get_legal_entity(db_path, "ACME") is None
+
+
+def test_module_functions_reuse_one_store(db_path):
+    assert PartyStore.shared(db_path) is PartyStore.shared(db_path)
+    assert PartyStore.shared(db_path).connection is PartyStore.shared(db_path).connection
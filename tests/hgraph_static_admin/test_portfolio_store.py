@@ -18,7 +18,9 @@ from hgraph_static_admin.portfolio_store import (
     get_all_books,
     get_all_portfolios,
     get_book,
+    get_books,
     get_portfolio,
+    get_portfolios,
     init_portfolio_db,
     upsert_book,
     upsert_portfolio,
@@ -272,6 +274,19 @@ def test_get_all_books_multiple(db_path, trading_portfolio, hedging_portfolio, t
     assert "GAS-HEDGE-BOOK" in symbols
 
 
+def test_get_many_portfolios_and_books(db_path, trading_portfolio, hedging_portfolio, trading_book, hedging_book):
+    for portfolio in (trading_portfolio, hedging_portfolio):
+        upsert_portfolio(db_path, portfolio)
+    for book in (trading_book, hedging_book):
+        upsert_book(db_path, book)
+
+    portfolios = get_portfolios(db_path, [trading_portfolio.symbol, "NONEXISTENT"])
+    assert portfolios == {trading_portfolio.symbol: get_portfolio(db_path, trading_portfolio.symbol)}
+    books = get_books(db_path, ["GAS-BOOK-1", "GAS-HEDGE-BOOK"])
+    assert set(books) == {"GAS-BOOK-1", "GAS-HEDGE-BOOK"}
+    assert books["GAS-BOOK-1"] == get_book(db_path, "GAS-BOOK-1")
+
+
 def test_delete_book(db_path, trading_portfolio, trading_book):
     upsert_portfolio(db_path, trading_portfolio)
     upsert_book(db_path, trading_book)
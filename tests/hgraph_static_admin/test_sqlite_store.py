@@ -0,0 +1,227 @@
+"""Tests for the persistent-connection SQLite store base class."""
+
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from hgraph_static_admin.sqlite_store import SqliteStore, close_shared_stores, json_keys
+
+
+@pytest.fixture()
+def db_path(tmp_path):
+    path = str(tmp_path / "store.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("CREATE TABLE items (key TEXT PRIMARY KEY, value INTEGER)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture(autouse=True)
+def _close_shared():
+    yield
+    close_shared_stores()
+
+
+def _count(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_connection_reused_per_thread(db_path):
+    store = SqliteStore(db_path)
+    conn = store.connection
+    assert store.connection is conn
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(store.connection))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+    store.close()
+
+
+def test_pragmas_applied_and_overridable(db_path):
+    with SqliteStore(db_path) as store:
+        conn = store.connection
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -16_384
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 0
+
+    with SqliteStore(db_path, pragmas={"synchronous": "FULL", "cache_size": None}) as store:
+        conn = store.connection
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -2000  # SQLite's default
+
+
+def test_transaction_commits_and_rolls_back(db_path):
+    with SqliteStore(db_path) as store:
+        with store.transaction() as conn:
+            conn.execute("INSERT INTO items VALUES ('a', 1)")
+        assert _count(db_path) == 1
+
+        with pytest.raises(ValueError):
+            with store.transaction() as conn:
+                conn.execute("INSERT INTO items VALUES ('b', 2)")
+                raise ValueError("boom")
+        assert _count(db_path) == 1
+
+
+def test_nested_transaction_commits_once(db_path):
+    with SqliteStore(db_path) as store:
+        with store.transaction() as outer:
+            outer.execute("INSERT INTO items VALUES ('a', 1)")
+            with store.transaction() as inner:
+                inner.execute("INSERT INTO items VALUES ('b', 2)")
+            assert _count(db_path) == 0  # not yet committed
+        assert _count(db_path) == 2
+
+
+def test_reads_see_other_connections_writes(db_path):
+    with SqliteStore(db_path) as store:
+        assert store.connection.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO items VALUES ('a', 1)")
+        conn.commit()
+        conn.close()
+        assert store.connection.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+
+
+def test_shared_store_reused_and_replaced_with_file(db_path, tmp_path):
+    store = SqliteStore.shared(db_path)
+    assert SqliteStore.shared(db_path) is store
+    with store.transaction() as conn:
+        conn.execute("INSERT INTO items VALUES ('a', 1)")
+
+    new_path = str(tmp_path / "replacement.db")
+    replacement = sqlite3.connect(new_path)
+    replacement.execute("CREATE TABLE items (key TEXT PRIMARY KEY, value INTEGER)")
+    replacement.commit()
+    replacement.close()
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    os.replace(new_path, db_path)
+
+    fresh = SqliteStore.shared(db_path)
+    assert fresh is not store
+    assert fresh.connection.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+
+def test_shared_store_for_new_file(tmp_path):
+    path = str(tmp_path / "new.db")
+    store = SqliteStore.shared(path)
+    with store.transaction() as conn:
+        conn.execute("CREATE TABLE items (key TEXT PRIMARY KEY, value INTEGER)")
+    assert os.path.exists(path)
+    assert SqliteStore.shared(path) is store
+    assert SqliteStore.shared(path) is store
+
+
+def test_close_reopens_on_next_use(db_path):
+    store = SqliteStore(db_path)
+    conn = store.connection
+    store.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    assert store.connection is not conn
+    store.close()
+
+
+def test_dead_thread_connections_closed(db_path):
+    store = SqliteStore(db_path)
+    opened = []
+    thread = threading.Thread(target=lambda: opened.append(store.connection))
+    thread.start()
+    thread.join()
+
+    store.connection  # opening this thread's connection prunes the finished thread's
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute("SELECT 1")
+    store.close()
+
+
+def test_batch_commits_once(db_path, item_store):
+    with item_store(db_path) as store:
+        with store.batch() as batch:
+            for i in range(100):
+                batch.record = i
+                store.put(f"k{i}", i)
+            assert _count(db_path) == 0  # queued, not committed
+            assert store.get("k42") == 42  # reads flush the queue first
+        assert _count(db_path) == 100
+        assert batch.failures == {}
+
+
+def test_batch_isolates_failing_rows(db_path, item_store):
+    with item_store(db_path) as store:
+        with store.batch() as batch:
+            for i, key in enumerate(["a", "b", "a", "c"]):  # the second "a" violates the primary key
+                batch.record = i
+                store.put(key, i)
+        assert set(batch.failures) == {2}
+        assert isinstance(batch.failures[2], sqlite3.IntegrityError)
+        assert _count(db_path) == 3
+        assert store.get("a") == 0
+
+
+def test_batch_keeps_order_of_deletes(db_path, item_store):
+    with item_store(db_path) as store:
+        with store.batch():
+            store.put("a", 1)
+            assert store.remove("a")
+            assert not store.remove("a")
+            store.put("a", 2)
+        assert store.get("a") == 2
+
+
+def test_batch_fail_drops_queued_rows_and_callbacks(db_path, item_store):
+    applied = []
+    with item_store(db_path) as store:
+        with store.batch() as batch:
+            batch.record = 0
+            store.put("a", 1)
+            store.after_commit(applied.append, "a")
+            batch.record = 1
+            store.put("b", 2)
+            store.after_commit(applied.append, "b")
+            batch.fail(ValueError("bad"))
+            assert applied == []  # only after commit
+        assert applied == ["a"]
+        assert store.get("a") == 1
+        assert store.get("b") is None
+
+
+def test_batch_rolls_back_when_block_raises(db_path, item_store):
+    with item_store(db_path) as store:
+        with pytest.raises(RuntimeError):
+            with store.batch():
+                store.put("a", 1)
+                store.get("a")  # flushed into the open transaction
+                raise RuntimeError("boom")
+        assert _count(db_path) == 0
+        store.put("b", 2)  # outside a batch, writes commit immediately
+        assert _count(db_path) == 1
+
+
+def test_json_keys_lookup(db_path):
+    with SqliteStore(db_path) as store:
+        with store.transaction() as conn:
+            conn.executemany("INSERT INTO items VALUES (?, ?)", [("a", 1), ("b", 2), ("c", 3)])
+        rows = store.connection.execute(
+            "SELECT key FROM items WHERE key IN (SELECT value FROM json_each(?)) ORDER BY key",
+            (json_keys(["c", "a", "z"]),),
+        )
+        assert [r["key"] for r in rows] == ["a", "c"]
+        pairs = store.connection.execute(
+            "SELECT key FROM items WHERE (key, value) IN "
+            "(SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]') FROM json_each(?))",
+            (json_keys([("a", 1), ("b", 3)]),),
+        )
+        assert [r["key"] for r in pairs] == ["a"]
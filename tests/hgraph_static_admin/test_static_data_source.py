@@ -0,0 +1,197 @@
+"""Tests for static_data_source — paged, conditional fetches from the static data API."""
+
+import json
+import sqlite3
+
+import pytest
+
+from hgraph_static_admin.example_code import fetch_static_data, init_db, run_pipeline
+from hgraph_static_admin.static_data_source import (
+    StaticDataClient,
+    StaticDataSourceError,
+    Validators,
+    iter_json_array,
+)
+from hgraph_static_admin.static_data_stub import StubStaticDataServer
+
+
+def _records(count, suffix=""):
+    return [
+        {
+            "Counterparty Legal Name": f"Counterparty {i}{suffix}",
+            "Counterparty Short Name": f"CP{i}",
+            "Counterparty Identifier 1": f"LEI-{i:05d}",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def server():
+    with StubStaticDataServer(_records(1000)) as stub:
+        yield stub
+
+
+# ---------------------------------------------------------------------------
+# iter_json_array
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024])
+def test_iter_json_array_any_split(chunk_size):
+    values = [{"name": "Zürich AG", "n": 12345}, 67890, "x,]", [1, [2]], None, True, -1.5e3]
+    payload = json.dumps(values, ensure_ascii=False).encode("utf-8")
+    chunks = (payload[i : i + chunk_size] for i in range(0, len(payload), chunk_size))
+    assert list(iter_json_array(chunks)) == values
+
+
+def test_iter_json_array_yields_before_the_end():
+    def chunks():
+        yield b'[{"a": 1}, {"b"'
+        raise AssertionError("read past the first element")
+
+    assert next(iter_json_array(chunks())) == {"a": 1}
+
+
+@pytest.mark.parametrize("payload", [b"", b'{"a": 1}', b"[1, 2", b"[1] [2]", b"[1, }]"])
+def test_iter_json_array_rejects_invalid(payload):
+    with pytest.raises(ValueError):
+        list(iter_json_array([payload]))
+
+
+# ---------------------------------------------------------------------------
+# StaticDataClient
+# ---------------------------------------------------------------------------
+
+
+def test_pages_fetched_concurrently_in_order(server):
+    with StaticDataClient(server.url, page_size=100, concurrency=3) as client:
+        fetch = client.fetch()
+        records = list(fetch)
+
+    assert fetch.modified and fetch.pages == 10
+    assert records == server.records
+    assert server.requests == 10
+    assert server.connections <= 3
+    assert fetch.validators == Validators(server.etag, fetch.validators.last_modified)
+
+
+def test_next_links_followed_without_last(server):
+    server.link_last = False
+    with StaticDataClient(server.url, page_size=300) as client:
+        fetch = client.fetch()
+        assert fetch.pages is None
+        assert list(fetch) == server.records
+    assert server.requests == 4
+
+
+@pytest.mark.parametrize("stale", ["etag", "last_modified"])
+def test_unchanged_data_not_fetched(server, stale):
+    with StaticDataClient(server.url, page_size=100) as client:
+        first = client.fetch()
+        list(first)
+        validators = first.validators._replace(**{"last_modified" if stale == "etag" else "etag": None})
+
+        again = client.fetch(validators)
+        assert not again.modified
+        assert list(again) == []
+        assert server.not_modified == 1
+
+        server.replace(_records(1000, " (renamed)"))
+        changed = client.fetch(validators)
+        assert changed.modified
+        assert list(changed) == server.records
+
+
+def test_data_changing_during_sync_fails_with_version_header(server):
+    server.version_header = "X-Data-Version"
+    with StaticDataClient(server.url, page_size=100, concurrency=1, version_header="X-Data-Version") as client:
+        records = iter(client.fetch())
+        next(records)
+        server.replace(_records(1000, " (renamed)"))
+        with pytest.raises(StaticDataSourceError, match="changed during the sync"):
+            list(records)
+
+
+def test_per_page_etags_accepted():
+    with StubStaticDataServer(_records(1000), page_etags=True) as server:
+        with StaticDataClient(server.url, page_size=100, concurrency=3) as client:
+            fetch = client.fetch()
+            assert list(fetch) == server.records
+            assert fetch.validators.etag != server.etag  # page 1's own ETag
+
+            again = client.fetch(fetch.validators)
+            assert not again.modified
+
+
+def test_failed_requests_retried(server):
+    server.fail_next = 2
+    with StaticDataClient(server.url, page_size=500, retry_backoff=0) as client:
+        assert len(list(client.fetch())) == 1000
+    assert server.requests == 4
+
+
+def test_gives_up_after_retries(server):
+    server.fail_next = 10
+    with StaticDataClient(server.url, max_retries=1, retry_backoff=0) as client:
+        with pytest.raises(StaticDataSourceError, match="after 2 attempts"):
+            client.fetch()
+
+
+def test_unpaged_api_is_one_page(server):
+    # An API without pagination ignores ?page and returns everything, without Link headers
+    with StaticDataClient(server.url, page_size=5000) as client:
+        fetch = client.fetch()
+        assert fetch.pages == 1
+        assert len(list(fetch)) == 1000
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+
+def _legal_names(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT legal_name FROM counterparties ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def test_fetch_static_data(server):
+    assert fetch_static_data(server.url, page_size=64) == server.records
+
+
+def test_run_pipeline_skips_unchanged_data(server, tmp_path):
+    db_path = str(tmp_path / "static.db")
+    init_db(db_path)
+
+    assert run_pipeline(server.url, db_path, page_size=100) is True
+    assert _legal_names(db_path) == [f"Counterparty {i}" for i in range(1000)]
+    requests = server.requests
+
+    assert run_pipeline(server.url, db_path, page_size=100) is False
+    assert server.requests == requests + 1
+    assert server.not_modified == 1
+
+    # Changed data replaces what was stored rather than adding to it
+    server.replace(_records(600, " (renamed)"))
+    assert run_pipeline(server.url, db_path, page_size=100) is True
+    assert _legal_names(db_path) == [f"Counterparty {i} (renamed)" for i in range(600)]
+
+    assert run_pipeline(server.url, db_path, page_size=100, force=True) is True
+    assert len(_legal_names(db_path)) == 600
+
+
+def test_failed_sync_keeps_stored_data(server, tmp_path, monkeypatch):
+    monkeypatch.setattr("hgraph_static_admin.static_data_source.random.uniform", lambda low, high: 0.0)
+    db_path = str(tmp_path / "static.db")
+    init_db(db_path)
+    run_pipeline(server.url, db_path)
+
+    server.replace(_records(10, " (new)"))
+    server.fail_next = 10
+    with pytest.raises(StaticDataSourceError):
+        run_pipeline(server.url, db_path)
+    assert len(_legal_names(db_path)) == 1000
@@ -0,0 +1,64 @@
+"""Tests for applying a poll batch to a store in one transaction."""
+
+import contextlib
+import sqlite3
+
+import pytest
+
+from hgraph_static_admin.subscriber_batch import apply_batch
+
+
+@pytest.fixture()
+def store(items_db, item_store):
+    return item_store(items_db)
+
+
+class _Metrics:
+    def __init__(self):
+        self.observed = []
+
+    def observe(self, topic, ok, seconds):
+        self.observed.append((topic, ok))
+
+
+def _records(*values):
+    return [{"topic": "items", "value": value} for value in values]
+
+
+def test_apply_batch_reports_each_record(store):
+    def handle(topic, value):
+        if "key" not in value:
+            raise ValueError("missing key")
+        store.put(value["key"], value.get("value"))
+
+    metrics = _Metrics()
+    records = _records({"key": "a", "value": 1}, {"value": 2}, {"key": "b"}, {"key": "c", "value": 3})
+    errors = apply_batch(store, records, handle, metrics)
+
+    assert errors[0] is None and errors[3] is None
+    assert isinstance(errors[1], ValueError)
+    assert isinstance(errors[2], sqlite3.IntegrityError)  # NOT NULL, isolated by its savepoint
+    assert [ok for _, ok in metrics.observed] == [True, False, False, True]
+    rows = store.connection.execute("SELECT key, value FROM items ORDER BY key").fetchall()
+    assert [tuple(row) for row in rows] == [("a", 1), ("c", 3)]
+
+
+def test_apply_batch_commit_failure_keeps_nothing(store, monkeypatch):
+    def handle(topic, value):
+        store.put(value["key"], value["value"])
+
+    monkeypatch.setattr(store, "transaction", _failing_commit(store.transaction))
+    with pytest.raises(sqlite3.OperationalError):
+        apply_batch(store, _records({"key": "a", "value": 1}), handle)
+    assert store.connection.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+
+def _failing_commit(transaction):
+    @contextlib.contextmanager
+    def wrapped():
+        with transaction() as conn:
+            yield conn
+            conn.rollback()
+            raise sqlite3.OperationalError("disk I/O error")
+
+    return wrapped
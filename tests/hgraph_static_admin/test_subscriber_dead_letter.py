@@ -0,0 +1,220 @@
+"""Tests for the retry and dead-letter topics of the subscribers."""
+
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from hgraph_static_admin.subscriber_dead_letter import (
+    DeadLetterRouter,
+    dead_letter_topic,
+    replay_dead_letters,
+    retry_topic,
+)
+from hgraph_static_admin.subscriber_snapshot import load_offsets
+
+
+class _Clock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def db_path(items_db):
+    return items_db
+
+
+@pytest.fixture()
+def clock():
+    return _Clock()
+
+
+@pytest.fixture()
+def sender(fake_sender):
+    return fake_sender
+
+
+@pytest.fixture()
+def router(sender, clock):
+    return DeadLetterRouter("items", "group-a", sender, retry_delays=(30.0, 300.0), clock=clock)
+
+
+def test_topic_names():
+    assert retry_topic("party", 1) == "party.retry.1"
+    assert dead_letter_topic("party") == "party.dead_letter"
+
+
+# ---------------------------------------------------------------------------
+# Routing
+# ---------------------------------------------------------------------------
+
+
+def test_failed_record_moves_through_retry_tiers(router, sender, clock, kafka_record):
+    assert router.topics == ["items.retry.1", "items.retry.2"]
+
+    assert router.route(kafka_record("items", 7, {"key": "a"}, partition=2), ValueError("bad")) == "items.retry.1"
+    topic, envelope, key = sender.sent[-1]
+    assert key == "k"
+    assert envelope == {
+        "original_topic": "items",
+        "original_partition": 2,
+        "original_offset": 7,
+        "original_key": "k",
+        "original_timestamp": 5,
+        "original_message": {"key": "a"},
+        "error": {"type": "ValueError", "message": "bad"},
+        "attempt": 1,
+        "subscriber": "items",
+        "group": "group-a",
+        "failed_at": 1_000.0,
+        "retry_at": 1_030.0,
+    }
+
+    clock.now = 1_040.0
+    assert router.route(kafka_record("items.retry.1", 0, envelope), KeyError("x")) == "items.retry.2"
+    envelope = sender.sent[-1][1]
+    assert (envelope["attempt"], envelope["retry_at"], envelope["original_offset"]) == (2, 1_340.0, 7)
+
+    assert router.route(kafka_record("items.retry.2", 0, envelope), KeyError("x")) == "items.dead_letter"
+    envelope = sender.sent[-1][1]
+    assert (envelope["attempt"], envelope["retry_at"]) == (3, None)
+
+
+def test_without_retry_tiers_failures_are_dead_lettered(sender, kafka_record):
+    router = DeadLetterRouter("items", "group-a", sender, retry_delays=())
+    assert router.topics == []
+    assert router.route(kafka_record("items", 0, {}, key=None), ValueError("bad")) == "items.dead_letter"
+    assert sender.sent[0][1]["original_key"] is None
+
+
+def test_handler_unwraps_own_retries_only(router):
+    handled = []
+    handle = router.handler(lambda topic, value: handled.append((topic, value)))
+
+    handle("items", {"key": "a"})
+    handle("items.retry.1", {"group": "group-a", "original_topic": "items", "original_message": {"key": "b"}})
+    handle("items.retry.1", {"group": "group-b", "original_topic": "items", "original_message": {"key": "c"}})
+
+    assert handled == [("items", {"key": "a"}), ("items", {"key": "b"})]
+
+
+# ---------------------------------------------------------------------------
+# Holding back retries that are not yet due
+# ---------------------------------------------------------------------------
+
+
+def test_retries_held_until_due(router, clock, kafka_record, fake_receiver):
+    receiver = fake_receiver()
+    due = {"group": "group-a", "retry_at": 990.0}
+    later = {"group": "group-a", "retry_at": 1_020.0}
+    foreign = {"group": "group-b", "retry_at": 5_000.0}
+    records = [
+        kafka_record("items", 0, {"key": "a"}),
+        kafka_record("items.retry.1", 3, due),
+        kafka_record("items.retry.1", 4, later),
+        kafka_record("items.retry.1", 5, due),  # behind a record that is not due: waits too
+        kafka_record("items.retry.1", 9, foreign, partition=1),
+    ]
+
+    selected = router.select(records, receiver)
+
+    assert [(r["topic"], r["offset"]) for r in selected] == [("items", 0), ("items.retry.1", 3), ("items.retry.1", 9)]
+    assert receiver.calls == [("seek", "items.retry.1", 0, 4), ("pause", [("items.retry.1", 0)])]
+
+    receiver.calls.clear()
+    assert router.select([], receiver) == []
+    assert receiver.calls == []  # not due yet
+
+    clock.now = 1_020.0
+    assert router.select([], receiver) == []
+    assert receiver.calls == [("resume", [("items.retry.1", 0)])]
+    assert router.select([kafka_record("items.retry.1", 4, later)], receiver) != []
+
+
+# ---------------------------------------------------------------------------
+# Routing inside the batch transaction
+# ---------------------------------------------------------------------------
+
+
+def test_failed_records_routed_with_batch(db_path, router, sender, kafka_record, consume_items):
+    records = [
+        kafka_record("items", 0, {"key": "a", "value": 1}),
+        kafka_record("items", 1, {"key": "b", "value": None}),
+    ]
+    errors = consume_items(db_path, records, router)
+
+    assert [error is None for error in errors] == [True, False]
+    assert [(topic, envelope["original_offset"]) for topic, envelope, _ in sender.sent] == [("items.retry.1", 1)]
+    assert load_offsets(db_path) == {("items", 0): 2}
+
+    # The retry succeeds once the cause is fixed
+    retry = kafka_record("items.retry.1", 0, {**sender.sent[0][1], "original_message": {"key": "b", "value": 2}})
+    assert consume_items(db_path, [retry], router) == [None]
+    assert load_offsets(db_path)[("items.retry.1", 0)] == 1
+
+
+def test_publish_failure_rolls_back_batch(db_path, router, sender, kafka_record, consume_items):
+    sender.error = ConnectionError("broker down")
+    records = [
+        kafka_record("items", 0, {"key": "a", "value": 1}),
+        kafka_record("items", 1, {"key": "b", "value": None}),
+    ]
+    with pytest.raises(ConnectionError):
+        consume_items(db_path, records, router)
+
+    assert load_offsets(db_path) == {}
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+    conn.close()
+
+
+def test_unacknowledged_publish_rolls_back_batch(db_path, clock, kafka_record, consume_items):
+    from kafka.errors import KafkaError, KafkaTimeoutError
+
+    from hgraph_trade.hgraph_trade_booker.kafka_sender import KafkaSender
+
+    with patch("hgraph_trade.hgraph_trade_booker.kafka_sender.KafkaProducer") as producer_cls:
+        producer_cls.return_value.send.return_value.get.side_effect = KafkaTimeoutError("no ack")
+        sender = KafkaSender("localhost:9092", max_retries=1, retry_backoff=0)
+    router = DeadLetterRouter("items", "group-a", sender, clock=clock)
+
+    with pytest.raises(KafkaError):
+        consume_items(db_path, [kafka_record("items", 0, {"key": "a", "value": None})], router)
+    assert load_offsets(db_path) == {}
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+
+def test_replay_dead_letters(sender, kafka_record, fake_receiver):
+    def dead(offset, topic, message):
+        return kafka_record(
+            "items.dead_letter",
+            offset,
+            {"original_topic": topic, "original_key": f"k{offset}", "original_message": message},
+        )
+
+    receiver = fake_receiver(
+        [[dead(0, "items", {"n": 0}), dead(1, "other", {"n": 1})], [], [dead(2, "items", {"n": 2})]]
+    )
+    result = replay_dead_letters(receiver, sender, poll_interval_ms=0, idle_polls=2)
+
+    assert result.replayed == 3
+    assert result.by_topic == {"items": 2, "other": 1}
+    assert sender.sent == [("items", {"n": 0}, "k0"), ("other", {"n": 1}, "k1"), ("items", {"n": 2}, "k2")]
+    assert receiver.calls == [("commit", {("items.dead_letter", 0): 2}), ("commit", {("items.dead_letter", 0): 3})]
+
+
+def test_replay_stops_at_limit(sender, kafka_record, fake_receiver):
+    records = [
+        kafka_record("items.dead_letter", n, {"original_topic": "items", "original_message": {}}) for n in range(5)
+    ]
+    receiver = fake_receiver([records[:2], records[2:]])
+
+    assert replay_dead_letters(receiver, sender, limit=2, poll_interval_ms=0).replayed == 2
+    assert receiver.batches == [records[2:]]
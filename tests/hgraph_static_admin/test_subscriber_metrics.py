@@ -0,0 +1,32 @@
+"""Tests for the Kafka subscriber metrics helper."""
+
+import time
+
+from hgraph_static_admin.subscriber_metrics import SubscriberMetrics
+from hgraph_trade.metrics import REGISTRY
+
+
+def _value(name, *labels):
+    return REGISTRY.get(name).labels(*labels).value
+
+
+def test_observe_counts_outcomes_and_latency():
+    processed = _value("hgraph_subscriber_messages_total", "test-sub", "t.a", "processed")
+    failed = _value("hgraph_subscriber_messages_total", "test-sub", "t.a", "failed")
+    observed = REGISTRY.get("hgraph_subscriber_message_seconds").labels("test-sub").count
+
+    metrics = SubscriberMetrics("test-sub", ["t.a"])
+    metrics.observe("t.a", True, 0.001)
+    metrics.observe("t.a", True, 0.002)
+    metrics.observe("t.a", False, 0.003)
+
+    assert _value("hgraph_subscriber_messages_total", "test-sub", "t.a", "processed") == processed + 2
+    assert _value("hgraph_subscriber_messages_total", "test-sub", "t.a", "failed") == failed + 1
+    assert REGISTRY.get("hgraph_subscriber_message_seconds").labels("test-sub").count == observed + 3
+    assert _value("hgraph_subscriber_last_message_timestamp_seconds", "test-sub") <= time.time()
+
+
+def test_observe_unknown_topic():
+    metrics = SubscriberMetrics("test-sub", [])
+    metrics.observe("t.unknown", True, 0.001)
+    assert _value("hgraph_subscriber_messages_total", "test-sub", "t.unknown", "processed") >= 1
@@ -0,0 +1,98 @@
+"""Tests for hgraph_static_admin.subscriber_runtime — the poll loop shared by the store subscribers."""
+
+import sys
+import types
+
+import pytest
+
+from hgraph_static_admin.subscriber_runtime import StoreSubscriber
+from hgraph_static_admin.subscriber_snapshot import load_offsets
+
+
+class _Receiver:
+    """``KafkaReceiver`` double: returns ``batches`` in turn and records the topics and commits."""
+
+    batches: list = []
+    topics: list = []
+    commits: list = []
+
+    def __init__(self, topics, **kwargs):
+        _Receiver.topics = list(topics)
+
+    def poll(self, timeout_ms=1000):
+        return _Receiver.batches.pop(0) if _Receiver.batches else []
+
+    def commit(self, offsets=None):
+        _Receiver.commits.append(offsets)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def subscriber_class(item_store, monkeypatch):
+    consumer = types.ModuleType("kafka_consumer")
+    consumer.KafkaReceiver = _Receiver
+    monkeypatch.setitem(sys.modules, "hgraph_trade.hgraph_trade_booker.kafka_consumer", consumer)
+    _Receiver.batches, _Receiver.topics, _Receiver.commits = [], [], []
+
+    class ItemSubscriber(StoreSubscriber):
+        name = "items"
+        store_class = types.SimpleNamespace(shared=item_store)
+        error_field = "key"
+
+        def __init__(self, db_path, **options):
+            super().__init__(db_path, bootstrap_servers="localhost:9092", **options)
+            self.rollbacks = 0
+
+        def _topics(self):
+            return ["items.a", "items.b"]
+
+        def process_message(self, topic, message):
+            if message["value"] is None:
+                raise ValueError("no value")
+            item_store(self.db_path).upsert(message["key"], message["value"])
+
+        def _on_rollback(self):
+            self.rollbacks += 1
+
+    return ItemSubscriber
+
+
+def test_applies_batches_and_records_offsets(subscriber_class, items_db, item_store, kafka_record):
+    _Receiver.batches = [
+        [kafka_record("items.a", 0, {"key": "x", "value": 1}), kafka_record("items.b", 4, {"key": "y", "value": 2})],
+        [kafka_record("items.a", 1, {"key": "x", "value": 3})],
+    ]
+    subscriber = subscriber_class(items_db)
+    subscriber.start(poll_interval_ms=0, max_messages=3)
+
+    assert _Receiver.topics == ["items.a", "items.b"]
+    assert subscriber.processed_count == 3
+    assert (item_store(items_db).get("x"), item_store(items_db).get("y")) == (3, 2)
+    assert load_offsets(items_db) == {("items.a", 0): 2, ("items.b", 0): 5}
+    assert _Receiver.commits == [None, None]
+
+
+def test_stops_after_consecutive_errors(subscriber_class, items_db, kafka_record, monkeypatch):
+    monkeypatch.setattr("hgraph_static_admin.subscriber_runtime._MAX_CONSECUTIVE_ERRORS", 3)
+    _Receiver.batches = [[kafka_record("items.a", offset, {"key": "x", "value": None}) for offset in range(5)]]
+    subscriber = subscriber_class(items_db)
+    subscriber.start(poll_interval_ms=0)
+
+    assert subscriber.processed_count == 0
+    assert load_offsets(items_db) == {("items.a", 0): 5}
+
+
+def test_rollback_hook_runs_when_batch_fails(subscriber_class, items_db, kafka_record, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr("hgraph_static_admin.subscriber_runtime.apply_batch", fail)
+    _Receiver.batches = [[kafka_record("items.a", 0, {"key": "x", "value": 1})]]
+    subscriber = subscriber_class(items_db)
+    with pytest.raises(RuntimeError, match="disk full"):
+        subscriber.start(poll_interval_ms=0)
+
+    assert subscriber.rollbacks == 1
+    assert not subscriber._running
@@ -0,0 +1,148 @@
+"""Tests for Kafka offset tracking and database snapshots of the subscribers."""
+
+import os
+import sqlite3
+
+import pytest
+
+from hgraph_static_admin.subscriber_batch import apply_batch
+from hgraph_static_admin.subscriber_snapshot import (
+    SnapshotWriter,
+    latest_snapshot,
+    load_offsets,
+    restore_latest_snapshot,
+    write_snapshot,
+)
+
+
+@pytest.fixture()
+def db_path(items_db):
+    return items_db
+
+
+@pytest.fixture()
+def consume(consume_items, kafka_record):
+    def consume(db_path, *records):
+        """Apply ``(partition, offset, key, value)`` records from the ``items`` topic as one poll batch."""
+        polled = [
+            kafka_record("items", offset, {"key": key, "value": value}, partition=partition)
+            for partition, offset, key, value in records
+        ]
+        return consume_items(db_path, polled)
+
+    return consume
+
+
+def _items(path):
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT key, value FROM items"))
+    finally:
+        conn.close()
+
+
+def test_offsets_recorded_with_batch(db_path, consume):
+    assert load_offsets(db_path) == {}
+    consume(db_path, (0, 10, "a", 1), (1, 4, "b", 2), (0, 11, "c", None))
+    # The failed record is consumed too
+    assert load_offsets(db_path) == {("items", 0): 12, ("items", 1): 5}
+
+    consume(db_path, (1, 5, "d", 3))
+    assert load_offsets(db_path) == {("items", 0): 12, ("items", 1): 6}
+
+
+def test_offsets_rolled_back_with_batch(db_path, consume, item_store):
+    consume(db_path, (0, 0, "a", 1))
+    store = item_store(db_path)
+
+    def handle(topic, value):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        apply_batch(store, [{"topic": "items", "partition": 0, "offset": 1, "value": {}}], handle)
+    assert load_offsets(db_path) == {("items", 0): 1}
+
+
+def test_missing_database_has_no_offsets(tmp_path):
+    path = str(tmp_path / "missing.db")
+    assert load_offsets(path) == {}
+    assert not os.path.exists(path)
+
+
+def test_snapshot_roundtrip(db_path, tmp_path, consume, make_items_db):
+    snapshots = str(tmp_path / "snapshots")
+    assert latest_snapshot(snapshots, "items") is None
+
+    consume(db_path, (0, 0, "a", 1), (0, 1, "b", 2))
+    written = write_snapshot(db_path, snapshots, "items")
+    assert written.offsets == {("items", 0): 2}
+    consume(db_path, (0, 2, "c", 3))  # after the snapshot
+
+    found = latest_snapshot(snapshots, "items")
+    assert found.path == written.path
+    assert found.offsets == {("items", 0): 2}
+
+    # A new node starts from an empty (initialised) database
+    node = make_items_db(str(tmp_path / "node.db"))
+    restored = restore_latest_snapshot(snapshots, "items", node)
+    assert restored.path == written.path
+    assert _items(node) == {"a": 1, "b": 2}
+    assert load_offsets(node) == {("items", 0): 2}
+    assert sqlite3.connect(node).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    # Consuming from the snapshot's offsets catches up
+    consume(node, (0, 2, "c", 3))
+    assert _items(node) == _items(db_path)
+
+
+def test_restore_keeps_database_that_has_consumed(db_path, tmp_path, consume):
+    snapshots = str(tmp_path / "snapshots")
+    consume(db_path, (0, 0, "a", 1))
+    write_snapshot(db_path, snapshots, "items")
+    consume(db_path, (0, 1, "b", 2))
+
+    assert restore_latest_snapshot(snapshots, "items", db_path) is None
+    assert _items(db_path) == {"a": 1, "b": 2}
+
+
+def test_restore_reopens_shared_store(db_path, tmp_path, consume, make_items_db, item_store):
+    snapshots = str(tmp_path / "snapshots")
+    consume(db_path, (0, 0, "a", 1))
+    write_snapshot(db_path, snapshots, "items")
+
+    node = make_items_db(str(tmp_path / "node.db"))
+    stale = item_store(node)
+    stale.connection.execute("SELECT COUNT(*) FROM items").fetchone()
+    restore_latest_snapshot(snapshots, "items", node)
+
+    store = item_store(node)
+    assert store is not stale
+    assert store.connection.execute("SELECT value FROM items WHERE key = 'a'").fetchone()[0] == 1
+
+
+def test_incomplete_snapshot_ignored(db_path, tmp_path, consume):
+    snapshots = tmp_path / "snapshots"
+    consume(db_path, (0, 0, "a", 1))
+    written = write_snapshot(db_path, str(snapshots), "items")
+    later = snapshots / "items-99991231T235959999999Z.db"  # copy without a manifest
+    later.write_bytes(written.path.read_bytes())
+
+    assert latest_snapshot(str(snapshots), "items").path == written.path
+
+
+def test_snapshot_writer_interval_and_retention(db_path, tmp_path, consume):
+    snapshots = str(tmp_path / "snapshots")
+    consume(db_path, (0, 0, "a", 1))
+
+    writer = SnapshotWriter("items", db_path, snapshots, interval_s=3600, keep=2)
+    assert writer.maybe_write() is None  # interval not yet passed
+
+    writer.interval_s = 0
+    paths = []
+    for offset in range(1, 4):
+        consume(db_path, (0, offset, "a", offset))
+        paths.append(writer.maybe_write().path)
+
+    expected = [name for path in paths[1:] for name in (path.name, path.with_suffix(".json").name)]
+    assert sorted(os.listdir(snapshots)) == sorted(expected)
+    assert latest_snapshot(snapshots, "items").offsets == {("items", 0): 4}
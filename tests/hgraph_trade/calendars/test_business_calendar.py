@@ -0,0 +1,85 @@
+"""Tests for business_calendar — bitmaps, conventions and vectorised adjustment."""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from hgraph_trade.calendars.business_calendar import BUSINESS_DAY_CONVENTIONS, BusinessCalendar
+
+# 2025: Memorial Day Mon 26 May, Independence Day Fri 4 Jul, Thanksgiving Thu 27 Nov, Christmas Thu 25 Dec
+HOLIDAYS = ["2025-01-01", "2025-05-26", "2025-07-04", "2025-11-27", "2025-12-25", "2025-03-31"]
+
+
+@pytest.fixture
+def calendar():
+    return BusinessCalendar(HOLIDAYS, name="TEST")
+
+
+@pytest.mark.parametrize(
+    "day, convention, expected",
+    [
+        ("2025-07-04", "FOLLOWING", "2025-07-07"),
+        ("2025-07-04", "PRECEDING", "2025-07-03"),
+        ("2025-05-31", "FOLLOWING", "2025-06-02"),
+        ("2025-05-31", "MODFOLLOWING", "2025-05-30"),
+        ("2025-03-01", "MODPRECEDING", "2025-03-03"),
+        ("2025-03-01", "PRECEDING", "2025-02-28"),
+        ("2025-03-29", "MODFOLLOWING", "2025-03-28"),
+        ("2025-07-05", "NEAREST", "2025-07-03"),
+        ("2025-07-06", "NEAREST", "2025-07-07"),
+        ("2025-07-05", "NONE", "2025-07-05"),
+        ("2025-07-05", "NotApplicable", "2025-07-05"),
+        ("2025-07-07", "PRECEDING", "2025-07-07"),
+    ],
+)
+def test_adjust(calendar, day, convention, expected):
+    assert calendar.adjust(day, convention).isoformat() == expected
+    assert str(calendar.adjust_array([day], convention)[0]) == expected
+
+
+def test_unsupported_convention(calendar):
+    with pytest.raises(ValueError, match="FRN"):
+        calendar.adjust("2025-07-04", "FRN")
+    with pytest.raises(ValueError):
+        calendar.adjust_array(["2025-07-04"], "FRN")
+
+
+@pytest.mark.parametrize("convention", BUSINESS_DAY_CONVENTIONS)
+def test_adjust_array_matches_scalar(calendar, convention):
+    # Spans years without holidays and the window's year boundaries
+    dates = np.datetime64("2023-12-01") + np.random.default_rng(7).integers(0, 3 * 366, 2000)
+    adjusted = calendar.adjust_array(dates, convention)
+    assert adjusted.dtype == np.dtype("datetime64[D]")
+    assert [str(d) for d in adjusted] == [calendar.adjust(d, convention).isoformat() for d in dates]
+
+
+def test_window_grows_for_later_dates(calendar):
+    assert str(calendar.adjust_array(["2025-07-04"], "FOLLOWING")[0]) == "2025-07-07"
+    assert str(calendar.adjust_array(["2040-12-31", "2025-07-04"], "FOLLOWING")[1]) == "2025-07-07"
+    assert str(calendar.adjust_array(["1999-01-01"], "FOLLOWING")[0]) == "1999-01-01"
+
+
+def test_is_business_day_and_count(calendar):
+    assert not calendar.is_business_day(datetime.date(2025, 12, 25))
+    assert not calendar.is_business_day("2025-12-27")
+    assert calendar.is_business_day(np.datetime64("2025-12-26"))
+    expected = int(np.busday_count("2025-01-01", "2026-01-01", holidays=HOLIDAYS))
+    assert calendar.business_days_between("2025-01-01", "2026-01-01") == expected
+    assert calendar.business_days_between("2026-01-01", "2025-01-01") == -expected
+
+
+def test_weekmask():
+    calendar = BusinessCalendar(weekmask="1111001")  # Sunday-Thursday
+    assert calendar.adjust("2025-07-04", "FOLLOWING").isoformat() == "2025-07-06"
+    with pytest.raises(ValueError, match="weekmask"):
+        BusinessCalendar(weekmask="11111")
+
+
+def test_intersect():
+    london = BusinessCalendar(["2025-08-25"], name="GBLO")
+    new_york = BusinessCalendar(["2025-09-01"], name="USNY")
+    both = BusinessCalendar.intersect([london, new_york])
+    assert both.name == "GBLO+USNY"
+    assert not both.is_business_day("2025-08-25") and not both.is_business_day("2025-09-01")
+    assert both.holidays == [datetime.date(2025, 8, 25), datetime.date(2025, 9, 1)]
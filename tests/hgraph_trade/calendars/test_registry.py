@@ -0,0 +1,78 @@
+"""Tests for the calendar registry and builder integration."""
+
+import pytest
+
+from hgraph_trade.calendars.registry import (
+    CalendarRegistry,
+    adjust_dates,
+    adjustable_date,
+    parse_business_centers,
+)
+from hgraph_trade.hgraph_trade_model.physical import create_commodity_physical
+from hgraph_trade.hgraph_trade_model.swap import create_commodity_swap
+
+
+@pytest.fixture
+def registry(tmp_path):
+    (tmp_path / "USNY.txt").write_text("# New York\n2025-07-04  # Independence Day\n\n2025-09-01\n")
+    (tmp_path / "GBLO.txt").write_text("2025-08-25\n")
+    (tmp_path / "AEDU.txt").write_text("weekmask 1111001\n")
+    return CalendarRegistry(str(tmp_path))
+
+
+def test_parse_business_centers():
+    assert parse_business_centers("usny, GBLO") == ("GBLO", "USNY")
+    assert parse_business_centers(["USNY", "USNY"]) == ("USNY",)
+    assert parse_business_centers(None) == ()
+
+
+def test_get_loads_once_and_combines(registry):
+    assert registry.available() == ["AEDU", "GBLO", "USNY"]
+    usny = registry.get("USNY")
+    assert registry.get(["usny"]) is usny
+    combined = registry.get("USNY,GBLO")
+    assert combined is registry.get(["GBLO", "USNY"])
+    assert not combined.is_business_day("2025-08-25")
+    assert not combined.is_business_day("2025-09-01")
+    assert registry.get("AEDU").weekmask == "1111001"
+
+
+def test_missing_or_bad_calendar(registry, tmp_path):
+    with pytest.raises(ValueError, match="JPTO"):
+        registry.get("JPTO")
+    (tmp_path / "BAD.txt").write_text("not-a-date\n")
+    with pytest.raises(ValueError, match="BAD.txt:1"):
+        registry.get("BAD")
+
+
+def test_adjust_dates(registry):
+    adjusted = adjust_dates(["2025-07-04", "2025-08-30"], "MODFOLLOWING", "USNY", registry)
+    assert [str(d) for d in adjusted] == ["2025-07-07", "2025-08-29"]
+
+
+def test_adjustable_date(registry):
+    assert adjustable_date("2025-07-04", "FOLLOWING", None, registry) == {
+        "unadjustedDate": "2025-07-04",
+        "dateAdjustments": {"businessDayConvention": "FOLLOWING"},
+    }
+    assert adjustable_date("2025-07-04", "FOLLOWING", "USNY", registry) == {
+        "unadjustedDate": "2025-07-04",
+        "dateAdjustments": {"businessDayConvention": "FOLLOWING", "businessCenters": {"businessCenter": ["USNY"]}},
+        "adjustedDate": "2025-07-07",
+    }
+
+
+def test_builders_emit_adjusted_dates(registry, monkeypatch, swap_fixed_float_data, physical_gas_data):
+    import hgraph_trade.calendars.registry as registry_module
+
+    monkeypatch.setattr(registry_module, "_default", registry)
+    dates = {
+        "effectiveDate.unadjustedDate": "2025-07-04",
+        "effectiveDate.businessDayConvention": "FOLLOWING",
+        "effectiveDate.businessCenters": "USNY",
+    }
+    swap = create_commodity_swap({**swap_fixed_float_data, **dates}, "fixedFloat")[0]["commoditySwap"]
+    assert swap["effectiveDate"]["adjustableDate"]["adjustedDate"] == "2025-07-07"
+
+    physical = create_commodity_physical({**physical_gas_data, **dates})[0]
+    assert physical["commoditySwap"]["effectiveDate"]["adjustableDate"]["adjustedDate"] == "2025-07-07"
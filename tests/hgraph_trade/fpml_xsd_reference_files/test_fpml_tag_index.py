@@ -0,0 +1,168 @@
+"""Tests for fpml_tag_index — compact memory-mapped FpML tag index."""
+
+import json
+
+import pytest
+from hgraph_trade.fpml_xsd_reference_files.fpml_tag_index import (
+    FpmlTagIndex,
+    FpmlTagNode,
+    build_tag_index,
+    build_tag_index_from_json,
+)
+
+SAMPLE_TAGS = {
+    "bullionPhysicalLeg": {
+        "type": "complexType",
+        "documentation": "The physical leg of a Commodity Forward Transaction.",
+        "python_type": "unknownType",
+        "children": {
+            "payerPartyReference": {
+                "type": "complexType",
+                "documentation": "A reference to the paying party.",
+                "python_type": "unknownType",
+                "children": {},
+            },
+            "deliveryLocation": {
+                "type": "complexType",
+                "documentation": "The physical delivery location.",
+                "python_type": "unknownType",
+                "attributes": ["deliveryLocationScheme", "id"],
+                "children": {
+                    "locationId": {
+                        "type": "simpleType",
+                        "documentation": "",
+                        "python_type": "str",
+                        "children": {},
+                    },
+                },
+            },
+        },
+    },
+    "commoditySwap": {
+        "type": "complexType",
+        "documentation": "A commodity swap.",
+        "python_type": "unknownType",
+        "children": {
+            "payerPartyReference": {
+                "type": "complexType",
+                "documentation": "A reference to the paying party.",
+                "python_type": "unknownType",
+                "children": {},
+            },
+        },
+    },
+    "bullionType": {
+        "type": "simpleType",
+        "documentation": "The type of Bullion.",
+        "base": "{http://www.w3.org/2001/XMLSchema}token",
+    },
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = str(tmp_path / "fpml_tags.idx")
+    build_tag_index(SAMPLE_TAGS, path)
+    idx = FpmlTagIndex.open(path)
+    yield idx
+    idx.close()
+
+
+# ---------- build ----------
+
+
+def test_build_returns_node_count(tmp_path):
+    assert build_tag_index(SAMPLE_TAGS, str(tmp_path / "t.idx")) == 7
+
+
+def test_build_from_json(tmp_path):
+    json_path = tmp_path / "fpml_tags.json"
+    json_path.write_text(json.dumps(SAMPLE_TAGS))
+    idx_path = str(tmp_path / "fpml_tags.idx")
+    assert build_tag_index_from_json(str(json_path), idx_path) == 7
+    with FpmlTagIndex.open(idx_path) as idx:
+        assert list(idx) == list(SAMPLE_TAGS)
+
+
+def test_build_rejects_unknown_attributes(tmp_path):
+    with pytest.raises(ValueError, match="unsupported attributes"):
+        build_tag_index({"x": {"type": "simpleType", "enum": ["a"]}}, str(tmp_path / "t.idx"))
+
+
+def test_open_rejects_non_index(tmp_path):
+    bogus = tmp_path / "bogus.idx"
+    bogus.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError, match="not an FpML tag index"):
+        FpmlTagIndex.open(str(bogus))
+
+
+# ---------- lookup ----------
+
+
+def test_top_level_mapping(index):
+    assert len(index) == 3
+    assert list(index) == ["bullionPhysicalLeg", "commoditySwap", "bullionType"]
+    assert "commoditySwap" in index
+    assert "nonsense" not in index
+
+
+def test_getitem_matches_json_shape(index):
+    leg = index["bullionPhysicalLeg"]
+    assert isinstance(leg, FpmlTagNode)
+    assert leg["type"] == "complexType"
+    assert leg["children"]["deliveryLocation"]["documentation"] == "The physical delivery location."
+
+
+def test_lookup_by_path(index):
+    node = index.lookup("bullionPhysicalLeg/deliveryLocation/locationId")
+    assert node is not None
+    assert node.name == "locationId"
+    assert node["python_type"] == "str"
+
+
+def test_lookup_same_name_under_different_parents(index):
+    a = index.lookup("bullionPhysicalLeg/payerPartyReference")
+    b = index.lookup("commoditySwap/payerPartyReference")
+    assert a.path != b.path
+    assert a.to_dict() == b.to_dict()
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["nonsense", "bullionPhysicalLeg/nonsense", "deliveryLocation", "commoditySwap/deliveryLocation"],
+)
+def test_lookup_missing(index, path):
+    assert index.lookup(path) is None
+
+
+def test_getitem_missing_and_nested_paths(index):
+    with pytest.raises(KeyError):
+        index["nonsense"]
+    with pytest.raises(KeyError):
+        index["bullionPhysicalLeg/deliveryLocation"]
+    with pytest.raises(KeyError):
+        index["bullionPhysicalLeg"]["children"]["nonsense"]
+
+
+def test_node_keys_reflect_stored_attributes(index):
+    assert set(index["bullionType"]) == {"type", "documentation", "base"}
+    assert "children" not in index["bullionType"]
+    with pytest.raises(KeyError):
+        index["bullionType"]["python_type"]
+
+
+def test_declared_xsd_attributes_round_trip(index):
+    location = index.lookup("bullionPhysicalLeg/deliveryLocation")
+    assert location["attributes"] == ["deliveryLocationScheme", "id"]
+    assert "attributes" in location
+    assert "attributes" not in index["bullionPhysicalLeg"]
+
+
+def test_children_are_lazy_mappings(index):
+    children = index["bullionPhysicalLeg"]["children"]
+    assert len(children) == 2
+    assert list(children) == ["payerPartyReference", "deliveryLocation"]
+
+
+def test_round_trip_to_dict(index):
+    assert {name: node.to_dict() for name, node in index.items()} == SAMPLE_TAGS
@@ -0,0 +1,175 @@
+"""Tests for fpml_XSD_parser — memoized, cycle-safe parsing and incremental regeneration."""
+
+import json
+import os
+
+import pytest
+from hgraph_trade.fpml_xsd_reference_files.fpml_tag_index import FpmlTagIndex
+from hgraph_trade.fpml_xsd_reference_files.fpml_XSD_parser import (
+    generate_fpml_tags,
+    map_xsd_type_to_python,
+    parse_xsd_schema,
+    schema_fingerprint,
+)
+
+MAIN_XSD = """<?xml version="1.0" encoding="UTF-8"?>
+<xsd:schema xmlns:xsd="http://www.w3.org/2001/XMLSchema">
+  <xsd:include schemaLocation="shared.xsd"/>
+  <xsd:complexType name="Leg">
+    <xsd:sequence>
+      <xsd:element name="payerPartyReference" type="PartyReference"/>
+      <xsd:element name="receiverPartyReference" type="PartyReference"/>
+      <xsd:element name="quantity" type="PositiveDecimal"/>
+      <xsd:element name="settlementCurrency" type="Currency"/>
+    </xsd:sequence>
+    <xsd:attribute name="id" type="xsd:ID"/>
+  </xsd:complexType>
+  <xsd:simpleType name="PositiveDecimal">
+    <xsd:restriction base="xsd:decimal">
+      <xsd:minExclusive value="0"/>
+    </xsd:restriction>
+  </xsd:simpleType>
+  <xsd:complexType name="Currency">
+    <xsd:simpleContent>
+      <xsd:extension base="xsd:token">
+        <xsd:attribute name="currencyScheme" type="xsd:anyURI"/>
+      </xsd:extension>
+    </xsd:simpleContent>
+  </xsd:complexType>
+  <xsd:complexType name="Basket">
+    <xsd:sequence>
+      <xsd:element name="name" type="xsd:string"/>
+      <xsd:element name="basket" type="Basket" minOccurs="0"/>
+    </xsd:sequence>
+  </xsd:complexType>
+  <xsd:element name="commoditySwapLeg" type="Leg" abstract="true"/>
+  <xsd:element name="fixedLeg" type="Leg" substitutionGroup="commoditySwapLeg"/>
+  <xsd:element name="floatingLeg" type="Leg"/>
+  <xsd:element name="basket" type="Basket"/>
+</xsd:schema>
+"""
+
+SHARED_XSD = """<?xml version="1.0" encoding="UTF-8"?>
+<xsd:schema xmlns:xsd="http://www.w3.org/2001/XMLSchema">
+  <xsd:complexType name="PartyReference">
+    <xsd:sequence>
+      <xsd:element name="href" type="xsd:string"/>
+    </xsd:sequence>
+  </xsd:complexType>
+</xsd:schema>
+"""
+
+
+@pytest.fixture
+def xsd_dir(tmp_path):
+    (tmp_path / "main.xsd").write_text(MAIN_XSD)
+    (tmp_path / "shared.xsd").write_text(SHARED_XSD)
+    return tmp_path
+
+
+# ---------- parse_xsd_schema ----------
+
+
+def test_shared_types_expanded_once(xsd_dir):
+    tags = parse_xsd_schema(str(xsd_dir / "main.xsd"))
+    fixed = tags["fixedLeg"]["children"]
+    assert fixed["payerPartyReference"]["children"] == {"href": fixed["payerPartyReference"]["children"]["href"]}
+    assert fixed["payerPartyReference"]["children"] is fixed["receiverPartyReference"]["children"]
+    assert tags["fixedLeg"]["children"] is tags["floatingLeg"]["children"]
+
+
+def test_recursive_type_becomes_reference(xsd_dir):
+    tags = parse_xsd_schema(str(xsd_dir / "main.xsd"))
+    inner = tags["basket"]["children"]["basket"]
+    assert inner["ref"] == "Basket"
+    assert inner["children"] == {}
+    assert tags["basket"]["children"]["name"]["type"] == "simpleType"
+
+
+def test_python_types_resolved_through_restrictions(xsd_dir):
+    children = parse_xsd_schema(str(xsd_dir / "main.xsd"))["fixedLeg"]["children"]
+    assert children["quantity"]["python_type"] == "float"
+    assert children["settlementCurrency"]["type"] == "complexType"
+    assert children["settlementCurrency"]["python_type"] == "str"
+    assert children["payerPartyReference"]["python_type"] == "unknownType"
+
+
+def test_declared_attributes_recorded(xsd_dir):
+    tags = parse_xsd_schema(str(xsd_dir / "main.xsd"))
+    assert tags["fixedLeg"]["attributes"] == ["id"]
+    assert tags["fixedLeg"]["children"]["settlementCurrency"]["attributes"] == ["currencyScheme"]
+    assert "attributes" not in tags["basket"]
+
+
+def test_substitution_group_recorded(xsd_dir):
+    tags = parse_xsd_schema(str(xsd_dir / "main.xsd"))
+    assert tags["fixedLeg"]["substitution_group"] == "commoditySwapLeg"
+    assert "substitution_group" not in tags["floatingLeg"]
+
+
+@pytest.mark.parametrize(
+    "xsd_type, expected",
+    [
+        ("xsd:decimal", "float"),
+        ("{http://www.w3.org/2001/XMLSchema}integer", "int"),
+        ("boolean", "bool"),
+        ("xsd:anyURI", "unknownType"),
+    ],
+)
+def test_map_xsd_type_to_python(xsd_type, expected):
+    assert map_xsd_type_to_python(xsd_type) == expected
+
+
+def test_parallel_matches_serial(xsd_dir):
+    xsd = str(xsd_dir / "main.xsd")
+    assert parse_xsd_schema(xsd, workers=2) == parse_xsd_schema(xsd)
+
+
+def test_parse_rejects_bad_workers(xsd_dir):
+    with pytest.raises(ValueError, match="workers"):
+        parse_xsd_schema(str(xsd_dir / "main.xsd"), workers=0)
+
+
+# ---------- schema_fingerprint ----------
+
+
+def test_fingerprint_follows_includes(xsd_dir):
+    fingerprint = schema_fingerprint(str(xsd_dir / "main.xsd"))
+    assert set(fingerprint) == {str(xsd_dir / "main.xsd"), str(xsd_dir / "shared.xsd")}
+
+
+def test_fingerprint_changes_with_included_file(xsd_dir):
+    before = schema_fingerprint(str(xsd_dir / "main.xsd"))
+    (xsd_dir / "shared.xsd").write_text(SHARED_XSD.replace("href", "id"))
+    assert schema_fingerprint(str(xsd_dir / "main.xsd")) != before
+
+
+# ---------- generate_fpml_tags ----------
+
+
+def test_generate_is_noop_when_unchanged(xsd_dir, tmp_path):
+    xsd = str(xsd_dir / "main.xsd")
+    output = str(tmp_path / "tags.json")
+    index = str(tmp_path / "tags.idx")
+
+    assert generate_fpml_tags(xsd, output, index) is True
+    with open(output) as fh:
+        assert set(json.load(fh)) == {"commoditySwapLeg", "fixedLeg", "floatingLeg", "basket"}
+    with FpmlTagIndex.open(index) as idx:
+        assert idx.lookup("basket/basket")["ref"] == "Basket"
+
+    assert generate_fpml_tags(xsd, output, index) is False
+    assert generate_fpml_tags(xsd, output, index, force=True) is True
+
+
+def test_generate_reruns_when_schema_or_output_changes(xsd_dir, tmp_path):
+    xsd = str(xsd_dir / "main.xsd")
+    output = str(tmp_path / "tags.json")
+    index = str(tmp_path / "tags.idx")
+    generate_fpml_tags(xsd, output, index)
+
+    (xsd_dir / "shared.xsd").write_text(SHARED_XSD.replace("href", "id"))
+    assert generate_fpml_tags(xsd, output, index) is True
+
+    os.remove(index)
+    assert generate_fpml_tags(xsd, output, index) is True
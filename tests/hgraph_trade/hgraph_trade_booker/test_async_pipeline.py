@@ -0,0 +1,189 @@
+"""Tests for async_pipeline — staged booking with bounded queues and backpressure."""
+
+import asyncio
+import json
+import pathlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from hgraph_trade.hgraph_trade_booker.async_pipeline import (
+    AsyncBookingPipeline,
+    PipelineStats,
+    QueueStats,
+    book_files_async,
+)
+from hgraph_trade.hgraph_trade_booker.pipeline_result import TradeStatus
+
+_SAMPLE_TRADE = (
+    pathlib.Path(__file__).resolve().parents[3] / "hgraph_trade" / "test_trades" / "fixed_float_BM_swap_001.txt"
+)
+
+
+def _write_trades(directory, count):
+    template = json.loads(_SAMPLE_TRADE.read_text())
+    paths = []
+    for i in range(count):
+        trade = dict(template, trade_id=f"SWAP-{i:03d}")
+        path = directory / f"trade_{i:03d}.json"
+        path.write_text(json.dumps(trade))
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(2) as pool:
+        yield pool
+
+
+class _SlowSender:
+    def __init__(self, delay):
+        self.delay = delay
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send_to_kafka(self, topic, message):
+        time.sleep(self.delay)
+        with self._lock:
+            self.sent.append((topic, message))
+
+
+# ---------- PipelineStats ----------
+
+
+def test_bottleneck_is_most_downstream_backed_up_queue():
+    stats = PipelineStats(
+        {
+            "load": QueueStats("load", 4, puts=10, _depth_total=40),
+            "validate": QueueStats("validate", 4, puts=10, _depth_total=40),
+            "map": QueueStats("map", 4, puts=10, _depth_total=35),
+            "wrap": QueueStats("wrap", 4, puts=10, _depth_total=5),
+            "sink": QueueStats("sink", 4, puts=10, _depth_total=5),
+        }
+    )
+    assert stats.bottleneck() == "map"
+    assert "Bottleneck: map" in stats.summary()
+
+
+def test_no_bottleneck_when_queues_drain():
+    stats = PipelineStats({"sink": QueueStats("sink", 4, puts=10, _depth_total=10)})
+    assert stats.bottleneck() is None
+
+
+# ---------- AsyncBookingPipeline ----------
+
+
+def test_books_every_file(tmp_path, executor):
+    paths = _write_trades(tmp_path, 12)
+    out = tmp_path / "out"
+
+    result, stats = book_files_async(paths, str(out), map_executor=executor, queue_size=4)
+
+    assert result.failure_count == 0
+    assert result.success_count == 12
+    booked = sorted(p.name for p in out.glob("*.json"))
+    assert booked == [f"SWAP-{i:03d}.json" for i in range(12)]
+    assert stats.queues["sink"].puts == 13  # 12 messages + stop marker
+
+
+def test_wrap_stage_seals_footer(tmp_path, executor):
+    paths = _write_trades(tmp_path, 1)
+    out = tmp_path / "out"
+    book_files_async(paths, str(out), map_executor=executor)
+
+    booked = json.loads((out / "SWAP-000.json").read_text())
+    assert len(booked["messageFooter"]["checksum"]) == 64
+
+
+def test_failures_are_reported_per_stage(tmp_path, executor):
+    paths = _write_trades(tmp_path, 1)
+    (tmp_path / "bad.json").write_text("not json")
+    paths += [str(tmp_path / "bad.json"), str(tmp_path / "missing.json")]
+
+    result, _ = book_files_async(paths, str(tmp_path / "out"), map_executor=executor)
+
+    assert result.success_count == 1
+    assert {r.status for r in result.failed} == {TradeStatus.VALIDATION_FAILED}
+    assert {r.stage for r in result.failed} == {"loading"}
+
+
+def test_slow_sink_backpressure_reaches_reader(tmp_path, executor):
+    paths = _write_trades(tmp_path, 20)
+    sender = _SlowSender(0.02)
+    pipeline = AsyncBookingPipeline(
+        str(tmp_path / "out"),
+        map_executor=executor,
+        queue_size=2,
+        sink_concurrency=1,
+        sender=sender,
+        topic="trades",
+    )
+    result = asyncio.run(pipeline.run(iter(paths)))
+
+    assert result.failure_count == 0
+    assert len(sender.sent) == 20
+    assert all(topic == "trades" for topic, _ in sender.sent)
+    assert pipeline.stats.queues["load"].blocked_puts > 0
+    assert pipeline.stats.bottleneck() == "sink"
+
+
+def test_blocking_source_does_not_stall_the_stages(tmp_path, executor):
+    paths = _write_trades(tmp_path, 4)
+    sent = []
+
+    class _Sender:
+        def send_to_kafka(self, topic, message):
+            sent.append(time.monotonic())
+
+    def slow_source():
+        # Like a fetch from the trade service: each item blocks before it arrives
+        for path in paths:
+            yield path
+            time.sleep(0.3)
+
+    started = time.monotonic()
+    result, _ = book_files_async(
+        slow_source(), str(tmp_path / "out"), map_executor=executor, sender=_Sender(), topic="trades"
+    )
+
+    assert result.success_count == 4
+    # The first trade is booked while the source is still blocked on the second
+    assert sent[0] - started < 0.3
+
+
+def test_send_failure_reported(tmp_path, executor):
+    class _FailingSender:
+        def send_to_kafka(self, topic, message):
+            raise RuntimeError("broker down")
+
+    paths = _write_trades(tmp_path, 2)
+    result, _ = book_files_async(
+        paths, str(tmp_path / "out"), map_executor=executor, sender=_FailingSender(), topic="trades"
+    )
+    assert [r.status for r in result.failed] == [TradeStatus.SEND_FAILED] * 2
+
+
+def test_fail_fast_stops_reading(tmp_path, executor):
+    (tmp_path / "bad.json").write_text("not json")
+    paths = [str(tmp_path / "bad.json")] + _write_trades(tmp_path, 30)
+
+    result, _ = book_files_async(paths, str(tmp_path / "out"), map_executor=executor, queue_size=1, fail_fast=True)
+    assert result.failure_count == 1
+    assert result.total < 31
+
+
+def test_default_process_pool(tmp_path):
+    paths = _write_trades(tmp_path, 3)
+    result, _ = book_files_async(paths, str(tmp_path / "out"), map_workers=2)
+    assert result.success_count == 3
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"queue_size": 0}, {"sink_concurrency": 0}, {"map_workers": 0}, {"sender": object()}],
+)
+def test_rejects_bad_options(tmp_path, options):
+    with pytest.raises(ValueError):
+        AsyncBookingPipeline(str(tmp_path), **options)
@@ -0,0 +1,192 @@
+"""Tests for duplicate_filter — Bloom filter persistence, rebuild, and duplicate suppression."""
+
+import os
+
+import pytest
+from hgraph_trade.hgraph_trade_booker.duplicate_filter import (
+    DEFAULT_FILTER_FILE,
+    BloomFilter,
+    BookedTradeFilter,
+)
+from hgraph_trade.hgraph_trade_booker.trade_booker import book_trades_batch
+from hgraph_trade.hgraph_trade_booker.trade_delta import TradeVersionStore
+
+
+def _message(trade_id="SWAP-001", trade_type="newTrade", price=4.0):
+    return {
+        "messageHeader": {"messageType": trade_type},
+        "tradeHeader": {"tradeHeader": {"partyTradeIdentifier": {"tradeId": trade_id}}},
+        "tradeEconomics": {"commoditySwap": {"fixedLeg": {"fixedPrice": {"price": price}}}},
+        "messageFooter": {},
+    }
+
+
+def _never_booked(trade_id):
+    raise AssertionError(f"unexpected exact lookup for {trade_id}")
+
+
+# ---------- BloomFilter ----------
+
+
+def test_bloom_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"T-{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    assert len(bloom) == 1000
+
+
+def test_bloom_false_positive_rate_near_target():
+    bloom = BloomFilter(capacity=2000, error_rate=0.01)
+    for i in range(2000):
+        bloom.add(f"in-{i}")
+    false_positives = sum(f"out-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_bloom_save_load_roundtrip(tmp_path):
+    bloom = BloomFilter(capacity=100)
+    bloom.add("a")
+    path = str(tmp_path / "f.bloom")
+    bloom.save(path)
+
+    loaded = BloomFilter.load(path)
+    assert "a" in loaded
+    assert "b" not in loaded
+    assert (loaded.bit_count, loaded.hash_count, len(loaded)) == (bloom.bit_count, bloom.hash_count, 1)
+
+
+def test_bloom_load_rejects_garbage(tmp_path):
+    path = tmp_path / "f.bloom"
+    path.write_bytes(b"not a filter at all, definitely not")
+    with pytest.raises(ValueError):
+        BloomFilter.load(str(path))
+
+
+@pytest.mark.parametrize("capacity, error_rate", [(0, 0.01), (10, 0), (10, 1.5)])
+def test_bloom_rejects_bad_parameters(capacity, error_rate):
+    with pytest.raises(ValueError):
+        BloomFilter(capacity, error_rate)
+
+
+# ---------- BookedTradeFilter ----------
+
+
+def test_negative_skips_exact_lookup():
+    dup_filter = BookedTradeFilter(BloomFilter(capacity=100))
+    assert not dup_filter.is_duplicate("T-1", "abc", _never_booked)
+    assert dup_filter.negatives == 1
+
+
+def test_in_process_duplicate_skips_exact_lookup():
+    dup_filter = BookedTradeFilter(BloomFilter(capacity=100))
+    dup_filter.add("T-1", "abc")
+    assert dup_filter.is_duplicate("T-1", "abc", _never_booked)
+    assert dup_filter.duplicates == 1
+
+
+def test_positive_confirmed_by_exact_lookup():
+    dup_filter = BookedTradeFilter(BloomFilter(capacity=100))
+    dup_filter.bloom.add("T-1\x1fabc")
+    assert dup_filter.is_duplicate("T-1", "abc", lambda trade_id: "abc")
+    assert not dup_filter.is_duplicate("T-1", "abc", lambda trade_id: "newer")
+    assert (dup_filter.duplicates, dup_filter.false_positives) == (1, 1)
+
+
+def test_open_or_rebuild_discards_corrupt_file(tmp_path):
+    (tmp_path / DEFAULT_FILTER_FILE).write_bytes(b"junk")
+    dup_filter = BookedTradeFilter.open_or_rebuild(str(tmp_path))
+    assert len(dup_filter.bloom) == 0
+    assert dup_filter.path == os.path.join(str(tmp_path), DEFAULT_FILTER_FILE)
+
+
+# ---------- book_trades_batch integration ----------
+
+
+def test_batch_skips_resent_trade(tmp_path):
+    out = str(tmp_path)
+    dup_filter = BookedTradeFilter.open_or_rebuild(out)
+
+    result = book_trades_batch([_message(), _message()], out, duplicate_filter=dup_filter)
+    assert len(result["booked"]) == 1
+    assert result["duplicates"] == ["SWAP-001"]
+    assert os.path.exists(os.path.join(out, DEFAULT_FILTER_FILE))
+
+
+def test_batch_books_changed_content(tmp_path):
+    out = str(tmp_path)
+    dup_filter = BookedTradeFilter.open_or_rebuild(out)
+
+    result = book_trades_batch(
+        [_message(), _message(trade_type="amendTrade", price=4.5)], out, duplicate_filter=dup_filter
+    )
+    assert len(result["booked"]) == 2
+    assert result["duplicates"] == []
+
+
+@pytest.mark.parametrize("trade_type", ["cancelTrade", "amendTrade"])
+def test_batch_books_lifecycle_event_with_unchanged_content(tmp_path, trade_type):
+    out = str(tmp_path)
+    book_trades_batch([_message()], out, duplicate_filter=BookedTradeFilter.open_or_rebuild(out))
+
+    # A fresh filter rebuilt from the booked files must not take the event for a re-send either
+    os.remove(os.path.join(out, DEFAULT_FILTER_FILE))
+    dup_filter = BookedTradeFilter.open_or_rebuild(out)
+    result = book_trades_batch([_message(trade_type=trade_type)], out, duplicate_filter=dup_filter)
+    assert result["duplicates"] == []
+    assert len(result["booked"]) == 1
+
+    result = book_trades_batch([_message(trade_type=trade_type)], out, duplicate_filter=dup_filter)
+    assert result["duplicates"] == ["SWAP-001"]
+
+
+def test_batch_lifecycle_event_with_version_store(tmp_path):
+    out = str(tmp_path)
+    store = TradeVersionStore(str(tmp_path / "versions"))
+    dup_filter = BookedTradeFilter.open_or_rebuild(out)
+
+    result = book_trades_batch(
+        [_message(), _message(trade_type="cancelTrade")], out, version_store=store, duplicate_filter=dup_filter
+    )
+    assert result["duplicates"] == []
+    assert result["deltas"] == [os.path.join(out, "SWAP-001.v2.json")]
+
+    rebuilt = BookedTradeFilter.rebuild(out)
+    result = book_trades_batch([_message(trade_type="cancelTrade")], out, version_store=store, duplicate_filter=rebuilt)
+    assert result["duplicates"] == ["SWAP-001"]
+
+
+def test_duplicates_detected_across_runs_via_saved_filter(tmp_path):
+    out = str(tmp_path)
+    book_trades_batch([_message()], out, duplicate_filter=BookedTradeFilter.open_or_rebuild(out))
+
+    dup_filter = BookedTradeFilter.open_or_rebuild(out)
+    result = book_trades_batch([_message(), _message("SWAP-002")], out, duplicate_filter=dup_filter)
+    assert result["duplicates"] == ["SWAP-001"]
+    assert len(result["booked"]) == 1
+
+
+def test_rebuild_from_output_dir_with_deltas(tmp_path):
+    out = str(tmp_path)
+    store = TradeVersionStore(str(tmp_path / "versions"))
+    book_trades_batch(
+        [_message(), _message(trade_type="amendTrade", price=4.5)],
+        out,
+        version_store=store,
+    )
+
+    dup_filter = BookedTradeFilter.rebuild(out)
+    assert len(dup_filter.bloom) == 2
+
+    # Re-sending the amendment is a duplicate; re-sending the original is not,
+    # because the latest booked version has moved on.
+    result = book_trades_batch(
+        [_message(trade_type="amendTrade", price=4.5), _message()],
+        out,
+        version_store=store,
+        duplicate_filter=dup_filter,
+    )
+    assert result["duplicates"] == ["SWAP-001"]
+    assert len(result["booked"]) == 1
+    assert dup_filter.false_positives == 1
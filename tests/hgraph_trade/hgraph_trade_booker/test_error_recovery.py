@@ -3,7 +3,7 @@
 import json
 
 import pytest
-from hgraph_trade.hgraph_trade_booker.trade_booker import book_trade, book_trades_batch
+from hgraph_trade.hgraph_trade_booker.trade_booker import Outcome, book_message, book_trade, book_trades_batch
 
 # ---------- book_trade ----------
 
@@ -68,3 +68,64 @@ def test_batch_quarantines_on_write_failure(tmp_path, monkeypatch):
     q_data = json.loads(open(result["quarantined"][0]).read())
     assert "Disk full" in q_data["error"]
     assert q_data["original_message"]["tradeHeader"]["partyTradeIdentifier"]["tradeId"] == "FAIL"
+
+
+def test_batch_quarantines_fpml_violations(tmp_path):
+    from hgraph_trade.hgraph_trade_booker.fpml_validator import FpmlValidator
+
+    tags = {
+        "commoditySwap": {
+            "type": "complexType",
+            "children": {"settlementCurrency": {"type": "complexType", "python_type": "str", "children": {}}},
+        }
+    }
+    messages = [
+        {
+            "tradeHeader": {"partyTradeIdentifier": {"tradeId": "BAD"}},
+            "tradeEconomics": {"commoditySwap": {"floatLeg1": {}}},
+        },
+        {
+            "tradeHeader": {"partyTradeIdentifier": {"tradeId": "GOOD"}},
+            "tradeEconomics": {"commoditySwap": {"settlementCurrency": "USD"}},
+        },
+    ]
+    result = book_trades_batch(messages, str(tmp_path), validator=FpmlValidator(tags))
+    assert result["booked"] == [str(tmp_path / "GOOD.json")]
+    assert result["quarantined"] == result["invalid"]
+    assert not (tmp_path / "BAD.json").exists()
+
+    q_data = json.loads(open(result["invalid"][0]).read())
+    assert "FpML validation failed" in q_data["error"]
+    assert q_data["violations"] == ["tradeEconomics/commoditySwap: unexpected element 'floatLeg1'"]
+
+
+def test_batch_reads_trade_id_from_nested_trade_header(tmp_path):
+    messages = [{"tradeHeader": {"tradeHeader": {"partyTradeIdentifier": {"tradeId": "NESTED-1"}}}}]
+    book_trades_batch(messages, str(tmp_path))
+    assert (tmp_path / "NESTED-1.json").exists()
+
+
+def test_book_message_reports_outcome(tmp_path):
+    from hgraph_trade.hgraph_trade_booker.duplicate_filter import BookedTradeFilter
+
+    out, q_dir = str(tmp_path / "out"), str(tmp_path / "quarantine")
+    message = {"tradeHeader": {"partyTradeIdentifier": {"tradeId": "T1"}}, "tradeEconomics": {"qty": 1}}
+    dup_filter = BookedTradeFilter()
+
+    assert book_message(message, "trade_0", out, q_dir, duplicate_filter=dup_filter) == (
+        Outcome.BOOKED,
+        str(tmp_path / "out" / "T1.json"),
+    )
+    assert book_message(message, "trade_0", out, q_dir, duplicate_filter=dup_filter) == (Outcome.DUPLICATE, "T1")
+
+
+# ---------- metrics ----------
+
+
+def test_batch_updates_booker_metrics(tmp_path):
+    from hgraph_trade.hgraph_trade_booker.trade_booker import BOOKED_MESSAGES
+
+    before = BOOKED_MESSAGES.labels("booked").value
+    messages = [{"tradeHeader": {"partyTradeIdentifier": {"tradeId": f"M{i}"}}} for i in range(3)]
+    book_trades_batch(messages, str(tmp_path))
+    assert BOOKED_MESSAGES.labels("booked").value == before + 3
@@ -0,0 +1,216 @@
+"""Tests for fpml_validator — structural validation of booked messages against FpML."""
+
+import pathlib
+
+import pytest
+from hgraph_trade.fpml_xsd_reference_files.fpml_tag_index import FpmlTagIndex, build_tag_index
+from hgraph_trade.hgraph_trade_booker.fpml_validator import FpmlValidator, FpmlViolation
+
+
+def _simple(python_type):
+    return {"type": "simpleType", "documentation": "", "python_type": python_type, "children": {}}
+
+
+def _ref():
+    return {"type": "complexType", "documentation": "", "python_type": "unknownType", "children": {}}
+
+
+LEG_CHILDREN = {
+    "payerPartyReference": _ref(),
+    "quantity": _simple("float"),
+    "businessCenter": _simple("str"),
+}
+
+TAGS = {
+    "commoditySwapLeg": {"type": "complexType", "documentation": "", "python_type": "unknownType", "children": {}},
+    "fixedLeg": {
+        "type": "complexType",
+        "documentation": "",
+        "python_type": "unknownType",
+        "substitution_group": "commoditySwapLeg",
+        "attributes": ["id"],
+        "children": LEG_CHILDREN,
+    },
+    "commoditySwap": {
+        "type": "complexType",
+        "documentation": "",
+        "python_type": "unknownType",
+        "children": {
+            "effectiveDate": {
+                "type": "complexType",
+                "documentation": "",
+                "python_type": "unknownType",
+                "children": {"unadjustedDate": _simple("date")},
+            },
+            "commonPricing": _simple("bool"),
+            "commoditySwapLeg": {
+                "type": "complexType",
+                "documentation": "",
+                "python_type": "unknownType",
+                "children": {},
+            },
+            "basket": {
+                "type": "complexType",
+                "documentation": "",
+                "python_type": "unknownType",
+                "ref": "Basket",
+                "children": {},
+            },
+        },
+    },
+}
+
+
+def _message(economics):
+    return {"tradeHeader": {}, "tradeEconomics": economics}
+
+
+@pytest.fixture(params=["dict", "index"])
+def validator(request, tmp_path):
+    if request.param == "dict":
+        yield FpmlValidator(TAGS)
+    else:
+        path = str(tmp_path / "tags.idx")
+        build_tag_index(TAGS, path)
+        with FpmlTagIndex.open(path) as idx:
+            yield FpmlValidator(idx)
+
+
+def test_conforming_message(validator):
+    message = _message(
+        {
+            "commoditySwap": {
+                "effectiveDate": {"unadjustedDate": "2024-01-01"},
+                "commonPricing": "true",
+                "fixedLeg": {
+                    "payerPartyReference": {"href": "party1"},
+                    "quantity": "10000",
+                    "businessCenter": ["GBLO", "USNY"],
+                },
+            }
+        }
+    )
+    assert validator.validate(message) == []
+
+
+def test_unexpected_element(validator):
+    violations = validator.validate(_message({"commoditySwap": {"floatLeg1": {}}}))
+    assert violations == [FpmlViolation("tradeEconomics/commoditySwap", "unexpected element 'floatLeg1'")]
+
+
+def test_unexpected_nested_element(validator):
+    violations = validator.validate(_message({"commoditySwap": {"fixedLeg": {"price": 1}}}))
+    assert [v.path for v in violations] == ["tradeEconomics/commoditySwap/fixedLeg"]
+
+
+def test_declared_attributes_accepted(validator):
+    assert validator.validate(_message({"commoditySwap": {"fixedLeg": {"id": "leg1", "quantity": 1}}})) == []
+    violations = validator.validate(_message({"commoditySwap": {"fixedLeg": {"id": "leg1", "href": "party1"}}}))
+    assert violations == [FpmlViolation("tradeEconomics/commoditySwap/fixedLeg", "unexpected element 'href'")]
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("quantity", "ten"),
+        ("quantity", True),
+    ],
+)
+def test_coercion_failures(validator, field, value):
+    violations = validator.validate(_message({"commoditySwap": {"fixedLeg": {field: value}}}))
+    assert len(violations) == 1
+    assert "cannot coerce" in violations[0].message
+
+
+def test_bad_date_and_bool(validator):
+    message = _message({"commoditySwap": {"effectiveDate": {"unadjustedDate": "01/02/2024"}, "commonPricing": "yes"}})
+    assert len(validator.validate(message)) == 2
+
+
+def test_empty_values_are_not_violations(validator):
+    message = _message({"commoditySwap": {"effectiveDate": "", "fixedLeg": {"quantity": "", "businessCenter": None}}})
+    assert validator.validate(message) == []
+
+
+def test_scalar_for_structure(validator):
+    violations = validator.validate(_message({"commoditySwap": {"effectiveDate": "2024-01-01"}}))
+    assert "expected element content" in violations[0].message
+
+
+def test_structure_for_simple_value(validator):
+    violations = validator.validate(_message({"commoditySwap": {"commonPricing": {"value": True}}}))
+    assert "expected a simple value" in violations[0].message
+
+
+def test_reference_nodes_accept_any_content(validator):
+    assert validator.validate(_message({"commoditySwap": {"basket": {"anything": {"goes": 1}}}})) == []
+
+
+def test_unknown_product_skipped_unless_strict(validator):
+    message = _message({"cashTrade": {"amount": 1}})
+    assert validator.validate(message) == []
+    strict = FpmlValidator(validator._tags, strict_products=True)
+    assert strict.validate(message) == [FpmlViolation("tradeEconomics/cashTrade", "no FpML definition for product")]
+
+
+def test_missing_trade_economics(validator):
+    assert validator.validate({"tradeHeader": {}})[0].path == "tradeEconomics"
+
+
+def test_compact_quantity_step_checked_as_quantity_step():
+    step = {
+        "type": "complexType",
+        "documentation": "",
+        "python_type": "unknownType",
+        "children": {
+            "quantity": _simple("float"),
+            "quantityUnit": _simple("str"),
+            "quantityFrequency": _simple("str"),
+        },
+    }
+    tags = {
+        "schedule": {
+            "type": "complexType",
+            "documentation": "",
+            "python_type": "unknownType",
+            "children": {"quantityStep": step},
+        }
+    }
+    validator = FpmlValidator(tags)
+    compact = {"encoding": "rle", "stepCount": 48, "quantityUnit": "MW", "runs": [[50, 24], [100, 24]]}
+    assert validator.validate(_message({"schedule": {"compactQuantityStep": compact}})) == []
+
+    compact["runs"][0][0] = "lots"
+    (violation,) = validator.validate(_message({"schedule": {"compactQuantityStep": compact}}))
+    assert violation.path == "tradeEconomics/schedule/quantityStep/quantity"
+
+
+# ---------- sample trades against the real FpML schema ----------
+
+_SAMPLE_TRADES = sorted((pathlib.Path(__file__).resolve().parents[3] / "hgraph_trade" / "test_trades").glob("*.txt"))
+
+
+@pytest.fixture(scope="module")
+def fpml_validator(tmp_path_factory):
+    pytest.importorskip("xmlschema")
+    from hgraph_trade.fpml_xsd_reference_files.fpml_XSD_parser import generate_fpml_tags
+
+    out = tmp_path_factory.mktemp("fpml")
+    generate_fpml_tags(output_file=str(out / "fpml_tags.json"), index_file=str(out / "fpml_tags.idx"))
+    with FpmlTagIndex.open(str(out / "fpml_tags.idx")) as idx:
+        yield FpmlValidator(idx)
+
+
+@pytest.mark.parametrize("trade_file", _SAMPLE_TRADES, ids=lambda path: path.name)
+def test_sample_trades_conform(fpml_validator, trade_file):
+    from hgraph_trade.hgraph_trade_booker.trade_loader import load_trade_from_file
+    from hgraph_trade.hgraph_trade_booker.trade_mapper import map_trade_to_model
+
+    try:
+        trade_data = load_trade_from_file(str(trade_file))
+    except Exception as exc:
+        pytest.skip(f"{trade_file.name} is not a loadable trade: {exc}")
+    messages = map_trade_to_model(trade_data)
+    assert messages
+    for message in messages:
+        assert fpml_validator.validate(message) == []
@@ -3,6 +3,7 @@
 from unittest.mock import MagicMock, patch
 
 import pytest
+from kafka import TopicPartition
 
 from hgraph_trade.hgraph_trade_booker.kafka_consumer import KafkaReceiver
 
@@ -151,6 +152,22 @@ def test_subscribe_updates_topics(mock_kafka_consumer):
     assert receiver._topics == ["topic.one", "topic.two", "topic.three"]
 
 
+def test_start_offsets_seek_on_assignment(mock_kafka_consumer):
+    mock_cls, mock_instance = mock_kafka_consumer
+    receiver = KafkaReceiver(["topic.one"], start_offsets=lambda: {("topic.one", 0): 42})
+
+    args, _ = mock_cls.call_args
+    assert args == ()
+    listener = mock_instance.subscribe.call_args.kwargs["listener"]
+    assert mock_instance.subscribe.call_args.args == (["topic.one"],)
+
+    listener.on_partitions_assigned([TopicPartition("topic.one", 0), TopicPartition("topic.one", 1)])
+    mock_instance.seek.assert_called_once_with(TopicPartition("topic.one", 0), 42)
+
+    receiver.subscribe(["topic.two"])
+    assert mock_instance.subscribe.call_args.kwargs["listener"] is listener
+
+
 # ---------------------------------------------------------------------------
 # commit()
 # ---------------------------------------------------------------------------
@@ -163,6 +180,44 @@ def test_commit(mock_kafka_consumer):
     mock_instance.commit.assert_called_once()
 
 
+def test_commit_explicit_offsets(mock_kafka_consumer):
+    _, mock_instance = mock_kafka_consumer
+    receiver = KafkaReceiver(["topic"])
+    receiver.commit({("topic", 0): 12, ("topic", 3): 7})
+
+    (offsets,), _ = mock_instance.commit.call_args
+    assert {tp: meta.offset for tp, meta in offsets.items()} == {
+        TopicPartition("topic", 0): 12,
+        TopicPartition("topic", 3): 7,
+    }
+
+
+def test_on_revoke_called_with_partitions(mock_kafka_consumer):
+    _, mock_instance = mock_kafka_consumer
+    revoked = []
+    KafkaReceiver(["topic"], on_revoke=revoked.extend)
+
+    listener = mock_instance.subscribe.call_args.kwargs["listener"]
+    listener.on_partitions_revoked([TopicPartition("topic", 2)])
+    listener.on_partitions_assigned([TopicPartition("topic", 2)])
+    assert revoked == [("topic", 2)]
+    mock_instance.seek.assert_not_called()
+
+
+def test_seek_pause_and_resume_assigned_partitions(mock_kafka_consumer):
+    _, mock_instance = mock_kafka_consumer
+    mock_instance.assignment.return_value = {TopicPartition("topic.retry.1", 0)}
+    receiver = KafkaReceiver(["topic.retry.1"])
+
+    receiver.seek("topic.retry.1", 0, 42)
+    receiver.pause([("topic.retry.1", 0), ("topic.retry.1", 1)])
+    receiver.resume([("topic.retry.1", 0), ("topic.retry.1", 1)])  # partition 1 was revoked meanwhile
+
+    mock_instance.seek.assert_called_once_with(TopicPartition("topic.retry.1", 0), 42)
+    mock_instance.pause.assert_called_once_with(TopicPartition("topic.retry.1", 0), TopicPartition("topic.retry.1", 1))
+    mock_instance.resume.assert_called_once_with(TopicPartition("topic.retry.1", 0))
+
+
 # ---------------------------------------------------------------------------
 # close()
 # ---------------------------------------------------------------------------
@@ -0,0 +1,42 @@
+"""Tests for the Kafka producer wrapper."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from kafka.errors import KafkaError, KafkaTimeoutError
+
+from hgraph_trade.hgraph_trade_booker.kafka_sender import KafkaSender
+
+
+@pytest.fixture(autouse=True)
+def producer():
+    """Mock kafka.KafkaProducer to avoid needing a live broker."""
+    with patch("hgraph_trade.hgraph_trade_booker.kafka_sender.KafkaProducer") as mock_cls:
+        mock_instance = MagicMock()
+        mock_cls.return_value = mock_instance
+        yield mock_instance
+
+
+def test_send_waits_for_acknowledgement(producer):
+    sender = KafkaSender("localhost:9092", send_timeout=5.0)
+    sender.send_to_kafka("trades", {"id": 1}, key="T-1")
+
+    producer.send.assert_called_once_with("trades", b'{"id": 1}', key=b"T-1")
+    producer.send.return_value.get.assert_called_once_with(timeout=5.0)
+
+
+def test_failed_delivery_retried_then_raised(producer):
+    producer.send.return_value.get.side_effect = KafkaTimeoutError("no ack")
+    sender = KafkaSender("localhost:9092", max_retries=2, retry_backoff=0)
+
+    with pytest.raises(KafkaError, match="after 2 attempts"):
+        sender.send_to_kafka("trades", "payload")
+    assert producer.send.call_count == 2
+
+
+def test_failed_delivery_recovers_on_retry(producer):
+    producer.send.return_value.get.side_effect = [KafkaError("broker down"), None]
+    sender = KafkaSender("localhost:9092", retry_backoff=0)
+
+    sender.send_to_kafka("trades", "payload")
+    assert producer.send.call_count == 2
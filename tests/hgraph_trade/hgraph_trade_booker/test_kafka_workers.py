@@ -0,0 +1,164 @@
+"""Tests for the partition-parallel Kafka worker pool."""
+
+import threading
+
+import pytest
+
+from hgraph_trade.hgraph_trade_booker.kafka_workers import KafkaWorkerPool, OffsetTracker
+
+
+def _run(pool, receiver):
+    pool.run(receiver, running=lambda: receiver.batches != [] or receiver.polls < 3, poll_interval_ms=0)
+
+
+# ---------------------------------------------------------------------------
+# OffsetTracker
+# ---------------------------------------------------------------------------
+
+
+def test_tracker_commits_lowest_unprocessed_offset():
+    tracker = OffsetTracker()
+    for offset in range(5):
+        tracker.dispatched("t", 0, offset)
+    tracker.dispatched("t", 1, 7)
+
+    tracker.completed("t", 0, 1)
+    tracker.completed("t", 0, 2)
+    assert tracker.committable() == {}  # offset 0 still in flight
+
+    tracker.completed("t", 0, 0)
+    tracker.completed("t", 1, 7)
+    assert tracker.committable() == {("t", 0): 3, ("t", 1): 8}
+    assert tracker.committable() == {}  # nothing advanced since
+    assert tracker.in_flight() == 2
+
+    tracker.forget([("t", 0)])
+    tracker.completed("t", 0, 3)  # completion of a forgotten partition is ignored
+    assert tracker.committable() == {}
+    assert tracker.in_flight() == 0
+
+
+# ---------------------------------------------------------------------------
+# KafkaWorkerPool
+# ---------------------------------------------------------------------------
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError, match="workers"):
+        KafkaWorkerPool(lambda records: None, lambda offsets: None, workers=0)
+    with pytest.raises(ValueError, match="dispatch"):
+        KafkaWorkerPool(lambda records: None, lambda offsets: None, workers=2, dispatch="round-robin")
+
+
+@pytest.mark.parametrize("dispatch", ["partition", "key"])
+def test_order_kept_and_all_offsets_committed(dispatch, kafka_record, fake_receiver):
+    seen = {}
+    threads = set()
+    lock = threading.Lock()
+    committed = {}
+
+    def process(records):
+        with lock:
+            threads.add(threading.current_thread().name)
+            for record in records:
+                group = record["partition"] if dispatch == "partition" else record["key"]
+                seen.setdefault(group, []).append(record["offset"])
+
+    batches = [
+        [
+            kafka_record("t", offset, {}, partition=partition, key=f"k{offset % 7}")
+            for partition in range(4)
+            for offset in range(i, i + 25)
+        ]
+        for i in range(0, 100, 25)
+    ]
+    pool = KafkaWorkerPool(process, committed.update, workers=3, dispatch=dispatch)
+    _run(pool, fake_receiver(batches))
+
+    assert committed == {("t", partition): 100 for partition in range(4)}
+    assert sum(len(offsets) for offsets in seen.values()) == 400
+    if dispatch == "partition":
+        assert all(offsets == list(range(100)) for offsets in seen.values())
+    assert len(threads) > 1
+
+
+def test_key_dispatch_keeps_per_key_order(kafka_record, fake_receiver):
+    seen = []
+    lock = threading.Lock()
+
+    def process(records):
+        with lock:
+            seen.extend((record["key"], record["offset"]) for record in records)
+
+    records = [kafka_record("t", offset, {}, key=f"entity-{offset % 5}") for offset in range(200)]
+    pool = KafkaWorkerPool(process, lambda offsets: None, workers=4, dispatch="key")
+    _run(pool, fake_receiver([records[:100], records[100:]]))
+
+    for key in {key for key, _ in seen}:
+        offsets = [offset for k, offset in seen if k == key]
+        assert offsets == sorted(offsets)
+        assert len(offsets) == 40
+
+
+def test_commit_waits_for_slow_record(kafka_record, fake_receiver):
+    release = threading.Event()
+    commits = []
+
+    def process(records):
+        if any(record["key"] == "slow" for record in records):
+            assert release.wait(5)
+
+    def commit(offsets):
+        commits.append(dict(offsets))
+        release.set()  # let the slow record finish once the others have committed
+
+    pool = KafkaWorkerPool(process, commit, workers=2, dispatch="key")
+    slow_worker = pool._worker_for({"key": "slow"})
+    fast = next(key for key in ("a", "b", "c", "d") if pool._worker_for({"key": key}) != slow_worker)
+    records = [
+        kafka_record("t", 0, {}, key=fast),
+        kafka_record("t", 1, {}, key="slow"),
+        kafka_record("t", 2, {}, key=fast),
+        kafka_record("t", 3, {}, key=fast),
+    ]
+    pool.run(fake_receiver([records]), running=lambda: not release.is_set(), poll_interval_ms=0)
+
+    # While offset 1 was in flight, nothing past it was committed
+    assert commits[0] == {("t", 0): 1}
+    assert commits[-1] == {("t", 0): 4}
+
+
+def test_process_error_stops_pool_without_committing_failed_records(kafka_record, fake_receiver):
+    commits = {}
+
+    def process(records):
+        if any(record["partition"] == 1 for record in records):
+            raise RuntimeError("boom")
+
+    batches = [
+        [kafka_record("t", 0, {}), kafka_record("t", 0, {}, partition=1)],
+        [kafka_record("t", 1, {}), kafka_record("t", 1, {}, partition=1)],
+    ]
+    pool = KafkaWorkerPool(process, commits.update, workers=2)
+    with pytest.raises(RuntimeError, match="boom"):
+        pool.run(fake_receiver(batches), running=lambda: True, poll_interval_ms=0)
+
+    assert ("t", 1) not in commits
+
+
+def test_drain_commits_in_flight_and_forgets_revoked(kafka_record, fake_receiver):
+    commits = []
+    pool = KafkaWorkerPool(lambda records: None, lambda offsets: commits.append(dict(offsets)), workers=2)
+
+    class _Receiver(fake_receiver):
+        def poll(self, timeout_ms=1000):
+            records = super().poll(timeout_ms)
+            if self.polls == 2:
+                pool.drain([("t", 0)])  # as the rebalance listener would, inside poll
+            return records
+
+    records = [kafka_record("t", 0, {}), kafka_record("t", 1, {}), kafka_record("t", 5, {}, partition=1)]
+    _run(pool, _Receiver([records]))
+
+    assert commits[0] == {("t", 0): 2, ("t", 1): 6}
+    assert pool.tracker.in_flight() == 0
@@ -0,0 +1,95 @@
+"""Tests for pipeline_profiler — per-stage profiles, creator attribution and collapsed stacks."""
+
+import os
+import pstats
+import time
+
+from hgraph_trade.hgraph_trade_booker.pipeline_profiler import (
+    COLLAPSED_FILE,
+    NULL_PROFILER,
+    REPORT_FILE,
+    PipelineProfiler,
+)
+
+
+def create_commodity_swap(seconds):
+    """Stand-in with the same name as the real creator, so it is attributed as one."""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_null_profiler_is_noop():
+    assert not NULL_PROFILER.enabled
+    with NULL_PROFILER.stage("map", "swap"):
+        pass
+    NULL_PROFILER.stop()
+
+
+def test_stages_timed_per_instrument():
+    profiler = PipelineProfiler(sample_interval=0)
+    for _ in range(3):
+        with profiler.stage("map", "swap"):
+            _busy(0.002)
+    with profiler.stage("map", "option"):
+        _busy(0.001)
+    with profiler.stage("load"):
+        pass
+
+    assert profiler.timings[("map", "swap")][0] == 3
+    assert profiler.timings[("map", "swap")][1] >= 0.006
+    assert profiler.timings[("map", "option")][0] == 1
+    assert set(profiler.profiles) == {("map", "swap"), ("map", "option"), ("load", "")}
+
+
+def test_nested_stage_attributed_to_innermost():
+    profiler = PipelineProfiler(sample_interval=0)
+    with profiler.stage("book"):
+        with profiler.stage("map", "swap"):
+            _busy(0.001)
+
+    book_funcs = {key[2] for key in pstats.Stats(profiler.profiles[("book", "")]).stats}
+    map_funcs = {key[2] for key in pstats.Stats(profiler.profiles[("map", "swap")]).stats}
+    assert "_busy" in map_funcs
+    assert "_busy" not in book_funcs
+
+
+def test_creator_times_and_report():
+    profiler = PipelineProfiler(sample_interval=0)
+    with profiler.stage("map", "swap"):
+        create_commodity_swap(0.002)
+
+    calls, seconds = profiler.creator_times()["create_commodity_swap"]
+    assert calls == 1
+    assert seconds >= 0.002
+
+    report = profiler.report()
+    assert "Wall time by instrument type:" in report
+    assert "create_commodity_swap" in report
+    assert "Top functions by own time -- map [swap]:" in report
+
+
+def test_write_outputs_collapsed_stacks(tmp_path):
+    profiler = PipelineProfiler(sample_interval=0.0005).start()
+    with profiler.stage("map", "swap"):
+        _busy(0.05)
+    profiler.stop()
+    profiler.stop()
+
+    out = tmp_path / "profile"
+    assert profiler.write(str(out)) == os.path.join(str(out), REPORT_FILE)
+    assert (out / "map-swap.pstats").exists()
+
+    lines = (out / COLLAPSED_FILE).read_text().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert stack.startswith("stage:map;instrument:swap;")
+    assert any(line.split(" ")[0].endswith(":_busy") for line in lines)
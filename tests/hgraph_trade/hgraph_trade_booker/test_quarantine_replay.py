@@ -0,0 +1,231 @@
+"""Tests for quarantine_replay — re-booking dead-lettered trades."""
+
+import json
+import threading
+
+import pytest
+from hgraph_trade.hgraph_trade_booker.pipeline_result import TradeStatus
+from hgraph_trade.hgraph_trade_booker.quarantine_replay import (
+    iter_quarantine_files,
+    requeue_file,
+    requeue_quarantined,
+)
+
+
+def _quarantine(directory, trade_id, **entry):
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{trade_id}.json"
+    message = {"tradeHeader": {"partyTradeIdentifier": {"tradeId": trade_id}}}
+    path.write_text(json.dumps({"original_message": message, "error": "Disk full", **entry}))
+    return path
+
+
+class _Validator:
+    """Reports the given violations for every message."""
+
+    def __init__(self, violations=()):
+        self.violations = list(violations)
+
+    def validate(self, message):
+        return self.violations
+
+
+# ---------- iter_quarantine_files ----------
+
+
+def test_iter_quarantine_files_only_json(tmp_path):
+    q_dir = tmp_path / "quarantine"
+    _quarantine(q_dir, "T1")
+    (q_dir / "notes.txt").write_text("ignore me")
+    assert [p.endswith("T1.json") for p in iter_quarantine_files(str(q_dir))] == [True]
+
+
+def test_iter_quarantine_files_missing_dir(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(iter_quarantine_files(str(tmp_path / "missing")))
+
+
+# ---------- requeue_file ----------
+
+
+def test_requeue_file_books_and_removes(tmp_path):
+    path = _quarantine(tmp_path / "quarantine", "SWAP-001")
+    result = requeue_file(str(path), str(tmp_path / "out"))
+
+    assert result.succeeded
+    assert not path.exists()
+    booked = json.loads((tmp_path / "out" / "SWAP-001.json").read_text())
+    assert booked["tradeHeader"]["partyTradeIdentifier"]["tradeId"] == "SWAP-001"
+
+
+def test_requeue_file_archives(tmp_path):
+    path = _quarantine(tmp_path / "quarantine", "SWAP-002")
+    result = requeue_file(str(path), str(tmp_path / "out"), archive_dir=str(tmp_path / "archive"))
+
+    assert result.succeeded
+    assert not path.exists()
+    assert (tmp_path / "archive" / "SWAP-002.json").exists()
+
+
+def test_requeue_file_malformed_left_in_place(tmp_path):
+    q_dir = tmp_path / "quarantine"
+    q_dir.mkdir()
+    path = q_dir / "BAD.json"
+    path.write_text(json.dumps({"error": "no message"}))
+
+    result = requeue_file(str(path), str(tmp_path / "out"))
+    assert result.status == TradeStatus.VALIDATION_FAILED
+    assert path.exists()
+
+
+def test_requeue_file_booking_failure_left_in_place(tmp_path, monkeypatch):
+    path = _quarantine(tmp_path / "quarantine", "FAIL")
+
+    def failing_book(trade_data, output_file, output_dir):
+        raise IOError("Disk still full")
+
+    monkeypatch.setattr("hgraph_trade.hgraph_trade_booker.trade_booker.book_trade", failing_book)
+    result = requeue_file(str(path), str(tmp_path / "out"))
+    assert result.status == TradeStatus.BOOKING_FAILED
+    assert "Disk still full" in result.message
+    assert path.exists()
+
+
+def test_requeue_file_invalid_entry_needs_validator(tmp_path):
+    path = _quarantine(tmp_path / "quarantine", "BADFPML", violations=["tradeEconomics: missing 'payer'"])
+
+    result = requeue_file(str(path), str(tmp_path / "out"))
+    assert result.status == TradeStatus.VALIDATION_FAILED
+    assert "replay with a validator" in result.message
+    assert path.exists()
+    assert not (tmp_path / "out").exists()
+
+
+def test_requeue_file_revalidates(tmp_path):
+    path = _quarantine(tmp_path / "quarantine", "BADFPML", violations=["old"])
+
+    result = requeue_file(str(path), str(tmp_path / "out"), validator=_Validator(["still missing 'payer'"]))
+    assert result.status == TradeStatus.VALIDATION_FAILED
+    assert json.loads(path.read_text())["violations"] == ["still missing 'payer'"]
+
+    assert requeue_file(str(path), str(tmp_path / "out"), validator=_Validator()).succeeded
+    assert not path.exists()
+    assert (tmp_path / "out" / "BADFPML.json").exists()
+
+
+def test_requeue_file_enrichment_rejection_left_in_place(tmp_path):
+    class _Enricher:
+        def enrich(self, message):
+            raise ValueError("externalParty 'ACME' is not a known legal entity")
+
+    path = _quarantine(tmp_path / "quarantine", "T1")
+    result = requeue_file(str(path), str(tmp_path / "out"), enricher=_Enricher())
+    assert result.status == TradeStatus.VALIDATION_FAILED
+    assert result.stage == "enrichment"
+    assert path.exists()
+
+
+def test_requeue_file_uses_version_store_and_duplicate_filter(tmp_path):
+    from hgraph_trade.hgraph_trade_booker.duplicate_filter import BookedTradeFilter
+    from hgraph_trade.hgraph_trade_booker.trade_booker import book_trades_batch
+    from hgraph_trade.hgraph_trade_booker.trade_delta import TradeVersionStore
+
+    out = tmp_path / "out"
+    store = TradeVersionStore(str(tmp_path / "versions"))
+    header = {"partyTradeIdentifier": {"tradeId": "T1"}}
+    new = {"messageHeader": {"messageType": "newTrade"}, "tradeHeader": header, "tradeEconomics": {"qty": 1}}
+    book_trades_batch([new], str(out), version_store=store)
+
+    amend = {"messageHeader": {"messageType": "amendTrade"}, "tradeHeader": header, "tradeEconomics": {"qty": 2}}
+    q_dir = tmp_path / "quarantine"
+    q_dir.mkdir()
+    (q_dir / "T1.v2.json").write_text(json.dumps({"original_message": amend, "error": "Disk full"}))
+    dup_filter = BookedTradeFilter.rebuild(str(out))
+
+    result = requeue_quarantined(str(q_dir), str(out), version_store=store, duplicate_filter=dup_filter)
+    assert result.success_count == 1
+    assert sorted(p.name for p in out.glob("*.json")) == ["T1.json", "T1.v2.json"]
+    assert store.get("T1").version == 2
+
+    # A quarantined re-send of the amendment is cleared without booking it again
+    (q_dir / "T1.v3.json").write_text(json.dumps({"original_message": amend, "error": "Disk full"}))
+    result = requeue_quarantined(str(q_dir), str(out), version_store=store, duplicate_filter=dup_filter)
+    assert result.success_count == 1
+    assert list(q_dir.iterdir()) == []
+    assert store.get("T1").version == 2
+
+
+# ---------- requeue_quarantined ----------
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_requeue_quarantined_books_all(tmp_path, concurrency):
+    q_dir = tmp_path / "quarantine"
+    for i in range(25):
+        _quarantine(q_dir, f"T{i}")
+
+    result = requeue_quarantined(str(q_dir), str(tmp_path / "out"), concurrency=concurrency)
+
+    assert result.total == 25
+    assert result.success_count == 25
+    assert result.finished_at is not None
+    assert list(q_dir.iterdir()) == []
+    assert len(list((tmp_path / "out").glob("*.json"))) == 25
+
+
+def test_requeue_quarantined_reports_failures(tmp_path):
+    q_dir = tmp_path / "quarantine"
+    _quarantine(q_dir, "OK")
+    (q_dir / "BAD.json").write_text("not json")
+
+    result = requeue_quarantined(str(q_dir), str(tmp_path / "out"))
+    assert result.success_count == 1
+    assert [r.trade_id for r in result.failed] == ["BAD"]
+
+
+def test_requeue_quarantined_validates_outside_booking_lock(tmp_path):
+    """With a shared version store and duplicate filter, different trades are still validated concurrently."""
+    from hgraph_trade.hgraph_trade_booker.duplicate_filter import BookedTradeFilter
+    from hgraph_trade.hgraph_trade_booker.trade_delta import TradeVersionStore
+
+    barrier = threading.Barrier(2, timeout=10)
+
+    class _WaitingValidator:
+        def validate(self, message):
+            barrier.wait()  # breaks unless both workers validate at the same time
+            return []
+
+    q_dir = tmp_path / "quarantine"
+    _quarantine(q_dir, "T1")
+    _quarantine(q_dir, "T2")
+    result = requeue_quarantined(
+        str(q_dir),
+        str(tmp_path / "out"),
+        concurrency=2,
+        validator=_WaitingValidator(),
+        version_store=TradeVersionStore(str(tmp_path / "versions")),
+        duplicate_filter=BookedTradeFilter(),
+    )
+    assert result.success_count == 2
+
+
+def test_requeue_quarantined_books_versions_of_one_trade_in_turn(tmp_path):
+    from hgraph_trade.hgraph_trade_booker.trade_delta import TradeVersionStore
+
+    store = TradeVersionStore(str(tmp_path / "versions"))
+    header = {"partyTradeIdentifier": {"tradeId": "T1"}}
+    q_dir = tmp_path / "quarantine"
+    q_dir.mkdir()
+    for qty in range(8):
+        amend = {"messageHeader": {"messageType": "amendTrade"}, "tradeHeader": header, "tradeEconomics": {"qty": qty}}
+        (q_dir / f"T1-{qty}.json").write_text(json.dumps({"original_message": amend, "error": "Disk full"}))
+
+    result = requeue_quarantined(str(q_dir), str(tmp_path / "out"), concurrency=4, version_store=store)
+    assert result.success_count == 8
+    assert store.get("T1").version == 8
+    assert len(list((tmp_path / "out").glob("T1*.json"))) == 8
+
+
+def test_requeue_quarantined_rejects_bad_concurrency(tmp_path):
+    with pytest.raises(ValueError):
+        requeue_quarantined(str(tmp_path), str(tmp_path / "out"), concurrency=0)
@@ -0,0 +1,150 @@
+"""Tests for static_enrichment — snapshot loading and trade header enrichment."""
+
+import sqlite3
+
+import pytest
+
+from hgraph_trade.hgraph_trade_booker.static_enrichment import (
+    LegalEntityRef,
+    PortfolioRef,
+    StaticDataEnricher,
+    StaticDataError,
+    StaticDataSnapshot,
+)
+from hgraph_trade.hgraph_trade_booker.trade_mapper import map_trade_to_model
+
+
+def _header(internal="InternalCo", external="ExternalCo", internal_pf="PortfolioA", external_pf="PortfolioB"):
+    return {
+        "partyTradeIdentifier": {"tradeId": "TEST-001"},
+        "parties": [{"internalParty": internal}, {"externalParty": external}],
+        "portfolio": {"internalPortfolio": internal_pf, "externalPortfolio": external_pf},
+    }
+
+
+@pytest.fixture
+def snapshot():
+    return StaticDataSnapshot(
+        legal_entities={
+            "InternalCo": LegalEntityRef("InternalCo", "Internal Co Ltd", "LEIINTERNAL0000000001", "Internal"),
+            "ExternalCo": LegalEntityRef("ExternalCo", "External Co plc", None, "External"),
+        },
+        relationships=frozenset({("InternalCo", "ExternalCo")}),
+        portfolios={
+            "PortfolioA": PortfolioRef("PortfolioA", "Gas Trading", "InternalCo"),
+            "Closed": PortfolioRef("Closed", "Old Book", "InternalCo", "Closed", is_book=True),
+        },
+        credit_counterparties=frozenset({"ExternalCo"}),
+    )
+
+
+@pytest.fixture
+def store_paths(tmp_path):
+    party_db, portfolio_db, credit_db = (str(tmp_path / n) for n in ("party.db", "portfolio.db", "credit.db"))
+    with sqlite3.connect(party_db) as conn:
+        conn.execute("CREATE TABLE legal_entities (symbol TEXT, name TEXT, classification TEXT, lei TEXT)")
+        conn.execute("CREATE TABLE trading_relationships (internal_party_symbol TEXT, external_party_symbol TEXT)")
+        conn.executemany(
+            "INSERT INTO legal_entities VALUES (?, ?, ?, ?)",
+            [
+                ("InternalCo", "Internal Co Ltd", "Internal", "LEI1"),
+                ("ExternalCo", "External Co plc", "External", None),
+            ],
+        )
+        conn.execute("INSERT INTO trading_relationships VALUES ('InternalCo', 'ExternalCo')")
+    with sqlite3.connect(portfolio_db) as conn:
+        for table in ("portfolios", "books"):
+            conn.execute(f"CREATE TABLE {table} (symbol TEXT, name TEXT, legal_entity_symbol TEXT, status TEXT)")
+        conn.execute("INSERT INTO portfolios VALUES ('PortfolioA', 'Gas Trading', 'InternalCo', 'Active')")
+        conn.execute("INSERT INTO books VALUES ('BookA', 'Gas Book', 'InternalCo', 'Active')")
+    with sqlite3.connect(credit_db) as conn:
+        conn.execute("CREATE TABLE credit_limits (counterparty_symbol TEXT, limit_type TEXT, status TEXT)")
+        conn.execute("INSERT INTO credit_limits VALUES ('ExternalCo', 'Gross', 'Active')")
+    return party_db, portfolio_db, credit_db
+
+
+def test_enrich_adds_lei_and_names(snapshot):
+    header = _header()
+    assert StaticDataEnricher(snapshot).enrich_header(header) == []
+    internal, external = header["parties"]
+    assert internal == {"internalParty": "InternalCo", "legalName": "Internal Co Ltd", "lei": "LEIINTERNAL0000000001"}
+    assert external == {"externalParty": "ExternalCo", "legalName": "External Co plc"}
+    assert header["portfolio"]["internalPortfolioName"] == "Gas Trading"
+    assert "externalPortfolioName" not in header["portfolio"]
+
+
+def test_enrich_accepts_full_message(snapshot):
+    message = {"tradeHeader": {"tradeHeader": _header(), "metadata": {}}}
+    StaticDataEnricher(snapshot).enrich(message)
+    assert message["tradeHeader"]["tradeHeader"]["parties"][0]["legalName"] == "Internal Co Ltd"
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (_header(external="Nobody"), "externalParty 'Nobody' is not a known legal entity"),
+        (_header(internal=""), "internalParty is missing"),
+        (_header(internal_pf="Missing"), "internalPortfolio 'Missing' is not a known portfolio or book"),
+        (_header(internal_pf="Closed"), "internalPortfolio 'Closed' is Closed"),
+        (_header(internal="ExternalCo"), "internalPortfolio 'PortfolioA' belongs to 'InternalCo', not 'ExternalCo'"),
+        (_header(internal="ExternalCo", external="InternalCo"), "No trading relationship"),
+    ],
+)
+def test_violations_raise_when_strict(snapshot, header, expected):
+    with pytest.raises(StaticDataError, match=expected) as info:
+        StaticDataEnricher(snapshot).enrich_header(header)
+    assert info.value.trade_id == "TEST-001"
+
+
+def test_lenient_returns_violations_and_enriches_the_rest(snapshot):
+    header = _header(external="Nobody")
+    violations = StaticDataEnricher(snapshot, strict=False).enrich_header(header)
+    assert violations == ["externalParty 'Nobody' is not a known legal entity"]
+    assert header["parties"][0]["legalName"] == "Internal Co Ltd"
+
+
+def test_require_credit_limit(snapshot):
+    enricher = StaticDataEnricher(snapshot, require_credit_limit=True)
+    assert enricher.enrich_header(_header()) == []
+    snapshot.credit_counterparties = frozenset()
+    with pytest.raises(StaticDataError, match="no active credit limit"):
+        enricher.enrich_header(_header())
+    with pytest.raises(ValueError, match="credit store"):
+        StaticDataEnricher(StaticDataSnapshot(), require_credit_limit=True)
+
+
+def test_snapshot_load_from_stores(store_paths):
+    snapshot = StaticDataSnapshot.load(*store_paths)
+    assert snapshot.legal_entities["InternalCo"].lei == "LEI1"
+    assert snapshot.relationships == {("InternalCo", "ExternalCo")}
+    assert snapshot.portfolios["BookA"].is_book
+    assert snapshot.credit_counterparties == {"ExternalCo"}
+
+
+def test_snapshot_load_missing_store_does_not_create_it(tmp_path):
+    path = tmp_path / "missing.db"
+    with pytest.raises(sqlite3.Error):
+        StaticDataSnapshot.load(str(path))
+    assert not path.exists()
+
+
+def test_refresh_and_max_age(store_paths):
+    enricher = StaticDataEnricher.from_stores(*store_paths[:2], max_age=0.0)
+    with sqlite3.connect(store_paths[0]) as conn:
+        conn.execute("UPDATE legal_entities SET lei = 'LEI2' WHERE symbol = 'InternalCo'")
+    header = _header()
+    enricher.enrich_header(header)
+    assert header["parties"][0]["lei"] == "LEI2"
+
+    with pytest.raises(ValueError, match="loader"):
+        StaticDataEnricher(StaticDataSnapshot()).refresh()
+
+
+def test_map_trade_to_model_with_enricher(swap_fixed_float_data, snapshot):
+    messages = map_trade_to_model(swap_fixed_float_data, enricher=StaticDataEnricher(snapshot))
+    assert messages[0]["tradeHeader"]["tradeHeader"]["parties"][1]["legalName"] == "External Co plc"
+
+    data = {**swap_fixed_float_data, "counterparty": {"internal": "InternalCo", "external": "Nobody"}}
+    assert map_trade_to_model(data, enricher=StaticDataEnricher(snapshot)) == []
+    with pytest.raises(StaticDataError):
+        map_trade_to_model(data, fail_fast=True, enricher=StaticDataEnricher(snapshot))
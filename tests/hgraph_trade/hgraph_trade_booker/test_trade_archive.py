@@ -0,0 +1,136 @@
+"""Tests for trade_archive — streaming trade files out of tar and zip bundles."""
+
+import io
+import json
+import pathlib
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from hgraph_trade.hgraph_trade_booker.async_pipeline import book_files_async
+from hgraph_trade.hgraph_trade_booker.trade_archive import is_trade_member, iter_archive_members
+from hgraph_trade.hgraph_trade_booker.trade_loader import load_trade_from_string
+
+_SAMPLE_TRADE = (
+    pathlib.Path(__file__).resolve().parents[3] / "hgraph_trade" / "test_trades" / "fixed_float_BM_swap_001.txt"
+)
+
+
+def _members(count):
+    template = json.loads(_SAMPLE_TRADE.read_text())
+    return {f"eod/SWAP-{i:03d}.json": json.dumps(dict(template, trade_id=f"SWAP-{i:03d}")) for i in range(count)}
+
+
+def _tar_bytes(members, mode="w:gz"):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode=mode) as tar:
+        for name, text in members.items():
+            data = text.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def _write_zip(path, members):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, text in members.items():
+            archive.writestr(name, text)
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("eod/SWAP-001.json", True),
+        ("SWAP-001.TXT", True),
+        ("eod/", False),
+        ("eod/readme.md", False),
+        ("eod/.hidden.json", False),
+        ("__MACOSX/eod/._SWAP-001.json", False),
+    ],
+)
+def test_is_trade_member(name, expected):
+    assert is_trade_member(name) is expected
+
+
+@pytest.mark.parametrize("mode, suffix", [("w:gz", ".tar.gz"), ("w:bz2", ".tar.bz2"), ("w", ".tar")])
+def test_iter_tar_members_in_order(tmp_path, mode, suffix):
+    members = _members(3)
+    path = tmp_path / f"drop{suffix}"
+    path.write_bytes(_tar_bytes({**members, "eod/notes.md": "skip"}, mode))
+
+    result = list(iter_archive_members(str(path)))
+    assert [name for name, _ in result] == list(members)
+    assert load_trade_from_string(result[0][1], result[0][0])["trade_id"] == "SWAP-000"
+
+
+def test_iter_zip_members(tmp_path):
+    members = _members(2)
+    path = tmp_path / "drop.zip"
+    _write_zip(path, members)
+    assert dict(iter_archive_members(str(path))) == members
+
+
+def test_iter_tar_from_stream():
+    members = _members(2)
+    stream = io.BytesIO(_tar_bytes(members))
+    assert [name for name, _ in iter_archive_members(stream)] == list(members)
+
+
+def test_tar_is_streamed_lazily():
+    data = _tar_bytes(_members(500), mode="w")
+    stream = io.BytesIO(data)
+    members = iter_archive_members(stream)
+    next(members)
+    assert stream.tell() < len(data) // 4
+
+
+def test_undecodable_member_reported_in_place(tmp_path):
+    path = tmp_path / "drop.tar"
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        for name, data in (("a.json", b"\xff\xfe"), ("b.json", b"{}")):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    path.write_bytes(buf.getvalue())
+
+    result = list(iter_archive_members(str(path)))
+    assert isinstance(result[0][1], ValueError)
+    assert result[1] == ("b.json", "{}")
+
+
+def test_truncated_tar_reports_final_failure(tmp_path):
+    data = _tar_bytes(_members(50))
+    path = tmp_path / "drop.tar.gz"
+    path.write_bytes(data[: len(data) // 2])
+
+    result = list(iter_archive_members(str(path)))
+    assert len(result) < 50
+    assert isinstance(result[-1][1], ValueError)
+    assert all(isinstance(content, str) for _, content in result[:-1])
+
+
+def test_not_an_archive(tmp_path):
+    path = tmp_path / "drop.tar.gz"
+    path.write_text("plain text")
+    with pytest.raises(ValueError):
+        iter_archive_members(str(path))
+
+
+def test_missing_archive(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        iter_archive_members(str(tmp_path / "missing.tar.gz"))
+
+
+def test_async_pipeline_books_archive_members(tmp_path):
+    path = tmp_path / "drop.tar.gz"
+    path.write_bytes(_tar_bytes({**_members(4), "eod/bad.json": "not json"}))
+
+    with ThreadPoolExecutor(2) as executor:
+        result, _ = book_files_async(iter_archive_members(str(path)), str(tmp_path / "out"), map_executor=executor)
+
+    assert result.success_count == 4
+    assert [r.trade_id for r in result.failed] == ["eod/bad.json"]
+    assert len(list((tmp_path / "out").glob("SWAP-*.json"))) == 4
@@ -0,0 +1,179 @@
+"""Tests for trade_delta — diffing, version store, and delta booking of amendments."""
+
+import copy
+import json
+
+import pytest
+from hgraph_trade.hgraph_trade_booker.trade_booker import book_trades_batch
+from hgraph_trade.hgraph_trade_booker.trade_delta import (
+    TradeVersion,
+    TradeVersionStore,
+    apply_delta,
+    build_delta_message,
+    content_checksum,
+    diff_content,
+)
+
+
+def _message(trade_id="SWAP-001", trade_type="newTrade", price=4.0, quantity=10000):
+    return {
+        "messageHeader": {"messageType": trade_type, "senderCompID": "hgraph_platform"},
+        "tradeHeader": {
+            "tradeHeader": {"partyTradeIdentifier": {"tradeId": trade_id}, "tradeDate": "2024-11-20"},
+        },
+        "tradeEconomics": {
+            "commoditySwap": {
+                "fixedLeg": {"fixedPrice": {"price": price, "priceCurrency": "USD"}},
+                "floatingLeg": {"notionalQuantity": {"quantity": quantity}},
+                "businessCenters": ["GBLO", "USNY"],
+            }
+        },
+        "tradeFooter": {},
+        "messageFooter": {"checksum": None},
+    }
+
+
+# ---------- diff_content / apply_delta ----------
+
+
+def test_diff_equal_is_empty():
+    assert diff_content({"a": [1, {"b": 2}]}, {"a": [1, {"b": 2}]}) == []
+
+
+def test_diff_replace_add_remove():
+    base = {"a": 1, "b": {"c": 2}, "d": 3}
+    new = {"a": 1, "b": {"c": 5}, "e": 4}
+    assert diff_content(base, new) == [
+        {"op": "remove", "path": "/d"},
+        {"op": "replace", "path": "/b/c", "value": 5},
+        {"op": "add", "path": "/e", "value": 4},
+    ]
+
+
+def test_diff_lists():
+    assert diff_content({"l": [1, 2]}, {"l": [1, 3]}) == [{"op": "replace", "path": "/l/1", "value": 3}]
+    assert diff_content({"l": [1, 2]}, {"l": [1]}) == [{"op": "replace", "path": "/l", "value": [1]}]
+
+
+def test_diff_distinguishes_types():
+    assert diff_content({"q": 1}, {"q": 1.0}) == [{"op": "replace", "path": "/q", "value": 1.0}]
+
+
+def test_diff_escapes_pointer_tokens():
+    ops = diff_content({}, {"a/b~c": 1})
+    assert ops == [{"op": "add", "path": "/a~1b~0c", "value": 1}]
+    assert apply_delta({}, ops) == {"a/b~c": 1}
+
+
+def test_apply_delta_round_trip():
+    base = _message()
+    new = _message(price=4.25, quantity=12000)
+    new["tradeEconomics"]["commoditySwap"]["businessCenters"] = ["GBLO"]
+    del new["tradeFooter"]
+    original = copy.deepcopy(base)
+    assert apply_delta(base, diff_content(base, new)) == new
+    assert base == original
+
+
+def test_apply_delta_rejects_mismatched_base():
+    with pytest.raises(ValueError, match="Cannot apply"):
+        apply_delta({}, [{"op": "replace", "path": "/a/b", "value": 1}])
+
+
+def test_content_checksum_ignores_key_order():
+    assert content_checksum({"a": 1, "b": 2}) == content_checksum({"b": 2, "a": 1})
+    assert content_checksum({"a": 1}) != content_checksum({"a": 2})
+
+
+# ---------- TradeVersionStore ----------
+
+
+def test_version_store_round_trip(tmp_path):
+    store = TradeVersionStore(str(tmp_path / "versions"))
+    assert store.get("T1") is None
+    recorded = store.put("T1", 3, {"tradeEconomics": {"x": 1}})
+    assert store.get("T1") == recorded
+    assert recorded.version == 3
+    assert recorded.checksum == content_checksum({"tradeEconomics": {"x": 1}})
+
+
+def test_build_delta_message():
+    base_content = {"tradeEconomics": {"price": 1}}
+    base = TradeVersion("T1", 1, content_checksum(base_content), base_content)
+    message = {"messageHeader": {"messageType": "amendTrade"}, "tradeEconomics": {"price": 2}}
+    delta, new_version = build_delta_message(message, "T1", base)
+    assert delta["tradeDelta"] == {
+        "tradeId": "T1",
+        "tradeType": "amendTrade",
+        "version": 2,
+        "baseVersion": 1,
+        "baseChecksum": base.checksum,
+        "checksum": new_version.checksum,
+        "operations": [{"op": "replace", "path": "/tradeEconomics/price", "value": 2}],
+    }
+
+
+# ---------- book_trades_batch with a version store ----------
+
+
+def test_batch_books_amend_as_delta(tmp_path):
+    store = TradeVersionStore(str(tmp_path / "versions"))
+    messages = [_message(), _message(trade_type="amendTrade", price=4.25)]
+    result = book_trades_batch(messages, str(tmp_path), version_store=store)
+
+    assert result["booked"] == [str(tmp_path / "SWAP-001.json"), str(tmp_path / "SWAP-001.v2.json")]
+    assert result["deltas"] == [str(tmp_path / "SWAP-001.v2.json")]
+
+    full = json.loads((tmp_path / "SWAP-001.json").read_text())
+    delta = json.loads((tmp_path / "SWAP-001.v2.json").read_text())["tradeDelta"]
+    base_content = {k: full[k] for k in ("tradeHeader", "tradeEconomics")}
+    assert delta["baseChecksum"] == content_checksum(base_content)
+    assert delta["operations"] == [
+        {"op": "replace", "path": "/tradeEconomics/commoditySwap/fixedLeg/fixedPrice/price", "value": 4.25}
+    ]
+    assert content_checksum(apply_delta(base_content, delta["operations"])) == delta["checksum"]
+    assert store.get("SWAP-001").version == 2
+
+
+def test_batch_deltas_chain_across_batches(tmp_path):
+    store = TradeVersionStore(str(tmp_path / "versions"))
+    book_trades_batch([_message()], str(tmp_path), version_store=store)
+    book_trades_batch([_message(trade_type="amendTrade", price=5.0)], str(tmp_path), version_store=store)
+    result = book_trades_batch([_message(trade_type="cancelTrade", price=5.0)], str(tmp_path), version_store=store)
+
+    delta = json.loads((tmp_path / "SWAP-001.v3.json").read_text())["tradeDelta"]
+    assert result["deltas"] == [str(tmp_path / "SWAP-001.v3.json")]
+    assert delta["tradeType"] == "cancelTrade"
+    assert delta["baseVersion"] == 2
+    assert delta["operations"] == []
+
+
+def test_batch_resent_new_trade_continues_versions(tmp_path):
+    store = TradeVersionStore(str(tmp_path / "versions"))
+    book_trades_batch([_message(), _message(trade_type="amendTrade", price=5.0)], str(tmp_path), version_store=store)
+    result = book_trades_batch([_message(price=6.0)], str(tmp_path), version_store=store)
+
+    # Booked in full as version 3; the original booking and its delta are untouched
+    assert result["booked"] == [str(tmp_path / "SWAP-001.v3.json")]
+    assert result["deltas"] == []
+    assert json.loads((tmp_path / "SWAP-001.json").read_text())["tradeEconomics"] == _message()["tradeEconomics"]
+    assert store.get("SWAP-001").version == 3
+
+    book_trades_batch([_message(trade_type="amendTrade", price=7.0)], str(tmp_path), version_store=store)
+    delta = json.loads((tmp_path / "SWAP-001.v4.json").read_text())["tradeDelta"]
+    assert (delta["baseVersion"], delta["version"]) == (3, 4)
+    assert delta["operations"][0]["value"] == 7.0
+
+
+def test_batch_amend_without_base_books_in_full(tmp_path):
+    store = TradeVersionStore(str(tmp_path / "versions"))
+    result = book_trades_batch([_message(trade_type="amendTrade")], str(tmp_path), version_store=store)
+    assert result["deltas"] == []
+    assert "tradeEconomics" in json.loads((tmp_path / "SWAP-001.json").read_text())
+    assert store.get("SWAP-001").version == 1
+
+
+def test_batch_without_store_rewrites_amend_in_full(tmp_path):
+    result = book_trades_batch([_message(), _message(trade_type="amendTrade")], str(tmp_path))
+    assert result["booked"] == [str(tmp_path / "SWAP-001.json")] * 2
+    assert result["deltas"] == []
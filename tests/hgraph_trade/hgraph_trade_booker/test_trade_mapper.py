@@ -0,0 +1,51 @@
+"""Tests for trade_mapper — lazy instrument-creator registry and message assembly."""
+
+import pytest
+import hgraph_trade.hgraph_trade_booker.trade_mapper as trade_mapper
+from hgraph_trade.hgraph_trade_booker.trade_mapper import map_trade_to_model
+
+# ---------- creator registry ----------
+
+
+@pytest.mark.parametrize("instrument_type", sorted(trade_mapper._INSTRUMENT_CREATOR_SPECS))
+def test_get_instrument_creator_resolves(instrument_type):
+    creator = trade_mapper._get_instrument_creator(instrument_type)
+    assert callable(creator)
+    assert trade_mapper._get_instrument_creator(instrument_type) is creator
+
+
+def test_get_instrument_creator_unknown():
+    assert trade_mapper._get_instrument_creator("nonsense") is None
+
+
+# ---------- map_trade_to_model ----------
+
+
+def test_map_swap_builds_full_message(swap_fixed_float_data):
+    messages = map_trade_to_model(swap_fixed_float_data)
+    assert len(messages) == 1
+    message = messages[0]
+    assert set(message) == {"messageHeader", "tradeHeader", "tradeEconomics", "tradeFooter", "messageFooter"}
+    assert "commoditySwap" in message["tradeEconomics"]
+
+
+def test_map_unsupported_instrument_skipped(base_trade_data):
+    data = {**base_trade_data, "instrument": "nonsense"}
+    assert map_trade_to_model(data) == []
+
+
+def test_map_unsupported_instrument_fail_fast(base_trade_data):
+    data = {**base_trade_data, "instrument": "nonsense"}
+    with pytest.raises(ValueError, match="Unsupported instrument"):
+        map_trade_to_model(data, fail_fast=True)
+
+
+# ---------- lazy package facades ----------
+
+
+def test_trade_model_facade_resolves_lazily():
+    import hgraph_trade.hgraph_trade_model as model
+
+    assert model.create_commodity_swap.__module__ == "hgraph_trade.hgraph_trade_model.swap"
+    with pytest.raises(AttributeError):
+        model.not_a_real_creator
@@ -0,0 +1,103 @@
+"""Tests for trade_source — pooled, batched fetches from the HTTP trade service."""
+
+import datetime
+
+import pytest
+from hgraph_trade.hgraph_trade_booker import trade_loader
+from hgraph_trade.hgraph_trade_booker.trade_source import TradeSourceClient, TradeSourceError
+from hgraph_trade.hgraph_trade_booker.trade_source_stub import StubTradeSourceServer
+
+_START = datetime.datetime(2024, 11, 20, tzinfo=datetime.timezone.utc)
+
+
+def _trades(count):
+    return [
+        {
+            "trade_id": f"SWAP-{i:05d}",
+            "tradeType": "newTrade",
+            "instrument": "outright",
+            "trade_date": "2024-11-20",
+            "execution_time": (_START + datetime.timedelta(seconds=i)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def server():
+    with StubTradeSourceServer(_trades(2000)) as stub:
+        yield stub
+
+
+def test_iter_trades_batches_and_pools(server):
+    ids = [f"SWAP-{i:05d}" for i in range(2000)]
+    with TradeSourceClient(server.url, batch_size=250, concurrency=4) as client:
+        trades = list(client.iter_trades(ids))
+
+    assert sorted(t["trade_id"] for t in trades) == ids
+    assert server.requests == 8
+    assert server.batch_sizes == [250] * 8
+    assert server.connections <= 4
+
+
+def test_iter_trades_skips_missing(server):
+    with TradeSourceClient(server.url) as client:
+        trades = list(client.iter_trades(["SWAP-00001", "NOPE-1"]))
+    assert [t["trade_id"] for t in trades] == ["SWAP-00001"]
+
+
+def test_iter_trades_in_window_pages_slices(server):
+    end = _START + datetime.timedelta(seconds=1500)
+    with TradeSourceClient(server.url, page_size=100, concurrency=4) as client:
+        trades = list(client.iter_trades_in_window(_START, end))
+
+    assert sorted(t["trade_id"] for t in trades) == [f"SWAP-{i:05d}" for i in range(1500)]
+    # 4 slices of 375 trades -> 4 pages each
+    assert server.requests == 16
+
+
+def test_window_must_be_ordered(server):
+    with TradeSourceClient(server.url) as client:
+        with pytest.raises(ValueError):
+            client.iter_trades_in_window(_START, _START)
+
+
+def test_retries_transient_failures(server):
+    server.fail_next = 2
+    with TradeSourceClient(server.url, retry_backoff=0.001) as client:
+        assert client.fetch_trade("SWAP-00007")["trade_id"] == "SWAP-00007"
+    assert server.requests == 3
+
+
+def test_gives_up_after_max_retries(server):
+    server.fail_next = 10
+    with TradeSourceClient(server.url, max_retries=2, retry_backoff=0.001) as client:
+        with pytest.raises(TradeSourceError, match="after 3 attempts"):
+            client.fetch_trade("SWAP-00007")
+
+
+def test_client_error_not_retried(server):
+    with TradeSourceClient(server.url.replace("/api", "/nope"), retry_backoff=0.001) as client:
+        with pytest.raises(TradeSourceError):
+            client.fetch_trade("SWAP-00007")
+    assert server.requests == 1
+
+
+def test_connection_refused_raises(server):
+    url = server.url
+    server.stop()
+    with TradeSourceClient(url, max_retries=1, retry_backoff=0.001, timeout=1) as client:
+        with pytest.raises(TradeSourceError):
+            client.fetch_trade("SWAP-00007")
+
+
+@pytest.mark.parametrize("option", ["batch_size", "page_size", "concurrency"])
+def test_rejects_bad_sizes(option):
+    with pytest.raises(ValueError):
+        TradeSourceClient("http://localhost", **{option: 0})
+
+
+def test_fetch_trade_from_hgraph_uses_shared_client(server, monkeypatch):
+    monkeypatch.setattr(trade_loader, "_trade_source_client", TradeSourceClient(server.url))
+    assert trade_loader.fetch_trade_from_hgraph("SWAP-00003")["trade_id"] == "SWAP-00003"
+    assert trade_loader.fetch_trade_from_hgraph("NOPE-1") == {}
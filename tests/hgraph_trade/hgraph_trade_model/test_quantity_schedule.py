@@ -0,0 +1,123 @@
+"""Tests for quantity_schedule — array-backed shaped quantities and their compact encodings."""
+
+import json
+
+import numpy as np
+import pytest
+
+from hgraph_trade.hgraph_trade_model.physical import create_commodity_physical
+from hgraph_trade.hgraph_trade_model.quantity_schedule import (
+    COMPACT_STEP_KEY,
+    QuantitySchedule,
+    expand_quantity_steps,
+)
+
+# Three years of hourly steps: 16 peak hours at 100 MW, 8 off-peak at 50 MW, with an outage
+DAY = np.array([50] * 7 + [100] * 16 + [50])
+HOURLY = np.tile(DAY, 3 * 365)
+HOURLY[5000:5100] = 0
+
+
+def _steps(quantities, unit="MW", frequency="PerHour"):
+    return [{"quantityUnit": unit, "quantityFrequency": frequency, "quantity": q} for q in quantities]
+
+
+@pytest.mark.parametrize(
+    "quantities",
+    [[], [10], [10, 10, 10], [1.5, 2.5, 2.5, 1.5], HOURLY, np.concatenate((HOURLY, [7, 7, 8]))],
+)
+def test_encodings_round_trip(quantities):
+    schedule = QuantitySchedule(quantities, "MW", "PerHour")
+    encodings = [schedule.encode_rle(), schedule.encode_blocks(24), schedule.encode_blocks(5), schedule.encode()]
+    for encoded in encodings:
+        decoded = QuantitySchedule.decode(json.loads(json.dumps(encoded)))
+        assert decoded == schedule
+
+
+def test_encode_picks_smaller_encoding():
+    flat = QuantitySchedule([25] * 8760, "MW", "PerHour").encode()
+    assert flat["encoding"] == "rle" and flat["runs"] == [[25, 8760]]
+
+    shaped = QuantitySchedule(HOURLY, "MW", "PerHour").encode()
+    assert shaped["encoding"] == "blocks"
+    assert shaped["blockSize"] == 24 and len(shaped["blocks"]) == 4
+    assert shaped["stepCount"] == len(HOURLY)
+
+
+def test_from_steps():
+    schedule = QuantitySchedule.from_steps(_steps([1, 2, 3]))
+    assert schedule.quantities.tolist() == [1, 2, 3]
+    assert (schedule.quantity_unit, schedule.quantity_frequency) == ("MW", "PerHour")
+    assert QuantitySchedule.from_steps(np.array([1.0, 2.0]), "MWh", "PerHour").total == 3.0
+    assert QuantitySchedule.from_steps(_steps([1]) + _steps([2], unit="MWh")) is None
+    assert QuantitySchedule.from_steps(_steps(["n/a"])) is None
+
+
+def test_decode_rejects_bad_input():
+    with pytest.raises(ValueError, match="encoding"):
+        QuantitySchedule.decode({"encoding": "zip", "runs": []})
+    with pytest.raises(ValueError, match="expected 5"):
+        QuantitySchedule.decode({"encoding": "rle", "stepCount": 5, "runs": [[1, 4]]})
+
+
+@pytest.fixture
+def shaped_power(base_trade_data):
+    return {
+        **base_trade_data,
+        "instrument": "physical",
+        "sub_instrument_type": "electricityPhysical",
+        "hasShapedQuantity": True,
+        "quantitySteps": _steps(HOURLY.tolist()),
+        "deliveryPeriodsScheduleReference": "deliveryPeriods",
+    }
+
+
+def _schedule_entry(result):
+    leg = result[0]["commoditySwap"]["electricityPhysicalLeg"]
+    return leg["deliveryQuantity"]["physicalQuantitySchedule"][0]
+
+
+def test_physical_books_step_list_by_default(shaped_power):
+    data = {**shaped_power, "quantitySteps": _steps(["50", "75.5"])}
+    entry = _schedule_entry(create_commodity_physical(data))
+    assert COMPACT_STEP_KEY not in entry
+    assert [s["quantity"] for s in entry["quantityStep"]] == ["50", "75.5"]
+
+
+def test_physical_books_compact_schedule_when_asked(shaped_power):
+    expanded = create_commodity_physical(shaped_power)
+    assert len(_schedule_entry(expanded)["quantityStep"]) == len(HOURLY)
+
+    compact = create_commodity_physical({**shaped_power, "compactQuantitySteps": True})
+    entry = _schedule_entry(compact)
+    assert "quantityStep" not in entry
+    assert entry[COMPACT_STEP_KEY]["encoding"] == "blocks"
+    assert entry["deliveryPeriodsScheduleReference"] == {"href": "deliveryPeriods"}
+    assert len(json.dumps(compact)) * 100 < len(json.dumps(expanded))
+    assert expand_quantity_steps(compact) == expanded
+
+
+def test_physical_accepts_bare_quantities(shaped_power):
+    data = {**shaped_power, "quantitySteps": HOURLY, "quantityUnit": "MW", "quantityFrequency": "PerHour"}
+    steps = _schedule_entry(create_commodity_physical(data))["quantityStep"]
+    assert steps[0] == {"quantityUnit": "MW", "quantityFrequency": "PerHour", "quantity": HOURLY[0]}
+    assert len(steps) == len(HOURLY)
+
+    data["compactQuantitySteps"] = True
+    encoded = _schedule_entry(create_commodity_physical(data))[COMPACT_STEP_KEY]
+    assert QuantitySchedule.decode(encoded) == QuantitySchedule(HOURLY, "MW", "PerHour")
+
+    rle = _schedule_entry(create_commodity_physical({**data, "quantityBlockSize": 1}))[COMPACT_STEP_KEY]
+    assert rle["encoding"] == "rle"
+
+
+def test_physical_mixed_units_keep_step_list(shaped_power):
+    data = {**shaped_power, "compactQuantitySteps": True, "quantitySteps": _steps([1, 2]) + _steps([3], unit="MWh")}
+    assert [s["quantity"] for s in _schedule_entry(create_commodity_physical(data))["quantityStep"]] == [1, 2, 3]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_physical_rejects_mixed_step_dicts_and_quantities(shaped_power, compact):
+    data = {**shaped_power, "compactQuantitySteps": compact, "quantitySteps": _steps([1]) + [2.0]}
+    with pytest.raises(ValueError, match="mixes"):
+        create_commodity_physical(data)
@@ -0,0 +1,147 @@
+"""Tests for setup_logging — JSON output, queue mode and rate limiting."""
+
+import json
+import logging
+
+import pytest
+from hgraph_trade.logging_config import setup_logging, shutdown_logging
+from hgraph_trade.logging_config.structured import JsonFormatter, RateLimitFilter
+
+
+@pytest.fixture(autouse=True)
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    shutdown_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def _record(name="hgraph.test", level=logging.INFO, msg="hello %s", args=("world",), created=None):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    if created is not None:
+        record.created = created
+    return record
+
+
+def _read_json_lines(path):
+    with open(path, "r", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh]
+
+
+def test_json_formatter_fields_and_extra():
+    record = _record()
+    record.trade_id = "SWAP-001"
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "hgraph.test"
+    assert entry["msg"] == "hello world"
+    assert entry["trade_id"] == "SWAP-001"
+    assert entry["ts"].endswith("Z")
+
+
+def test_json_formatter_exception():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        import sys
+
+        record = logging.LogRecord("hgraph.test", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["msg"] == "failed"
+    assert "ValueError: boom" in entry["exc"]
+
+
+def test_rate_limit_filter_token_bucket():
+    limiter = RateLimitFilter({"hgraph.test": 2.0})
+    passed = [limiter.filter(_record(created=100.0)) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+
+    # Half a second later one token has refilled; the record reports what was dropped
+    record = _record(created=100.5)
+    assert limiter.filter(record)
+    assert record.suppressed == 3
+    assert record.getMessage() == "hello world [3 similar record(s) suppressed]"
+
+
+def test_rate_limit_filter_scope():
+    limiter = RateLimitFilter({"hgraph": 1.0})
+    assert limiter.filter(_record(name="hgraph.child", created=1.0))
+    assert not limiter.filter(_record(name="hgraph.child", created=1.0))
+    # Separate bucket per logger
+    assert limiter.filter(_record(name="hgraph.other", created=1.0))
+    # Warnings and unmatched loggers always pass
+    assert limiter.filter(_record(name="hgraph.child", level=logging.WARNING, created=1.0))
+    assert all(limiter.filter(_record(name="elsewhere", created=1.0)) for _ in range(10))
+
+
+def test_rate_limit_filter_rejects_bad_rate():
+    with pytest.raises(ValueError):
+        RateLimitFilter({"hgraph": 0})
+
+
+@pytest.mark.parametrize("use_queue", [False, True])
+def test_setup_logging_json_file(tmp_path, use_queue):
+    log_file = tmp_path / "run.log"
+    setup_logging(level="INFO", log_file=str(log_file), fmt="json", use_queue=use_queue)
+    logger = logging.getLogger("hgraph.test")
+    for i in range(100):
+        logger.info("Trade %d booked", i, extra={"trade_id": f"T{i}"})
+    try:
+        raise RuntimeError("disk full")
+    except RuntimeError:
+        logger.exception("Booking failed")
+    shutdown_logging()
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+    entries = _read_json_lines(log_file)
+    assert [e["msg"] for e in entries[:2]] == ["Trade 0 booked", "Trade 1 booked"]
+    assert entries[99]["trade_id"] == "T99"
+    assert entries[-1]["msg"] == "Booking failed"
+    assert "RuntimeError: disk full" in entries[-1]["exc"]
+
+
+def test_setup_logging_queue_moves_handlers_to_listener(tmp_path):
+    setup_logging(level="INFO", log_file=str(tmp_path / "run.log"), use_queue=True)
+    root = logging.getLogger()
+    assert len(root.handlers) == 1
+    assert isinstance(root.handlers[0], logging.handlers.QueueHandler)
+
+
+def test_setup_logging_rate_limits(tmp_path):
+    log_file = tmp_path / "run.log"
+    setup_logging(level="INFO", log_file=str(log_file), fmt="json", rate_limits={"hgraph.chatty": 5.0})
+    chatty = logging.getLogger("hgraph.chatty")
+    for i in range(50):
+        chatty.info("message %d", i)
+    chatty.warning("always kept")
+    logging.getLogger("hgraph.quiet").info("not limited")
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+    messages = [e["msg"] for e in _read_json_lines(log_file)]
+    assert len([m for m in messages if m.startswith("message")]) <= 6
+    assert "always kept" in messages
+    assert "not limited" in messages
+
+
+def test_setup_logging_env_fallback(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_FORMAT", "json")
+    log_file = tmp_path / "run.log"
+    setup_logging(level="INFO", log_file=str(log_file))
+    logging.getLogger("hgraph.test").info("from env")
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+    assert _read_json_lines(log_file)[0]["msg"] == "from env"
+
+
+@pytest.mark.parametrize("kwargs", [{"fmt": "xml"}, {"rate_limits": {"hgraph": -1}}])
+def test_setup_logging_rejects_bad_options(kwargs):
+    with pytest.raises(ValueError):
+        setup_logging(level="INFO", **kwargs)
@@ -0,0 +1,24 @@
+"""Tests for the stand-alone metrics HTTP exporter."""
+
+import urllib.error
+import urllib.request
+
+import pytest
+from hgraph_trade.metrics import CONTENT_TYPE, MetricsRegistry
+from hgraph_trade.metrics.exporter import MetricsExporter
+
+
+def test_serves_registry():
+    registry = MetricsRegistry()
+    registry.counter("test_exported_total", "Test.").inc(7)
+
+    with MetricsExporter(0, host="127.0.0.1", registry=registry) as exporter:
+        with urllib.request.urlopen(exporter.url, timeout=5) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            assert "test_exported_total 7" in response.read().decode("utf-8")
+
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(exporter.url.replace("/metrics", "/other"), timeout=5)
+        assert excinfo.value.code == 404
+
+    exporter.stop()
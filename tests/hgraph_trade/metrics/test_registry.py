@@ -0,0 +1,112 @@
+"""Tests for the metrics registry — counters, gauges, histograms and text rendering."""
+
+import threading
+
+import pytest
+from hgraph_trade.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_labels_and_render(registry):
+    messages = registry.counter("test_messages_total", "Messages seen.", ("topic", "outcome"))
+    messages.labels("party", "processed").inc()
+    messages.labels(topic="party", outcome="processed").inc(2)
+    messages.labels("party", "failed").inc()
+
+    assert messages.labels("party", "processed").value == 3
+    assert registry.render() == (
+        "# HELP test_messages_total Messages seen.\n"
+        "# TYPE test_messages_total counter\n"
+        'test_messages_total{topic="party",outcome="failed"} 1\n'
+        'test_messages_total{topic="party",outcome="processed"} 3\n'
+    )
+
+
+def test_counter_rejects_decrement(registry):
+    with pytest.raises(ValueError):
+        registry.counter("test_total", "Test.").inc(-1)
+
+
+def test_unlabelled_and_labelled_misuse(registry):
+    labelled = registry.counter("test_labelled_total", "Test.", ("topic",))
+    with pytest.raises(ValueError, match="use .labels"):
+        labelled.inc()
+    with pytest.raises(ValueError):
+        labelled.labels("a", "b")
+    with pytest.raises(ValueError):
+        labelled.labels(other="a")
+
+
+def test_gauge(registry):
+    in_flight = registry.gauge("test_in_flight", "Test.")
+    in_flight.inc(3)
+    in_flight.dec()
+    assert in_flight.value == 2
+    in_flight.set(0.5)
+    assert "test_in_flight 0.5" in registry.render()
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = registry.histogram("test_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    child = latency.labels("/a")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        child.observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'test_seconds_sum{route="/a"} 3.65' in lines
+    assert 'test_seconds_count{route="/a"} 4' in lines
+
+
+def test_histogram_time(registry):
+    latency = registry.histogram("test_timed_seconds", "Test.")
+    with latency.time():
+        pass
+    assert latency.labels().count == 1
+
+
+@pytest.mark.parametrize("buckets", [(), (1.0, 0.5), (1.0, 1.0)])
+def test_histogram_rejects_bad_buckets(registry, buckets):
+    with pytest.raises(ValueError):
+        registry.histogram("test_bad_seconds", "Test.", buckets=buckets)
+
+
+def test_redeclare_returns_same_metric(registry):
+    first = registry.counter("test_shared_total", "Test.", ("outcome",))
+    assert registry.counter("test_shared_total", "Test.", ("outcome",)) is first
+    with pytest.raises(ValueError, match="already registered"):
+        registry.gauge("test_shared_total", "Test.")
+    with pytest.raises(ValueError, match="already registered"):
+        registry.counter("test_shared_total", "Test.", ("other",))
+
+
+@pytest.mark.parametrize("name", ["1bad", "bad-name", ""])
+def test_rejects_bad_names(registry, name):
+    with pytest.raises(ValueError):
+        registry.counter(name, "Test.")
+
+
+def test_label_values_escaped(registry):
+    registry.counter("test_escaped_total", "Test.", ("path",)).labels('a"b\\c\nd').inc()
+    assert 'test_escaped_total{path="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+
+def test_concurrent_increments_are_not_lost(registry):
+    hits = registry.counter("test_concurrent_total", "Test.").labels()
+
+    def _work():
+        for _ in range(10_000):
+            hits.inc()
+
+    threads = [threading.Thread(target=_work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert hits.value == 80_000
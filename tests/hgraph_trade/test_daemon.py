@@ -0,0 +1,141 @@
+"""Tests for hgraph_trade.daemon — the warm CLI daemon's server and client."""
+
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+from hgraph_trade.daemon import DaemonServer, forward_if_running, send_control
+
+
+class _Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, argv):
+        self.calls.append((list(argv), os.getcwd()))
+        if argv[1:] == ["exit"]:
+            sys.exit(3)
+        if argv[1:] == ["boom"]:
+            raise RuntimeError("kaboom")
+        print("out:" + " ".join(argv))
+        print("err:" + argv[0], file=sys.stderr)
+        return 7
+
+
+@pytest.fixture()
+def daemon(tmp_path):
+    run = _Recorder()
+    server = DaemonServer(run, str(tmp_path / "d.sock")).bind()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, run
+    server.stop()
+    thread.join(timeout=10)
+
+
+def test_forward_relays_output_exit_code_and_cwd(daemon, tmp_path, capfdbinary, monkeypatch):
+    server, run = daemon
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+
+    assert forward_if_running(["book", "--input_file", "t.json"], server.path) == 7
+
+    out, err = capfdbinary.readouterr()
+    assert out == b"out:book --input_file t.json\n"
+    assert err == b"err:book\n"
+    assert run.calls == [(["book", "--input_file", "t.json"], str(workdir))]
+    assert os.getcwd() == str(workdir)
+
+
+def test_forward_system_exit_and_exception(daemon):
+    server, _run = daemon
+    assert forward_if_running(["book", "exit"], server.path) == 3
+    assert forward_if_running(["book", "boom"], server.path) == 1
+    assert send_control("ping", server.path)["commands_served"] == 2
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["serve"],
+        ["party-subscribe"],
+        ["--no-daemon", "book"],
+        ["book", "--input_archive", "-"],
+        [],
+    ],
+)
+def test_not_forwarded(daemon, argv):
+    server, run = daemon
+    assert forward_if_running(argv, server.path) is None
+    assert run.calls == []
+
+
+def test_disabled_by_environment(daemon, monkeypatch):
+    server, run = daemon
+    monkeypatch.setenv("HGRAPH_DAEMON", "0")
+    assert forward_if_running(["book"], server.path) is None
+    assert run.calls == []
+
+
+def test_no_daemon_runs_locally(tmp_path):
+    assert forward_if_running(["book"], str(tmp_path / "missing.sock")) is None
+    assert send_control("ping", str(tmp_path / "missing.sock")) is None
+
+
+def test_stale_socket_replaced_and_removed_on_stop(tmp_path):
+    path = str(tmp_path / "d.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    assert forward_if_running(["book"], path) is None
+
+    server = DaemonServer(lambda argv: 0, path).bind()
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    with pytest.raises(RuntimeError, match="already listening"):
+        DaemonServer(lambda argv: 0, path).bind()
+
+    assert send_control("stop", path)["pid"] == os.getpid()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert not os.path.exists(path)
+
+
+def test_refused_when_config_environment_differs(tmp_path, monkeypatch):
+    run = _Recorder()
+    server = DaemonServer(run, str(tmp_path / "d.sock"), config_env={"PARTY_DB_PATH": "a.db", "CREDIT_DB_PATH": None})
+    thread = threading.Thread(target=server.bind().serve_forever, daemon=True)
+    thread.start()
+    try:
+        monkeypatch.setenv("PARTY_DB_PATH", "b.db")
+        assert forward_if_running(["book"], server.path) is None
+        monkeypatch.setenv("PARTY_DB_PATH", "a.db")
+        monkeypatch.setenv("CREDIT_DB_PATH", "credit.db")
+        assert forward_if_running(["book"], server.path) is None
+        assert run.calls == []
+
+        monkeypatch.delenv("CREDIT_DB_PATH")
+        assert forward_if_running(["book"], server.path) == 7
+        assert len(run.calls) == 1
+    finally:
+        server.stop()
+        thread.join(timeout=10)
+
+
+def test_socket_not_owned_by_user_runs_locally(daemon, tmp_path, monkeypatch):
+    server, run = daemon
+    planted = tmp_path / "planted.sock"
+    planted.write_text("")
+    assert forward_if_running(["book"], str(planted)) is None
+    with pytest.raises(RuntimeError, match="not a socket owned"):
+        DaemonServer(lambda argv: 0, str(planted)).bind()
+
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(server.path).st_uid + 1)
+    assert forward_if_running(["book"], server.path) is None
+    assert send_control("ping", server.path) is None
+    assert run.calls == []
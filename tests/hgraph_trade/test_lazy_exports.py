@@ -0,0 +1,25 @@
+"""Tests for lazy_exports — PEP 562 facades for the packages."""
+
+import sys
+
+import pytest
+
+import hgraph_trade.calendars as calendars
+
+
+def test_name_resolved_and_cached(monkeypatch):
+    monkeypatch.delitem(vars(calendars), "adjust_date", raising=False)
+    from hgraph_trade.calendars.registry import adjust_date
+
+    assert calendars.adjust_date is adjust_date
+    assert vars(calendars)["adjust_date"] is adjust_date
+    assert "hgraph_trade.calendars.registry" in sys.modules
+
+
+def test_unknown_name_raises_attribute_error():
+    with pytest.raises(AttributeError, match="no attribute 'not_a_calendar'"):
+        calendars.not_a_calendar
+
+
+def test_dir_lists_unresolved_names():
+    assert set(calendars.__all__) <= set(dir(calendars))
@@ -0,0 +1,170 @@
+"""Tests for the unified CLI — startup import budget per subcommand.
+
+Each subcommand is run in a fresh interpreter under ``python -X importtime``.
+The test fails if a subcommand imports a module it should not need (the
+deterministic check) or if the total import time exceeds its budget.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+_SAMPLE_TRADE = _REPO_ROOT / "hgraph_trade" / "test_trades" / "fixed_float_BM_swap_001.txt"
+
+# Matches: "import time:  self [us] | cumulative | imported package"
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$")
+
+# Interpreter start-up imports that happen before cli.py runs
+_INTERPRETER_MODULES = {"site", "encodings", "zipimport", "_frozen_importlib_external", "codecs", "io", "abc"}
+
+# Heavy modules that no lightweight subcommand should pay for
+_ALWAYS_FORBIDDEN = {"requests", "xmlschema", "pandas", "numpy", "kafka", "hgraph", "fastapi"}
+
+
+# Runs cli.py as __main__ and records sys.modules on exit. -X importtime does not
+# log modules loaded through importlib.import_module (used by the lazy facades),
+# so the module set is taken from sys.modules instead.
+_BOOTSTRAP = """
+import json, runpy, sys
+cli_path, modules_out = sys.argv[1], sys.argv[2]
+sys.argv = [cli_path] + sys.argv[3:]
+try:
+    runpy.run_path(cli_path, run_name="__main__")
+finally:
+    with open(modules_out, "w") as fh:
+        json.dump(sorted(sys.modules), fh)
+"""
+
+
+def _run_importtime(args, cwd, env=None):
+    """Run ``cli.py`` under ``-X importtime``; return (exit code, total import ms, loaded module names)."""
+    modules_out = Path(cwd) / "modules.json"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _BOOTSTRAP, str(_REPO_ROOT / "cli.py"), str(modules_out), *args],
+        cwd=cwd,
+        # In-process unless a test opts in, so a developer's running daemon does not skew the budgets
+        env={**os.environ, "PYTHONPATH": str(_REPO_ROOT), "HGRAPH_DAEMON": "0", **(env or {})},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match is None:
+            continue
+        _self_us, cumulative_us, indent, name = match.groups()
+        if len(indent) == 1 and name not in _INTERPRETER_MODULES:
+            total_us += int(cumulative_us)
+    modules = set(json.loads(modules_out.read_text()))
+    return proc.returncode, total_us / 1000.0, modules
+
+
+def _assert_not_imported(modules, forbidden):
+    leaked = sorted(m for m in modules if m in forbidden or m.split(".")[0] in forbidden)
+    assert not leaked, f"Unexpected imports at startup: {leaked}"
+
+
+@pytest.fixture()
+def book_args(tmp_path):
+    trade_file = tmp_path / "trade.txt"
+    shutil.copy(_SAMPLE_TRADE, trade_file)
+    return ["book", "--input_file", str(trade_file), "--output_dir", str(tmp_path / "out")]
+
+
+def test_help_startup_budget(tmp_path):
+    _rc, total_ms, modules = _run_importtime([], cwd=tmp_path)
+    _assert_not_imported(modules, _ALWAYS_FORBIDDEN | {"hgraph_trade.hgraph_trade_booker", "secure_config"})
+    assert total_ms < 150, f"CLI help imports took {total_ms:.1f} ms"
+
+
+def test_book_startup_budget(tmp_path, book_args):
+    rc, total_ms, modules = _run_importtime(book_args, cwd=tmp_path)
+    assert rc == 0
+    # Only the swap creator is needed for the sample trade
+    assert "hgraph_trade.hgraph_trade_model.swap" in modules
+    _assert_not_imported(
+        modules,
+        _ALWAYS_FORBIDDEN
+        | {
+            "hgraph_entitlements",
+            "hgraph_static_admin",
+            "hgraph_trade.hgraph_trade_model.option",
+            "hgraph_trade.hgraph_trade_model.physical",
+            "hgraph_trade.fpml_xsd_reference_files",
+        },
+    )
+    assert total_ms < 250, f"book imports took {total_ms:.1f} ms"
+
+
+def test_requeue_startup_budget(tmp_path):
+    (tmp_path / "out" / "quarantine").mkdir(parents=True)
+    rc, total_ms, modules = _run_importtime(["requeue", "--output_dir", str(tmp_path / "out")], cwd=tmp_path)
+    assert rc == 0
+    _assert_not_imported(
+        modules,
+        _ALWAYS_FORBIDDEN
+        | {"hgraph_entitlements", "hgraph_trade.hgraph_trade_booker.trade_mapper", "hgraph_trade.hgraph_trade_model"},
+    )
+    assert total_ms < 200, f"requeue imports took {total_ms:.1f} ms"
+
+
+def test_entitlements_startup_budget(tmp_path):
+    rc, total_ms, modules = _run_importtime(
+        ["entitlements", "check", "nobody", "execute_trade"],
+        cwd=tmp_path,
+        env={"ENTITLEMENTS_DB_PATH": str(tmp_path / "ent.db")},
+    )
+    assert rc == 1  # unknown user is denied
+    _assert_not_imported(modules, _ALWAYS_FORBIDDEN | {"hgraph_trade.hgraph_trade_booker"})
+    assert total_ms < 200, f"entitlements imports took {total_ms:.1f} ms"
+
+
+def test_book_forwarded_to_daemon(tmp_path, book_args):
+    socket_path = tmp_path / "d.sock"
+    env = {**os.environ, "PYTHONPATH": str(_REPO_ROOT), "HGRAPH_DAEMON_SOCKET": str(socket_path)}
+    daemon = subprocess.Popen(
+        [sys.executable, str(_REPO_ROOT / "cli.py"), "daemon"],
+        cwd=tmp_path,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while not socket_path.exists():
+            assert daemon.poll() is None, "daemon exited during start-up"
+            assert time.monotonic() < deadline, "daemon did not start"
+            time.sleep(0.05)
+
+        rc, total_ms, modules = _run_importtime(
+            book_args, cwd=tmp_path, env={"HGRAPH_DAEMON": "1", "HGRAPH_DAEMON_SOCKET": str(socket_path)}
+        )
+        assert rc == 0
+        assert list((tmp_path / "out").glob("*.json"))
+        # The client only relays: the mapper and booker stay in the daemon
+        _assert_not_imported(modules, _ALWAYS_FORBIDDEN | {"hgraph_trade.hgraph_trade_booker", "secure_config"})
+        assert total_ms < 150, f"forwarded book imports took {total_ms:.1f} ms"
+
+        stop = subprocess.run(
+            [sys.executable, str(_REPO_ROOT / "cli.py"), "daemon", "--stop"],
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        assert stop.returncode == 0
+        assert "1 command(s) served" in stop.stdout
+        assert daemon.wait(timeout=30) == 0
+        assert not socket_path.exists()
+    finally:
+        if daemon.poll() is None:
+            daemon.kill()